@@ -18,6 +18,7 @@ class Assembler:
         self.parser = InstructionParser()
         self.word_size = 8  # 64 bits
         self.address_word_index = {}
+        self.parsed_lines = []  # Instrucciones/directivas de la última ensamblada
 
     def assemble_file(self, input_file, output_binary, output_map=None):
         """Ensambla un archivo"""
@@ -32,6 +33,7 @@ class Assembler:
         """Ensambla código fuente"""
         self._reset_state()
         parsed_lines = self._first_pass(source_code)
+        self.parsed_lines = parsed_lines
         binary_output = self._second_pass(parsed_lines)
         return binary_output
 
@@ -39,6 +41,9 @@ class Assembler:
 
     def _first_pass(self, source_code):
         """Primera pasada: identificar etiquetas y parsear"""
+        # El lexer es global: reiniciar el contador para que line_no sea correcto
+        # también en la segunda y siguientes ensambladas
+        lexer.lineno = 1
         lexer.input(source_code)
         parsed_lines = []
         current_address = 0
@@ -1,10 +1,11 @@
-import struct
+from array import array
 from enum import IntEnum
 from typing import Tuple
 
 import src.user_interface.logging.logger as logger
 
 logger_handler = logger.configurar_logger()
+hot_logger = logger.configurar_logger_alta_frecuencia()
 
 
 # Banderas de la CPU
@@ -49,9 +50,57 @@ class ALUOperation(IntEnum):
     NEG = 13
 
 
+# Operaciones cuyo resultado puede desbordar 64 bits con signo
+_OVERFLOW_OPERATIONS = frozenset({ALUOperation.ADD, ALUOperation.SUB, ALUOperation.MUL})
+
+# Mensajes de registro por operación (solo con el logger de alta frecuencia)
+_LOG_MESSAGES = {
+    ALUOperation.ADD: "Desarrollo de la operación suma entre: %(a)d y %(b)d "
+    "con resultado %(r)d",
+    ALUOperation.SUB: "Desarrollo de la operación resta entre %(a)d y %(b)d "
+    "con resultado %(r)d",
+    ALUOperation.MUL: "Desarrollo de la operación multiplicación entre %(a)d y "
+    "%(b)d con resultado %(r)d",
+    ALUOperation.DIV: "Desarrollo de la operación división entre %(a)d y %(b)d "
+    "con resultado %(r)d",
+    ALUOperation.AND: "Desarrollo de la operación AND entre %(a)d y %(b)d "
+    "con resultado %(r)d",
+    ALUOperation.OR: "Desarrollo de la operación OR entre %(a)d y %(b)d "
+    "con resultado %(r)d",
+    ALUOperation.XOR: "Desarrollo de la operación XOR - or exclusivo entre %(a)d "
+    "y %(b)d con resultado %(r)d",
+    ALUOperation.NOT: "Desarrollo de la operación negación para %(a)d",
+    ALUOperation.SHL: "Desarrollo de la operación shift left para %(a)d",
+    ALUOperation.SHR: "Desarrollo de la operación shift right para %(a)d",
+    ALUOperation.CMP: "Desarrollo de la operación comparación para %(a)d y %(b)d",
+    ALUOperation.INC: "Desarrollo de la operación incremento para %(a)d",
+    ALUOperation.DEC: "Desarrollo de la operación decremento para %(a)d",
+}
+
+# Registro de flags diferidos: (resultado sin acotar, operando1, operando2, operación)
+LazyFlags = Tuple[int, int, int, ALUOperation]
+
+
 class ALU:
     """Unidad Aritmetico-Logica"""
 
+    def __init__(self, lazy_flags: bool = True):
+        """
+        Args:
+            lazy_flags: Si es True los ejecutores usan execute_lazy y los flags
+                solo se calculan cuando alguien los lee
+        """
+        self.lazy_flags = lazy_flags
+        self.refresh_logging()
+
+    def refresh_logging(self):
+        """
+        Resuelve la guarda de logging: con el registro de alta frecuencia
+        deshabilitado, _compute apunta a la variante sin llamadas al logger
+        """
+        self.trace = logger.hot_path_habilitado()
+        self._compute = self._compute_traced if self.trace else self._compute_fast
+
     def execute(
         self, operation: ALUOperation, operand1: int, operand2: int = 0
     ) -> Tuple[int, int]:
@@ -66,92 +115,103 @@ class ALU:
         Returns:
             Tupla (resultado, flags)
         """
-        flags = 0
-
         # Asegurar que los operandos sean de 64 bits con signo
         operand1 = self._to_signed_64(operand1)
         operand2 = self._to_signed_64(operand2)
 
+        result = self._compute(operation, operand1, operand2)
+
+        # Calcular flags
+        flags = self._calculate_flags(result, operand1, operand2, operation)
+        if self.trace:
+            hot_logger.debug("Estado de la ALU por medio del flag register: %d", flags)
+
+        # Convertir resultado a 64 bits sin signo
+        result = result & 0xFFFFFFFFFFFFFFFF
+
+        return result, flags
+
+    def execute_lazy(
+        self, operation: ALUOperation, operand1: int, operand2: int = 0
+    ) -> Tuple[int, LazyFlags]:
+        """
+        Ejecuta una operacion sin calcular los flags
+
+        Returns:
+            Tupla (resultado, registro para materialize_flags/test_flag)
+        """
+        operand1 = self._to_signed_64(operand1)
+        operand2 = self._to_signed_64(operand2)
+
+        result = self._compute(operation, operand1, operand2)
+
+        return result & 0xFFFFFFFFFFFFFFFF, (result, operand1, operand2, operation)
+
+    def materialize_flags(self, record: LazyFlags) -> int:
+        """Calcula el registro de flags completo a partir de un registro diferido"""
+        return self._calculate_flags(*record)
+
+    def test_flag(self, record: LazyFlags, flag: "Flags") -> bool:
+        """Calcula un solo bit de flag a partir de un registro diferido"""
+        result, op1, op2, operation = record
+        if flag == Flags.ZERO:
+            return result == 0
+        if flag == Flags.NEGATIVE:
+            return result < 0
+        if flag == Flags.POSITIVE:
+            return result >= 0
+        return bool(self._calculate_flags(result, op1, op2, operation) & (1 << flag))
+
+    def _compute_fast(
+        self, operation: ALUOperation, operand1: int, operand2: int
+    ) -> int:
+        """Resultado sin acotar de la operación (operandos ya con signo)"""
         if operation == ALUOperation.ADD:
             result = operand1 + operand2
-            logger_handler.info(
-                f"Desarrollo de la operación suma entre: {operand1} y {operand2} con resultado {result}"
-            )
         elif operation == ALUOperation.SUB:
             result = operand1 - operand2
-            logger_handler.info(
-                f"Desarrollo de la operación resta entre {operand1} y {operand2} con resultado {result}"
-            )
         elif operation == ALUOperation.MUL:
             result = operand1 * operand2
-            logger_handler.info(
-                f"Desarrollo de la operación multiplicación entre {operand1} y {operand2} con resultado {result}"
-            )
         elif operation == ALUOperation.DIV:
             if operand2 == 0:
                 logger_handler.error("Se intentó desarrollar una división por cero")
                 raise RuntimeError("Division por cero")
             result = operand1 // operand2
-            logger_handler.info(
-                f"Desarrollo de la operación división entre {operand1} y {operand2} con resultado {result}"
-            )
         elif operation == ALUOperation.AND:
             result = operand1 & operand2
-            logger_handler.info(
-                f"Desarrollo de la operación AND entre {operand1} y {operand2} con resultado {result}"
-            )
         elif operation == ALUOperation.OR:
             result = operand1 | operand2
-            logger_handler.info(
-                f"Desarrollo de la operación OR entre {operand1} y {operand2} con resultado {result}"
-            )
         elif operation == ALUOperation.XOR:
             result = operand1 ^ operand2
-            logger_handler.info(
-                f"Desarrollo de la operación XOR - or exclusivo entre {operand1} y {operand2} con resultado {result}"
-            )
         elif operation == ALUOperation.NOT:
             result = ~operand1
-            logger_handler.info(f"Desarrollo de la operación negación para {operand1}")
         elif operation == ALUOperation.SHL:
             result = operand1 << (operand2 & 63)  # Limitar shift a 63 bits
-            logger_handler.info(
-                f"Desarrollo de la operación shift left para {operand1}"
-            )
         elif operation == ALUOperation.SHR:
             result = operand1 >> (operand2 & 63)
-            logger_handler.info(
-                f"Desarrollo de la operación shift right para {operand1}"
-            )
         elif operation == ALUOperation.CMP:
             result = operand1 - operand2
-            logger_handler.info(
-                f"Desarrollo de la operación comparación para {operand1} y {operand2}"
-            )
         elif operation == ALUOperation.INC:
             result = operand1 + 1
-            logger_handler.info(
-                f"Desarrollo de la operación incremento para {operand1}"
-            )
         elif operation == ALUOperation.DEC:
             result = operand1 - 1
-            logger_handler.info(
-                f"Desarrollo de la operación decremento para {operand1}"
-            )
         elif operation == ALUOperation.NEG:
             result = -operand1
         else:
             logger_handler.error(f"Operación de ALU no reconocida: {operation}")
             raise ValueError(f"Operacion ALU no reconocida: {operation}")
 
-        # Calcular flags
-        flags = self._calculate_flags(result, operand1, operand2, operation)
-        logger_handler.info(f"Estado de la ALU por medio del flag register: {flags}")
-
-        # Convertir resultado a 64 bits sin signo
-        result = result & 0xFFFFFFFFFFFFFFFF
+        return result
 
-        return result, flags
+    def _compute_traced(
+        self, operation: ALUOperation, operand1: int, operand2: int
+    ) -> int:
+        """Igual que _compute_fast, registrando la operación (nivel DEBUG)"""
+        result = self._compute_fast(operation, operand1, operand2)
+        message = _LOG_MESSAGES.get(operation)
+        if message is not None:
+            hot_logger.debug(message, {"a": operand1, "b": operand2, "r": result})
+        return result
 
     def _to_signed_64(self, value: int) -> int:
         """Convierte un valor a entero con signo de 64 bits"""
@@ -177,15 +237,14 @@ class ALU:
             flags |= 1 << Flags.POSITIVE
 
         # Carry flag (para operaciones aritmeticas)
-        if operation in [ALUOperation.ADD, ALUOperation.SUB]:
-            if operation == ALUOperation.ADD:
-                if (op1 > 0 and op2 > 0 and result < 0) or (
-                    op1 < 0 and op2 < 0 and result > 0
-                ):
-                    flags |= 1 << Flags.CARRY
+        if operation == ALUOperation.ADD:
+            if (op1 > 0 and op2 > 0 and result < 0) or (
+                op1 < 0 and op2 < 0 and result > 0
+            ):
+                flags |= 1 << Flags.CARRY
 
         # Overflow flag
-        if operation in [ALUOperation.ADD, ALUOperation.SUB, ALUOperation.MUL]:
+        if operation in _OVERFLOW_OPERATIONS:
             if result > 0x7FFFFFFFFFFFFFFF or result < -0x8000000000000000:
                 flags |= 1 << Flags.OVERFLOW
 
@@ -195,7 +254,25 @@ class ALU:
 class FloatALU:
     """Unidad Aritmética para operaciones de punto flotante IEEE 754"""
 
-    def execute(self, operation: str, operand1: int, operand2: int) -> Tuple[int, int]:
+    def __init__(self):
+        # Tres palabras vistas a la vez como enteros de 64 bits y como doubles:
+        # reinterpretar los bits de un registro es una escritura y una lectura
+        # sobre el mismo buffer, sin el ida y vuelta de struct.pack/unpack
+        self._bits = array("Q", bytes(24))
+        self._doubles = memoryview(self._bits).cast("B").cast("d")
+        self.refresh_logging()
+
+    def refresh_logging(self):
+        """
+        Resuelve la guarda de logging: con el registro de alta frecuencia
+        deshabilitado, execute es la variante sin llamadas al logger
+        """
+        self.trace = logger.hot_path_habilitado()
+        self.execute = self._execute_traced if self.trace else self._execute_fast
+
+    def _execute_fast(
+        self, operation: str, operand1: int, operand2: int
+    ) -> Tuple[int, int]:
         """
         Ejecuta una operación flotante
 
@@ -208,8 +285,12 @@ class FloatALU:
             Tupla (resultado_como_int_64bits, flags)
         """
         # Convertir de representación entera a float
-        f1 = self.int_to_float(operand1)
-        f2 = self.int_to_float(operand2)
+        bits = self._bits
+        doubles = self._doubles
+        bits[0] = operand1 & 0xFFFFFFFFFFFFFFFF
+        bits[1] = operand2 & 0xFFFFFFFFFFFFFFFF
+        f1 = doubles[0]
+        f2 = doubles[1]
 
         # Realizar operación
         if operation == "FADD":
@@ -228,13 +309,26 @@ class FloatALU:
             raise ValueError(f"Operación flotante no reconocida: {operation}")
 
         # Convertir resultado de vuelta a int de 64 bits
-        result_int = self.float_to_int(result_float)
+        doubles[2] = result_float
+        result_int = bits[2]
 
         # Calcular flags
         flags = self._calculate_float_flags(result_float)
 
-        logger_handler.info(f"FloatALU: {operation} {f1} y {f2} = {result_float}")
+        return result_int, flags
 
+    def _execute_traced(
+        self, operation: str, operand1: int, operand2: int
+    ) -> Tuple[int, int]:
+        """Igual que _execute_fast, registrando la operación (nivel DEBUG)"""
+        result_int, flags = self._execute_fast(operation, operand1, operand2)
+        hot_logger.debug(
+            "FloatALU: %s %s y %s = %s",
+            operation,
+            self.int_to_float(operand1),
+            self.int_to_float(operand2),
+            self.int_to_float(result_int),
+        )
         return result_int, flags
 
     def int_to_float(self, value: int) -> float:
@@ -247,10 +341,9 @@ class FloatALU:
         Returns:
             float: Valor en punto flotante
         """
-        # Asegurar que sea de 64 bits
-        value = value & 0xFFFFFFFFFFFFFFFF
-        # Usar struct para interpretar los bits como double
-        return struct.unpack("d", struct.pack("Q", value))[0]
+        # Asegurar que sea de 64 bits e interpretar los bits como double
+        self._bits[2] = value & 0xFFFFFFFFFFFFFFFF
+        return self._doubles[2]
 
     def float_to_int(self, value: float) -> int:
         """
@@ -262,8 +355,9 @@ class FloatALU:
         Returns:
             int: Representación de 64 bits del float
         """
-        # Usar struct para obtener la representación binaria
-        return struct.unpack("Q", struct.pack("d", value))[0]
+        # Leer la representación binaria a través del mismo buffer
+        self._doubles[2] = value
+        return self._bits[2]
 
     def _calculate_float_flags(self, result: float) -> int:
         """Calcula flags para resultado flotante"""
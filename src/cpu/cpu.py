@@ -4,32 +4,213 @@ CPU Emulator Module - M1 (Refactorizado)
 Coordinador principal de la CPU - Solo lógica, sin interfaz.
 """
 
-from typing import Any, Callable, Dict, Optional
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
-from src.cpu.core import ALU
+from src.cpu.block_compiler import BlockCompiler
+from src.cpu.core import ALU, Flags, LazyFlags
 from src.cpu.decoder import Decoder
+from src.cpu.devices import Device
 from src.cpu.execution.alu_executor import ALUExecutor
 from src.cpu.execution.control_flow_executor import ControlFlowExecutor
 from src.cpu.execution.data_transfer_executor import DataTransferExecutor
 from src.cpu.execution.stack_executor import StackExecutor
 from src.cpu.io_ports import IOPorts
 from src.cpu.memory_ops import MemoryOperations
+from src.cpu.profiler import Profiler
 from src.cpu.registers import RegisterFile
 from src.cpu.stack_ops import StackOperations
+from src.cpu.trace import MEMORY_OPCODES, NO_ADDRESS, TraceRecorder, memory_address
 from src.isa.isa import Opcodes
+from src.memory.cache import CachedBus, CacheHierarchy
+from src.memory.file_window import FileWindow, FileWindowBus
 from src.memory.memory import Memory
+from src.memory.permissions import PermissionTable
+from src.memory.regions import Region, RegionRegistry
+from src.memory.watchpoints import (
+    WATCH_EXEC,
+    Watchpoint,
+    WatchBus,
+    WatchHit,
+    WatchpointStop,
+    WatchpointTable,
+    parse_kind,
+)
+
+
+# Manejador de opcode: recibe la instrucción decodificada y la CPU, retorna
+# True para continuar o False para detener la ejecución
+OpcodeHandler = Callable[[Dict[str, Any], "CPU"], bool]
+
+
+class DecodeCache:
+    """
+    Caché de instrucciones decodificadas indexada por PC.
+
+    Cada línea guarda (instrucción cruda, instrucción decodificada). Se registra
+    como observador de escritura en Memory, de modo que cualquier escritura que
+    toque una palabra cacheada (código auto-modificable, editor de RAM, loader)
+    invalida la línea correspondiente.
+    """
+
+    # Granularidad del índice de páginas usado como filtro rápido de invalidación
+    PAGE_SHIFT = 8
+
+    def __init__(self):
+        self.lines: Dict[int, Tuple[int, Dict[str, Any]]] = {}
+        self._pages: set[int] = set()
+        # Páginas cuyas instrucciones no se cachean (watchpoints de ejecución)
+        self.uncached_pages: set[int] = set()
+
+    def get(self, pc: int) -> Optional[Tuple[int, Dict[str, Any]]]:
+        return self.lines.get(pc)
+
+    def store(self, pc: int, instruction: int, decoded: Dict[str, Any]):
+        if self.uncached_pages and pc >> self.PAGE_SHIFT in self.uncached_pages:
+            return
+        self.lines[pc] = (instruction, decoded)
+        self._pages.add(pc >> self.PAGE_SHIFT)
+        self._pages.add((pc + 7) >> self.PAGE_SHIFT)
+
+    def invalidate(self, addr: int, size: int):
+        """Descarta las líneas cuya palabra [pc, pc + 8) toca [addr, addr + size)"""
+        lines = self.lines
+        if not lines:
+            return
+
+        low = addr - 7
+        high = addr + size
+        first_page = max(low, 0) >> self.PAGE_SHIFT
+        last_page = (high - 1) >> self.PAGE_SHIFT
+
+        if last_page - first_page > 4:
+            # Escritura grande (carga de programa, reset): filtrar todo. Se
+            # modifica el diccionario en su lugar porque run_fast lo retiene
+            for pc in [pc for pc in lines if low <= pc < high]:
+                del lines[pc]
+            if not lines:
+                self._pages.clear()
+            return
+
+        pages = self._pages
+        for page in range(first_page, last_page + 1):
+            if page in pages:
+                break
+        else:
+            return
+
+        if size <= 64:
+            for pc in range(low, high):
+                lines.pop(pc, None)
+        else:
+            for pc in [pc for pc in lines if low <= pc < high]:
+                del lines[pc]
+
+    def clear(self):
+        self.lines.clear()
+        self._pages.clear()
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+
+@dataclass
+class CPUFault:
+    """Descripción de un error ocurrido durante run_fast"""
+
+    pc: int  # Dirección de la instrucción que falló
+    ir: int  # Último valor del IR (instrucción previa si falló el fetch)
+    cycle: int  # Valor de cycle_count al momento del fallo
+    error_type: str  # Nombre de la excepción original
+    message: str
+
+    def __str__(self) -> str:
+        return (
+            f"{self.error_type} en PC=0x{self.pc:08X} "
+            f"(IR=0x{self.ir:016X}, ciclo {self.cycle}): {self.message}"
+        )
+
+
+@dataclass
+class RunResult:
+    """Resultado de una ejecución con run_fast"""
+
+    cycles: int  # Instrucciones ejecutadas en esta llamada
+    elapsed: float  # Segundos de reloj
+    halted: bool  # True si terminó por HALT
+    fault: Optional[CPUFault] = None
+
+    @property
+    def ips(self) -> float:
+        """Instrucciones por segundo"""
+        return self.cycles / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        status = "HALT" if self.halted else "detenido"
+        if self.fault is not None:
+            status = "error"
+        return (
+            f"{self.cycles} instrucciones en {self.elapsed:.3f} s "
+            f"({self.ips:,.0f} instr/s) - {status}"
+        )
+
+
+@dataclass(frozen=True)
+class MachineSnapshot:
+    """Estado completo de la máquina tomado con CPU.snapshot()"""
+
+    pc: int
+    ir: int
+    flags: int
+    registers: Tuple[int, ...]
+    stack_pointer: int
+    cycle_count: int
+    exec_restricted: bool
+    permissions: tuple  # PermissionTable.export_state()
+    regions: Tuple[Region, ...]  # RegionRegistry.export_state()
+    current_program: Optional[str]
+    memory_size: int
+    memory: Any  # Memory.capture()
+
+    @property
+    def segments(self) -> Tuple[Tuple[int, int, str], ...]:
+        """Tramos (inicio, fin, nombre) de los programas cargados"""
+        return tuple(
+            (region.start, region.end, region.name)
+            for region in self.regions
+            if region.kind == "program"
+        )
+
+
+def _execute_halt(instruction: Dict[str, Any], cpu) -> bool:
+    """HALT - Detiene la CPU (y entrega la salida pendiente)"""
+    cpu.io_ports.flush_output()
+    return False
+
+
+def _execute_nop(instruction: Dict[str, Any], cpu) -> bool:
+    """NOP - No operación"""
+    return True
 
 
 class CPU:
     """CPU de 64 bits - Arquitectura Von Neumann"""
 
-    def __init__(self, memory_size: int = 65536, memory: Optional[Memory] = None):
+    def __init__(
+        self,
+        memory_size: int = 65536,
+        memory: Optional[Memory] = None,
+        lazy_flags: bool = True,
+    ):
         """
         Inicializa la CPU
 
         Args:
             memory_size: Tamaño de memoria en bytes (default 64KB)
             memory: Objeto Memory externo (opcional)
+            lazy_flags: Difiere el cálculo de flags de la ALU hasta que se lean
         """
         # Memoria
         self.mem: Memory = (
@@ -39,24 +220,45 @@ class CPU:
 
         # Componentes
         self.registers = RegisterFile()
-        self.alu = ALU()
+        self.alu = ALU(lazy_flags=lazy_flags)
         self.decoder = Decoder()
+        self.decode_cache = DecodeCache()
+        self.mem.add_write_hook(self.decode_cache.invalidate)
         self.memory_ops = MemoryOperations(self.mem)
-        self.stack_ops = StackOperations(self.mem, self.memory_size)
+        # La pila crece desde el tope de la memoria, o desde debajo de la
+        # ventana MMIO si la memoria la cubre (SparseMemory de 4 GiB)
+        self.stack_top: int = min(self.memory_size, IOPorts.MMIO_CONSOLE_CHAR)
+        self.stack_ops = StackOperations(self.mem, self.stack_top)
         self.io_ports = IOPorts(self.mem, self.memory_size)
+        self.memory_ops.devices = self.io_ports.devices
 
         # Ejecutores
         self.alu_executor = ALUExecutor(self.registers, self.alu)
         self.data_transfer_executor = DataTransferExecutor(
-            self.registers, self.memory_ops, self.io_ports
+            self.registers, self.memory_ops, self.io_ports, self.alu
         )
         self.control_flow_executor = ControlFlowExecutor(self.registers, self.stack_ops)
         self.stack_executor = StackExecutor(self.registers, self.stack_ops)
 
+        # Grabador de trazas, perfilador y simulador de caché (opcionales)
+        self.tracer: Optional[TraceRecorder] = None
+        self.profiler: Optional[Profiler] = None
+        self.cache_sim: Optional[CacheHierarchy] = None
+
+        # Motor de bloques básicos (se crea al usarlo por primera vez)
+        self.block_compiler: Optional[BlockCompiler] = None
+
+        # Tabla de despacho: opcode (0-255) -> handler(instruction, cpu) -> bool
+        self.dispatch_table: List[Optional[OpcodeHandler]] = [None] * 256
+        self.overridden_opcodes: set[int] = set()
+        self._build_dispatch_table()
+
         # Registros especiales
         self.pc: int = 0
         self.ir: int = 0
-        self.flags: int = 0
+        self._flags: int = 0
+        # Última operación de la ALU cuyos flags aún no se calcularon
+        self._pending_flags: Optional[LazyFlags] = None
 
         # Estado
         self.running: bool = False
@@ -66,11 +268,34 @@ class CPU:
         # Callback para pausas en step mode (la GUI lo usa)
         self.on_step_callback: Optional[Callable[[Dict], None]] = None
 
-        # Mapa de ejecución
-        self.exec_map: Optional[set[int]] = None
-        self.segments: list[tuple[int, int, str]] = []
+        # Mapa de ejecución: la tabla de permisos es la fuente de verdad;
+        # exec_map la expone como conjunto (None = sin restricción)
+        self.permissions = PermissionTable(self.memory_size)
+        self.permissions.add_change_hook(self._on_permissions_change)
+        self._exec_restricted: bool = False
         self.current_program: Optional[str] = None
-        self.occupied_words: set[int] = set()
+
+        # Regiones ocupadas (programas, MMIO); la pila no puede invadirlas
+        self.regions = RegionRegistry()
+        self.regions.add_change_hook(self._on_regions_change)
+        self._register_mmio()
+
+        # Archivos del host mapeados por encima de la RAM (map_file); como las
+        # ventanas MMIO, sobreviven al reinicio
+        self.file_windows: List[FileWindow] = []
+
+        # Watchpoints: se conservan al reiniciar, como la configuración de un
+        # depurador. watch_hit guarda el último que detuvo la ejecución
+        self.watchpoints = WatchpointTable()
+        self.watchpoints.add_change_hook(self._on_watchpoints_change)
+        self.decode_cache.uncached_pages = self.watchpoints.exec_pages
+        self.watch_hit: Optional[WatchHit] = None
+        # PC de un watchpoint de ejecución ya informado (se ejecuta al continuar)
+        self._watch_resume_pc: Optional[int] = None
+
+        # Última instantánea tomada o restaurada: las páginas sucias de la
+        # memoria son relativas a ella
+        self._baseline: Optional[MachineSnapshot] = None
 
     def reset(self):
         """Reinicia la CPU a su estado inicial"""
@@ -79,30 +304,281 @@ class CPU:
         self.flags = 0
         self.registers.reset()
         self.stack_ops.reset()
-        self.mem.data[:] = b"\x00" * self.mem.size
+        self.mem.clear()
+        self.decode_cache.clear()
+        if self.block_compiler is not None:
+            self.block_compiler.clear()
+        self.permissions = PermissionTable(self.memory_size)
+        self.permissions.add_change_hook(self._on_permissions_change)
+        self._exec_restricted = False
         self.running = False
         self.cycle_count = 0
         self.step_mode = False
-        self.exec_map = None
-        self.segments = []
+        self.regions.clear(kinds=("program", "data", "stack"))
         self.current_program = None
-        self.occupied_words = set()
+        self._baseline = None
+        self._clear_watch_hit()
+
+    # === Instantáneas ===
+
+    def snapshot(self) -> MachineSnapshot:
+        """
+        Captura registros, PC, flags, SP, mapa de ejecución, segmentos y memoria
+
+        A partir de la primera instantánea la memoria registra las páginas
+        que se escriben, de modo que restaurar esta instantánea solo copia
+        las páginas modificadas desde entonces.
+        """
+        self.mem.start_dirty_tracking()
+        snap = MachineSnapshot(
+            pc=self.pc,
+            ir=self.ir,
+            flags=self.flags,
+            registers=tuple(self.registers.get_all()),
+            stack_pointer=self.stack_ops.stack_pointer,
+            cycle_count=self.cycle_count,
+            exec_restricted=self._exec_restricted,
+            permissions=self.permissions.export_state(),
+            regions=self.regions.export_state(),
+            current_program=self.current_program,
+            memory_size=self.mem.size,
+            memory=self.mem.capture(),
+        )
+        self.mem.clear_dirty()
+        self._baseline = snap
+        return snap
+
+    def restore(self, snap: MachineSnapshot):
+        """
+        Vuelve al estado de una instantánea
+
+        Si snap es la última instantánea tomada o restaurada, solo se copian
+        las páginas escritas desde entonces; si no, se copia la memoria entera.
+
+        Raises:
+            ValueError: Si la instantánea es de una memoria de otro tamaño
+        """
+        if snap.memory_size != self.mem.size:
+            raise ValueError(
+                f"La instantánea es de una memoria de {snap.memory_size} bytes "
+                f"(la actual tiene {self.mem.size})"
+            )
+
+        mem = self.mem
+        if snap is self._baseline and mem.tracking_dirty:
+            mem.restore_capture(snap.memory, mem.dirty_pages())
+        else:
+            mem.start_dirty_tracking()
+            mem.restore_capture(snap.memory)
+        mem.clear_dirty()
+        self._baseline = snap
+
+        self.pc = snap.pc
+        self.ir = snap.ir
+        self.flags = snap.flags
+        # En el lugar: el código de bloques compilado referencia esta lista
+        self.registers.values[:] = snap.registers
+        self.stack_ops.stack_pointer = snap.stack_pointer
+        self.cycle_count = snap.cycle_count
+        self.permissions.import_state(snap.permissions)
+        if self._exec_restricted != snap.exec_restricted:
+            self._exec_restricted = snap.exec_restricted
+            self._on_permissions_change()
+        if self.regions.export_state() != snap.regions:
+            self.regions.import_state(snap.regions)
+        self.current_program = snap.current_program
+        self.running = False
+        self._clear_watch_hit()
+
+    def refresh_logging(self):
+        """Vuelve a resolver las guardas de logging tras cambiar el nivel"""
+        self.alu.refresh_logging()
+        self.alu_executor.float_alu.refresh_logging()
+
+    # === Flags ===
+
+    @property
+    def flags(self) -> int:
+        """Registro de flags (se materializa si la ALU dejó flags pendientes)"""
+        if self._pending_flags is not None:
+            self._flags = self.alu.materialize_flags(self._pending_flags)
+            self._pending_flags = None
+        return self._flags
+
+    @flags.setter
+    def flags(self, value: int):
+        self._flags = value
+        self._pending_flags = None
+
+    def defer_flags(self, record: LazyFlags):
+        """Guarda el registro de la última operación de la ALU sin calcular flags"""
+        self._pending_flags = record
+
+    def test_flag(self, flag: Flags) -> bool:
+        """Lee un solo bit de flag, calculando solo ese bit si está pendiente"""
+        if self._pending_flags is not None:
+            return self.alu.test_flag(self._pending_flags, flag)
+        return bool(self._flags & (1 << flag))
+
+    # === Mapa de ejecución ===
+
+    @property
+    def exec_map(self) -> Optional[PermissionTable]:
+        """Direcciones ejecutables (None si se puede ejecutar cualquier dirección)"""
+        return self.permissions if self._exec_restricted else None
+
+    @exec_map.setter
+    def exec_map(self, addresses: Optional[Iterable[int]]):
+        if addresses is not self.permissions:
+            self.permissions.clear()
+            if addresses is not None:
+                self.permissions.update(addresses)
+        self._exec_restricted = addresses is not None
+        self._on_permissions_change()
+
+    # === Regiones ===
+
+    @property
+    def segments(self) -> List[Tuple[int, int, str]]:
+        """Tramos (inicio, fin, nombre) de los programas cargados (solo lectura)"""
+        return [
+            (region.start, region.end, region.name)
+            for region in self.regions.of_kind("program")
+        ]
+
+    def _register_mmio(self):
+        """Registra los dispositivos MMIO (consola y DMA) como regiones"""
+        for device in self.io_ports.devices:
+            self.regions.add(device.start, device.end - 1, device.name, "mmio")
+
+    # === Dispositivos MMIO ===
+
+    def attach_device(self, device: Device) -> Device:
+        """
+        Conecta un dispositivo al bus MMIO (temporizador, RNG, ...)
+
+        Lo atienden IN/OUT a MMIO, INS/OUTS y los LD/ST a su tramo. Su
+        tramo se registra como región "mmio" con el nombre del dispositivo.
+
+        Returns:
+            El mismo dispositivo
+
+        Raises:
+            ValueError: Si su tramo cae en la RAM o colisiona con otra región
+        """
+        # Con SparseMemory la memoria cubre la ventana MMIO: el límite es el
+        # tope de la pila
+        if device.start < self.stack_top:
+            raise ValueError(
+                f"El dispositivo '{device.name}' (0x{device.start:08X}) cae "
+                f"dentro de la RAM (0x{self.stack_top:08X} bytes)"
+            )
+        region = self.regions.add(device.start, device.end - 1, device.name, "mmio")
+        try:
+            self.io_ports.devices.attach(device)
+        except ValueError:
+            self.regions.remove(region)
+            raise
+        return device
+
+    def detach_device(self, device: Device):
+        """
+        Desconecta un dispositivo conectado con attach_device
+
+        Raises:
+            ValueError: Si no está conectado
+        """
+        self.io_ports.devices.detach(device)
+        for region in self.regions.overlapping(device.start, device.end - 1):
+            if region.name == device.name:
+                self.regions.remove(region)
+
+    # === Ventanas de archivos ===
+
+    def map_file(
+        self,
+        path: str,
+        base: Optional[int] = None,
+        size: Optional[int] = None,
+        read_only: bool = False,
+    ) -> FileWindow:
+        """
+        Mapea un archivo del host en el espacio de direcciones del invitado
+
+        LD/ST acceden al archivo directamente (mmap, sin copias). La ventana
+        se registra como región "mmio" con el nombre del archivo. Las
+        instantáneas no la incluyen: el contenido vive en el archivo.
+
+        Args:
+            path: Archivo a mapear (se crea o se extiende si se indica size)
+            base: Dirección del invitado; None = primer hueco alineado a
+                página por encima de la RAM
+            size: Bytes mapeados (None = tamaño del archivo)
+            read_only: Las escrituras del invitado detienen la CPU con error
+
+        Returns:
+            La ventana creada (sirve para unmap_file)
+
+        Raises:
+            ValueError: Si la ventana cae dentro de la RAM o colisiona con otra
+                región
+        """
+        window = FileWindow(path, size=size, read_only=read_only)
+        try:
+            if base is None:
+                page = Memory.PAGE_SIZE
+                base = self.regions.allocate(
+                    window.size,
+                    low=-(-self.memory_size // page) * page,
+                    high=IOPorts.MMIO_CONSOLE_CHAR,
+                    align=page,
+                )
+            if base < self.memory_size:
+                raise ValueError(
+                    f"La ventana de {path} (0x{base:08X}) cae dentro de la RAM "
+                    f"(0x{self.memory_size:08X} bytes)"
+                )
+            window.base = base
+            self.regions.add(
+                base, window.end - 1, os.path.basename(path) or path, "mmio"
+            )
+        except ValueError:
+            window.close()
+            raise
+        self.file_windows.append(window)
+        self._rebuild_bus()
+        return window
+
+    def unmap_file(self, window: FileWindow):
+        """
+        Vuelca, desmapea y quita una ventana creada con map_file
+
+        Raises:
+            ValueError: Si la ventana no está mapeada en esta CPU
+        """
+        if window not in self.file_windows:
+            raise ValueError(f"El archivo {window.path} no está mapeado")
+        self.file_windows.remove(window)
+        for region in self.regions.overlapping(window.base, window.end - 1):
+            self.regions.remove(region)
+        self._rebuild_bus()
+        window.close()
+
+    def _on_regions_change(self):
+        """La pila no puede crecer dentro de la región más alta bajo el tope"""
+        self.stack_ops.stack_limit = self.regions.stack_floor(self.stack_top)
+
+    def _on_permissions_change(self):
+        """Las instrucciones cacheadas se validaron con el mapa anterior"""
+        self.decode_cache.clear()
+        if self.block_compiler is not None:
+            self.block_compiler.clear()
 
     # === Ciclo Fetch-Decode-Execute ===
 
     def fetch(self) -> int:
         """Fase FETCH: Obtiene la instrucción"""
-        if self.pc >= self.memory_size - 7:
-            raise RuntimeError("Program Counter fuera de límites")
-
-        if self.exec_map is not None and self.pc not in self.exec_map:
-            try:
-                next_exec = min(a for a in self.exec_map if a >= self.pc)
-                self.pc = next_exec
-            except ValueError:
-                raise RuntimeError(
-                    f"Intento de ejecutar dato/no ejecutable en 0x{self.pc:08X}"
-                )
+        self._check_fetch_address()
 
         instruction = self.mem.read_word(self.pc)
         self.ir = instruction
@@ -113,80 +589,126 @@ class CPU:
         """Fase DECODE: Decodifica la instrucción"""
         return self.decoder.decode(instruction)
 
-    def execute(self, decoded_instruction: Dict[str, Any]) -> bool:
-        """Fase EXECUTE: Ejecuta la instrucción"""
-        opcode = decoded_instruction["opcode"]
+    def fetch_decoded(self) -> Dict[str, Any]:
+        """
+        Fases FETCH + DECODE usando la caché de instrucciones decodificadas
 
-        if opcode in self._get_alu_opcodes():
-            return self.alu_executor.execute(decoded_instruction, self)
+        Returns:
+            Instrucción decodificada (no debe modificarse, se comparte con la caché)
+        """
+        pc = self.pc
+        entry = self.decode_cache.get(pc)
+        if entry is None:
+            # Solo se cachean direcciones ya validadas: la validación (límites
+            # y exec_map) se hace únicamente al fallar la caché
+            self._check_fetch_address()
+            pc = self.pc
+            entry = self.decode_cache.get(pc)
+        if entry is None:
+            instruction = self.mem.read_word(pc)
+            decoded = self.decoder.decode(instruction)
+            self.decode_cache.store(pc, instruction, decoded)
+        else:
+            instruction, decoded = entry
 
-        elif opcode in self._get_data_transfer_opcodes():
-            return self.data_transfer_executor.execute(decoded_instruction, self)
+        self.ir = instruction
+        self.pc = pc + 8
+        return decoded
 
-        elif opcode in self._get_stack_opcodes():
-            return self.stack_executor.execute(decoded_instruction)
+    def _check_fetch_address(self):
+        """
+        Valida el PC y lo adelanta a la siguiente dirección ejecutable
 
-        elif opcode in self._get_control_flow_opcodes():
-            return self.control_flow_executor.execute(decoded_instruction, self)
+        Raises:
+            WatchpointStop: Si la instrucción en el PC tiene un watchpoint de
+                ejecución (la CPU se detiene antes de ejecutarla)
+        """
+        if self.pc >= self.memory_size - 7:
+            raise RuntimeError("Program Counter fuera de límites")
 
-        elif opcode == Opcodes.HALT:
-            return False
+        if self._exec_restricted and self.pc not in self.permissions:
+            next_exec = self.permissions.next_executable(self.pc)
+            if next_exec is None:
+                raise RuntimeError(
+                    f"Intento de ejecutar dato/no ejecutable en 0x{self.pc:08X}"
+                )
+            self.pc = next_exec
 
-        elif opcode == Opcodes.NOP:
-            return True
+        exec_pages = self.watchpoints.exec_pages
+        if exec_pages and self.pc >> WatchpointTable.PAGE_SHIFT in exec_pages:
+            pc = self.pc
+            if pc == self._watch_resume_pc:
+                # Ya se informó: al continuar se ejecuta la instrucción
+                self._watch_resume_pc = None
+                return
+            watchpoint = self.watchpoints.match(pc, 8, WATCH_EXEC)
+            if watchpoint is not None:
+                self._watch_resume_pc = pc
+                raise WatchpointStop(WatchHit(watchpoint, WATCH_EXEC, pc, 8, pc=pc))
 
-        else:
-            raise RuntimeError(f"Opcode no reconocido: {opcode}")
+    def execute(self, decoded_instruction: Dict[str, Any]) -> bool:
+        """Fase EXECUTE: Ejecuta la instrucción"""
+        handler = self.dispatch_table[decoded_instruction["opcode"]]
+        if handler is None:
+            raise RuntimeError(
+                f"Opcode no reconocido: {decoded_instruction['opcode']}"
+            )
+        return handler(decoded_instruction, self)
 
-    # === Clasificación de Opcodes ===
+    # === Tabla de despacho ===
 
-    def _get_alu_opcodes(self):
-        return {
-            Opcodes.ADD,
-            Opcodes.SUB,
-            Opcodes.MUL,
-            Opcodes.DIV,
-            Opcodes.AND,
-            Opcodes.OR,
-            Opcodes.XOR,
-            Opcodes.NOT,
-            Opcodes.SHL,
-            Opcodes.SHR,
-            Opcodes.CMP,
-            # Operaciones flotantes
-            Opcodes.FADD,
-            Opcodes.FSUB,
-            Opcodes.FMUL,
-            Opcodes.FDIV,
-        }
+    def _build_dispatch_table(self):
+        """Llena la tabla de despacho con los manejadores de los ejecutores"""
+        for executor in (
+            self.alu_executor,
+            self.data_transfer_executor,
+            self.stack_executor,
+            self.control_flow_executor,
+        ):
+            for opcode, handler in executor.get_handlers().items():
+                self.dispatch_table[opcode] = handler
 
-    def _get_data_transfer_opcodes(self):
-        return {
-            Opcodes.MOVI,
-            Opcodes.LD,
-            Opcodes.ST,
-            Opcodes.OUT,
-            Opcodes.IN,
-            Opcodes.ADDI,
-            Opcodes.CP,
-            Opcodes.INS,
-            Opcodes.OUTS,
-        }
+        self.dispatch_table[Opcodes.HALT] = _execute_halt
+        self.dispatch_table[Opcodes.NOP] = _execute_nop
 
-    def _get_stack_opcodes(self):
-        return {Opcodes.PUSH, Opcodes.POP}
+    def register_opcode_handler(
+        self, opcode: int, handler: OpcodeHandler, replace: bool = False
+    ):
+        """
+        Registra un manejador para un opcode (extensiones del ISA)
 
-    def _get_control_flow_opcodes(self):
-        return {
-            Opcodes.JMP,
-            Opcodes.JZ,
-            Opcodes.JNZ,
-            Opcodes.JC,
-            Opcodes.JNC,
-            Opcodes.JS,
-            Opcodes.CALL,
-            Opcodes.RET,
-        }
+        El manejador recibe la instrucción decodificada (diccionario con opcode,
+        type, rd, rs1, rs2, func, imm32) y la CPU. Cuando se invoca, el PC ya
+        apunta a la siguiente instrucción. Debe retornar True para continuar o
+        False para detener la CPU (como HALT).
+
+        Args:
+            opcode: Byte de opcode (0-255)
+            handler: Función handler(instruction, cpu) -> bool
+            replace: Permite reemplazar un opcode ya registrado
+
+        Raises:
+            ValueError: Si el opcode está fuera de rango o ya existe y replace=False
+        """
+        if not 0 <= opcode <= 0xFF:
+            raise ValueError(f"Opcode fuera de rango: {opcode} (debe ser 0-255)")
+        if self.dispatch_table[opcode] is not None and not replace:
+            raise ValueError(f"El opcode 0x{opcode:02X} ya tiene un manejador")
+
+        self.dispatch_table[opcode] = handler
+        self.overridden_opcodes.add(opcode)
+        if self.block_compiler is not None:
+            self.block_compiler.clear()
+
+    def unregister_opcode_handler(self, opcode: int):
+        """Elimina el manejador de un opcode (queda como no reconocido)"""
+        if not 0 <= opcode <= 0xFF:
+            raise ValueError(f"Opcode fuera de rango: {opcode} (debe ser 0-255)")
+
+        self.dispatch_table[opcode] = None
+        self.overridden_opcodes.add(opcode)
+        if self.block_compiler is not None:
+            self.block_compiler.clear()
 
     # === Ejecución ===
 
@@ -197,11 +719,35 @@ class CPU:
         Returns:
             True si debe continuar, False si debe detenerse
         """
+        self.watch_hit = None
         try:
-            instruction = self.fetch()
-            decoded = self.decode(instruction)
+            decoded = self.fetch_decoded()
+            pc = self.pc - 8
+            tracer = self.tracer
+            if self.cache_sim is not None:
+                self.cache_sim.fetch(pc)
+            if tracer is not None:
+                address = memory_address(
+                    decoded, self.registers, self.stack_ops.stack_pointer
+                )
             should_continue = self.execute(decoded)
+            profiler = self.profiler
+            if profiler is not None:
+                profiler.countdown -= 1
+                if not profiler.countdown:
+                    profiler.sample(pc, decoded["opcode"])
+            if tracer is not None:
+                tracer.record(
+                    self.cycle_count,
+                    pc,
+                    self.ir,
+                    self.registers.values[decoded["rd"]],
+                    address,
+                    self.flags,
+                )
             self.cycle_count += 1
+            if self.watchpoints.pending is not None:
+                self._stop_on_watch(self.watchpoints.pending, pc)
 
             # Si hay callback en step mode, notificar a la GUI
             if self.step_mode and self.on_step_callback:
@@ -209,16 +755,192 @@ class CPU:
 
             return should_continue
 
+        except WatchpointStop as stop:
+            self._stop_on_watch(stop.hit, stop.hit.pc)
+            return True
         except Exception as e:
             raise RuntimeError(f"Error en ciclo CPU: {e}")
 
-    def run(self, max_cycles: int = None):
+    def run(self, max_cycles: int = None, engine: str = "interpreter"):
         """
         Ejecuta la CPU continuamente
 
         Args:
             max_cycles: Máximo de ciclos (None = sin límite)
+            engine: "interpreter" (ciclo fetch-decode-execute) o "blocks"
+                (bloques básicos traducidos a funciones de Python). Con step mode,
+                una traza, el perfilador, el simulador de caché o watchpoints
+                activos se usa siempre el intérprete
+        """
+        instrumented = (
+            self.tracer is not None
+            or self.profiler is not None
+            or self.cache_sim is not None
+            or len(self.watchpoints) > 0
+        )
+        if engine == "blocks" and not self.step_mode and not instrumented:
+            try:
+                self._run_blocks(max_cycles)
+            finally:
+                self.io_ports.flush_output()
+            return
+        if engine not in ("interpreter", "blocks"):
+            raise ValueError(f"Motor de ejecución desconocido: {engine}")
+
+        self.running = True
+        cycles = 0
+
+        try:
+            while self.running:
+                if max_cycles and cycles >= max_cycles:
+                    break
+
+                should_continue = self.step()
+                if not should_continue:
+                    self.running = False
+                    break
+
+                cycles += 1
+        finally:
+            self.io_ports.flush_output()
+
+    def run_fast(
+        self, max_cycles: Optional[int] = None, check_every: int = 4096
+    ) -> RunResult:
         """
+        Ejecuta la CPU sin callbacks ni step mode (uso por lotes/servidor)
+
+        El estado del bucle vive en variables locales, las condiciones de parada
+        (stop(), max_cycles) se revisan cada check_every instrucciones y los
+        errores no se relanzan: se devuelven como un CPUFault en el resultado.
+
+        Args:
+            max_cycles: Máximo de instrucciones (None = sin límite)
+            check_every: Instrucciones entre revisiones de las condiciones de parada
+
+        Returns:
+            RunResult con ciclos, tiempo, instrucciones por segundo y el fallo
+        """
+        if check_every < 1:
+            raise ValueError("check_every debe ser mayor que 0")
+
+        table = self.dispatch_table
+        lines = self.decode_cache.lines
+        store = self.decode_cache.store
+        read_word = self.mem.read_word
+        decode = self.decoder.decode
+        check_fetch = self._check_fetch_address
+        tracer = self.tracer
+        record = tracer.record if tracer is not None else None
+        profiler = self.profiler
+        cache_sim = self.cache_sim
+        watch = self.watchpoints if self.watchpoints.watches_data else None
+        # Un solo chequeo por instrucción cuando no hay instrumentación
+        instrumented = (
+            tracer is not None
+            or profiler is not None
+            or cache_sim is not None
+            or watch is not None
+        )
+        registers = self.registers
+        regs = registers.values
+        stack_ops = self.stack_ops
+        address = 0
+
+        executed = 0
+        halted = False
+        fault = None
+        pc = self.pc
+        self.watch_hit = None
+
+        self.running = True
+        start = time.perf_counter()
+        try:
+            while self.running:
+                chunk = check_every
+                if max_cycles is not None:
+                    chunk = min(chunk, max_cycles - executed)
+                    if chunk <= 0:
+                        break
+                for _ in range(chunk):
+                    pc = self.pc
+                    entry = lines.get(pc)
+                    if entry is None:
+                        check_fetch()
+                        pc = self.pc
+                        entry = lines.get(pc)
+                    if entry is None:
+                        instruction = read_word(pc)
+                        decoded = decode(instruction)
+                        store(pc, instruction, decoded)
+                    else:
+                        instruction, decoded = entry
+
+                    self.ir = instruction
+                    self.pc = pc + 8
+                    handler = table[decoded["opcode"]]
+                    if handler is None:
+                        raise RuntimeError(f"Opcode no reconocido: {decoded['opcode']}")
+                    if instrumented:
+                        if cache_sim is not None:
+                            cache_sim.fetch(pc)
+                        if tracer is not None:
+                            address = (
+                                memory_address(
+                                    decoded, registers, stack_ops.stack_pointer
+                                )
+                                if decoded["opcode"] in MEMORY_OPCODES
+                                else NO_ADDRESS
+                            )
+                    should_continue = handler(decoded, self)
+                    executed += 1
+                    if instrumented:
+                        if profiler is not None:
+                            profiler.countdown -= 1
+                            if not profiler.countdown:
+                                profiler.sample(pc, decoded["opcode"])
+                        if tracer is not None:
+                            record(
+                                self.cycle_count + executed - 1,
+                                pc,
+                                instruction,
+                                regs[decoded["rd"]],
+                                address,
+                                self.flags,
+                            )
+                        if watch is not None and watch.pending is not None:
+                            self._stop_on_watch(watch.pending, pc)
+                            break
+                    if not should_continue:
+                        halted = True
+                        break
+
+                if halted:
+                    break
+        except WatchpointStop as stop:
+            self._stop_on_watch(stop.hit, stop.hit.pc)
+        except Exception as e:
+            fault = CPUFault(
+                pc=pc,
+                ir=self.ir,
+                cycle=self.cycle_count + executed,
+                error_type=type(e).__name__,
+                message=str(e),
+            )
+        finally:
+            elapsed = time.perf_counter() - start
+            self.running = False
+            self.cycle_count += executed
+            self.io_ports.flush_output()
+
+        return RunResult(executed, elapsed, halted, fault)
+
+    def _run_blocks(self, max_cycles: Optional[int]):
+        """Bucle del motor de bloques; usa el intérprete como respaldo"""
+        if self.block_compiler is None:
+            self.block_compiler = BlockCompiler(self)
+        lookup = self.block_compiler.lookup
+
         self.running = True
         cycles = 0
 
@@ -226,6 +948,18 @@ class CPU:
             if max_cycles and cycles >= max_cycles:
                 break
 
+            block = lookup(self.pc)
+            if block is not None and (
+                not max_cycles or cycles + block.length <= max_cycles
+            ):
+                try:
+                    block.fn(self)
+                except Exception as e:
+                    raise RuntimeError(f"Error en ciclo CPU: {e}")
+                cycles += block.length
+                continue
+
+            # Instrucción no traducible (I/O, HALT, ...) o bloque invalidado
             should_continue = self.step()
             if not should_continue:
                 self.running = False
@@ -233,6 +967,173 @@ class CPU:
 
             cycles += 1
 
+    # === Trazas ===
+
+    def start_trace(self, path: str, **options) -> TraceRecorder:
+        """
+        Comienza a grabar una traza binaria de cada instrucción ejecutada
+
+        Grabar cuesta: run_fast corre unas 2-4 veces más lento y run() pasa al
+        intérprete (ver src.cpu.trace).
+
+        Args:
+            path: Archivo .trace de salida
+            **options: Opciones de TraceRecorder (compression, buffer_records, level)
+
+        Returns:
+            El grabador activo
+        """
+        self.stop_trace()
+        self.tracer = TraceRecorder(path, **options)
+        return self.tracer
+
+    def stop_trace(self):
+        """Vuelca y cierra la traza activa (si hay una)"""
+        if self.tracer is not None:
+            self.tracer.close()
+            self.tracer = None
+
+    # === Perfilador ===
+
+    def start_profiler(self, mode: str = "exact", sample_every: int = 997) -> Profiler:
+        """
+        Activa el perfilador por PC y por opcode
+
+        Args:
+            mode: "exact" (cada instrucción) o "sampling" (una de cada sample_every)
+            sample_every: Intervalo de muestreo en modo "sampling"
+
+        Returns:
+            El perfilador activo (sus contadores siguen disponibles tras detenerlo)
+        """
+        self.profiler = Profiler(self.memory_size, mode, sample_every)
+        return self.profiler
+
+    def enable_cache(
+        self, hierarchy: Optional[CacheHierarchy] = None, **config
+    ) -> CacheHierarchy:
+        """
+        Conecta el simulador de caché
+
+        Las búsquedas de instrucción se informan desde step/run_fast y los
+        accesos de datos pasan por un CachedBus que reemplaza a la memoria en
+        MemoryOperations y StackOperations. Los segmentos cargados se usan
+        como regiones del informe si no se indican otras.
+
+        Args:
+            hierarchy: Jerarquía ya construida (si no, se crea con config)
+            **config: Argumentos de CacheHierarchy (l1i, l1d, l2, use_l2, regions)
+
+        Returns:
+            La jerarquía activa (para consultar sus estadísticas)
+        """
+        if hierarchy is None:
+            config.setdefault("regions", list(self.segments))
+            hierarchy = CacheHierarchy(**config)
+        self.cache_sim = hierarchy
+        self._rebuild_bus()
+        return hierarchy
+
+    def disable_cache(self) -> Optional[CacheHierarchy]:
+        """Desconecta el simulador de caché y retorna la jerarquía"""
+        hierarchy, self.cache_sim = self.cache_sim, None
+        self._rebuild_bus()
+        return hierarchy
+
+    def _rebuild_bus(self):
+        """
+        Arma la cadena memoria -> FileWindowBus -> WatchBus -> CachedBus según
+        lo que esté activo; sin ventanas, watchpoints de datos ni caché se usa
+        la memoria directamente
+        """
+        bus = self.mem
+        if self.file_windows:
+            bus = FileWindowBus(bus, self.file_windows)
+        if self.watchpoints.watches_data:
+            bus = WatchBus(bus, self.watchpoints)
+        if self.cache_sim is not None:
+            bus = CachedBus(bus, self.cache_sim)
+        self.memory_ops.mem = bus
+        self.stack_ops.mem = bus
+        self.memory_ops.limit = max(
+            [self.memory_size] + [window.end for window in self.file_windows]
+        )
+
+    # === Watchpoints ===
+
+    def add_watchpoint(
+        self, start: int, size: int = 8, kinds: int | str = "w"
+    ) -> Watchpoint:
+        """
+        Vigila los bytes [start, start + size)
+
+        Las lecturas y escrituras detienen la ejecución al terminar la
+        instrucción que accedió; la ejecución la detiene antes de ejecutar la
+        instrucción. El acceso queda en watch_hit.
+
+        Args:
+            start: Primera dirección vigilada
+            size: Cantidad de bytes
+            kinds: "r", "w", "x", combinaciones ("rw") o bits WATCH_*
+
+        Returns:
+            El watchpoint creado (su id sirve para quitarlo)
+
+        Raises:
+            ValueError: Si el rango o el tipo no son válidos
+        """
+        if isinstance(kinds, str):
+            kinds = parse_kind(kinds)
+        if start + size > self.memory_size:
+            raise ValueError(
+                f"Watchpoint fuera de memoria: 0x{start:08X} (+{size} bytes)"
+            )
+        return self.watchpoints.add(start, size, kinds)
+
+    def remove_watchpoint(self, watch_id: int):
+        """
+        Quita un watchpoint por id
+
+        Raises:
+            ValueError: Si no existe
+        """
+        try:
+            self.watchpoints.remove(watch_id)
+        except KeyError:
+            raise ValueError(f"No existe el watchpoint #{watch_id}") from None
+
+    def clear_watchpoints(self):
+        """Quita todos los watchpoints"""
+        self.watchpoints.clear()
+        self._clear_watch_hit()
+
+    def _on_watchpoints_change(self):
+        """Las páginas vigiladas cambiaron: reconstruir el bus y las cachés"""
+        self._rebuild_bus()
+        # Las instrucciones de páginas con watchpoints de ejecución no deben
+        # quedar en las cachés (se validan en cada búsqueda)
+        self.decode_cache.clear()
+        if self.block_compiler is not None:
+            self.block_compiler.clear()
+        self._watch_resume_pc = None
+
+    def _stop_on_watch(self, hit: WatchHit, pc: int):
+        """Registra el acceso con el PC de la instrucción y detiene la ejecución"""
+        hit.pc = pc
+        self.watch_hit = hit
+        self.watchpoints.pending = None
+        self.running = False
+
+    def _clear_watch_hit(self):
+        self.watch_hit = None
+        self.watchpoints.pending = None
+        self._watch_resume_pc = None
+
+    def stop_profiler(self) -> Optional[Profiler]:
+        """Desactiva el perfilador y retorna el que estaba activo"""
+        profiler, self.profiler = self.profiler, None
+        return profiler
+
     def enable_step_mode(self, callback: Optional[Callable[[Dict], None]] = None):
         """
         Activa modo paso a paso
@@ -265,4 +1166,5 @@ class CPU:
             "cycle_count": self.cycle_count,
             "running": self.running,
             "step_mode": self.step_mode,
+            "watch_hit": self.watch_hit,
         }
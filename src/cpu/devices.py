@@ -0,0 +1,155 @@
+"""
+Bus de dispositivos MMIO
+
+Cada dispositivo ocupa un tramo [start, end) de direcciones y atiende las
+lecturas y escrituras de palabra (IN/OUT a MMIO y LD/ST) y,
+si es un flujo, las de strings (INS/OUTS). Consola, puertos de archivo y DMA
+son dispositivos; uno nuevo (temporizador, RNG, ...) se conecta con
+DeviceBus.attach (o CPU.attach_device) sin tocar IOPorts.
+
+La decodificación usa una tabla de páginas de PAGE_SIZE bytes: un dict de
+página -> dispositivos que la tocan. Saber si una dirección es MMIO cuesta
+una búsqueda en el dict, sin importar cuántos dispositivos haya. Para LD/ST,
+MemoryOperations solo consulta la tabla desde DeviceBus.low (el inicio del
+dispositivo mapeado más bajo): los accesos a la RAM pagan una comparación y
+los dispositivos tienen prioridad aunque la memoria cubra sus direcciones
+(SparseMemory de 4 GiB).
+"""
+
+from typing import Dict, Iterator, List, Optional
+
+# DeviceBus.low cuando no hay dispositivos mapeados
+NO_DEVICE = 1 << 64
+
+
+class Device:
+    """Dispositivo MMIO en [start, end); las subclases redefinen lo que usan"""
+
+    # False para los que solo se usan con IN/OUT/INS/OUTS (puertos de
+    # archivo): LD/ST en su dirección siguen yendo a la memoria
+    mapped = True
+
+    def __init__(self, name: str, start: int, size: int):
+        """
+        Args:
+            name: Nombre del dispositivo (también el de su región en la CPU)
+            start: Primera dirección
+            size: Bytes que ocupa
+        """
+        if start < 0 or size <= 0:
+            raise ValueError(
+                f"Tramo de dispositivo inválido: 0x{max(start, 0):08X} (+{size} bytes)"
+            )
+        self.name = name
+        self.start = start
+        self.end = start + size
+
+    def read(self, address: int) -> int:
+        """Lectura de palabra (IN a MMIO, LD)"""
+        return 0
+
+    def write(self, address: int, value: int):
+        """Escritura de palabra (OUT a MMIO, ST)"""
+
+    def read_string(self, address: int, max_length: int) -> str:
+        """Lectura de string (INS); "" si el dispositivo no es un flujo"""
+        return ""
+
+    def write_string(self, address: int, text: str):
+        """Escritura de string (OUTS); se ignora si no es un flujo"""
+
+    def __str__(self) -> str:
+        return f"{self.name} 0x{self.start:08X}-0x{self.end - 1:08X}"
+
+
+class DeviceBus:
+    """Dispositivos conectados y tabla de páginas para decodificarlos"""
+
+    PAGE_SHIFT = 8
+    PAGE_SIZE = 1 << PAGE_SHIFT
+
+    def __init__(self):
+        self._devices: List[Device] = []
+        # Página -> dispositivos que la tocan (casi siempre uno)
+        self._pages: Dict[int, List[Device]] = {}
+        # Inicio del dispositivo mapeado más bajo (LD/ST debajo van a memoria)
+        self.low: int = NO_DEVICE
+
+    # === Conexión ===
+
+    def attach(self, device: Device) -> Device:
+        """
+        Conecta un dispositivo
+
+        Returns:
+            El mismo dispositivo
+
+        Raises:
+            ValueError: Si su tramo se solapa con otro dispositivo
+        """
+        for other in self._devices:
+            if device.start < other.end and other.start < device.end:
+                raise ValueError(
+                    f"El dispositivo '{device.name}' colisiona con '{other.name}' "
+                    f"(0x{other.start:08X}-0x{other.end - 1:08X})"
+                )
+        self._devices.append(device)
+        for page in self._page_range(device):
+            self._pages.setdefault(page, []).append(device)
+        self._update_low()
+        return device
+
+    def detach(self, device: Device):
+        """
+        Desconecta un dispositivo
+
+        Raises:
+            ValueError: Si no está conectado
+        """
+        if device not in self._devices:
+            raise ValueError(f"El dispositivo '{device.name}' no está conectado")
+        self._devices.remove(device)
+        for page in self._page_range(device):
+            devices = self._pages[page]
+            devices.remove(device)
+            if not devices:
+                del self._pages[page]
+        self._update_low()
+
+    # === Decodificación ===
+
+    def find(self, address: int) -> Optional[Device]:
+        """Dispositivo que atiende address (None = no es MMIO)"""
+        devices = self._pages.get(address >> self.PAGE_SHIFT)
+        if devices is not None:
+            for device in devices:
+                if device.start <= address < device.end:
+                    return device
+        return None
+
+    def named(self, name: str) -> Optional[Device]:
+        """Dispositivo con ese nombre (None si no hay)"""
+        for device in self._devices:
+            if device.name == name:
+                return device
+        return None
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def __iter__(self) -> Iterator[Device]:
+        return iter(sorted(self._devices, key=lambda device: device.start))
+
+    # === Internos ===
+
+    def _update_low(self):
+        self.low = min(
+            (device.start for device in self._devices if device.mapped),
+            default=NO_DEVICE,
+        )
+
+    def _page_range(self, device: Device) -> range:
+        return range(
+            device.start >> self.PAGE_SHIFT,
+            ((device.end - 1) >> self.PAGE_SHIFT) + 1,
+        )
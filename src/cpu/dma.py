@@ -0,0 +1,208 @@
+"""
+Controlador DMA entre archivos del host y la memoria del invitado
+
+Mueve bloques completos entre un archivo abierto en IOPorts.open_files y la
+RAM sin pasar por la CPU: readinto sobre una vista memoryview de Memory.data
+(archivo -> memoria) y write de una rebanada de esa vista (memoria ->
+archivo). No hay bucle por byte en Python, así que un programa que procesa
+archivos de megabytes queda limitado por el disco y no por el intérprete.
+
+Registros (palabras de 64 bits a partir de DMA_BASE; es un dispositivo del
+bus MMIO, así que se acceden con OUT/IN o LD/ST):
+
+    +0x00 SRC     Origen: puerto del archivo o dirección de memoria
+    +0x08 DST     Destino: dirección de memoria o puerto del archivo
+    +0x10 LEN     Bytes a transferir
+    +0x18 CTRL    Escribir inicia la transferencia; bit 0 = dirección
+                  (DMA_TO_MEMORY: archivo -> memoria, DMA_TO_FILE: memoria
+                  -> archivo)
+    +0x20 STATUS  Solo lectura: DMA_DONE | DMA_ERROR | DMA_EOF
+    +0x28 COUNT   Solo lectura: bytes movidos por la última transferencia
+
+La transferencia es síncrona: al volver de la escritura en CTRL ya terminó.
+Los errores (puerto sin abrir, rango fuera de la memoria) no detienen la CPU:
+se reportan en STATUS y el detalle queda en last_error.
+"""
+
+import mmap
+from typing import Any, Dict, Optional
+
+from src.cpu.devices import Device
+
+DMA_BASE = 0xFFFF0100
+DMA_SRC = DMA_BASE + 0x00
+DMA_DST = DMA_BASE + 0x08
+DMA_LEN = DMA_BASE + 0x10
+DMA_CTRL = DMA_BASE + 0x18
+DMA_STATUS = DMA_BASE + 0x20
+DMA_COUNT = DMA_BASE + 0x28
+DMA_END = DMA_BASE + 0x30  # Primera dirección fuera de la ventana
+
+# Bit 0 de CTRL
+DMA_TO_MEMORY = 0
+DMA_TO_FILE = 1
+
+# Bits de STATUS
+DMA_DONE = 0x1
+DMA_ERROR = 0x2
+DMA_EOF = 0x4  # El archivo terminó antes de LEN bytes
+
+# Tamaño de los trozos cuando la memoria no expone un buffer (SparseMemory)
+CHUNK_SIZE = 1 << 16
+
+
+class DMAController(Device):
+    """Dispositivo DMA de la ventana MMIO [DMA_BASE, DMA_END)"""
+
+    def __init__(self, memory, files: Dict[int, Any]):
+        """
+        Args:
+            memory: Memoria del invitado (Memory o subclase)
+            files: Archivos abiertos por puerto (IOPorts.open_files)
+        """
+        super().__init__("dma", DMA_BASE, DMA_END - DMA_BASE)
+        self.mem = memory
+        self.files = files
+        self.src = 0
+        self.dst = 0
+        self.length = 0
+        self.status = 0
+        self.count = 0
+        self.last_error: Optional[str] = None
+        self.transfers = 0
+
+    # === Registros ===
+
+    def write(self, address: int, value: int):
+        """Escritura MMIO en la ventana del DMA (STATUS y COUNT se ignoran)"""
+        value &= 0xFFFFFFFFFFFFFFFF
+        if address == DMA_SRC:
+            self.src = value
+        elif address == DMA_DST:
+            self.dst = value
+        elif address == DMA_LEN:
+            self.length = value
+        elif address == DMA_CTRL:
+            self.transfer(value & 1)
+
+    def read(self, address: int) -> int:
+        """Lectura MMIO en la ventana del DMA"""
+        if address == DMA_SRC:
+            return self.src
+        if address == DMA_DST:
+            return self.dst
+        if address == DMA_LEN:
+            return self.length
+        if address == DMA_STATUS:
+            return self.status
+        if address == DMA_COUNT:
+            return self.count
+        return 0
+
+    # === Transferencias ===
+
+    def transfer(self, direction: int) -> int:
+        """
+        Ejecuta la transferencia programada en SRC/DST/LEN
+
+        Args:
+            direction: DMA_TO_MEMORY o DMA_TO_FILE
+
+        Returns:
+            Bytes transferidos (también quedan en COUNT)
+        """
+        self.count = 0
+        self.last_error = None
+        try:
+            if direction == DMA_TO_MEMORY:
+                moved, eof = self._file_to_memory(self.src, self.dst, self.length)
+            else:
+                moved, eof = self._memory_to_file(self.src, self.dst, self.length)
+        except (OSError, ValueError, RuntimeError, TypeError) as e:
+            self.status = DMA_DONE | DMA_ERROR
+            self.last_error = str(e)
+            return 0
+        self.count = moved
+        self.status = DMA_DONE | (DMA_EOF if eof else 0)
+        self.transfers += 1
+        return moved
+
+    def _file_to_memory(self, port: int, addr: int, length: int):
+        self._check_range(addr, length)
+        handle, text = self._binary(port)
+        view = self._guest_view(addr, length)
+        moved = 0
+        if view is not None:
+            while moved < length:
+                n = handle.readinto(view[moved:])
+                if not n:
+                    break
+                moved += n
+        else:
+            while moved < length:
+                chunk = handle.read(min(CHUNK_SIZE, length - moved))
+                if not chunk:
+                    break
+                self.mem.write_bytes(addr + moved, chunk)
+                moved += len(chunk)
+        if text is not None:
+            # La capa de texto descarta lo que leyó por adelantado y sigue
+            # después de lo transferido
+            text.seek(handle.tell())
+        if moved and view is not None:
+            # Un solo aviso para la caché de decodificación y páginas sucias
+            self.mem.notify_write(addr, moved)
+        return moved, moved < length
+
+    def _memory_to_file(self, addr: int, port: int, length: int):
+        self._check_range(addr, length)
+        handle, text = self._binary(port)
+        view = self._guest_view(addr, length)
+        if view is not None:
+            handle.write(view)
+        else:
+            for offset in range(0, length, CHUNK_SIZE):
+                size = min(CHUNK_SIZE, length - offset)
+                handle.write(self.mem.read_bytes(addr + offset, size))
+        if text is not None:
+            handle.flush()
+            text.seek(handle.tell())
+        return length, False
+
+    # === Internos ===
+
+    def _check_range(self, addr: int, length: int):
+        if addr < 0 or addr + length > self.mem.size:
+            raise ValueError(
+                f"DMA fuera de la memoria: 0x{addr:08X} (+{length} bytes)"
+            )
+
+    def _binary(self, port: int):
+        """
+        Capa binaria del archivo del puerto y, si se abrió en modo texto y
+        admite seek, la capa de texto a resincronizar después
+
+        La capa de texto se vacía antes de transferir y, como lee por
+        adelantado (INS previos), la binaria se posiciona donde va el texto.
+        """
+        handle = self.files.get(port)
+        if handle is None:
+            raise RuntimeError(
+                f"DMA: no hay un archivo abierto en el puerto 0x{port:X}"
+            )
+        raw = getattr(handle, "buffer", None)
+        if raw is None:
+            return handle, None
+        if handle.writable():
+            handle.flush()
+        if not handle.seekable():
+            return raw, None
+        raw.seek(handle.tell())
+        return raw, handle
+
+    def _guest_view(self, addr: int, length: int) -> Optional[memoryview]:
+        """Vista sin copia de la RAM, o None si la memoria no es un buffer"""
+        data = self.mem.data
+        if isinstance(data, (bytearray, mmap.mmap)):
+            return memoryview(data)[addr : addr + length]
+        return None
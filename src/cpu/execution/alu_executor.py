@@ -2,7 +2,7 @@
 Ejecutor de instrucciones ALU
 """
 
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 
 from src.cpu.core import ALU, ALUOperation, FloatALU
 from src.cpu.registers import RegisterFile
@@ -21,6 +21,8 @@ class ALUExecutor:
             alu: Unidad aritmético-lógica
         """
         self.registers = registers
+        # Acceso sin validar: rd/rs1/rs2 son campos de 4 bits del decodificador
+        self.regs = registers.values
         self.alu = alu
         self.float_alu = FloatALU()  # ALU para operaciones flotantes
 
@@ -41,6 +43,27 @@ class ALUExecutor:
 
         # Instrucciones flotantes
         self.float_opcodes = {Opcodes.FADD, Opcodes.FSUB, Opcodes.FMUL, Opcodes.FDIV}
+        self.float_op_names = {
+            Opcodes.FADD: "FADD",
+            Opcodes.FSUB: "FSUB",
+            Opcodes.FMUL: "FMUL",
+            Opcodes.FDIV: "FDIV",
+        }
+
+        # Operaciones de un solo operando
+        self.single_operand_ops = frozenset({Opcodes.NOT})
+
+    def get_handlers(self) -> Dict[int, Callable[[Dict[str, Any], Any], bool]]:
+        """
+        Retorna los manejadores por opcode para la tabla de despacho de la CPU
+
+        Returns:
+            Diccionario opcode -> handler(instruction, cpu)
+        """
+        handlers = {opcode: self.execute for opcode in self.opcode_to_alu_op}
+        for opcode in self.float_opcodes:
+            handlers[opcode] = self._execute_float
+        return handlers
 
     def execute(self, instruction: Dict[str, Any], cpu) -> bool:
         """
@@ -63,22 +86,36 @@ class ALUExecutor:
             return self._execute_float_op(opcode, rd, rs1, rs2, cpu)
 
         # Obtener operandos
-        operand1 = self.registers[rs1]
-        operand2 = self.registers[rs2] if self._requires_two_operands(opcode) else 0
+        regs = self.regs
+        operand1 = regs[rs1]
+        operand2 = regs[rs2] if opcode not in self.single_operand_ops else 0
 
         # Ejecutar operación ALU
         alu_operation = self.opcode_to_alu_op[opcode]
-        result, flags = self.alu.execute(alu_operation, operand1, operand2)
-
-        # Actualizar flags en CPU
-        cpu.flags = flags
+        if self.alu.lazy_flags:
+            # Los flags se calculan cuando un salto o la interfaz los lean
+            result, record = self.alu.execute_lazy(alu_operation, operand1, operand2)
+            cpu.defer_flags(record)
+        else:
+            result, flags = self.alu.execute(alu_operation, operand1, operand2)
+            cpu.flags = flags
 
         # Guardar resultado (excepto CMP que solo afecta flags)
         if opcode != Opcodes.CMP:
-            self.registers[rd] = result & 0xFFFFFFFFFFFFFFFF
+            regs[rd] = result & 0xFFFFFFFFFFFFFFFF
 
         return True
 
+    def _execute_float(self, instruction: Dict[str, Any], cpu) -> bool:
+        """Manejador de despacho para FADD/FSUB/FMUL/FDIV"""
+        return self._execute_float_op(
+            instruction["opcode"],
+            instruction["rd"],
+            instruction["rs1"],
+            instruction["rs2"],
+            cpu,
+        )
+
     def _execute_float_op(
         self, opcode: Opcodes, rd: int, rs1: int, rs2: int, cpu
     ) -> bool:
@@ -96,23 +133,19 @@ class ALUExecutor:
             True para continuar ejecución
         """
         # Obtener operandos (se interpretan como flotantes)
-        operand1 = self.registers[rs1]
-        operand2 = self.registers[rs2]
+        regs = self.regs
+        operand1 = regs[rs1]
+        operand2 = regs[rs2]
 
         # Mapeo de opcode a nombre de operación
-        op_name = {
-            Opcodes.FADD: "FADD",
-            Opcodes.FSUB: "FSUB",
-            Opcodes.FMUL: "FMUL",
-            Opcodes.FDIV: "FDIV",
-        }[opcode]
+        op_name = self.float_op_names[opcode]
 
         # Ejecutar en FloatALU
         result, flags = self.float_alu.execute(op_name, operand1, operand2)
 
         # Actualizar flags y resultado
         cpu.flags = flags
-        self.registers[rd] = result
+        regs[rd] = result
 
         return True
 
@@ -126,5 +159,4 @@ class ALUExecutor:
         Returns:
             True si requiere dos operandos
         """
-        single_operand_ops = {Opcodes.NOT}
-        return opcode not in single_operand_ops
+        return opcode not in self.single_operand_ops
@@ -2,7 +2,7 @@
 Ejecutor de instrucciones de control de flujo
 """
 
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 
 from src.cpu.core import Flags
 from src.cpu.registers import RegisterFile
@@ -24,6 +24,26 @@ class ControlFlowExecutor:
         self.registers = registers
         self.stack_ops = stack_ops
 
+        self.handlers = {
+            Opcodes.JMP: self._execute_jmp,
+            Opcodes.JZ: self._execute_jz,
+            Opcodes.JNZ: self._execute_jnz,
+            Opcodes.JC: self._execute_jc,
+            Opcodes.JNC: self._execute_jnc,
+            Opcodes.JS: self._execute_js,
+            Opcodes.CALL: self._execute_call,
+            Opcodes.RET: self._execute_ret,
+        }
+
+    def get_handlers(self) -> Dict[int, Callable[[Dict[str, Any], Any], bool]]:
+        """
+        Retorna los manejadores por opcode para la tabla de despacho de la CPU
+
+        Returns:
+            Diccionario opcode -> handler(instruction, cpu)
+        """
+        return dict(self.handlers)
+
     def execute(self, instruction: Dict[str, Any], cpu) -> bool:
         """
         Ejecuta una instrucción de control de flujo
@@ -35,66 +55,60 @@ class ControlFlowExecutor:
         Returns:
             True para continuar ejecución
         """
-        opcode = instruction["opcode"]
-        imm32 = instruction["imm32"]  # Dirección de salto
-
-        handlers = {
-            Opcodes.JMP: self._execute_jmp,
-            Opcodes.JZ: self._execute_jz,
-            Opcodes.JNZ: self._execute_jnz,
-            Opcodes.JC: self._execute_jc,
-            Opcodes.JNC: self._execute_jnc,
-            Opcodes.JS: self._execute_js,
-            Opcodes.CALL: self._execute_call,
-            Opcodes.RET: self._execute_ret,
-        }
-
-        handler = handlers.get(opcode)
+        handler = self.handlers.get(instruction["opcode"])
         if handler:
-            handler(imm32, cpu)
+            handler(instruction, cpu)
 
         return True
 
-    def _execute_jmp(self, target: int, cpu):
+    def _execute_jmp(self, instruction: Dict[str, Any], cpu) -> bool:
         """JMP address - Salto incondicional"""
-        cpu.pc = target
+        cpu.pc = instruction["imm32"]
+        return True
 
-    def _execute_jz(self, target: int, cpu):
+    def _execute_jz(self, instruction: Dict[str, Any], cpu) -> bool:
         """JZ address - Salto si Zero flag está activado"""
-        if self._get_flag(cpu.flags, Flags.ZERO):
-            cpu.pc = target
+        if cpu.test_flag(Flags.ZERO):
+            cpu.pc = instruction["imm32"]
+        return True
 
-    def _execute_jnz(self, target: int, cpu):
+    def _execute_jnz(self, instruction: Dict[str, Any], cpu) -> bool:
         """JNZ address - Salto si Zero flag NO está activado"""
-        if not self._get_flag(cpu.flags, Flags.ZERO):
-            cpu.pc = target
+        if not cpu.test_flag(Flags.ZERO):
+            cpu.pc = instruction["imm32"]
+        return True
 
-    def _execute_jc(self, target: int, cpu):
+    def _execute_jc(self, instruction: Dict[str, Any], cpu) -> bool:
         """JC address - Salto si Carry flag está activado"""
-        if self._get_flag(cpu.flags, Flags.CARRY):
-            cpu.pc = target
+        if cpu.test_flag(Flags.CARRY):
+            cpu.pc = instruction["imm32"]
+        return True
 
-    def _execute_jnc(self, target: int, cpu):
+    def _execute_jnc(self, instruction: Dict[str, Any], cpu) -> bool:
         """JNC address - Salto si Carry flag NO está activado"""
-        if not self._get_flag(cpu.flags, Flags.CARRY):
-            cpu.pc = target
+        if not cpu.test_flag(Flags.CARRY):
+            cpu.pc = instruction["imm32"]
+        return True
 
-    def _execute_js(self, target: int, cpu):
+    def _execute_js(self, instruction: Dict[str, Any], cpu) -> bool:
         """JS address - Salto si Negative flag está activado"""
-        if self._get_flag(cpu.flags, Flags.NEGATIVE):
-            cpu.pc = target
+        if cpu.test_flag(Flags.NEGATIVE):
+            cpu.pc = instruction["imm32"]
+        return True
 
-    def _execute_call(self, target: int, cpu):
+    def _execute_call(self, instruction: Dict[str, Any], cpu) -> bool:
         """CALL address - Llamada a subrutina"""
         # Guardar dirección de retorno en la pila
         self.stack_ops.push(cpu.pc)
         # Saltar a la dirección objetivo
-        cpu.pc = target
+        cpu.pc = instruction["imm32"]
+        return True
 
-    def _execute_ret(self, target: int, cpu):
+    def _execute_ret(self, instruction: Dict[str, Any], cpu) -> bool:
         """RET - Retorno de subrutina"""
         # Restaurar dirección de retorno desde la pila
         cpu.pc = self.stack_ops.pop()
+        return True
 
     def _get_flag(self, flags: int, flag: Flags) -> bool:
         """
@@ -2,7 +2,7 @@
 Ejecutor de instrucciones de transferencia de datos
 """
 
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
 
 from src.cpu.core import ALU, ALUOperation
 from src.cpu.io_ports import IOPorts
@@ -19,6 +19,7 @@ class DataTransferExecutor:
         registers: RegisterFile,
         memory_ops: MemoryOperations,
         io_ports: IOPorts,
+        alu: Optional[ALU] = None,
     ):
         """
         Inicializa el ejecutor de transferencia de datos
@@ -27,26 +28,18 @@ class DataTransferExecutor:
             registers: Banco de registros
             memory_ops: Operaciones de memoria
             io_ports: Operaciones de I/O
+            alu: ALU para ADDI (se comparte con la CPU para respetar su
+                configuración de flags y logging)
         """
         self.registers = registers
+        # Acceso sin validar para las instrucciones frecuentes; IN conserva
+        # la escritura con truncado porque los valores vienen de callbacks
+        self.regs = registers.values
         self.memory_ops = memory_ops
         self.io_ports = io_ports
-        self.alu = ALU()  # Para ADDI
+        self.alu = alu if alu is not None else ALU()  # Para ADDI
 
-    def execute(self, instruction: Dict[str, Any], cpu) -> bool:
-        """
-        Ejecuta una instrucción de transferencia de datos
-
-        Args:
-            instruction: Instrucción decodificada
-            cpu: Referencia a la CPU
-
-        Returns:
-            True para continuar ejecución
-        """
-        opcode = instruction["opcode"]
-
-        handlers = {
+        self.handlers = {
             Opcodes.MOVI: self._execute_movi,
             Opcodes.LD: self._execute_ld,
             Opcodes.ST: self._execute_st,
@@ -58,13 +51,33 @@ class DataTransferExecutor:
             Opcodes.OUTS: self._execute_outs,
         }
 
-        handler = handlers.get(opcode)
+    def get_handlers(self) -> Dict[int, Callable[[Dict[str, Any], Any], bool]]:
+        """
+        Retorna los manejadores por opcode para la tabla de despacho de la CPU
+
+        Returns:
+            Diccionario opcode -> handler(instruction, cpu)
+        """
+        return dict(self.handlers)
+
+    def execute(self, instruction: Dict[str, Any], cpu) -> bool:
+        """
+        Ejecuta una instrucción de transferencia de datos
+
+        Args:
+            instruction: Instrucción decodificada
+            cpu: Referencia a la CPU
+
+        Returns:
+            True para continuar ejecución
+        """
+        handler = self.handlers.get(instruction["opcode"])
         if handler:
             handler(instruction, cpu)
 
         return True
 
-    def _execute_movi(self, instruction: Dict[str, Any], cpu):
+    def _execute_movi(self, instruction: Dict[str, Any], cpu) -> bool:
         """MOVI Rd, Rs1 o MOVI Rd, #imm"""
         rd = instruction["rd"]
         rs1 = instruction["rs1"]
@@ -73,9 +86,9 @@ class DataTransferExecutor:
 
         if func == 0:  # Inmediato entero
             # Sign-extend el inmediato de 32 bits a 64 bits
-            self.registers[rd] = self.memory_ops.sign_extend_32(imm32)
+            self.regs[rd] = self.memory_ops.sign_extend_32(imm32)
         elif func == 1:  # Registro a registro
-            self.registers[rd] = self.registers[rs1]
+            self.regs[rd] = self.regs[rs1]
         elif func == 2:  # Inmediato flotante (single precision en IMM32)
             # IMM32 contiene un float de 32 bits, convertir a double de 64 bits
             import struct
@@ -84,9 +97,11 @@ class DataTransferExecutor:
             float_val = struct.unpack("f", struct.pack("I", imm32 & 0xFFFFFFFF))[0]
             # Convertir a double de 64 bits y guardar su representación
             double_bits = struct.unpack("Q", struct.pack("d", float_val))[0]
-            self.registers[rd] = double_bits
+            self.regs[rd] = double_bits
+
+        return True
 
-    def _execute_ld(self, instruction: Dict[str, Any], cpu):
+    def _execute_ld(self, instruction: Dict[str, Any], cpu) -> bool:
         """LD Rd, Rs1 + offset o LD Rd, #address"""
         rd = instruction["rd"]
         rs1 = instruction["rs1"]
@@ -96,12 +111,14 @@ class DataTransferExecutor:
         if func == 0:  # Dirección absoluta
             address = imm32
         else:  # Offset desde registro base
-            address = self.registers[rs1] + self.memory_ops.sign_extend_32(imm32)
+            address = self.regs[rs1] + self.memory_ops.sign_extend_32(imm32)
 
         value = self.memory_ops.read_word(address)
-        self.registers[rd] = value
+        self.regs[rd] = value
 
-    def _execute_st(self, instruction: Dict[str, Any], cpu):
+        return True
+
+    def _execute_st(self, instruction: Dict[str, Any], cpu) -> bool:
         """ST Rd, #address o ST Rd, [Rs1 + offset]"""
         rd = instruction["rd"]
         rs1 = instruction["rs1"]
@@ -110,14 +127,16 @@ class DataTransferExecutor:
 
         if func == 0:  # Dirección absoluta: ST Rd, #address
             address = imm32
-            value = self.registers[rd]
+            value = self.regs[rd]
         else:  # Offset desde registro base: ST Rd, [Rs1 + offset]
-            address = self.registers[rs1] + self.memory_ops.sign_extend_32(imm32)
-            value = self.registers[rd]
+            address = self.regs[rs1] + self.memory_ops.sign_extend_32(imm32)
+            value = self.regs[rd]
 
         self.memory_ops.write_word(address, value)
 
-    def _execute_out(self, instruction: Dict[str, Any], cpu):
+        return True
+
+    def _execute_out(self, instruction: Dict[str, Any], cpu) -> bool:
         """OUT Rs1/Rd, port/mmio"""
         rd = instruction["rd"]
         rs1 = instruction["rs1"]
@@ -125,11 +144,13 @@ class DataTransferExecutor:
         func = instruction["func"]
 
         # Aceptar ambas codificaciones (compatibilidad)
-        src_reg_val = self.registers[rs1] if rs1 != 0 else self.registers[rd]
+        src_reg_val = self.regs[rs1] if rs1 != 0 else self.regs[rd]
 
         self.io_ports.write_output(src_reg_val, imm32, func)
 
-    def _execute_in(self, instruction: Dict[str, Any], cpu):
+        return True
+
+    def _execute_in(self, instruction: Dict[str, Any], cpu) -> bool:
         """IN Rd, port/mmio"""
         rd = instruction["rd"]
         rs1 = instruction["rs1"]
@@ -149,17 +170,8 @@ class DataTransferExecutor:
             base = self.registers[rs1]
             count = imm32 & 0xFFFFFFFF
 
-            # Leer línea (debe venir de callback)
-            line = ""
-            if self.io_ports.input_char_callback:
-                # Simular lectura de línea completa
-                chars = []
-                while True:
-                    ch = self.io_ports.input_char_callback()
-                    if ch == 10 or ch == 0:  # \n o null
-                        break
-                    chars.append(chr(ch))
-                line = "".join(chars)
+            # Leer línea completa (proveedor de entrada o callback)
+            line = self.io_ports.read_line()
 
             # Separar y parsear
             parts = line.split(chr(sep_chr)) if sep_chr else line.split()
@@ -182,28 +194,38 @@ class DataTransferExecutor:
             value = self.io_ports.read_input(imm32, func)
             self.registers[rd] = value
 
-    def _execute_addi(self, instruction: Dict[str, Any], cpu):
+        return True
+
+    def _execute_addi(self, instruction: Dict[str, Any], cpu) -> bool:
         """ADDI Rd, Rs1, #imm32"""
         rd = instruction["rd"]
         rs1 = instruction["rs1"]
         imm32 = instruction["imm32"]
 
-        operand1 = self.registers[rs1]
+        operand1 = self.regs[rs1]
         operand2 = self.memory_ops.sign_extend_32(imm32)
 
-        result, flags = self.alu.execute(ALUOperation.ADD, operand1, operand2)
+        if self.alu.lazy_flags:
+            result, record = self.alu.execute_lazy(ALUOperation.ADD, operand1, operand2)
+            cpu.defer_flags(record)
+        else:
+            result, flags = self.alu.execute(ALUOperation.ADD, operand1, operand2)
+            cpu.flags = flags
+
+        self.regs[rd] = result & 0xFFFFFFFFFFFFFFFF
 
-        self.registers[rd] = result & 0xFFFFFFFFFFFFFFFF
-        cpu.flags = flags
+        return True
 
-    def _execute_cp(self, instruction: Dict[str, Any], cpu):
+    def _execute_cp(self, instruction: Dict[str, Any], cpu) -> bool:
         """CP Rd, Rs1 (copia registro sin afectar flags)"""
         rd = instruction["rd"]
         rs1 = instruction["rs1"]
 
-        self.registers[rd] = self.registers[rs1]
+        self.regs[rd] = self.regs[rs1]
 
-    def _execute_ins(self, instruction: Dict[str, Any], cpu):
+        return True
+
+    def _execute_ins(self, instruction: Dict[str, Any], cpu) -> bool:
         """
         INS Rd, PORT - Lee string desde puerto
 
@@ -222,7 +244,9 @@ class DataTransferExecutor:
         # Guardar en memoria
         self.io_ports.write_string_to_memory(buffer_addr, text, max_length=1000)
 
-    def _execute_outs(self, instruction: Dict[str, Any], cpu):
+        return True
+
+    def _execute_outs(self, instruction: Dict[str, Any], cpu) -> bool:
         """
         OUTS Rd, PORT - Escribe string a puerto
 
@@ -240,3 +264,5 @@ class DataTransferExecutor:
 
         # Escribir a puerto
         self.io_ports.write_string(text, port)
+
+        return True
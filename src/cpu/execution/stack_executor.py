@@ -2,7 +2,7 @@
 Ejecutor de instrucciones de pila
 """
 
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 
 from src.cpu.registers import RegisterFile
 from src.cpu.stack_ops import StackOperations
@@ -21,8 +21,21 @@ class StackExecutor:
             stack_ops: Operaciones de pila
         """
         self.registers = registers
+        self.regs = registers.values  # Acceso sin validar (ver RegisterFile)
         self.stack_ops = stack_ops
 
+    def get_handlers(self) -> Dict[int, Callable[[Dict[str, Any], Any], bool]]:
+        """
+        Retorna los manejadores por opcode para la tabla de despacho de la CPU
+
+        Returns:
+            Diccionario opcode -> handler(instruction, cpu)
+        """
+        return {
+            Opcodes.PUSH: self._execute_push,
+            Opcodes.POP: self._execute_pop,
+        }
+
     def execute(self, instruction: Dict[str, Any]) -> bool:
         """
         Ejecuta una instrucción de pila
@@ -42,12 +55,13 @@ class StackExecutor:
 
         return True
 
-    def _execute_push(self, instruction: Dict[str, Any]):
+    def _execute_push(self, instruction: Dict[str, Any], cpu=None) -> bool:
         """
         PUSH Rs1 o PUSH #imm
 
         Args:
             instruction: Instrucción decodificada
+            cpu: Referencia a la CPU (no se usa, firma de despacho)
         """
         rs1 = instruction["rs1"]
         imm32 = instruction["imm32"]
@@ -56,18 +70,21 @@ class StackExecutor:
         if func == 0:  # Inmediato
             value = imm32
         else:  # Registro
-            value = self.registers[rs1]
+            value = self.regs[rs1]
 
         self.stack_ops.push(value)
+        return True
 
-    def _execute_pop(self, instruction: Dict[str, Any]):
+    def _execute_pop(self, instruction: Dict[str, Any], cpu=None) -> bool:
         """
         POP Rd
 
         Args:
             instruction: Instrucción decodificada
+            cpu: Referencia a la CPU (no se usa, firma de despacho)
         """
         rd = instruction["rd"]
 
         value = self.stack_ops.pop()
-        self.registers[rd] = value
+        self.regs[rd] = value
+        return True
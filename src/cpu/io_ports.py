@@ -1,13 +1,413 @@
 """
 Módulo de puertos de entrada/salida (I/O) para la CPU
+
+La salida de consola puede pasar por un OutputSink: el texto se acumula en
+un buffer acotado y se entrega de una vez al destino (stdout, la consola de
+la GUI o un archivo) al llegar un salto de línea, al llenarse el buffer, al
+pasar flush_interval segundos, antes de cada lectura (IN) y al terminar la
+ejecución (HALT). Sin sink se conservan los callbacks por carácter/entero.
+
+La entrada puede venir de un InputProvider (texto en memoria, archivo o
+stdin) que lee líneas o bloques completos y sirve desde su buffer los
+caracteres, enteros, flotantes y líneas que piden IN, INF e INS. Así los
+programas interactivos corren sin intervención (scripts, benchmarks).
+
+Las direcciones MMIO se resuelven en un DeviceBus: la consola, cada puerto de
+archivo abierto y el DMA son dispositivos conectados a él, y las demás
+direcciones se tratan como memoria.
 """
 
 import struct
-from typing import Any, Callable, Dict, Optional
+import sys
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, TextIO
 
+from src.cpu.devices import Device, DeviceBus
+from src.cpu.dma import DMAController
 from src.memory.memory import Memory
 
 
+class OutputSink(ABC):
+    """Buffer de salida de consola con entrega por lotes"""
+
+    def __init__(
+        self,
+        capacity: int = 8192,
+        line_buffered: bool = True,
+        flush_interval: Optional[float] = 0.1,
+    ):
+        """
+        Args:
+            capacity: Caracteres acumulados que fuerzan la entrega
+            line_buffered: Entregar al recibir un salto de línea
+            flush_interval: Segundos máximos que el texto espera en el buffer
+                (se revisa al escribir; la GUI además vacía el sink con un
+                temporizador; None = sin límite de tiempo)
+        """
+        if capacity < 1:
+            raise ValueError("La capacidad del buffer de salida debe ser mayor que 0")
+        self.capacity = capacity
+        self.line_buffered = line_buffered
+        self.flush_interval = flush_interval
+        self._parts: List[str] = []
+        self._size = 0
+        self._last_flush = time.monotonic()
+        self.flushes = 0  # Entregas al destino (una actualización de GUI cada una)
+
+    def write(self, text: str):
+        """Agrega texto al buffer (lo entrega si se cumple alguna condición)"""
+        if not text:
+            return
+        if len(text) >= self.capacity:
+            # Un bloque grande (p. ej. un arreglo completo) sale de una vez
+            self.flush()
+            self._emit(text)
+            return
+        self._parts.append(text)
+        self._size += len(text)
+        if (
+            self._size >= self.capacity
+            or (self.line_buffered and "\n" in text)
+            or (
+                self.flush_interval is not None
+                and time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        ):
+            self.flush()
+
+    def flush(self):
+        """Entrega el texto pendiente en una sola llamada al destino"""
+        if self._parts:
+            text = "".join(self._parts)
+            self._parts.clear()
+            self._size = 0
+            self._emit(text)
+
+    def close(self):
+        """Entrega lo pendiente y libera el destino"""
+        self.flush()
+
+    @property
+    def pending(self) -> int:
+        """Caracteres en el buffer sin entregar"""
+        return self._size
+
+    def _emit(self, text: str):
+        self._last_flush = time.monotonic()
+        self.flushes += 1
+        self.write_through(text)
+
+    @abstractmethod
+    def write_through(self, text: str):
+        """Escribe en el destino (lo implementan las subclases)"""
+
+
+class CallbackSink(OutputSink):
+    """Entrega cada lote a una función, p. ej. ConsoleFrame.append_text"""
+
+    def __init__(self, callback: Callable[[str], None], **kwargs):
+        super().__init__(**kwargs)
+        self.callback = callback
+
+    def write_through(self, text: str):
+        self.callback(text)
+
+
+class StreamSink(OutputSink):
+    """Escribe cada lote en un stream de texto ya abierto"""
+
+    def __init__(self, stream: TextIO, **kwargs):
+        super().__init__(**kwargs)
+        self.stream = stream
+
+    def write_through(self, text: str):
+        self.stream.write(text)
+        self.stream.flush()
+
+
+class StdoutSink(StreamSink):
+    """Salida estándar (se resuelve sys.stdout en cada entrega)"""
+
+    def __init__(self, **kwargs):
+        super().__init__(sys.stdout, **kwargs)
+
+    def write_through(self, text: str):
+        self.stream = sys.stdout
+        super().write_through(text)
+
+
+class FileSink(StreamSink):
+    """Archivo de texto propio; close() lo cierra"""
+
+    def __init__(self, path: str, mode: str = "w", **kwargs):
+        """
+        Raises:
+            RuntimeError: Si no se puede abrir el archivo
+        """
+        try:
+            stream = open(path, mode, encoding="utf-8")
+        except OSError as e:
+            raise RuntimeError(f"No se pudo abrir archivo {path}: {e}")
+        # Sin límite de tiempo: el archivo no necesita actualizarse en vivo
+        kwargs.setdefault("line_buffered", False)
+        kwargs.setdefault("flush_interval", None)
+        super().__init__(stream, **kwargs)
+        self.path = path
+
+    def close(self):
+        super().close()
+        self.stream.close()
+
+
+class InputProvider(ABC):
+    """
+    Entrada de consola servida desde un buffer que se llena por bloques
+
+    Cada bloque se parte una sola vez en líneas; las lecturas de enteros y
+    flotantes toman una línea de la lista y read_char avanza una columna
+    dentro de la línea actual.
+    """
+
+    def __init__(self):
+        self._lines: List[str] = []  # Líneas completas (sin el salto)
+        self._index = 0  # Próxima línea a servir
+        self._col = 0  # Caracteres de esa línea ya leídos con read_char
+        self._tail = ""  # Resto del último bloque que aún no termina en salto
+        self._eof = False
+
+    @abstractmethod
+    def read_block(self) -> str:
+        """Siguiente bloque de texto ("" al terminar); lo implementan las subclases"""
+
+    def close(self):
+        """Libera el origen de la entrada"""
+
+    def read_char(self) -> int:
+        """Código del siguiente carácter (10 en fin de línea, 0 al terminar)"""
+        while self._index >= len(self._lines):
+            if not self._fill():
+                return 0
+        line = self._lines[self._index]
+        col = self._col
+        if col < len(line):
+            self._col = col + 1
+            return ord(line[col])
+        self._index += 1
+        self._col = 0
+        return 10
+
+    def read_line(self, max_length: Optional[int] = None) -> Optional[str]:
+        """
+        Siguiente línea (o lo que queda de ella) sin el salto de línea
+
+        Args:
+            max_length: Si la línea es más larga, se devuelven max_length
+                caracteres y el resto queda para la próxima lectura
+
+        Returns:
+            La línea, o None si la entrada terminó
+        """
+        while self._index >= len(self._lines):
+            if not self._fill():
+                return None
+        line = self._lines[self._index]
+        col = self._col
+        if max_length is not None and len(line) - col > max_length:
+            self._col = col + max_length
+            return line[col : col + max_length]
+        self._index += 1
+        self._col = 0
+        return line[col:] if col else line
+
+    def read_int(self) -> int:
+        """
+        Entero de la siguiente línea no vacía (decimal, 0x, 0b...; 0 al
+        terminar la entrada)
+
+        Raises:
+            ValueError: Si la línea no es un entero
+        """
+        # Ruta rápida: la línea ya está en la lista y es un entero decimal
+        i = self._index
+        if i < len(self._lines) and not self._col:
+            try:
+                value = int(self._lines[i])
+            except ValueError:
+                pass
+            else:
+                self._index = i + 1
+                return value
+        text = self._next_value()
+        if text is None:
+            return 0
+        try:
+            return int(text)
+        except ValueError:
+            pass
+        try:
+            return int(text, 0)
+        except ValueError:
+            raise ValueError(f"Entrada inválida para un entero: {text!r}")
+
+    def read_float(self) -> float:
+        """
+        Flotante de la siguiente línea no vacía (0.0 al terminar la entrada)
+
+        Raises:
+            ValueError: Si la línea no es un número
+        """
+        text = self._next_value()
+        if text is None:
+            return 0.0
+        try:
+            return float(text)
+        except ValueError:
+            raise ValueError(f"Entrada inválida para un flotante: {text!r}")
+
+    def _next_value(self) -> Optional[str]:
+        """Siguiente línea no vacía, sin espacios alrededor"""
+        while True:
+            line = self.read_line()
+            if line is None:
+                return None
+            line = line.strip()
+            if line:
+                return line
+
+    def _fill(self) -> bool:
+        """Parte otro bloque en líneas; False si la entrada terminó"""
+        if self._eof:
+            return False
+        block = self.read_block()
+        if not block:
+            self._eof = True
+            self.close()
+            if not self._tail:
+                return False
+            # La última línea no terminaba en salto de línea
+            parts = [self._tail]
+            self._tail = ""
+        else:
+            text = self._tail + block
+            if "\r" in text:
+                text = text.replace("\r\n", "\n")
+            parts = text.split("\n")
+            self._tail = parts.pop()
+        # Descartar las líneas consumidas para que la lista no crezca sin límite
+        self._lines = self._lines[self._index :] + parts
+        self._index = 0
+        return True
+
+
+class StringInputProvider(InputProvider):
+    """Entrada fija en memoria (tests, scripts generados)"""
+
+    def __init__(self, text: str):
+        super().__init__()
+        self._text = text
+
+    def read_block(self) -> str:
+        text, self._text = self._text, ""
+        return text
+
+
+class FileInputProvider(InputProvider):
+    """Entrada guionada desde un archivo de texto, leído por bloques"""
+
+    def __init__(self, path: str, block_size: int = 65536):
+        """
+        Raises:
+            RuntimeError: Si no se puede abrir el archivo
+        """
+        super().__init__()
+        try:
+            self._file = open(path, "r", encoding="utf-8")
+        except OSError as e:
+            raise RuntimeError(f"No se pudo abrir archivo {path}: {e}")
+        self.path = path
+        self.block_size = block_size
+
+    def read_block(self) -> str:
+        return self._file.read(self.block_size) if not self._file.closed else ""
+
+    def close(self):
+        self._file.close()
+
+
+class StdinInputProvider(InputProvider):
+    """Entrada estándar, una línea completa por lectura (interactivo o tubería)"""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        super().__init__()
+        self.stream = stream
+
+    def read_block(self) -> str:
+        return (self.stream or sys.stdin).readline()
+
+
+class ConsoleDevice(Device):
+    """Ventana MMIO de la consola: escribe y lee caracteres, enteros y líneas"""
+
+    def __init__(self, io: "IOPorts"):
+        super().__init__(
+            "consola",
+            IOPorts.MMIO_CONSOLE_CHAR,
+            IOPorts.MMIO_CONSOLE_IN_INT + 8 - IOPorts.MMIO_CONSOLE_CHAR,
+        )
+        self.io = io
+
+    def read(self, address: int) -> int:
+        if address == IOPorts.MMIO_CONSOLE_IN_CHAR:
+            return self.io._read_char()
+        if address == IOPorts.MMIO_CONSOLE_IN_INT:
+            return self.io._read_int()
+        return 0
+
+    def write(self, address: int, value: int):
+        if address == IOPorts.MMIO_CONSOLE_CHAR:
+            self.io._write_char(value)
+        elif address == IOPorts.MMIO_CONSOLE_INT:
+            self.io._write_int(value)
+
+    def read_string(self, address: int, max_length: int) -> str:
+        if address == IOPorts.MMIO_CONSOLE_IN_INT:
+            return self.io.read_line(max_length)
+        return ""
+
+    def write_string(self, address: int, text: str):
+        if address == IOPorts.MMIO_CONSOLE_INT:
+            self.io._emit_text(text)
+
+
+class FilePortDevice(Device):
+    """Puerto (una dirección) asociado a un archivo de IOPorts.open_files"""
+
+    mapped = False
+
+    def __init__(self, port: int, files: Dict[int, Any]):
+        super().__init__(f"archivo:0x{port:X}", port, 1)
+        self.files = files
+
+    def read_string(self, address: int, max_length: int) -> str:
+        try:
+            file_handle = self.files.get(address)
+            if file_handle:
+                return file_handle.readline(max_length).rstrip("\n\r")
+        except Exception:
+            pass
+        return ""
+
+    def write_string(self, address: int, text: str):
+        try:
+            file_handle = self.files.get(address)
+            if file_handle:
+                # Sin flush por escritura: se vacía en flush_output y al cerrar
+                file_handle.write(text)
+        except Exception:
+            pass
+
+
 class IOPorts:
     """Maneja operaciones de entrada/salida (IN/OUT) y MMIO"""
 
@@ -34,13 +434,59 @@ class IOPorts:
         self.input_char_callback: Optional[Callable[[], int]] = None
         self.input_int_callback: Optional[Callable[[], int]] = None
 
+        # Salida por lotes (tiene prioridad sobre los callbacks de salida)
+        self.output_sink: Optional[OutputSink] = None
+        # Entrada por buffer (tiene prioridad sobre los callbacks de entrada)
+        self.input_provider: Optional[InputProvider] = None
+
         # Archivos abiertos para I/O de strings
         self.open_files: Dict[int, Any] = {}  # puerto -> file handle
 
-        # Buffers de salida (para tests sin GUI)
-        self.output_buffer: str = ""
+        # Dispositivos MMIO: consola, DMA sobre esos archivos y un puerto por
+        # archivo abierto (open_file/close_file los conectan y quitan)
+        self.devices = DeviceBus()
+        self.console = self.devices.attach(ConsoleDevice(self))
+        self.dma = self.devices.attach(DMAController(memory, self.open_files))
+
+        # Buffers de salida (para tests sin GUI). El texto se acumula en una
+        # lista y output_buffer lo une al leerlo (evita concatenar str)
+        self._output_parts: List[str] = []
         self.output_int_buffer: list = []
 
+    @property
+    def output_buffer(self) -> str:
+        """Texto escrito sin sink ni callback de caracteres"""
+        if len(self._output_parts) > 1:
+            self._output_parts[:] = ["".join(self._output_parts)]
+        return self._output_parts[0] if self._output_parts else ""
+
+    @output_buffer.setter
+    def output_buffer(self, text: str):
+        self._output_parts = [text] if text else []
+
+    def _emit_text(self, text: str):
+        """Envía texto al sink, al callback de caracteres o al buffer"""
+        if self.output_sink is not None:
+            self.output_sink.write(text)
+        elif self.output_char_callback:
+            for ch in text:
+                self.output_char_callback(ord(ch))
+        else:
+            self._output_parts.append(text)
+
+    def flush_output(self):
+        """
+        Entrega la salida pendiente del sink y de los archivos abiertos (HALT,
+        IN, fin de ejecución)
+        """
+        if self.output_sink is not None:
+            self.output_sink.flush()
+        for file_handle in self.open_files.values():
+            try:
+                file_handle.flush()
+            except Exception:
+                pass
+
     # === Salida (OUT) ===
 
     def write_output(self, value: int, target: int, func: int):
@@ -95,17 +541,18 @@ class IOPorts:
             self._write_char(value)
         elif port == 2:
             self._write_int(value)
-        else:
+        elif self.output_sink is not None:
+            # Puerto desconocido: el valor tal cual, como con output_int_callback
+            self.output_sink.write(f"{value & 0xFFFFFFFFFFFFFFFF}\n")
+        elif self.output_int_callback:
             # Puerto desconocido
-            if self.output_int_callback:
-                self.output_int_callback(value)
+            self.output_int_callback(value)
 
     def _output_to_mmio(self, value: int, address: int):
         """Escribe a dirección MMIO"""
-        if address == self.MMIO_CONSOLE_CHAR:
-            self._write_char(value)
-        elif address == self.MMIO_CONSOLE_INT:
-            self._write_int(value)
+        device = self.devices.find(address)
+        if device is not None:
+            device.write(address, value)
         else:
             # MMIO genérico: escribir como memoria si está en rango
             if 0 <= address <= (self.memory_size - 8):
@@ -115,14 +562,13 @@ class IOPorts:
         """Escribe un carácter (byte menos significativo)"""
         ch = value & 0xFF
 
-        if self.output_char_callback:
+        if self.output_sink is not None:
+            self.output_sink.write(chr(ch))
+        elif self.output_char_callback:
             self.output_char_callback(ch)
         else:
             # Fallback: agregar a buffer
-            try:
-                self.output_buffer += chr(ch)
-            except Exception:
-                self.output_buffer += f"[0x{ch:02X}]"
+            self._output_parts.append(chr(ch))
 
     def _write_int(self, value: int):
         """Escribe un entero"""
@@ -133,7 +579,9 @@ class IOPorts:
         if val >= 0x8000000000000000:
             val = val - 0x10000000000000000
 
-        if self.output_int_callback:
+        if self.output_sink is not None:
+            self.output_sink.write(f"{val}\n")
+        elif self.output_int_callback:
             self.output_int_callback(val)
         else:
             # Fallback: agregar a buffer
@@ -145,15 +593,7 @@ class IOPorts:
         float_val = struct.unpack("d", struct.pack("Q", value & 0xFFFFFFFFFFFFFFFF))[0]
 
         # Convertir a string
-        float_str = str(float_val)
-
-        if self.output_char_callback:
-            # Imprimir carácter por carácter
-            for ch in float_str:
-                self.output_char_callback(ord(ch))
-        else:
-            # Fallback: agregar a buffer
-            self.output_buffer += float_str
+        self._emit_text(str(float_val))
 
     def _output_int_no_newline(self, value: int):
         """Escribe entero sin newline (para formato)"""
@@ -164,21 +604,25 @@ class IOPorts:
         if val >= 0x8000000000000000:
             val = val - 0x10000000000000000
 
-        if self.output_int_callback:
+        if self.output_sink is not None:
+            self.output_sink.write(str(val))
+        elif self.output_int_callback:
             # La GUI decide cómo manejarlo
             self.output_int_callback(val)
         else:
             # Fallback: convertir a string y agregar
-            self.output_buffer += str(val)
+            self._output_parts.append(str(val))
 
     def _output_uint_no_newline(self, value: int):
         """Escribe entero unsigned sin newline (para formato)"""
         val = int(value & 0xFFFFFFFFFFFFFFFF)
 
-        if self.output_int_callback:
+        if self.output_sink is not None:
+            self.output_sink.write(str(val))
+        elif self.output_int_callback:
             self.output_int_callback(val)
         else:
-            self.output_buffer += str(val)
+            self._output_parts.append(str(val))
 
     def _output_int_array(self, base_addr: int, count: int, separator: int):
         """
@@ -189,14 +633,13 @@ class IOPorts:
             count: Número de elementos
             separator: Carácter ASCII separador
         """
-        count = max(0, min(count, 1_000_000))  # Límite de seguridad
-
-        for i in range(count):
-            addr = base_addr + i * 8
-            if not (0 <= addr <= (self.memory_size - 8)):
-                break
+        values = self._read_array(base_addr, count)
+        if self._batch_arrays():
+            signed = [v - (1 << 64) if v >> 63 else v for v in values]
+            self._emit_text(self._format_array(signed, count, separator))
+            return
 
-            val = self.mem.read_word(addr)
+        for i, val in enumerate(values):
             self._output_int_no_newline(val)
 
             # Separador entre números (no después del último)
@@ -212,19 +655,51 @@ class IOPorts:
             count: Número de elementos
             separator: Carácter ASCII separador
         """
-        count = max(0, min(count, 1_000_000))
-
-        for i in range(count):
-            addr = base_addr + i * 8
-            if not (0 <= addr <= (self.memory_size - 8)):
-                break
+        values = self._read_array(base_addr, count)
+        if self._batch_arrays():
+            self._emit_text(self._format_array(values, count, separator))
+            return
 
-            val = self.mem.read_word(addr)
+        for i, val in enumerate(values):
             self._output_uint_no_newline(val)
 
             if i != count - 1 and separator:
                 self._write_char(separator)
 
+    def _batch_arrays(self) -> bool:
+        """True si el arreglo puede salir como un solo texto (sin callbacks)"""
+        return self.output_sink is not None or not (
+            self.output_int_callback or self.output_char_callback
+        )
+
+    @staticmethod
+    def _format_array(values: List[int], count: int, separator: int) -> str:
+        """Texto de un arreglo igual al que producen las escrituras sueltas"""
+        sep = chr(separator & 0xFF) if separator else ""
+        text = sep.join(map(str, values))
+        # Arreglo cortado al final de la memoria: el bucle original también
+        # escribía el separador después del último elemento leído
+        if sep and values and len(values) != count:
+            text += sep
+        return text
+
+    def _read_array(self, base_addr: int, count: int) -> List[int]:
+        """
+        Lee de una vez las palabras del array que caen dentro de la memoria
+
+        Args:
+            base_addr: Dirección base del array
+            count: Número de elementos pedidos
+
+        Returns:
+            Hasta count palabras (se corta en el final de la memoria)
+        """
+        count = max(0, min(count, 1_000_000))  # Límite de seguridad
+        if base_addr < 0:
+            return []
+        count = min(count, (self.memory_size - base_addr) // 8)
+        return self.mem.read_words(base_addr, count)
+
     # === Entrada (IN) ===
 
     def read_input(self, source: int, func: int) -> int:
@@ -239,6 +714,8 @@ class IOPorts:
             Valor de 64 bits leído
         """
         mode_port = func & 1
+        # El usuario debe ver el texto pendiente (p. ej. el prompt) antes de leer
+        self.flush_output()
 
         if mode_port == 1:
             # Entrada desde puerto numérico
@@ -259,10 +736,9 @@ class IOPorts:
 
     def _input_from_mmio(self, address: int) -> int:
         """Lee desde dirección MMIO"""
-        if address == self.MMIO_CONSOLE_IN_CHAR:
-            return self._read_char()
-        elif address == self.MMIO_CONSOLE_IN_INT:
-            return self._read_int()
+        device = self.devices.find(address)
+        if device is not None:
+            return device.read(address)
         else:
             # MMIO genérico: leer como memoria si está en rango
             if 0 <= address <= (self.memory_size - 8):
@@ -271,6 +747,8 @@ class IOPorts:
 
     def _read_char(self) -> int:
         """Lee un carácter desde la entrada"""
+        if self.input_provider is not None:
+            return self.input_provider.read_char() & 0xFF
         if self.input_char_callback:
             return self.input_char_callback() & 0xFF
 
@@ -279,17 +757,19 @@ class IOPorts:
 
     def _read_int(self) -> int:
         """Lee un entero desde la entrada"""
-        if self.input_int_callback:
+        if self.input_provider is not None:
+            val = self.input_provider.read_int()
+        elif self.input_int_callback:
             val = self.input_int_callback()
+        else:
+            # Fallback: retornar 0
+            return 0
 
-            # Convertir números negativos a representación sin signo de 64 bits
-            if val < 0:
-                val = (1 << 64) + val  # Equivalente a: 0x10000000000000000 + val
+        # Convertir números negativos a representación sin signo de 64 bits
+        if val < 0:
+            val = (1 << 64) + val  # Equivalente a: 0x10000000000000000 + val
 
-            return val & 0xFFFFFFFFFFFFFFFF
-
-        # Fallback: retornar 0
-        return 0
+        return val & 0xFFFFFFFFFFFFFFFF
 
     def read_input_float(self, source: int) -> int:
         """
@@ -301,6 +781,11 @@ class IOPorts:
         Returns:
             Representación de 64 bits del flotante leído
         """
+        self.flush_output()
+        if self.input_provider is not None:
+            float_val = self.input_provider.read_float()
+            return struct.unpack("Q", struct.pack("d", float_val))[0]
+
         if self.input_int_callback:
             # Leer el valor como si fuera entero, pero parsearlo como float
             # Necesitamos un callback especial o modificar el existente
@@ -308,10 +793,9 @@ class IOPorts:
             if hasattr(self, "input_float_callback") and self.input_float_callback:
                 float_val = self.input_float_callback()
             else:
-                # Fallback: usar input_int_callback pero parsear como float
+                # Fallback: leer una línea de stdin y parsearla como float
                 try:
-                    # Leer como string y parsear como float
-                    float_val = float(input(""))
+                    float_val = StdinInputProvider().read_float()
                 except Exception:
                     float_val = 0.0
 
@@ -330,6 +814,21 @@ class IOPorts:
         """Registra callback para salida de enteros"""
         self.output_int_callback = callback
 
+    def set_output_sink(self, sink: Optional[OutputSink]):
+        """
+        Registra el sink de salida por lotes (None lo quita)
+
+        El sink anterior se vacía antes de reemplazarlo.
+        """
+        self.flush_output()
+        self.output_sink = sink
+
+    def set_input_provider(self, provider: Optional[InputProvider]):
+        """Registra el proveedor de entrada por buffer (None lo quita)"""
+        if self.input_provider is not None and self.input_provider is not provider:
+            self.input_provider.close()
+        self.input_provider = provider
+
     def set_input_char_callback(self, callback: Callable[[], int]):
         """Registra callback para entrada de caracteres"""
         self.input_char_callback = callback
@@ -370,17 +869,11 @@ class IOPorts:
             max_length: Longitud máxima del string
 
         Returns:
-            String leído
+            String leído ("" si el puerto no es un flujo)
         """
-        # Puerto de consola
-        if port == self.MMIO_CONSOLE_IN_INT or port == 0xFFFF0018:
-            return self._read_string_from_console(max_length)
-
-        # Puerto de archivo
-        elif port in self.open_files:
-            return self._read_string_from_file(port, max_length)
-
-        # Puerto desconocido
+        device = self.devices.find(port)
+        if device is not None:
+            return device.read_string(port, max_length)
         return ""
 
     def write_string(self, text: str, port: int):
@@ -393,13 +886,9 @@ class IOPorts:
                 - 0xFFFF0008: Consola (stdout)
                 - 0xFFFF0020: Archivo (debe estar abierto previamente)
         """
-        # Puerto de consola
-        if port == self.MMIO_CONSOLE_INT or port == 0xFFFF0008:
-            self._write_string_to_console(text)
-
-        # Puerto de archivo
-        elif port in self.open_files:
-            self._write_string_to_file(text, port)
+        device = self.devices.find(port)
+        if device is not None:
+            device.write_string(port, text)
 
     def read_string_from_memory(self, base_addr: int, max_length: int = 1000) -> str:
         """
@@ -453,11 +942,23 @@ class IOPorts:
 
     # === Helpers de consola ===
 
-    def _read_string_from_console(self, max_length: int) -> str:
-        """Lee string desde consola usando callback"""
+    def read_line(self, max_length: Optional[int] = None) -> str:
+        """
+        Lee una línea de la consola (sin el salto de línea)
+
+        Args:
+            max_length: Longitud máxima (None = hasta el fin de línea)
+
+        Returns:
+            La línea leída ("" si no hay entrada)
+        """
+        self.flush_output()
+        if self.input_provider is not None:
+            line = self.input_provider.read_line(max_length)
+            return line if line is not None else ""
         if self.input_char_callback:
             chars = []
-            for _ in range(max_length):
+            while max_length is None or len(chars) < max_length:
                 ch = self.input_char_callback()
                 if ch == 0 or ch == 10:  # Null o newline
                     break
@@ -465,36 +966,6 @@ class IOPorts:
             return "".join(chars)
         return ""
 
-    def _write_string_to_console(self, text: str):
-        """Escribe string a consola usando callback"""
-        if self.output_char_callback:
-            for ch in text:
-                self.output_char_callback(ord(ch))
-        else:
-            self.output_buffer += text
-
-    # === Helpers de archivo ===
-
-    def _read_string_from_file(self, port: int, max_length: int) -> str:
-        """Lee string desde archivo"""
-        try:
-            file_handle = self.open_files.get(port)
-            if file_handle:
-                return file_handle.readline(max_length).rstrip("\n\r")
-        except Exception:
-            pass
-        return ""
-
-    def _write_string_to_file(self, text: str, port: int):
-        """Escribe string a archivo"""
-        try:
-            file_handle = self.open_files.get(port)
-            if file_handle:
-                file_handle.write(text)
-                file_handle.flush()  # Forzar escritura inmediata
-        except Exception:
-            pass
-
     # === Gestión de archivos ===
 
     def open_file(self, port: int, filepath: str, mode: str = "r"):
@@ -504,12 +975,24 @@ class IOPorts:
         Args:
             port: Número de puerto (ej: 0xFFFF0020)
             filepath: Ruta del archivo
-            mode: Modo de apertura ('r', 'w', 'a', etc.)
+            mode: Modo de apertura ('r', 'w', 'a', etc.; 'rb'/'wb' para
+                archivos que solo se usan con DMA)
         """
+        device = self.devices.find(port)
+        if device is not None and not isinstance(device, FilePortDevice):
+            raise RuntimeError(
+                f"No se pudo abrir archivo {filepath}: el puerto 0x{port:X} "
+                f"pertenece al dispositivo '{device.name}'"
+            )
+        self.close_file(port)
         try:
-            self.open_files[port] = open(filepath, mode, encoding="utf-8")
+            if "b" in mode:
+                self.open_files[port] = open(filepath, mode)
+            else:
+                self.open_files[port] = open(filepath, mode, encoding="utf-8")
         except Exception as e:
             raise RuntimeError(f"No se pudo abrir archivo {filepath}: {e}")
+        self.devices.attach(FilePortDevice(port, self.open_files))
 
     def close_file(self, port: int):
         """
@@ -525,6 +1008,7 @@ class IOPorts:
                 pass
             finally:
                 del self.open_files[port]
+                self.devices.detach(self.devices.find(port))
 
     def close_all_files(self):
         """Cierra todos los archivos abiertos"""
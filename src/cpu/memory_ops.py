@@ -2,6 +2,9 @@
 Módulo de operaciones de memoria para la CPU
 """
 
+from typing import Optional
+
+from src.cpu.devices import Device, DeviceBus
 from src.memory.memory import Memory
 
 
@@ -16,6 +19,12 @@ class MemoryOperations:
             memory: Objeto Memory
         """
         self.mem = memory
+        # Fin del espacio que atiende el bus: la RAM y, por encima, las
+        # ventanas de archivos (la CPU lo actualiza en _rebuild_bus)
+        self.limit: int = memory.size
+        # Dispositivos MMIO (la CPU conecta el de IOPorts). Se decodifican
+        # antes que la memoria, pero solo desde devices.low
+        self.devices = DeviceBus()
 
     def read_word(self, address: int) -> int:
         """
@@ -26,14 +35,25 @@ class MemoryOperations:
 
         Returns:
             Valor de 64 bits
-        """
-        if address < 0 or address > self.mem.size - 8:
-            raise ValueError(
-                f"Dirección de lectura fuera de rango: 0x{address:08X} "
-                f"(memoria: 0-0x{self.mem.size:08X})"
-            )
 
-        return self.mem.read_word(address)
+        Raises:
+            ValueError: Si la dirección no es de memoria ni de un dispositivo
+        """
+        if address >= self.devices.low:
+            device = self._device(address)
+            if device is not None:
+                return device.read(address) & 0xFFFFFFFFFFFFFFFF
+        # La memoria valida el rango una sola vez; aquí solo se traduce su
+        # error (el de un bus u observador dentro del rango sale tal cual)
+        try:
+            return self.mem.read_word(address)
+        except ValueError:
+            if 0 <= address <= self.limit - 8:
+                raise
+        raise ValueError(
+            f"Dirección de lectura fuera de rango: 0x{address:08X} "
+            f"(memoria: 0-0x{self.mem.size:08X})"
+        )
 
     def write_word(self, address: int, value: int):
         """
@@ -42,15 +62,25 @@ class MemoryOperations:
         Args:
             address: Dirección de memoria (debe estar alineada a 8 bytes)
             value: Valor de 64 bits a escribir
-        """
-        if address < 0 or address > self.mem.size - 8:
-            raise ValueError(
-                f"Dirección de escritura fuera de rango: 0x{address:08X} "
-                f"(memoria: 0-0x{self.mem.size:08X})"
-            )
 
-        # Asegurar que el valor cabe en 64 bits
-        self.mem.write_word(address, value & 0xFFFFFFFFFFFFFFFF)
+        Raises:
+            ValueError: Si la dirección no es de memoria ni de un dispositivo
+        """
+        if address >= self.devices.low:
+            device = self._device(address)
+            if device is not None:
+                device.write(address, value & 0xFFFFFFFFFFFFFFFF)
+                return
+        try:
+            self.mem.write_word(address, value)
+            return
+        except ValueError:
+            if 0 <= address <= self.limit - 8:
+                raise
+        raise ValueError(
+            f"Dirección de escritura fuera de rango: 0x{address:08X} "
+            f"(memoria: 0-0x{self.mem.size:08X})"
+        )
 
     def read_byte(self, address: int) -> int:
         """
@@ -62,10 +92,16 @@ class MemoryOperations:
         Returns:
             Valor de 8 bits
         """
-        if address < 0 or address >= self.mem.size:
-            raise ValueError(f"Dirección fuera de rango: 0x{address:08X}")
-
-        return self.mem.read_byte(address)
+        if address >= self.devices.low:
+            device = self._device(address)
+            if device is not None:
+                return device.read(address) & 0xFF
+        try:
+            return self.mem.read_byte(address)
+        except ValueError:
+            if 0 <= address < self.limit:
+                raise
+        raise ValueError(f"Dirección fuera de rango: 0x{address:08X}")
 
     def write_byte(self, address: int, value: int):
         """
@@ -75,10 +111,18 @@ class MemoryOperations:
             address: Dirección de memoria
             value: Valor de 8 bits a escribir
         """
-        if address < 0 or address >= self.mem.size:
-            raise ValueError(f"Dirección fuera de rango: 0x{address:08X}")
-
-        self.mem.write_byte(address, value & 0xFF)
+        if address >= self.devices.low:
+            device = self._device(address)
+            if device is not None:
+                device.write(address, value & 0xFF)
+                return
+        try:
+            self.mem.write_byte(address, value & 0xFF)
+            return
+        except ValueError:
+            if 0 <= address < self.limit:
+                raise
+        raise ValueError(f"Dirección fuera de rango: 0x{address:08X}")
 
     def read_half_word(self, address: int) -> int:
         """
@@ -163,3 +207,8 @@ class MemoryOperations:
             True si la dirección es válida
         """
         return 0 <= address <= (self.mem.size - size)
+
+    def _device(self, address: int) -> Optional[Device]:
+        """Dispositivo mapeado que atiende address (None = memoria)"""
+        device = self.devices.find(address)
+        return device if device is not None and device.mapped else None
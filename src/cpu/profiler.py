@@ -0,0 +1,302 @@
+"""
+Perfilador de ejecución por PC y por opcode
+
+Cuenta las instrucciones ejecutadas en arreglos preasignados (array('Q'))
+indexados por dirección de palabra, sin diccionarios en la ruta caliente.
+Tiene dos modos:
+
+- "exact": cuenta cada instrucción.
+- "sampling": cuenta una de cada `sample_every` instrucciones; los informes
+  escalan los conteos para estimar el total.
+
+SourceMap traduce los PCs a líneas del .asm y etiquetas usando el line_no que
+el ensamblador guarda en cada Instruction y su SymbolTable.
+"""
+
+import json
+from array import array
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.isa.isa import Opcodes
+
+
+class SourceMap:
+    """Relaciona direcciones de instrucción con líneas y etiquetas del fuente"""
+
+    def __init__(
+        self,
+        lines: Dict[int, int],
+        symbols: Dict[str, int],
+        source_lines: Optional[List[str]] = None,
+        base_address: int = 0,
+    ):
+        """
+        Args:
+            lines: Dirección (según el ensamblador) -> número de línea
+            symbols: Etiqueta -> dirección (según el ensamblador)
+            source_lines: Texto del fuente, para mostrar la línea en los informes
+            base_address: Desplazamiento con el que se cargó el programa
+        """
+        self.lines = {addr + base_address: line for addr, line in lines.items()}
+        labels = sorted((addr + base_address, name) for name, addr in symbols.items())
+        self._label_addrs = [addr for addr, _ in labels]
+        self._label_names = [name for _, name in labels]
+        self.source_lines = source_lines or []
+
+    @classmethod
+    def from_assembler(
+        cls, assembler, source_code: Optional[str] = None, base_address: int = 0
+    ) -> "SourceMap":
+        """Construye el mapa a partir de un Assembler que ya ensambló el código"""
+        from src.assembler.parser import Instruction
+
+        lines = {
+            item.address: item.line_no
+            for item in assembler.parsed_lines
+            if isinstance(item, Instruction) and item.line_no is not None
+        }
+        source_lines = source_code.splitlines() if source_code is not None else None
+        return cls(
+            lines, assembler.symbol_table.get_all(), source_lines, base_address
+        )
+
+    @classmethod
+    def from_asm_file(cls, path: str, base_address: int = 0) -> "SourceMap":
+        """Ensambla un archivo .asm en memoria y retorna su mapa de fuente"""
+        from src.assembler.assembler import Assembler
+
+        with open(path, "r", encoding="utf-8") as f:
+            source_code = f.read()
+        assembler = Assembler()
+        assembler.assemble(source_code)
+        return cls.from_assembler(assembler, source_code, base_address)
+
+    def line_for(self, pc: int) -> Optional[int]:
+        """Número de línea del fuente para pc (None si no se conoce)"""
+        return self.lines.get(pc)
+
+    def text_for(self, line_no: Optional[int]) -> str:
+        """Texto de la línea line_no del fuente (vacío si no está disponible)"""
+        if line_no is None or not 1 <= line_no <= len(self.source_lines):
+            return ""
+        return self.source_lines[line_no - 1].strip()
+
+    def label_for(self, pc: int) -> Optional[Tuple[str, int]]:
+        """Etiqueta más cercana a pc por debajo y el desplazamiento desde ella"""
+        i = bisect_right(self._label_addrs, pc) - 1
+        if i < 0:
+            return None
+        return self._label_names[i], pc - self._label_addrs[i]
+
+
+class Profiler:
+    """Contadores de ejecución por PC y por opcode"""
+
+    MODES = ("exact", "sampling")
+    # Bytes de memoria cubiertos por los arreglos; por encima (p. ej. memoria
+    # dispersa de 4 GiB) los PCs se cuentan en un diccionario
+    MAX_DENSE_BYTES = 1 << 24
+
+    def __init__(self, memory_size: int, mode: str = "exact", sample_every: int = 997):
+        """
+        Args:
+            memory_size: Tamaño de la memoria (define el tamaño de los arreglos)
+            mode: "exact" o "sampling"
+            sample_every: Intervalo de muestreo en instrucciones (modo sampling).
+                Conviene un primo para no sincronizarse con bucles de largo fijo
+
+        Raises:
+            ValueError: Si el modo o el intervalo no son válidos
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Modo de perfilado desconocido: {mode}")
+        if sample_every < 1:
+            raise ValueError("sample_every debe ser mayor que 0")
+
+        self.mode = mode
+        self.sample_every = sample_every if mode == "sampling" else 1
+        # Instrucciones que faltan para la próxima muestra (lo decrementa la CPU)
+        self.countdown = self.sample_every
+
+        words = (min(memory_size, self.MAX_DENSE_BYTES) + 7) >> 3
+        self._words = words
+        self.pc_counts = array("Q", bytes(8 * words))
+        # (pc & 7) + 1 de la primera dirección vista en cada palabra; las
+        # direcciones con otra alineación en la misma palabra, o fuera de los
+        # arreglos, van a _extra
+        self._phases = bytearray(words)
+        self._extra: Dict[int, int] = {}
+        self.opcode_counts = array("Q", bytes(8 * 256))
+        self.samples = 0
+
+    def sample(self, pc: int, opcode: int):
+        """Registra una ejecución (la CPU la llama cuando countdown llega a 0)"""
+        self.countdown = self.sample_every
+        self.samples += 1
+        self.opcode_counts[opcode] += 1
+
+        i = pc >> 3
+        if i >= self._words:
+            self._extra[pc] = self._extra.get(pc, 0) + 1
+            return
+        tag = (pc & 7) + 1
+        phase = self._phases[i]
+        if phase == tag:
+            self.pc_counts[i] += 1
+        elif phase == 0:
+            self._phases[i] = tag
+            self.pc_counts[i] += 1
+        else:
+            self._extra[pc] = self._extra.get(pc, 0) + 1
+
+    def reset(self):
+        """Pone todos los contadores en cero"""
+        self.pc_counts = array("Q", bytes(8 * len(self.pc_counts)))
+        self._phases = bytearray(len(self._phases))
+        self._extra.clear()
+        self.opcode_counts = array("Q", bytes(8 * 256))
+        self.samples = 0
+        self.countdown = self.sample_every
+
+    # === Consultas ===
+
+    def pc_items(self) -> List[Tuple[int, int]]:
+        """Lista (pc, muestras) de todos los PCs ejecutados"""
+        items = [
+            (i * 8 + self._phases[i] - 1, count)
+            for i, count in enumerate(self.pc_counts)
+            if count
+        ]
+        items.extend(self._extra.items())
+        return items
+
+    def estimated(self, count: int) -> int:
+        """Convierte muestras en una estimación de instrucciones ejecutadas"""
+        return count * self.sample_every
+
+    # === Informes ===
+
+    def to_dict(
+        self, source_map: Optional[SourceMap] = None, top: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Informe estructurado (base del informe JSON)
+
+        Args:
+            source_map: Mapa de fuente para atribuir PCs a líneas y etiquetas
+            top: Máximo de entradas por sección (None = todas)
+        """
+        total = self.samples or 1
+        by_pc = []
+        by_line: Dict[int, int] = {}
+        by_label: Dict[str, int] = {}
+
+        for pc, count in sorted(self.pc_items(), key=lambda item: -item[1]):
+            entry = {
+                "pc": pc,
+                "count": self.estimated(count),
+                "percent": round(100.0 * count / total, 3),
+            }
+            if source_map is not None:
+                line_no = source_map.line_for(pc)
+                label = source_map.label_for(pc)
+                entry["line"] = line_no
+                entry["source"] = source_map.text_for(line_no)
+                entry["label"] = f"{label[0]}+{label[1]}" if label else None
+                if line_no is not None:
+                    by_line[line_no] = by_line.get(line_no, 0) + count
+                if label is not None:
+                    by_label[label[0]] = by_label.get(label[0], 0) + count
+            by_pc.append(entry)
+
+        opcodes = sorted(
+            (
+                (self._opcode_name(op), count)
+                for op, count in enumerate(self.opcode_counts)
+                if count
+            ),
+            key=lambda item: -item[1],
+        )
+
+        report = {
+            "mode": self.mode,
+            "sample_every": self.sample_every,
+            "samples": self.samples,
+            "estimated_instructions": self.estimated(self.samples),
+            "by_pc": by_pc[:top],
+            "by_opcode": [
+                {
+                    "opcode": name,
+                    "count": self.estimated(count),
+                    "percent": round(100.0 * count / total, 3),
+                }
+                for name, count in opcodes[:top]
+            ],
+        }
+        if source_map is not None:
+            report["by_line"] = [
+                {
+                    "line": line_no,
+                    "source": source_map.text_for(line_no),
+                    "count": self.estimated(count),
+                    "percent": round(100.0 * count / total, 3),
+                }
+                for line_no, count in sorted(by_line.items(), key=lambda i: -i[1])
+            ][:top]
+            report["by_label"] = [
+                {
+                    "label": name,
+                    "count": self.estimated(count),
+                    "percent": round(100.0 * count / total, 3),
+                }
+                for name, count in sorted(by_label.items(), key=lambda i: -i[1])
+            ][:top]
+        return report
+
+    def report_json(
+        self, source_map: Optional[SourceMap] = None, top: Optional[int] = None
+    ) -> str:
+        """Informe en JSON"""
+        return json.dumps(self.to_dict(source_map, top), indent=2, ensure_ascii=False)
+
+    def report_text(self, source_map: Optional[SourceMap] = None, top: int = 20) -> str:
+        """Informe de texto ordenado de mayor a menor"""
+        data = self.to_dict(source_map, top)
+        title = "exacto" if self.mode == "exact" else f"muestreo 1/{self.sample_every}"
+        out = [
+            f"Perfil ({title}): {data['estimated_instructions']} instrucciones",
+            "",
+            f"{'PC':<12}{'Conteo':>12}{'%':>8}  Origen",
+        ]
+        for entry in data["by_pc"]:
+            origin = ""
+            if entry.get("line") is not None:
+                origin = f"línea {entry['line']}: {entry['source']}"
+            if entry.get("label"):
+                origin = f"[{entry['label']}] {origin}"
+            out.append(
+                f"0x{entry['pc']:08X}  {entry['count']:>12}{entry['percent']:>8.2f}  "
+                f"{origin}"
+            )
+
+        if "by_label" in data:
+            out += ["", f"{'Etiqueta':<24}{'Conteo':>12}{'%':>8}"]
+            for entry in data["by_label"]:
+                out.append(
+                    f"{entry['label']:<24}{entry['count']:>12}{entry['percent']:>8.2f}"
+                )
+
+        out += ["", f"{'Opcode':<12}{'Conteo':>12}{'%':>8}"]
+        for entry in data["by_opcode"]:
+            out.append(
+                f"{entry['opcode']:<12}{entry['count']:>12}{entry['percent']:>8.2f}"
+            )
+        return "\n".join(out)
+
+    @staticmethod
+    def _opcode_name(opcode: int) -> str:
+        try:
+            return Opcodes(opcode).name
+        except ValueError:
+            return f"0x{opcode:02X}"
@@ -1,5 +1,10 @@
 """
 Módulo de gestión de registros de propósito general
+
+La API pública (read/write/[]) valida el número de registro y trunca a 64
+bits para la GUI y la CLI. Los ejecutores usan la lista `values` sin
+validar: el decodificador extrae campos de 4 bits (siempre 0-15) y los
+resultados que escriben ya están en el rango de 64 bits sin signo.
 """
 
 from typing import List
@@ -10,8 +15,19 @@ class RegisterFile:
 
     def __init__(self):
         """Inicializa 16 registros de 64 bits"""
+        # La lista no se reemplaza nunca (los ejecutores guardan la referencia)
         self._registers: List[int] = [0] * 16
 
+    @property
+    def values(self) -> List[int]:
+        """
+        Lista interna R0-R15 para acceso sin validar (ruta rápida)
+
+        Quien escribe en ella debe garantizar índices 0-15 y valores en
+        [0, 2**64)
+        """
+        return self._registers
+
     def read(self, reg_num: int) -> int:
         """
         Lee el valor de un registro
@@ -52,7 +68,7 @@ class RegisterFile:
 
     def reset(self):
         """Reinicia todos los registros a 0"""
-        self._registers = [0] * 16
+        self._registers[:] = [0] * 16
 
     def __getitem__(self, reg_num: int) -> int:
         """Permite acceso con notación de índice: registers[5]"""
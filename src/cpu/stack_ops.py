@@ -2,6 +2,8 @@
 Módulo de operaciones de pila para la CPU
 """
 
+from typing import List
+
 from src.memory.memory import Memory
 
 
@@ -14,11 +16,15 @@ class StackOperations:
 
         Args:
             memory: Objeto Memory
-            memory_size: Tamaño total de la memoria
+            memory_size: Tope de la pila (el tamaño de la memoria, salvo que
+                la memoria cubra la ventana MMIO)
         """
         self.mem = memory
         self.memory_size = memory_size
         self.stack_pointer: int = memory_size  # Comienza en el tope (crece hacia abajo)
+        # Menor dirección que puede ocupar la pila (la fija la CPU con el
+        # registro de regiones: el final del programa más alto)
+        self.stack_limit: int = 0
 
     def push(self, value: int):
         """
@@ -30,9 +36,15 @@ class StackOperations:
             value: Valor de 64 bits a empujar
 
         Raises:
-            RuntimeError: Si hay stack overflow
-        """
-        if self.stack_pointer < 8:
+            RuntimeError: Si hay stack overflow (la pila alcanzaría stack_limit)
+        """
+        if self.stack_pointer - 8 < self.stack_limit:
+            if self.stack_limit:
+                raise RuntimeError(
+                    f"Stack overflow: SP=0x{self.stack_pointer:08X}, la pila "
+                    f"invadiría la región ocupada que termina en "
+                    f"0x{self.stack_limit - 1:08X}"
+                )
             raise RuntimeError(
                 f"Stack overflow: SP=0x{self.stack_pointer:08X}, no hay espacio"
             )
@@ -87,6 +99,15 @@ class StackOperations:
 
         return self.mem.read_word(address)
 
+    def contents(self) -> List[int]:
+        """
+        Lee de una vez todas las palabras de la pila
+
+        Returns:
+            Palabras desde el tope (SP) hasta el fondo de la pila
+        """
+        return self.mem.read_words(self.stack_pointer, self.get_depth())
+
     def reset(self):
         """Reinicia el stack pointer al tope de la memoria"""
         self.stack_pointer = self.memory_size
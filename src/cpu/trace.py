@@ -0,0 +1,237 @@
+"""
+Grabador de trazas de ejecución en formato binario comprimido
+
+Cada instrucción ejecutada produce un registro de tamaño fijo:
+
+    ciclo | PC | IR | valor de Rd | dirección de memoria   (uint64 cada uno)
+    flags                                                  (uint8)
+
+Los registros se empaquetan en un búfer preasignado y solo al llenarse se
+comprimen (zlib o lzma) y se escriben al archivo .trace, de modo que no hay
+E/S por instrucción. TraceReader recorre el archivo de forma perezosa.
+
+Costo real: el grabador aislado sostiene del orden de 1.5M registros/s (zlib),
+pero grabar desde la CPU suma por instrucción la dirección de memoria, los
+flags materializados (anula la evaluación perezosa de la ALU) y la llamada a
+record. En tests/benchmark.py trace, run_fast baja de ~0.6-1M a ~0.25-0.3M
+instr/s con la traza activa; run() con traza usa siempre el intérprete, aunque
+se pida engine="blocks".
+"""
+
+import lzma
+import struct
+import zlib
+from collections import namedtuple
+from typing import BinaryIO, Iterator, Optional
+
+from src.isa.isa import Opcodes
+
+MAGIC = b"E64TRC"
+VERSION = 1
+
+# Cabecera: magic, versión, compresión, tamaño de registro
+HEADER = struct.Struct("<6sBBH")
+RECORD = struct.Struct("<QQQQQB")
+
+COMPRESSION_IDS = {"none": 0, "zlib": 1, "lzma": 2}
+
+# Dirección de memoria para instrucciones que no acceden a memoria
+NO_ADDRESS = 0xFFFFFFFFFFFFFFFF
+MASK64 = 0xFFFFFFFFFFFFFFFF
+
+TraceRecord = namedtuple(
+    "TraceRecord", ["cycle", "pc", "ir", "rd_value", "address", "flags"]
+)
+
+_IO_OPCODES = frozenset({Opcodes.IN, Opcodes.OUT, Opcodes.INS, Opcodes.OUTS})
+_PUSH_OPCODES = frozenset({Opcodes.PUSH, Opcodes.CALL})
+_POP_OPCODES = frozenset({Opcodes.POP, Opcodes.RET})
+
+# Instrucciones con dirección de memoria (las demás llevan NO_ADDRESS)
+MEMORY_OPCODES = (
+    frozenset({Opcodes.LD, Opcodes.ST}) | _IO_OPCODES | _PUSH_OPCODES | _POP_OPCODES
+)
+
+
+def memory_address(decoded, registers, stack_pointer: int) -> int:
+    """
+    Dirección de memoria que tocará una instrucción (calculada antes de ejecutarla)
+
+    Args:
+        decoded: Instrucción decodificada
+        registers: Banco de registros (indexable)
+        stack_pointer: Valor actual del SP
+
+    Returns:
+        Dirección en bytes, o NO_ADDRESS si la instrucción no accede a memoria
+    """
+    opcode = decoded["opcode"]
+    if opcode == Opcodes.LD or opcode == Opcodes.ST:
+        imm32 = decoded["imm32"]
+        if decoded["func"] == 0:
+            return imm32
+        offset = imm32 | 0xFFFFFFFF00000000 if imm32 & 0x80000000 else imm32
+        return (registers[decoded["rs1"]] + offset) & MASK64
+    if opcode in _PUSH_OPCODES:
+        return (stack_pointer - 8) & MASK64
+    if opcode in _POP_OPCODES:
+        return stack_pointer
+    if opcode in _IO_OPCODES:
+        return decoded["imm32"]
+    return NO_ADDRESS
+
+
+def _make_compressor(compression: str, level: Optional[int]):
+    if compression == "zlib":
+        return zlib.compressobj(1 if level is None else level)
+    if compression == "lzma":
+        return lzma.LZMACompressor(preset=0 if level is None else level)
+    return None
+
+
+def _make_decompressor(compression_id: int):
+    if compression_id == COMPRESSION_IDS["zlib"]:
+        return zlib.decompressobj()
+    if compression_id == COMPRESSION_IDS["lzma"]:
+        return lzma.LZMADecompressor()
+    return None
+
+
+class TraceRecorder:
+    """Escribe registros de traza en un búfer y lo vuelca comprimido por bloques"""
+
+    def __init__(
+        self,
+        path: str,
+        compression: str = "zlib",
+        buffer_records: int = 65536,
+        level: Optional[int] = None,
+    ):
+        """
+        Args:
+            path: Archivo .trace de salida
+            compression: "zlib", "lzma" o "none"
+            buffer_records: Registros que caben en el búfer antes de volcarlo
+            level: Nivel de compresión (None = el más rápido: zlib 1, lzma 0)
+
+        Raises:
+            ValueError: Si la compresión no existe o el búfer es vacío
+        """
+        if compression not in COMPRESSION_IDS:
+            raise ValueError(f"Compresión de traza desconocida: {compression}")
+        if buffer_records < 1:
+            raise ValueError("buffer_records debe ser mayor que 0")
+
+        self.path = path
+        self.compression = compression
+        self.records_written = 0
+        self._buffer = bytearray(RECORD.size * buffer_records)
+        self._view = memoryview(self._buffer)
+        self._capacity = len(self._buffer)
+        self._offset = 0
+        self._pack_into = RECORD.pack_into
+        self._compressor = _make_compressor(compression, level)
+        self._file: Optional[BinaryIO] = open(path, "wb")
+        self._file.write(
+            HEADER.pack(MAGIC, VERSION, COMPRESSION_IDS[compression], RECORD.size)
+        )
+
+    def record(
+        self, cycle: int, pc: int, ir: int, rd_value: int, address: int, flags: int
+    ):
+        """Agrega un registro al búfer (vuelca al archivo solo si se llena)"""
+        offset = self._offset
+        self._pack_into(
+            self._buffer, offset, cycle, pc, ir, rd_value, address, flags & 0xFF
+        )
+        offset += RECORD.size
+        if offset == self._capacity:
+            self._write_chunk(offset)
+            offset = 0
+        self._offset = offset
+
+    def flush(self):
+        """Vuelca los registros pendientes (sin cerrar el flujo comprimido)"""
+        if self._offset:
+            self._write_chunk(self._offset)
+            self._offset = 0
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        """Vuelca lo pendiente, cierra el flujo comprimido y el archivo"""
+        if self._file is None:
+            return
+        if self._offset:
+            self._write_chunk(self._offset)
+            self._offset = 0
+        if self._compressor is not None:
+            self._file.write(self._compressor.flush())
+        self._file.close()
+        self._file = None
+
+    def _write_chunk(self, size: int):
+        chunk = self._view[:size]
+        if self._compressor is not None:
+            data = self._compressor.compress(chunk)
+            if data:
+                self._file.write(data)
+        else:
+            self._file.write(chunk)
+        self.records_written += size // RECORD.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class TraceReader:
+    """Lee un archivo .trace registro a registro sin cargarlo completo"""
+
+    def __init__(self, path: str, read_size: int = 1 << 16):
+        """
+        Args:
+            path: Archivo .trace
+            read_size: Bytes comprimidos que se leen por vez
+
+        Raises:
+            ValueError: Si el archivo no es una traza válida
+        """
+        self.path = path
+        self.read_size = read_size
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ValueError(f"Archivo de traza incompleto: {path}")
+
+        magic, version, compression_id, record_size = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"No es un archivo de traza válido: {path}")
+        if record_size != RECORD.size:
+            raise ValueError(f"Tamaño de registro no soportado: {record_size}")
+        if compression_id not in COMPRESSION_IDS.values():
+            raise ValueError(f"Compresión de traza desconocida: {compression_id}")
+
+        self.compression_id = compression_id
+
+    def __iter__(self) -> Iterator[TraceRecord]:
+        decompressor = _make_decompressor(self.compression_id)
+        pending = b""
+        with open(self.path, "rb") as f:
+            f.seek(HEADER.size)
+            while True:
+                data = f.read(self.read_size)
+                if not data:
+                    break
+                if decompressor is not None:
+                    data = decompressor.decompress(data)
+                pending += data
+                usable = len(pending) - len(pending) % RECORD.size
+                for fields in RECORD.iter_unpack(pending[:usable]):
+                    yield TraceRecord._make(fields)
+                pending = pending[usable:]
+
+        if pending:
+            raise ValueError("Traza truncada: registro incompleto al final")
@@ -0,0 +1,417 @@
+"""
+Simulador de jerarquía de caché (L1I / L1D / L2)
+
+Modela solo aciertos y fallos: no guarda datos, así que no cambia el
+resultado de los programas. Cada nivel es asociativo por conjuntos, con
+reemplazo LRU o PLRU (árbol de pseudo-LRU). Las escrituras asignan línea
+(write-allocate) y se cuentan como accesos; no se modelan write-backs.
+
+La CPU lo conecta con CPU.enable_cache(): las búsquedas de instrucción se
+informan desde el ciclo de ejecución y los accesos de datos (LD/ST,
+PUSH/POP, CALL/RET) pasan por CachedBus, un Bus que envuelve a la memoria.
+Sin simulador la CPU usa la memoria directamente.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.memory.memory import Bus, Memory
+
+POLICIES = ("lru", "plru")
+
+
+def _is_power_of_two(value: int) -> bool:
+    return value > 0 and value & (value - 1) == 0
+
+
+@dataclass
+class CacheConfig:
+    """Geometría de un nivel de caché"""
+
+    size: int  # Capacidad en bytes
+    associativity: int = 2  # Vías por conjunto
+    line_size: int = 64  # Bytes por línea
+    policy: str = "lru"  # "lru" o "plru"
+
+    def validate(self):
+        """
+        Raises:
+            ValueError: Si la geometría no es válida
+        """
+        if self.policy not in POLICIES:
+            raise ValueError(f"Política de reemplazo desconocida: {self.policy}")
+        if not _is_power_of_two(self.line_size):
+            raise ValueError("line_size debe ser potencia de 2")
+        if not _is_power_of_two(self.associativity):
+            raise ValueError("associativity debe ser potencia de 2")
+        sets = self.size // (self.line_size * self.associativity)
+        if sets < 1 or sets * self.line_size * self.associativity != self.size:
+            raise ValueError("size debe ser múltiplo de line_size * associativity")
+        if not _is_power_of_two(sets):
+            raise ValueError("La cantidad de conjuntos debe ser potencia de 2")
+
+
+class CacheLevel:
+    """Un nivel de caché asociativo por conjuntos"""
+
+    def __init__(self, name: str, config: CacheConfig, next_level=None):
+        """
+        Args:
+            name: Nombre para los informes (L1I, L1D, L2)
+            config: Geometría y política
+            next_level: Nivel al que se consulta en caso de fallo
+        """
+        config.validate()
+        self.name = name
+        self.config = config
+        self.next_level = next_level
+        self.num_sets = config.size // (config.line_size * config.associativity)
+        self._ways = config.associativity
+        self._line_shift = config.line_size.bit_length() - 1
+        self._set_bits = self.num_sets.bit_length() - 1
+        self._set_mask = self.num_sets - 1
+        self._levels = self._ways.bit_length() - 1
+        self.hits = 0
+        self.misses = 0
+        self.reset()
+
+    def reset(self):
+        """Invalida todas las líneas y pone los contadores en cero"""
+        if self.config.policy == "lru":
+            # Etiquetas por conjunto, de la menos a la más recientemente usada
+            self._sets: List[List[int]] = [[] for _ in range(self.num_sets)]
+        else:
+            self._tags: List[List[Optional[int]]] = [
+                [None] * self._ways for _ in range(self.num_sets)
+            ]
+            self._bits = [0] * self.num_sets
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def accesses(self) -> int:
+        return self.hits + self.misses
+
+    def access(self, addr: int) -> bool:
+        """Accede a la línea de addr; en caso de fallo consulta el siguiente nivel"""
+        line = addr >> self._line_shift
+        index = line & self._set_mask
+        tag = line >> self._set_bits
+        if self.config.policy == "lru":
+            hit = self._access_lru(index, tag)
+        else:
+            hit = self._access_plru(index, tag)
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+            if self.next_level is not None:
+                self.next_level.access(addr)
+        return hit
+
+    def _access_lru(self, index: int, tag: int) -> bool:
+        ways = self._sets[index]
+        if ways and ways[-1] == tag:
+            return True
+        if tag in ways:
+            ways.remove(tag)
+            ways.append(tag)
+            return True
+        if len(ways) >= self._ways:
+            del ways[0]
+        ways.append(tag)
+        return False
+
+    def _access_plru(self, index: int, tag: int) -> bool:
+        tags = self._tags[index]
+        try:
+            way = tags.index(tag)
+            hit = True
+        except ValueError:
+            hit = False
+            try:
+                way = tags.index(None)
+            except ValueError:
+                way = self._plru_victim(self._bits[index])
+            tags[way] = tag
+        self._bits[index] = self._plru_touch(self._bits[index], way)
+        return hit
+
+    def _plru_touch(self, bits: int, way: int) -> int:
+        # Nodos del árbol numerados desde 1; cada bit apunta a la mitad
+        # que se reemplazará (0 = izquierda), se orienta lejos de way
+        node = 1
+        for level in range(self._levels - 1, -1, -1):
+            branch = (way >> level) & 1
+            if branch:
+                bits &= ~(1 << node)
+            else:
+                bits |= 1 << node
+            node = node * 2 + branch
+        return bits
+
+    def _plru_victim(self, bits: int) -> int:
+        node = 1
+        way = 0
+        for _ in range(self._levels):
+            branch = (bits >> node) & 1
+            way = way * 2 + branch
+            node = node * 2 + branch
+        return way
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores del nivel"""
+        return {
+            "level": self.name,
+            "size": self.config.size,
+            "associativity": self.config.associativity,
+            "line_size": self.config.line_size,
+            "policy": self.config.policy,
+            "accesses": self.accesses,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / self.accesses, 4) if self.accesses else 0.0,
+        }
+
+
+class CacheHierarchy:
+    """L1I y L1D privadas con una L2 unificada opcional"""
+
+    def __init__(
+        self,
+        l1i: Optional[CacheConfig] = None,
+        l1d: Optional[CacheConfig] = None,
+        l2: Optional[CacheConfig] = None,
+        use_l2: bool = True,
+        regions: Optional[Sequence[Tuple[int, int, str]]] = None,
+    ):
+        """
+        Args:
+            l1i: Caché de instrucciones (default 4 KiB, 2 vías, líneas de 64 B)
+            l1d: Caché de datos (default 4 KiB, 2 vías, líneas de 64 B)
+            l2: Caché unificada (default 32 KiB, 8 vías, líneas de 64 B)
+            use_l2: False para simular solo el nivel 1
+            regions: Tramos (inicio, fin inclusive, nombre) para agrupar los
+                accesos de datos; sin ellos se agrupa por páginas de 4 KiB
+        """
+        l2_config = l2 or CacheConfig(32 * 1024, 8, 64)
+        self.l2 = CacheLevel("L2", l2_config) if use_l2 else None
+        self.l1i = CacheLevel("L1I", l1i or CacheConfig(4 * 1024, 2, 64), self.l2)
+        self.l1d = CacheLevel("L1D", l1d or CacheConfig(4 * 1024, 2, 64), self.l2)
+
+        self.current_pc = 0
+        # pc -> [accesos, fallos L1D, fallos L2] de datos
+        self.data_by_pc: Dict[int, List[int]] = {}
+        # pc -> fallos de L1I al buscar esa instrucción
+        self.fetch_misses_by_pc: Dict[int, int] = {}
+        # región -> [accesos, fallos L1D]
+        self.by_region: Dict[str, List[int]] = {}
+        self.reads = 0
+        self.writes = 0
+        self.set_regions(regions)
+
+    def set_regions(self, regions: Optional[Sequence[Tuple[int, int, str]]]):
+        """Define los tramos de datos usados en el informe por región"""
+        ordered = sorted(regions or [])
+        self._region_starts = [start for start, _, _ in ordered]
+        self._regions = ordered
+
+    def reset(self):
+        """Vacía las cachés y los contadores"""
+        for level in self.levels():
+            level.reset()
+        self.data_by_pc.clear()
+        self.fetch_misses_by_pc.clear()
+        self.by_region.clear()
+        self.reads = 0
+        self.writes = 0
+
+    def levels(self) -> List[CacheLevel]:
+        """Niveles en orden L1I, L1D, L2"""
+        return [lvl for lvl in (self.l1i, self.l1d, self.l2) if lvl is not None]
+
+    # === Accesos ===
+
+    def fetch(self, pc: int):
+        """Búsqueda de la instrucción en pc (la informa la CPU)"""
+        self.current_pc = pc
+        if not self.l1i.access(pc):
+            self.fetch_misses_by_pc[pc] = self.fetch_misses_by_pc.get(pc, 0) + 1
+
+    def data_access(self, addr: int, size: int, write: bool):
+        """Acceso de datos de size bytes (se divide si cruza líneas)"""
+        if write:
+            self.writes += 1
+        else:
+            self.reads += 1
+        l2 = self.l2
+        l2_misses = l2.misses if l2 is not None else 0
+
+        hit = self.l1d.access(addr)
+        last = addr + size - 1
+        line_shift = self.l1d._line_shift
+        if last >> line_shift != addr >> line_shift:
+            hit = self.l1d.access(last) and hit
+
+        stats = self.data_by_pc.get(self.current_pc)
+        if stats is None:
+            stats = self.data_by_pc[self.current_pc] = [0, 0, 0]
+        stats[0] += 1
+        if not hit:
+            stats[1] += 1
+            if l2 is not None:
+                stats[2] += l2.misses - l2_misses
+
+        region = self._region_for(addr)
+        counts = self.by_region.get(region)
+        if counts is None:
+            counts = self.by_region[region] = [0, 0]
+        counts[0] += 1
+        if not hit:
+            counts[1] += 1
+
+    def _region_for(self, addr: int) -> str:
+        i = bisect_right(self._region_starts, addr) - 1
+        if i >= 0:
+            start, end, name = self._regions[i]
+            if addr <= end:
+                return name
+        return f"página 0x{addr & ~0xFFF:08X}"
+
+    # === Informes ===
+
+    def to_dict(self, top: Optional[int] = 20) -> Dict[str, Any]:
+        """Informe estructurado"""
+        by_pc = sorted(self.data_by_pc.items(), key=lambda item: -item[1][1])
+        fetch = sorted(self.fetch_misses_by_pc.items(), key=lambda item: -item[1])
+        regions = sorted(self.by_region.items(), key=lambda item: -item[1][0])
+        return {
+            "levels": [level.stats() for level in self.levels()],
+            "reads": self.reads,
+            "writes": self.writes,
+            "data_by_pc": [
+                {"pc": pc, "accesses": a, "l1_misses": m1, "l2_misses": m2}
+                for pc, (a, m1, m2) in by_pc[:top]
+            ],
+            "fetch_misses_by_pc": [
+                {"pc": pc, "misses": misses} for pc, misses in fetch[:top]
+            ],
+            "by_region": [
+                {
+                    "region": name,
+                    "accesses": accesses,
+                    "l1_misses": misses,
+                    "miss_rate": round(misses / accesses, 4) if accesses else 0.0,
+                }
+                for name, (accesses, misses) in regions[:top]
+            ],
+        }
+
+    def report_text(self, top: int = 10) -> str:
+        """Informe de texto"""
+        data = self.to_dict(top)
+        out = [f"{'Nivel':<6}{'Accesos':>12}{'Aciertos':>12}{'Fallos':>12}{'Tasa':>9}"]
+        for lvl in data["levels"]:
+            out.append(
+                f"{lvl['level']:<6}{lvl['accesses']:>12}{lvl['hits']:>12}"
+                f"{lvl['misses']:>12}{100 * lvl['hit_rate']:>8.2f}%"
+            )
+        out += ["", f"Lecturas: {data['reads']}  Escrituras: {data['writes']}"]
+
+        out += [
+            "",
+            f"{'PC (datos)':<12}{'Accesos':>12}{'Fallos L1D':>12}{'Fallos L2':>12}",
+        ]
+        for entry in data["data_by_pc"]:
+            out.append(
+                f"0x{entry['pc']:08X}  {entry['accesses']:>12}"
+                f"{entry['l1_misses']:>12}{entry['l2_misses']:>12}"
+            )
+
+        out += ["", f"{'Región':<28}{'Accesos':>12}{'Fallos L1D':>12}"]
+        for entry in data["by_region"]:
+            out.append(
+                f"{entry['region']:<28}{entry['accesses']:>12}{entry['l1_misses']:>12}"
+            )
+        return "\n".join(out)
+
+
+class CachedBus(Bus):
+    """
+    Bus que informa a la jerarquía de caché cada acceso de datos
+
+    Ofrece la misma API que Memory (lo que no intercepta se delega), de modo
+    que puede reemplazar a la memoria en MemoryOperations y StackOperations.
+    """
+
+    def __init__(self, memory: Memory, hierarchy: CacheHierarchy):
+        super().__init__(memory)
+        self.hierarchy = hierarchy
+
+    def read_word(self, addr: int) -> int:
+        value = self.memory.read_word(addr)
+        self.hierarchy.data_access(addr, 8, False)
+        return value
+
+    def write_word(self, addr: int, value: int):
+        self.memory.write_word(addr, value)
+        self.hierarchy.data_access(addr, 8, True)
+
+    def read_byte(self, addr: int) -> int:
+        value = self.memory.read_byte(addr)
+        self.hierarchy.data_access(addr, 1, False)
+        return value
+
+    def write_byte(self, addr: int, value: int):
+        self.memory.write_byte(addr, value)
+        self.hierarchy.data_access(addr, 1, True)
+
+    def __getattr__(self, name: str):
+        return getattr(self.memory, name)
+
+
+def parse_cache_spec(spec: str) -> Dict[str, Any]:
+    """
+    Convierte una especificación de texto en argumentos de CacheHierarchy
+
+    Formato: "l1i=4K/2/64,l1d=4K/2/64,l2=32K/8/64,policy=plru" (tamaño/vías/
+    línea; K y M como sufijos). "l2=off" desactiva L2. Lo omitido usa los
+    valores por defecto.
+
+    Raises:
+        ValueError: Si la especificación no es válida
+    """
+    levels: Dict[str, Tuple[int, int, int]] = {}
+    policy = "lru"
+    use_l2 = True
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        key, _, value = item.partition("=")
+        key = key.strip().lower()
+        value = value.strip().lower()
+        if key == "policy":
+            policy = value
+        elif key == "l2" and value == "off":
+            use_l2 = False
+        elif key in ("l1i", "l1d", "l2"):
+            parts = value.split("/")
+            if len(parts) != 3:
+                raise ValueError(f"Nivel de caché inválido: {item}")
+            levels[key] = (_parse_size(parts[0]), int(parts[1]), int(parts[2]))
+        else:
+            raise ValueError(f"Opción de caché desconocida: {key}")
+
+    defaults = {"l1i": (4096, 2, 64), "l1d": (4096, 2, 64), "l2": (32768, 8, 64)}
+    kwargs: Dict[str, Any] = {"use_l2": use_l2}
+    for key, (size, ways, line) in {**defaults, **levels}.items():
+        config = CacheConfig(size, ways, line, policy)
+        config.validate()
+        kwargs[key] = config
+    return kwargs
+
+
+def _parse_size(text: str) -> int:
+    units = {"k": 1024, "m": 1024 * 1024}
+    if text and text[-1] in units:
+        return int(text[:-1], 0) * units[text[-1]]
+    return int(text, 0)
@@ -0,0 +1,165 @@
+"""
+Ventanas de archivos del host mapeadas en el espacio de direcciones
+
+Una FileWindow mapea un archivo con mmap (reutiliza Memory con backing_file)
+en [base, base + size), por encima de la RAM del invitado. FileWindowBus se
+coloca en la cadena de buses de la CPU: las instrucciones LD/ST que caen
+dentro de una ventana leen y escriben el archivo sin copias; el resto de los
+accesos va a la RAM sin cambios.
+
+Así un programa puede ordenar o recorrer un conjunto de datos de cientos de
+megabytes sin cargarlo por la consola. Las ventanas no forman parte de las
+instantáneas de la CPU: el archivo es el estado.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+from src.memory.memory import Bus, Memory
+
+
+class FileWindow:
+    """Archivo del host visible en [base, end) del espacio del invitado"""
+
+    def __init__(
+        self,
+        path: str,
+        base: int = 0,
+        size: Optional[int] = None,
+        read_only: bool = False,
+    ):
+        """
+        Args:
+            path: Archivo a mapear (se crea o se extiende hasta size)
+            base: Primera dirección del invitado de la ventana
+            size: Bytes mapeados (None = tamaño del archivo existente)
+            read_only: Las escrituras del invitado fallan
+        """
+        self.path = path
+        self.read_only = read_only
+        self.memory = Memory(size_bytes=size, backing_file=path, read_only=read_only)
+        self.size = self.memory.size
+        self.base = base
+
+    @property
+    def end(self) -> int:
+        """Primera dirección fuera de la ventana"""
+        return self.base + self.size
+
+    def flush(self):
+        """Vuelca al archivo las páginas modificadas"""
+        self.memory.flush()
+
+    def close(self):
+        """Vuelca y desmapea el archivo"""
+        self.memory.close()
+
+    def __str__(self) -> str:
+        mode = "solo lectura" if self.read_only else "lectura/escritura"
+        return f"{self.path} -> 0x{self.base:08X}-0x{self.end - 1:08X} ({mode})"
+
+
+class FileWindowBus(Bus):
+    """
+    Bus que envía a su ventana los accesos dentro de una FileWindow
+
+    Como CachedBus y WatchBus, ofrece la API de Memory y delega el resto. Las
+    ventanas están por encima de la RAM, así que los accesos a la RAM solo
+    pagan una comparación.
+    """
+
+    def __init__(self, memory, windows: Sequence[FileWindow]):
+        super().__init__(memory)
+        self.windows: List[FileWindow] = sorted(windows, key=lambda w: w.base)
+        self._low = self.windows[0].base if self.windows else 1 << 64
+
+    def _window(self, addr: int, size: int) -> Optional[FileWindow]:
+        for window in self.windows:
+            if window.base <= addr and addr + size <= window.end:
+                return window
+        return None
+
+    def _writable(self, addr: int, size: int) -> Optional[FileWindow]:
+        window = self._window(addr, size)
+        if window is not None and window.read_only:
+            raise RuntimeError(
+                f"Escritura en la ventana de solo lectura {window.path} "
+                f"(0x{addr:08X})"
+            )
+        return window
+
+    def read_word(self, addr: int) -> int:
+        if addr >= self._low:
+            window = self._window(addr, 8)
+            if window is not None:
+                return window.memory.read_word(addr - window.base)
+        return self.memory.read_word(addr)
+
+    def write_word(self, addr: int, value: int):
+        if addr >= self._low:
+            window = self._writable(addr, 8)
+            if window is not None:
+                window.memory.write_word(addr - window.base, value)
+                return
+        self.memory.write_word(addr, value)
+
+    def read_byte(self, addr: int) -> int:
+        if addr >= self._low:
+            window = self._window(addr, 1)
+            if window is not None:
+                return window.memory.read_byte(addr - window.base)
+        return self.memory.read_byte(addr)
+
+    def write_byte(self, addr: int, value: int):
+        if addr >= self._low:
+            window = self._writable(addr, 1)
+            if window is not None:
+                window.memory.write_byte(addr - window.base, value)
+                return
+        self.memory.write_byte(addr, value)
+
+    def read_bytes(self, addr: int, size: int) -> bytes:
+        if addr >= self._low:
+            window = self._window(addr, size)
+            if window is not None:
+                return window.memory.read_bytes(addr - window.base, size)
+        return self.memory.read_bytes(addr, size)
+
+    def write_bytes(self, addr: int, data: bytes):
+        if addr >= self._low:
+            window = self._writable(addr, len(data))
+            if window is not None:
+                window.memory.write_bytes(addr - window.base, data)
+                return
+        self.memory.write_bytes(addr, data)
+
+    def __getattr__(self, name: str):
+        return getattr(self.memory, name)
+
+
+def parse_window_spec(spec: str) -> Tuple[str, Optional[int], bool]:
+    """
+    Convierte una especificación de texto en argumentos de CPU.map_file
+
+    Formato: "ruta[@base][,ro]" (p. ej. "datos.bin@0x20000000,ro"). Sin base
+    la CPU elige el primer hueco por encima de la RAM.
+
+    Returns:
+        (ruta, base o None, solo lectura)
+
+    Raises:
+        ValueError: Si la especificación no es válida
+    """
+    text = spec.strip()
+    read_only = False
+    if text.lower().endswith(",ro"):
+        text, read_only = text[:-3], True
+    path, sep, base_text = text.rpartition("@")
+    if not sep:
+        path, base_text = text, ""
+    if not path:
+        raise ValueError(f"Ventana de archivo inválida: {spec!r}")
+    try:
+        base = int(base_text, 0) if base_text else None
+    except ValueError:
+        raise ValueError(f"Dirección base inválida en {spec!r}") from None
+    return path, base, read_only
@@ -3,11 +3,12 @@ Loader - Carga y reubicación de programas ensamblados
 """
 
 import os
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import src.user_interface.logging.logger as logger
 
 from .linker import Linker, MapEntry, ProgramWord
+from .regions import extents_from_addresses
 
 logger_handler = logger.configurar_logger()
 
@@ -39,6 +40,10 @@ class Loader:
         # Las direcciones del mapa están en bytes
         min_addr = None
         max_addr = None
+        # Las palabras contiguas se escriben juntas con write_words: una
+        # validación y un aviso a los observadores por tramo
+        run_start = None
+        run_values: List[int] = []
 
         for entry, word in zip(map_entries, program_words):
             addr = entry.address + offset  # sumar base_address a la dirección original
@@ -48,11 +53,22 @@ class Loader:
                 raise ValueError(f"Dirección 0x{addr:08X} fuera de rango de memoria")
 
             value = Loader._materializar_palabra(word, entry, map_entries, offset)
-            memory.write_word(addr, value)
+            if run_start is not None and (
+                addr == run_start + len(run_values) * Loader.WORD_SIZE
+            ):
+                run_values.append(value)
+            else:
+                if run_values:
+                    memory.write_words(run_start, run_values)
+                run_start = addr
+                run_values = [value]
 
             min_addr = addr if min_addr is None else min(min_addr, addr)
             max_addr = addr if max_addr is None else max(max_addr, addr)
 
+        if run_values:
+            memory.write_words(run_start, run_values)
+
         return (
             min_addr if min_addr is not None else 0,
             max_addr if max_addr is not None else 0,
@@ -98,28 +114,79 @@ class Loader:
 
         raise ValueError(f"Tipo de palabra desconocido: {word.kind}")
 
+    @staticmethod
+    def tramos(map_entries: List[MapEntry], offset: int = 0) -> List[Tuple[int, int]]:
+        """Tramos contiguos [inicio, fin] (en bytes) que ocupa el programa"""
+        return extents_from_addresses(
+            (entry.address + offset for entry in map_entries), Loader.WORD_SIZE
+        )
+
+    @staticmethod
+    def elegir_base(cpu, map_entries: List[MapEntry], placement: str = "first") -> int:
+        """Desplazamiento que ubica el programa en un hueco libre de la memoria
+
+        Args:
+            cpu: Instancia del CPU (usa su registro de regiones)
+            map_entries: Entradas del mapa de memoria
+            placement: "first" (primer hueco) o "best" (el más ajustado)
+
+        Raises:
+            ValueError: Si no hay un hueco suficiente por debajo de la pila
+        """
+        extents = Loader.tramos(map_entries)
+        if not extents:
+            return 0
+        low, high = extents[0][0], extents[-1][1]
+        limit = min(cpu.stack_ops.stack_pointer, cpu.memory_size)
+        base = cpu.regions.allocate(
+            high - low + 1, 0, limit, Loader.WORD_SIZE, placement
+        )
+        return base - low
+
     @staticmethod
     def cargar_programa(
-        cpu, bin_path: str, map_path: str, base_address: int = None
+        cpu,
+        bin_path: str,
+        map_path: str,
+        base_address: int = None,
+        placement: Optional[str] = None,
     ) -> None:
         """Carga un programa completo usando las direcciones absolutas del mapa
 
+        Antes de escribir se registran sus tramos en cpu.regions: si se solapan
+        con otro programa o con MMIO la carga falla sin tocar la memoria.
+
         Args:
             cpu: Instancia del CPU
             bin_path: Ruta al archivo .bin
             map_path: Ruta al archivo .map
             base_address: Dirección base para sumar a todas las direcciones (en bytes)
+            placement: "first" o "best" para que el registro de regiones elija
+                la dirección base (se ignora base_address)
+
+        Raises:
+            ValueError: Si el programa colisiona con una región ocupada
         """
 
         program_words, map_entries = Linker.analizar_programa(bin_path, map_path)
-
-        # Cargar y obtener extremos en bytes
-        min_addr, max_addr = Loader.cargar_bin(
-            cpu.mem, program_words, map_entries, base_address
-        )
+        if placement is not None:
+            base_address = Loader.elegir_base(cpu, map_entries, placement)
 
         # Si se especifica base_address, se suma a todas las direcciones
         offset = base_address if base_address is not None else 0
+        regions = cpu.regions.add_extents(
+            Loader.tramos(map_entries, offset), os.path.basename(bin_path)
+        )
+
+        # Cargar y obtener extremos en bytes
+        try:
+            min_addr, max_addr = Loader.cargar_bin(
+                cpu.mem, program_words, map_entries, base_address
+            )
+        except Exception:
+            for region in regions:
+                cpu.regions.remove(region)
+            raise
         exec_addresses = {
             entry.address + offset for entry in map_entries if entry.flag == 1
         }
@@ -130,11 +197,39 @@ class Loader:
         cpu.exec_map.update(exec_addresses)
 
         cpu.pc = min(exec_addresses) if exec_addresses else 0
-        # Guardar segmento en bytes
-        cpu.segments.append((min_addr, max_addr, os.path.basename(bin_path)))
         cpu.current_program = bin_path
 
         logger_handler.info(
             f"Programa cargado: {bin_path}, PC=0x{cpu.pc:08X}, "
             f"segmento [0x{min_addr:08X}, 0x{max_addr:08X}]"
         )
+
+    @staticmethod
+    def mapear_archivo(
+        cpu,
+        path: str,
+        base_address: Optional[int] = None,
+        read_only: bool = False,
+    ):
+        """Mapea un archivo de datos del host en el espacio de direcciones
+
+        Los programas lo recorren con LD/ST en lugar de leerlo por la consola
+        (ver CPU.map_file).
+
+        Args:
+            cpu: Instancia del CPU
+            path: Archivo a mapear
+            base_address: Dirección del invitado (None = primer hueco por
+                encima de la RAM)
+            read_only: Rechaza las escrituras del programa
+
+        Returns:
+            La FileWindow creada
+
+        Raises:
+            ValueError: Si la ventana cae dentro de la RAM o colisiona con
+                otra región
+        """
+        window = cpu.map_file(path, base_address, read_only=read_only)
+        logger_handler.info(f"Archivo mapeado: {window}")
+        return window
@@ -1,26 +1,73 @@
 # src/memory/memory.py
+import mmap
+import os
 import struct
-from typing import Optional
+import sys
+from array import array
+from typing import IO, Callable, Iterable, Iterator, List, Optional, Tuple
 import src.user_interface.logging.logger as logger
 
 logger_handler = logger.configurar_logger()
 
+MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
 class Memory:
 
-    def __init__(self, size_bytes: Optional[int] = None, size_words: Optional[int] = None):
+    # Granularidad del seguimiento de páginas modificadas (4 KiB)
+    PAGE_SHIFT = 12
+    PAGE_SIZE = 1 << PAGE_SHIFT
+
+    def __init__(
+        self,
+        size_bytes: Optional[int] = None,
+        size_words: Optional[int] = None,
+        backing_file: Optional[str] = None,
+        read_only: bool = False,
+    ):
         """
         Inicializa la memoria.
         :param size_bytes: tamaño en bytes.
         :param size_words: tamaño en palabras de 64 bits.
+        :param backing_file: si se indica, la RAM se mapea sobre este archivo
+            con mmap (se crea o se extiende hasta el tamaño pedido). Sin tamaño
+            explícito se usa el tamaño del archivo existente.
+        :param read_only: mapea backing_file solo para lectura (varios procesos
+            pueden inspeccionar la misma imagen); escribir lanza TypeError.
         """
         if size_words is not None:
             self.size = size_words * 8  # 1 palabra = 8 bytes
         elif size_bytes is not None:
             self.size = size_bytes
+        elif backing_file is not None and os.path.isfile(backing_file) and (
+            os.path.getsize(backing_file) > 0
+        ):
+            self.size = os.path.getsize(backing_file)
         else:
             self.size = 1024 * 1024  # default = 1 MiB
-        logger_handler.info(f"Inicialización de memoria ram con tamaño {self.size}")
-        self.data = bytearray(self.size)
+
+        self.backing_file = backing_file
+        self.read_only = read_only
+        self._mmap: Optional[mmap.mmap] = None
+        if backing_file is None:
+            if read_only:
+                raise ValueError("read_only requiere backing_file")
+            logger_handler.info(
+                f"Inicialización de memoria ram con tamaño {self.size}"
+            )
+            self.data = bytearray(self.size)
+        else:
+            logger_handler.info(
+                f"Inicialización de memoria ram con tamaño {self.size} "
+                f"mapeada sobre {backing_file}"
+            )
+            self._mmap = self._map_file(backing_file, read_only)
+            self.data = self._mmap
+        self._bind_words()
+        # Observadores de escritura (addr, nbytes); p. ej. la caché de decodificación
+        self._write_hooks: List[Callable[[int, int], None]] = []
+        # Páginas escritas desde el último clear_dirty (None = sin seguimiento)
+        self._dirty: Optional[bytearray] = None
 
     # ---------------------------
     #  ACCESO POR BYTE
@@ -32,18 +79,109 @@ class Memory:
     def write_byte(self, addr: int, value: int):
         self._check_addr(addr)
         self.data[addr] = value & 0xFF
+        if self._write_hooks:
+            self.notify_write(addr, 1)
 
     # ---------------------------
     #  ACCESO POR PALABRA (64 bits)
     # ---------------------------
     def read_word(self, addr: int) -> int:
+        # Ruta rápida: palabra alineada, un solo chequeo de rango
+        if not addr & 7 and 0 <= addr <= self._last_aligned:
+            return self._words[addr >> 3]
         self._check_addr(addr, 8)
         return struct.unpack_from("<Q", self.data, addr)[0]  # Little-endian
 
     def write_word(self, addr: int, value: int):
-        self._check_addr(addr, 8)
-        struct.pack_into("<Q", self.data, addr, value & 0xFFFFFFFFFFFFFFFF)
-    
+        if not addr & 7 and 0 <= addr <= self._last_aligned:
+            self._words[addr >> 3] = value & 0xFFFFFFFFFFFFFFFF
+        else:
+            self._check_addr(addr, 8)
+            struct.pack_into("<Q", self.data, addr, value & 0xFFFFFFFFFFFFFFFF)
+        if self._write_hooks:
+            self.notify_write(addr, 8)
+
+    def _bind_words(self):
+        """
+        Crea la vista de palabras de 64 bits usada por los accesos alineados
+
+        Debe llamarse de nuevo si se reemplaza `data`. En hosts big-endian la
+        vista no coincide con el formato little-endian y se desactiva.
+        """
+        usable = self.size & ~7
+        if sys.byteorder == "little" and usable:
+            self._words = memoryview(self.data)[:usable].cast("Q")
+            self._last_aligned = usable - 8
+        else:
+            self._words = None
+            self._last_aligned = -1
+
+    # ---------------------------
+    #  ACCESO POR BLOQUES
+    # ---------------------------
+    def read_bytes(self, addr: int, size: int) -> bytes:
+        """Lee size bytes a partir de addr"""
+        self._check_addr(addr, size)
+        return bytes(self.data[addr:addr + size])
+
+    def write_bytes(self, addr: int, data: bytes):
+        """Escribe data a partir de addr y avisa a los observadores"""
+        self._check_addr(addr, len(data))
+        self.data[addr:addr + len(data)] = data
+        if self._write_hooks:
+            self.notify_write(addr, len(data))
+
+    def read_words(self, addr: int, count: int) -> List[int]:
+        """
+        Lee count palabras de 64 bits (little-endian) consecutivas.
+        :param addr: dirección de la primera palabra.
+        :param count: cantidad de palabras.
+        :return: lista de enteros sin signo.
+
+        Se valida el rango una sola vez; con la dirección alineada se copia
+        directamente de la vista de palabras, si no se desempaqueta en C.
+        """
+        if count <= 0:
+            return []
+        size = count * 8
+        if not addr & 7 and 0 <= addr and addr + size - 8 <= self._last_aligned:
+            return self._words[addr >> 3 : (addr >> 3) + count].tolist()
+        return list(struct.unpack(f"<{count}Q", self.read_bytes(addr, size)))
+
+    def write_words(self, addr: int, words) -> int:
+        """
+        Escribe palabras de 64 bits (little-endian) consecutivas a partir de addr.
+        :param words: iterable de enteros (se truncan a 64 bits), o un buffer
+            de palabras (array('Q'), arreglo NumPy uint64) o de bytes
+            little-endian (bytes, bytearray, memoryview).
+        :return: cantidad de palabras escritas.
+
+        Una sola validación de rango y un solo aviso a los observadores.
+        """
+        data = pack_words(words)
+        if data:
+            self.write_bytes(addr, data)
+        return len(data) // 8
+
+    def nonzero_pages(
+        self, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[Tuple[int, bytes]]:
+        """
+        Recorre [start, end) por páginas y entrega solo las que no son cero.
+        :return: pares (dirección, contenido); la primera y la última página
+            pueden ser parciales si start/end no están alineados.
+        """
+        end = self.size if end is None else end
+        self._check_addr(start, max(0, end - start))
+        zero = bytes(self.PAGE_SIZE)
+        addr = start
+        while addr < end:
+            stop = min((addr | (self.PAGE_SIZE - 1)) + 1, end)
+            chunk = bytes(self.data[addr:stop])
+            if chunk != zero[: stop - addr]:
+                yield addr, chunk
+            addr = stop
+
     def get_content_list(self):
         return [self.data[i:i+8] for i in range(len(self.data))]
 
@@ -72,20 +210,184 @@ class Memory:
             self.data[addr] |= (1 << bit_index)
         else:
             self.data[addr] &= ~(1 << bit_index)
+        if self._write_hooks:
+            self.notify_write(addr, 1)
 
     # ---------------------------
     #  CARGA Y VOLCADO A ARCHIVO
     # ---------------------------
     def load_from_file(self, filename: str):
+        if self._is_backing_file(filename):
+            # El contenido del archivo ya es la memoria
+            self.notify_write(0, self.size)
+            return
         with open(filename, "rb") as f:
             content = f.read()
             n = min(len(content), self.size)
             self.data[:n] = content[:n]
+        self.notify_write(0, n)
 
     def dump_to_file(self, filename: str):
+        if self._is_backing_file(filename):
+            self.flush()
+            return
         with open(filename, "wb") as f:
             f.write(self.data)
 
+    def clear(self):
+        """Pone toda la memoria en cero sin reasignar el búfer"""
+        if not self._discard_mapped_pages():
+            self.data[:] = bytes(self.size)
+        self.notify_write(0, self.size)
+
+    # ---------------------------
+    #  ARCHIVO DE RESPALDO (mmap)
+    # ---------------------------
+    def _map_file(self, path: str, read_only: bool) -> mmap.mmap:
+        if self.size <= 0:
+            raise ValueError("Una memoria mapeada debe tener tamaño mayor que 0")
+        if read_only:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size < self.size:
+                    raise ValueError(
+                        f"{path} es más chico que la memoria pedida "
+                        f"({self.size} bytes)"
+                    )
+                return mmap.mmap(f.fileno(), self.size, access=mmap.ACCESS_READ)
+
+        with open(path, "r+b" if os.path.exists(path) else "w+b") as f:
+            if os.fstat(f.fileno()).st_size < self.size:
+                f.truncate(self.size)
+            # mmap duplica el descriptor: el archivo puede cerrarse
+            return mmap.mmap(f.fileno(), self.size, access=mmap.ACCESS_WRITE)
+
+    def _is_backing_file(self, filename: str) -> bool:
+        return (
+            self._mmap is not None
+            and os.path.exists(filename)
+            and os.path.samefile(filename, self.backing_file)
+        )
+
+    def _discard_mapped_pages(self) -> bool:
+        """Libera los bloques del archivo (se leen como cero) si el SO lo permite"""
+        if self._mmap is None or self.read_only or not hasattr(mmap, "MADV_REMOVE"):
+            return False
+        try:
+            self._mmap.madvise(mmap.MADV_REMOVE)
+        except OSError:
+            return False
+        return True
+
+    def flush(self):
+        """Asegura que los cambios de una memoria mapeada lleguen al archivo"""
+        if self._mmap is not None and not self.read_only:
+            self._mmap.flush()
+
+    def close(self):
+        """Libera el mapeo del archivo (la memoria deja de ser usable)"""
+        if self._mmap is not None:
+            self.flush()
+            if self._words is not None:
+                self._words.release()
+            self._words = None
+            self._last_aligned = -1
+            self._mmap.close()
+            self._mmap = None
+
+    # ---------------------------
+    #  INSTANTÁNEAS
+    # ---------------------------
+    def capture(self):
+        """Copia inmutable del contenido (ver restore_capture)"""
+        return bytes(self.data)
+
+    def restore_capture(self, state, pages: Optional[List[int]] = None):
+        """
+        Vuelve al contenido guardado con capture()
+
+        Args:
+            state: Valor retornado por capture()
+            pages: Si se indica, solo se copian esas páginas (PAGE_SIZE)
+        """
+        if pages is None:
+            self.data[:] = state
+            self.notify_write(0, self.size)
+            return
+        source = memoryview(state)
+        for page in pages:
+            start = page << self.PAGE_SHIFT
+            end = min(start + self.PAGE_SIZE, self.size)
+            self.data[start:end] = source[start:end]
+            self.notify_write(start, end - start)
+
+    # ---------------------------
+    #  PÁGINAS MODIFICADAS
+    # ---------------------------
+    def start_dirty_tracking(self):
+        """Empieza a registrar qué páginas se escriben (idempotente)"""
+        if self._dirty is None:
+            num_pages = (self.size + self.PAGE_SIZE - 1) >> self.PAGE_SHIFT
+            self._dirty = bytearray(num_pages)
+            self.add_write_hook(self._mark_dirty)
+
+    def stop_dirty_tracking(self):
+        """Deja de registrar páginas modificadas"""
+        if self._dirty is not None:
+            self.remove_write_hook(self._mark_dirty)
+            self._dirty = None
+
+    @property
+    def tracking_dirty(self) -> bool:
+        """True si se están registrando las páginas modificadas"""
+        return self._dirty is not None
+
+    def dirty_pages(self) -> List[int]:
+        """Números de página escritos desde el último clear_dirty"""
+        dirty = self._dirty
+        if dirty is None:
+            return []
+        pages = []
+        page = dirty.find(1)
+        while page != -1:
+            pages.append(page)
+            page = dirty.find(1, page + 1)
+        return pages
+
+    def clear_dirty(self):
+        """Marca todas las páginas como limpias"""
+        if self._dirty is not None:
+            self._dirty[:] = bytes(len(self._dirty))
+
+    def _mark_dirty(self, addr: int, size: int):
+        if size <= 0:
+            return
+        first = addr >> self.PAGE_SHIFT
+        last = (addr + size - 1) >> self.PAGE_SHIFT
+        if first == last:
+            self._dirty[first] = 1
+        else:
+            self._dirty[first : last + 1] = b"\x01" * (last - first + 1)
+
+    # ---------------------------
+    #  OBSERVADORES DE ESCRITURA
+    # ---------------------------
+    def add_write_hook(self, hook: Callable[[int, int], None]):
+        """
+        Registra un observador que se invoca con (addr, nbytes) tras cada escritura.
+        Quien escriba directamente sobre `data` debe llamar a notify_write.
+        """
+        if hook not in self._write_hooks:
+            self._write_hooks.append(hook)
+
+    def remove_write_hook(self, hook: Callable[[int, int], None]):
+        if hook in self._write_hooks:
+            self._write_hooks.remove(hook)
+
+    def notify_write(self, addr: int, size: int):
+        """Avisa a los observadores que el rango [addr, addr + size) cambió."""
+        for hook in self._write_hooks:
+            hook(addr, size)
+
     # ---------------------------
     #  HELPERS
     # ---------------------------
@@ -93,7 +395,50 @@ class Memory:
         if addr < 0 or addr + size > self.size:
             raise ValueError(f"Dirección {addr} fuera de rango (0 - {self.size - 1})")
 
-# src/memory/memory.py (continuación)
+
+def pack_words(words) -> bytes:
+    """
+    Convierte palabras de 64 bits en bytes little-endian (ver write_words).
+    :raises ValueError: si el buffer no es de bytes ni de palabras de 8 bytes.
+    """
+    try:
+        view = memoryview(words)
+    except TypeError:
+        view = None
+    if view is not None:
+        with view:
+            if view.itemsize == 1:
+                if view.nbytes % 8:
+                    raise ValueError(
+                        f"El buffer tiene {view.nbytes} bytes (no es múltiplo de 8)"
+                    )
+                return view.tobytes()
+            if view.itemsize != 8:
+                raise ValueError(
+                    f"Buffer con elementos de {view.itemsize} bytes: "
+                    "se esperaban palabras de 8 bytes"
+                )
+            raw = view.tobytes()
+            order = view.format[:1]
+            if order == "<" or sys.byteorder == "little" and order not in (">", "!"):
+                return raw
+            # Palabras big-endian: invertir los bytes de cada una
+            packed = array("Q")
+            packed.frombytes(raw)
+            packed.byteswap()
+            return packed.tobytes()
+
+    if not isinstance(words, (list, tuple, range)):
+        words = list(words)  # Se recorre dos veces si hay que truncar
+    try:
+        packed = array("Q", words)
+    except (OverflowError, TypeError):
+        # Negativos o valores de más de 64 bits: se truncan como write_word
+        packed = array("Q", (int(word) & MASK64 for word in words))
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
 
 class Bus:
     """
@@ -128,5 +473,300 @@ class Bus:
             nbytes = nbits // 8
             self.memory._check_addr(addr, nbytes)
             self.memory.data[addr:addr+nbytes] = value.to_bytes(nbytes, "little")
+            self.memory.notify_write(addr, nbytes)
         else:
             raise ValueError("nbits soportados: 1, 4, múltiplos de 8")
+
+
+# ---------------------------
+#  FORMATOS DE EXPORTACIÓN / IMPORTACIÓN
+# ---------------------------
+# Los exportadores son generadores que entregan trozos (bytes o líneas de
+# texto) página a página, de modo que volcar una memoria grande usa tiempo y
+# RAM acotados. Los formatos de texto y el disperso omiten las páginas en cero.
+# Cada formato tiene un parser que entrega pares (dirección, bytes).
+
+SPARSE_MAGIC = b"E64SPR"
+SPARSE_VERSION = 1
+_SPARSE_HEADER = struct.Struct("<6sBQ")  # magic, versión, tamaño de la memoria
+_SPARSE_RUN = struct.Struct("<QI")  # dirección, largo
+_SPARSE_END = 0xFFFFFFFFFFFFFFFF
+
+# Extensión de archivo -> formato
+FORMAT_BY_EXTENSION = {
+    ".bin": "raw",
+    ".raw": "raw",
+    ".hex": "ihex",
+    ".ihex": "ihex",
+    ".srec": "srec",
+    ".s19": "srec",
+    ".s28": "srec",
+    ".s37": "srec",
+    ".mot": "srec",
+    ".sparse": "sparse",
+}
+
+
+def iter_raw(
+    memory: Memory, start: int = 0, end: Optional[int] = None
+) -> Iterator[bytes]:
+    """Binario plano de [start, end) en trozos de una página (incluye los ceros)"""
+    end = memory.size if end is None else end
+    memory._check_addr(start, max(0, end - start))
+    addr = start
+    while addr < end:
+        stop = min((addr | (memory.PAGE_SIZE - 1)) + 1, end)
+        yield memory.read_bytes(addr, stop - addr)
+        addr = stop
+
+
+def _nonzero_records(
+    memory: Memory, start: int, end: Optional[int], record_size: int
+) -> Iterator[Tuple[int, bytes]]:
+    for page_addr, page in memory.nonzero_pages(start, end):
+        for off in range(0, len(page), record_size):
+            record = page[off : off + record_size]
+            if any(record):
+                yield page_addr + off, record
+
+
+def iter_intel_hex(
+    memory: Memory, start: int = 0, end: Optional[int] = None, record_size: int = 16
+) -> Iterator[str]:
+    """Intel HEX (registros 00/04/01), una línea por registro; omite los ceros"""
+    upper = None
+    for addr, record in _nonzero_records(memory, start, end, record_size):
+        # Un registro no puede cruzar un límite de 64 KiB
+        split = min(len(record), 0x10000 - (addr & 0xFFFF))
+        for sub_addr, data in ((addr, record[:split]), (addr + split, record[split:])):
+            if not data:
+                continue
+            if sub_addr >> 16 != upper:
+                upper = sub_addr >> 16
+                yield _ihex_line(0, 0x04, upper.to_bytes(2, "big"))
+            yield _ihex_line(sub_addr & 0xFFFF, 0x00, data)
+    yield _ihex_line(0, 0x01, b"")
+
+
+def _ihex_line(offset: int, record_type: int, data: bytes) -> str:
+    body = bytes([len(data), offset >> 8, offset & 0xFF, record_type]) + data
+    checksum = (-sum(body)) & 0xFF
+    return f":{body.hex().upper()}{checksum:02X}\n"
+
+
+def iter_srec(
+    memory: Memory, start: int = 0, end: Optional[int] = None, record_size: int = 16
+) -> Iterator[str]:
+    """Motorola S-record (S0/S3/S7, direcciones de 32 bits); omite los ceros"""
+    yield _srec_line("0", b"\x00\x00", b"E64")
+    for addr, record in _nonzero_records(memory, start, end, record_size):
+        yield _srec_line("3", addr.to_bytes(4, "big"), record)
+    yield _srec_line("7", bytes(4), b"")
+
+
+def _srec_line(record_type: str, address: bytes, data: bytes) -> str:
+    body = bytes([len(address) + len(data) + 1]) + address + data
+    checksum = ~sum(body) & 0xFF
+    return f"S{record_type}{body.hex().upper()}{checksum:02X}\n"
+
+
+def iter_sparse(
+    memory: Memory, start: int = 0, end: Optional[int] = None
+) -> Iterator[bytes]:
+    """
+    Formato binario disperso: cabecera y tramos (dirección, largo, datos)
+
+    Las páginas distintas de cero contiguas forman un tramo, recortado en sus
+    extremos para no guardar los ceros iniciales y finales.
+    """
+    yield _SPARSE_HEADER.pack(SPARSE_MAGIC, SPARSE_VERSION, memory.size)
+    run_addr = None
+    run: List[bytes] = []
+    run_end = None
+    for addr, page in memory.nonzero_pages(start, end):
+        if run and addr != run_end:
+            yield from _sparse_run(run_addr, b"".join(run))
+            run = []
+        if not run:
+            run_addr = addr
+        run.append(page)
+        run_end = addr + len(page)
+    if run:
+        yield from _sparse_run(run_addr, b"".join(run))
+    yield _SPARSE_RUN.pack(_SPARSE_END, 0)
+
+
+def _sparse_run(addr: int, data: bytes) -> Iterator[bytes]:
+    trimmed = data.lstrip(b"\x00")
+    addr += len(data) - len(trimmed)
+    trimmed = trimmed.rstrip(b"\x00")
+    yield _SPARSE_RUN.pack(addr, len(trimmed))
+    yield trimmed
+
+
+EXPORTERS = {
+    "raw": iter_raw,
+    "ihex": iter_intel_hex,
+    "srec": iter_srec,
+    "sparse": iter_sparse,
+}
+
+
+def parse_raw(
+    stream: IO[bytes], base: int = 0, chunk_size: int = 1 << 16
+) -> Iterator[Tuple[int, bytes]]:
+    """Lee un binario plano por trozos; cada trozo va a base + offset"""
+    addr = base
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        yield addr, chunk
+        addr += len(chunk)
+
+
+def parse_intel_hex(lines: Iterable[str]) -> Iterator[Tuple[int, bytes]]:
+    """
+    Parser de Intel HEX (registros 00, 01, 02, 04; 03/05 se ignoran)
+    :raises ValueError: si una línea es inválida o el checksum no coincide
+    """
+    base = 0
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if not line.startswith(":"):
+            raise ValueError(f"Línea {line_no}: registro Intel HEX sin ':'")
+        try:
+            body = bytes.fromhex(line[1:])
+        except ValueError:
+            raise ValueError(f"Línea {line_no}: hexadecimal inválido") from None
+        if len(body) < 5 or len(body) != body[0] + 5:
+            raise ValueError(f"Línea {line_no}: largo de registro inválido")
+        if sum(body) & 0xFF:
+            raise ValueError(f"Línea {line_no}: checksum inválido")
+
+        offset = (body[1] << 8) | body[2]
+        record_type = body[3]
+        data = body[4:-1]
+        if record_type == 0x00:
+            yield base + offset, data
+        elif record_type == 0x01:
+            return
+        elif record_type == 0x02:
+            base = int.from_bytes(data, "big") << 4
+        elif record_type == 0x04:
+            base = int.from_bytes(data, "big") << 16
+
+
+def parse_srec(lines: Iterable[str]) -> Iterator[Tuple[int, bytes]]:
+    """
+    Parser de Motorola S-record (S1/S2/S3 con datos; el resto se ignora)
+    :raises ValueError: si una línea es inválida o el checksum no coincide
+    """
+    address_sizes = {"1": 2, "2": 3, "3": 4}
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if len(line) < 4 or line[0] != "S":
+            raise ValueError(f"Línea {line_no}: registro S-record inválido")
+        try:
+            body = bytes.fromhex(line[2:])
+        except ValueError:
+            raise ValueError(f"Línea {line_no}: hexadecimal inválido") from None
+        if len(body) != body[0] + 1:
+            raise ValueError(f"Línea {line_no}: largo de registro inválido")
+        if sum(body) & 0xFF != 0xFF:
+            raise ValueError(f"Línea {line_no}: checksum inválido")
+
+        record_type = line[1]
+        if record_type in address_sizes:
+            size = address_sizes[record_type]
+            yield int.from_bytes(body[1 : 1 + size], "big"), body[1 + size : -1]
+        elif record_type in "789":
+            return
+
+
+def parse_sparse(stream: IO[bytes]) -> Iterator[Tuple[int, bytes]]:
+    """
+    Parser del formato disperso de iter_sparse
+    :raises ValueError: si la cabecera no es válida o el archivo está truncado
+    """
+    header = stream.read(_SPARSE_HEADER.size)
+    if len(header) != _SPARSE_HEADER.size:
+        raise ValueError("Archivo disperso incompleto")
+    magic, version, _ = _SPARSE_HEADER.unpack(header)
+    if magic != SPARSE_MAGIC or version != SPARSE_VERSION:
+        raise ValueError("No es un volcado disperso válido")
+    while True:
+        raw = stream.read(_SPARSE_RUN.size)
+        if len(raw) != _SPARSE_RUN.size:
+            raise ValueError("Volcado disperso truncado")
+        addr, length = _SPARSE_RUN.unpack(raw)
+        if addr == _SPARSE_END:
+            return
+        data = stream.read(length)
+        if len(data) != length:
+            raise ValueError("Volcado disperso truncado")
+        yield addr, data
+
+
+def _detect_format(path: str, fmt: Optional[str]) -> str:
+    if fmt is None:
+        fmt = FORMAT_BY_EXTENSION.get(os.path.splitext(path)[1].lower(), "raw")
+    if fmt not in EXPORTERS:
+        raise ValueError(f"Formato de volcado desconocido: {fmt}")
+    return fmt
+
+
+def export_memory(
+    memory: Memory,
+    path: str,
+    fmt: Optional[str] = None,
+    start: int = 0,
+    end: Optional[int] = None,
+) -> int:
+    """
+    Escribe [start, end) de la memoria en path usando un exportador.
+    :param fmt: 'raw', 'ihex', 'srec' o 'sparse' (None = según la extensión)
+    :return: bytes escritos en el archivo
+    """
+    fmt = _detect_format(path, fmt)
+    chunks = EXPORTERS[fmt](memory, start, end)
+    written = 0
+    if fmt in ("ihex", "srec"):
+        with open(path, "w", encoding="ascii", newline="\n") as f:
+            for line in chunks:
+                written += f.write(line)
+    else:
+        with open(path, "wb") as f:
+            for chunk in chunks:
+                written += f.write(chunk)
+    return written
+
+
+def import_memory(
+    memory: Memory, path: str, fmt: Optional[str] = None, base: int = 0
+) -> int:
+    """
+    Carga en memoria un archivo escrito por export_memory (o compatible).
+    :param base: dirección de carga de un binario plano (los demás formatos
+        llevan sus propias direcciones)
+    :return: bytes cargados
+    """
+    fmt = _detect_format(path, fmt)
+    loaded = 0
+    if fmt in ("ihex", "srec"):
+        parser = parse_intel_hex if fmt == "ihex" else parse_srec
+        with open(path, "r", encoding="ascii") as f:
+            for addr, data in parser(f):
+                memory.write_bytes(addr, data)
+                loaded += len(data)
+    else:
+        with open(path, "rb") as f:
+            runs = parse_raw(f, base) if fmt == "raw" else parse_sparse(f)
+            for addr, data in runs:
+                memory.write_bytes(addr, data)
+                loaded += len(data)
+    return loaded
@@ -0,0 +1,328 @@
+"""
+Tabla de permisos de ejecución
+
+Fuente única de verdad sobre qué direcciones son ejecutables. Reemplaza el
+conjunto exec_map con:
+
+- Un dict página -> palabras ejecutables que comienzan en ella: las páginas
+  sin código se descartan en O(1) y la tabla ocupa memoria proporcional al
+  código cargado, no al tamaño de la memoria.
+- Tramos ordenados de direcciones ejecutables con paso de 8 bytes, separados
+  por alineación (addr % 8), buscados con bisect (pertenencia y siguiente
+  ejecutable en O(log n)). Un tramo nuevo se funde con los que toca en
+  O(log n + k), sin recorrer sus palabras; solo las páginas que cubre se
+  actualizan en el dict.
+
+Solo describe la ejecución: el mapa (.map) no distingue datos de solo
+lectura, así que lectura y escritura no se restringen por página.
+
+La clase se comporta como un conjunto de direcciones ejecutables (in, add,
+update, discard, clear, len, iteración ordenada) para que el código que usaba
+exec_map siga funcionando sin cambios.
+"""
+
+import heapq
+from bisect import bisect_right
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+
+class PermissionTable:
+    """Páginas con código y direcciones ejecutables por tramos"""
+
+    PAGE_SHIFT = 8
+    PAGE_SIZE = 1 << PAGE_SHIFT
+    WORD_SIZE = 8
+
+    def __init__(self, size_bytes: int):
+        """
+        Args:
+            size_bytes: Tamaño de la memoria que describe la tabla
+        """
+        self.size = size_bytes
+        # Palabras ejecutables que comienzan en cada página (solo páginas con
+        # código)
+        self._exec_per_page: Dict[int, int] = {}
+        # Por alineación: listas paralelas de inicio y fin (inclusive) de tramos
+        self._starts: Dict[int, List[int]] = {}
+        self._ends: Dict[int, List[int]] = {}
+        self._count = 0
+        self._change_hooks: List[Callable[[], None]] = []
+
+    # === Observadores ===
+
+    def add_change_hook(self, hook: Callable[[], None]):
+        """Registra una función que se llama cuando cambia el conjunto ejecutable"""
+        if hook not in self._change_hooks:
+            self._change_hooks.append(hook)
+
+    def remove_change_hook(self, hook: Callable[[], None]):
+        """Elimina un observador registrado con add_change_hook"""
+        if hook in self._change_hooks:
+            self._change_hooks.remove(hook)
+
+    def _notify(self):
+        for hook in self._change_hooks:
+            hook()
+
+    # === Páginas ===
+
+    def page_executable(self, addr: int) -> bool:
+        """Verifica en O(1) si la página de addr contiene código"""
+        return (addr >> self.PAGE_SHIFT) in self._exec_per_page
+
+    # === Direcciones ejecutables (interfaz de conjunto) ===
+
+    def __contains__(self, addr: int) -> bool:
+        """Descarte O(1) por página; dentro de una página con código, bisect"""
+        if (addr >> self.PAGE_SHIFT) not in self._exec_per_page:
+            return False
+        starts = self._starts.get(addr & 7)
+        if not starts:
+            return False
+        i = bisect_right(starts, addr) - 1
+        return i >= 0 and addr <= self._ends[addr & 7][i]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[int]:
+        phases = [self._iter_phase(phase) for phase in self._starts]
+        if len(phases) == 1:
+            return phases[0]
+        return heapq.merge(*phases)
+
+    def _iter_phase(self, phase: int) -> Iterator[int]:
+        for start, end in zip(self._starts[phase], self._ends[phase]):
+            yield from range(start, end + 1, self.WORD_SIZE)
+
+    def add(self, addr: int):
+        """Marca la palabra que comienza en addr como ejecutable"""
+        if self._add(addr):
+            self._notify()
+
+    def update(self, addrs: Iterable[int]):
+        """Marca como ejecutables todas las direcciones de addrs"""
+        if isinstance(addrs, range) and addrs.step == self.WORD_SIZE:
+            if addrs:
+                self.add_range(addrs[0], addrs[-1])
+            return
+        # Palabras contiguas de cada alineación -> un tramo por inserción
+        changed = False
+        run_start = run_end = None
+        for addr in sorted(set(addrs), key=lambda a: (a & 7, a)):
+            if run_end is not None and addr == run_end + self.WORD_SIZE:
+                run_end = addr
+                continue
+            if run_start is not None:
+                changed |= self._add_span(run_start, run_end)
+            run_start = run_end = addr
+        if run_start is not None:
+            changed |= self._add_span(run_start, run_end)
+        if changed:
+            self._notify()
+
+    def add_range(self, start: int, end: int):
+        """Marca como ejecutables las palabras start, start+8, ... <= end"""
+        if end < start:
+            return
+        end -= (end - start) % self.WORD_SIZE
+        if self._add_span(start, end):
+            self._notify()
+
+    def discard(self, addr: int):
+        """Quita addr de las direcciones ejecutables (si estaba)"""
+        if addr not in self:
+            return
+        phase = addr & 7
+        starts = self._starts[phase]
+        ends = self._ends[phase]
+        i = bisect_right(starts, addr) - 1
+        start, end = starts[i], ends[i]
+
+        if start == end:
+            del starts[i]
+            del ends[i]
+            if not starts:
+                del self._starts[phase]
+                del self._ends[phase]
+        elif addr == start:
+            starts[i] = addr + self.WORD_SIZE
+        elif addr == end:
+            ends[i] = addr - self.WORD_SIZE
+        else:
+            ends[i] = addr - self.WORD_SIZE
+            starts.insert(i + 1, addr + self.WORD_SIZE)
+            ends.insert(i + 1, end)
+
+        self._count -= 1
+        self._unmark_page(addr)
+        self._notify()
+
+    def remove(self, addr: int):
+        """Como discard, pero lanza KeyError si addr no era ejecutable"""
+        if addr not in self:
+            raise KeyError(addr)
+        self.discard(addr)
+
+    def clear(self):
+        """Elimina todas las direcciones ejecutables"""
+        if not self._count:
+            return
+        self._exec_per_page.clear()
+        self._starts.clear()
+        self._ends.clear()
+        self._count = 0
+        self._notify()
+
+    def next_executable(self, addr: int) -> Optional[int]:
+        """Retorna la menor dirección ejecutable >= addr (None si no hay)"""
+        best = None
+        for phase, starts in self._starts.items():
+            ends = self._ends[phase]
+            i = bisect_right(starts, addr) - 1
+            if i >= 0 and addr <= ends[i]:
+                # addr cae dentro del tramo: siguiente palabra con esta alineación
+                candidate = addr + ((phase - addr) & 7)
+                if candidate > ends[i]:
+                    candidate = starts[i + 1] if i + 1 < len(starts) else None
+            else:
+                candidate = starts[i + 1] if i + 1 < len(starts) else None
+            if candidate is not None and (best is None or candidate < best):
+                best = candidate
+        return best
+
+    def ranges(self) -> List[tuple]:
+        """Lista ordenada de tramos (inicio, fin) de palabras ejecutables"""
+        return sorted(
+            (start, end)
+            for phase in self._starts
+            for start, end in zip(self._starts[phase], self._ends[phase])
+        )
+
+    # === Estado (instantáneas) ===
+
+    def export_state(self) -> tuple:
+        """Estado completo: los tramos ejecutables"""
+        return tuple(self.ranges())
+
+    def import_state(self, state: tuple):
+        """
+        Restaura un estado obtenido con export_state
+
+        Solo avisa a los observadores si el conjunto ejecutable cambió.
+
+        Raises:
+            ValueError: Si algún tramo cae fuera de la memoria
+        """
+        ranges = tuple(state)
+        if tuple(self.ranges()) == ranges:
+            return
+        if ranges and (
+            min(start for start, _ in ranges) < 0
+            or max(end for _, end in ranges) + self.WORD_SIZE > self.size
+        ):
+            raise ValueError("El estado de permisos no cabe en esta memoria")
+
+        self._starts.clear()
+        self._ends.clear()
+        self._exec_per_page.clear()
+        self._count = 0
+        for start, end in ranges:
+            self._starts.setdefault(start & 7, []).append(start)
+            self._ends.setdefault(start & 7, []).append(end)
+            self._mark_pages(start, end)
+        self._notify()
+
+    # === Internos ===
+
+    def _add_span(self, start: int, end: int) -> bool:
+        """
+        Funde el tramo [start, end] (misma alineación) con los que se solapan
+        o tocan: bisect para ubicarlos y una sola asignación de rebanada
+
+        Returns:
+            True si agregó alguna palabra
+        """
+        if start < 0 or end + self.WORD_SIZE > self.size:
+            raise ValueError(
+                f"Tramo ejecutable fuera de memoria: 0x{max(start, 0):08X}-0x{end:08X}"
+            )
+
+        word = self.WORD_SIZE
+        phase = start & 7
+        starts = self._starts.setdefault(phase, [])
+        ends = self._ends.setdefault(phase, [])
+        first = bisect_right(starts, start) - 1
+        if first < 0 or ends[first] + word < start:
+            first += 1
+        last = bisect_right(starts, end + word) - 1
+
+        # Huecos de [start, end] que no cubren los tramos first..last
+        cursor = start
+        for i in range(first, last + 1):
+            if starts[i] > cursor:
+                self._mark_pages(cursor, starts[i] - word)
+            cursor = max(cursor, ends[i] + word)
+        if cursor <= end:
+            self._mark_pages(cursor, end)
+        elif first <= last and starts[first] <= start and end <= ends[first]:
+            return False
+
+        new_start = min(start, starts[first]) if first <= last else start
+        new_end = max(end, ends[last]) if first <= last else end
+        starts[first : last + 1] = [new_start]
+        ends[first : last + 1] = [new_end]
+        return True
+
+    def _mark_pages(self, start: int, end: int):
+        """Cuenta las palabras de [start, end] (paso 8) en sus páginas"""
+        shift = self.PAGE_SHIFT
+        per_page = self._exec_per_page
+        self._count += (end - start) // self.WORD_SIZE + 1
+        for page in range(start >> shift, (end >> shift) + 1):
+            low = max(start, page << shift)
+            low += (start - low) & 7
+            high = min(end, ((page + 1) << shift) - 1)
+            if high < low:
+                continue
+            words = (high - low) // self.WORD_SIZE + 1
+            per_page[page] = per_page.get(page, 0) + words
+
+    def _add(self, addr: int) -> bool:
+        if addr < 0 or addr + self.WORD_SIZE > self.size:
+            raise ValueError(f"Dirección ejecutable fuera de memoria: 0x{addr:08X}")
+
+        phase = addr & 7
+        starts = self._starts.setdefault(phase, [])
+        ends = self._ends.setdefault(phase, [])
+        i = bisect_right(starts, addr) - 1
+
+        if i >= 0 and addr <= ends[i]:
+            return False
+
+        joins_prev = i >= 0 and ends[i] + self.WORD_SIZE == addr
+        joins_next = i + 1 < len(starts) and starts[i + 1] - self.WORD_SIZE == addr
+        if joins_prev and joins_next:
+            ends[i] = ends[i + 1]
+            del starts[i + 1]
+            del ends[i + 1]
+        elif joins_prev:
+            ends[i] = addr
+        elif joins_next:
+            starts[i + 1] = addr
+        else:
+            starts.insert(i + 1, addr)
+            ends.insert(i + 1, addr)
+
+        self._count += 1
+        page = addr >> self.PAGE_SHIFT
+        self._exec_per_page[page] = self._exec_per_page.get(page, 0) + 1
+        return True
+
+    def _unmark_page(self, addr: int):
+        page = addr >> self.PAGE_SHIFT
+        remaining = self._exec_per_page[page] - 1
+        if remaining:
+            self._exec_per_page[page] = remaining
+        else:
+            del self._exec_per_page[page]
@@ -0,0 +1,320 @@
+"""
+Registro de regiones de memoria (programas, pila y MMIO)
+
+Fuente única de verdad sobre qué tramos de direcciones están ocupados y por
+quién. Reemplaza a cpu.segments, cpu.occupied_words y la búsqueda lineal de
+colisiones del registro de la GUI con:
+
+- Una lista de regiones disjuntas ordenada por inicio, consultada con bisect:
+  buscar la dueña de una dirección o las regiones que se solapan con un
+  tramo cuesta O(log n + k).
+- Un asignador first-fit / best-fit que recorre los huecos entre regiones
+  para elegir la dirección base de un programa nuevo.
+- El piso de la pila: la pila crece hacia abajo desde el tope de la memoria
+  y no puede entrar en la región más alta que haya debajo del tope.
+"""
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+KINDS = ("program", "data", "stack", "mmio")
+STRATEGIES = ("first", "best")
+
+
+@dataclass(frozen=True)
+class Region:
+    """Tramo [start, end] (inclusive) con su dueño"""
+
+    start: int
+    end: int
+    name: str
+    kind: str = "program"
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start + 1
+
+    def __str__(self) -> str:
+        return f"{self.name} [{self.kind}] 0x{self.start:08X}-0x{self.end:08X}"
+
+
+def extents_from_addresses(
+    addrs: Iterable[int], word: int = 8
+) -> List[Tuple[int, int]]:
+    """
+    Agrupa direcciones de palabra en tramos contiguos [inicio, fin]
+
+    Args:
+        addrs: Direcciones de las palabras (en cualquier orden)
+        word: Tamaño de palabra en bytes
+
+    Returns:
+        Tramos ordenados; fin es el último byte de la última palabra
+    """
+    extents: List[Tuple[int, int]] = []
+    for addr in sorted(set(addrs)):
+        if extents and addr == extents[-1][1] + 1:
+            extents[-1] = (extents[-1][0], addr + word - 1)
+        else:
+            extents.append((addr, addr + word - 1))
+    return extents
+
+
+class RegionRegistry:
+    """Regiones disjuntas ordenadas por dirección de inicio"""
+
+    def __init__(self):
+        self._starts: List[int] = []
+        self._regions: List[Region] = []
+        self._change_hooks: List[Callable[[], None]] = []
+
+    # === Observadores ===
+
+    def add_change_hook(self, hook: Callable[[], None]):
+        """Registra una función que se llama cuando cambian las regiones"""
+        if hook not in self._change_hooks:
+            self._change_hooks.append(hook)
+
+    def remove_change_hook(self, hook: Callable[[], None]):
+        """Elimina un observador registrado con add_change_hook"""
+        if hook in self._change_hooks:
+            self._change_hooks.remove(hook)
+
+    def _notify(self):
+        for hook in self._change_hooks:
+            hook()
+
+    # === Consultas ===
+
+    def __len__(self) -> int:
+        return len(self._regions)
+
+    def __iter__(self) -> Iterator[Region]:
+        return iter(list(self._regions))
+
+    def find(self, addr: int) -> Optional[Region]:
+        """Región que contiene addr (None si la dirección está libre)"""
+        i = bisect_right(self._starts, addr) - 1
+        if i >= 0 and addr <= self._regions[i].end:
+            return self._regions[i]
+        return None
+
+    def overlapping(self, start: int, end: int) -> List[Region]:
+        """Regiones que se solapan con [start, end], en orden de dirección"""
+        if end < start:
+            return []
+        first = bisect_right(self._starts, start) - 1
+        if first < 0 or self._regions[first].end < start:
+            first += 1
+        last = bisect_right(self._starts, end)
+        return self._regions[first:last]
+
+    def named(self, name: str) -> List[Region]:
+        """Regiones de un dueño"""
+        return [region for region in self._regions if region.name == name]
+
+    def of_kind(self, kind: str) -> List[Region]:
+        """Regiones de un tipo ("program", "data", "stack" o "mmio")"""
+        return [region for region in self._regions if region.kind == kind]
+
+    # === Altas y bajas ===
+
+    def add(
+        self,
+        start: int,
+        end: int,
+        name: str,
+        kind: str = "program",
+        evict: bool = False,
+    ) -> Region:
+        """
+        Registra la región [start, end]
+
+        Args:
+            start: Primera dirección
+            end: Última dirección (inclusive)
+            name: Dueño (nombre del programa, "pila", ...)
+            kind: "program", "data", "stack" o "mmio"
+            evict: Quitar las regiones solapadas en lugar de fallar (la carga
+                las sobrescribió)
+
+        Returns:
+            La región registrada
+
+        Raises:
+            ValueError: Si el tramo no es válido o se solapa con otra región
+        """
+        return self.add_extents([(start, end)], name, kind, evict)[0]
+
+    def add_extents(
+        self,
+        extents: Sequence[Tuple[int, int]],
+        name: str,
+        kind: str = "program",
+        evict: bool = False,
+    ) -> List[Region]:
+        """
+        Registra varios tramos del mismo dueño; si alguno colisiona no se
+        registra ninguno
+
+        Raises:
+            ValueError: Si algún tramo no es válido o se solapa con otra región
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Tipo de región desconocido: {kind}")
+        extents = sorted(extents)
+        for i, (start, end) in enumerate(extents):
+            if start < 0 or end < start:
+                raise ValueError(f"Región inválida: 0x{max(start, 0):08X}-0x{end:08X}")
+            if i and start <= extents[i - 1][1]:
+                raise ValueError(f"Los tramos de '{name}' se solapan entre sí")
+
+        overlaps = {}
+        for start, end in extents:
+            for region in self.overlapping(start, end):
+                overlaps[region.start] = region
+        if overlaps and not evict:
+            other = min(overlaps.values(), key=lambda region: region.start)
+            raise ValueError(
+                f"La región de '{name}' colisiona con '{other.name}' "
+                f"(0x{other.start:08X}-0x{other.end:08X})"
+            )
+        for region in overlaps.values():
+            self._remove(region)
+
+        added = []
+        for start, end in extents:
+            region = Region(start, end, name, kind)
+            i = bisect_left(self._starts, start)
+            self._starts.insert(i, start)
+            self._regions.insert(i, region)
+            added.append(region)
+        self._notify()
+        return added
+
+    def remove(self, region: Region):
+        """
+        Quita una región registrada
+
+        Raises:
+            KeyError: Si la región no está registrada
+        """
+        self._remove(region)
+        self._notify()
+
+    def remove_named(self, name: str) -> int:
+        """Quita todas las regiones de un dueño; retorna cuántas quitó"""
+        return self._remove_where(lambda region: region.name == name)
+
+    def clear(self, kinds: Optional[Iterable[str]] = None):
+        """Quita todas las regiones, o solo las de los tipos indicados"""
+        if kinds is None:
+            if self._regions:
+                self._starts.clear()
+                self._regions.clear()
+                self._notify()
+            return
+        kinds = set(kinds)
+        self._remove_where(lambda region: region.kind in kinds)
+
+    # === Asignación ===
+
+    def free_ranges(self, low: int, high: int) -> List[Tuple[int, int]]:
+        """Huecos [inicio, fin] sin regiones dentro de [low, high)"""
+        gaps = []
+        cursor = low
+        for region in self.overlapping(low, high - 1):
+            if region.start > cursor:
+                gaps.append((cursor, region.start - 1))
+            cursor = max(cursor, region.end + 1)
+        if cursor < high:
+            gaps.append((cursor, high - 1))
+        return gaps
+
+    def allocate(
+        self,
+        size: int,
+        low: int,
+        high: int,
+        align: int = 8,
+        strategy: str = "first",
+    ) -> int:
+        """
+        Elige una dirección base libre para size bytes (no la registra)
+
+        Args:
+            size: Bytes necesarios
+            low: Menor dirección utilizable
+            high: Límite superior (exclusivo), p. ej. el piso de la pila
+            align: Alineación de la dirección base
+            strategy: "first" (el primer hueco donde cabe) o "best" (el hueco
+                más chico donde cabe, para fragmentar menos)
+
+        Returns:
+            Dirección base
+
+        Raises:
+            ValueError: Si la estrategia no existe o no hay un hueco suficiente
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Estrategia de asignación desconocida: {strategy}")
+        if size <= 0:
+            raise ValueError("El tamaño a asignar debe ser mayor que 0")
+
+        best = None
+        for gap_start, gap_end in self.free_ranges(low, high):
+            base = -(-gap_start // align) * align
+            if base + size - 1 > gap_end:
+                continue
+            if strategy == "first":
+                return base
+            slack = gap_end - gap_start
+            if best is None or slack < best[0]:
+                best = (slack, base)
+        if best is None:
+            raise ValueError(f"No hay un hueco libre de {size} bytes en memoria")
+        return best[1]
+
+    # === Pila ===
+
+    def stack_floor(self, top: int) -> int:
+        """
+        Menor dirección que puede ocupar la pila que crece hacia abajo desde
+        top: el byte siguiente a la región más alta por debajo de top
+        (0 si no hay ninguna)
+        """
+        i = bisect_left(self._starts, top) - 1
+        while i >= 0 and self._regions[i].kind == "stack":
+            i -= 1
+        return self._regions[i].end + 1 if i >= 0 else 0
+
+    # === Estado (instantáneas) ===
+
+    def export_state(self) -> Tuple[Region, ...]:
+        """Regiones actuales (las Region son inmutables)"""
+        return tuple(self._regions)
+
+    def import_state(self, state: Tuple[Region, ...]):
+        """Reemplaza las regiones por las de export_state"""
+        self._regions = list(state)
+        self._starts = [region.start for region in self._regions]
+        self._notify()
+
+    # === Internos ===
+
+    def _remove(self, region: Region):
+        i = bisect_left(self._starts, region.start)
+        if i == len(self._regions) or self._regions[i] != region:
+            raise KeyError(region)
+        del self._starts[i]
+        del self._regions[i]
+
+    def _remove_where(self, predicate: Callable[[Region], bool]) -> int:
+        kept = [region for region in self._regions if not predicate(region)]
+        removed = len(self._regions) - len(kept)
+        if removed:
+            self._regions = kept
+            self._starts = [region.start for region in kept]
+            self._notify()
+        return removed
@@ -0,0 +1,236 @@
+"""
+Escáner de memoria (búsqueda de patrones y valores)
+
+Busca secuencias de bytes y valores de 64 bits, y permite acotar candidatos
+entre escaneos sucesivos al estilo Cheat Engine: primer escaneo (valor exacto
+o desconocido) y luego "cambió / no cambió / aumentó / disminuyó / igual a".
+
+Con NumPy, las palabras se leen como un arreglo uint64 sobre Memory.data sin
+copiarlo y las comparaciones son vectoriales. Sin NumPy se usa bytes.find
+(también en C) y arreglos array('Q').
+"""
+
+import mmap
+import sys
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+HAVE_NUMPY = np is not None
+MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+class MemoryScanner:
+    """Búsquedas y escaneos incrementales sobre una región de memoria"""
+
+    MODES = ("exact", "changed", "unchanged", "increased", "decreased")
+
+    def __init__(
+        self,
+        memory,
+        start: int = 0,
+        end: Optional[int] = None,
+        use_numpy: Optional[bool] = None,
+    ):
+        """
+        Args:
+            memory: Memory (o subclase) a escanear
+            start: Inicio de la región (alineado a 8)
+            end: Fin de la región (None = toda la memoria)
+            use_numpy: Forzar o desactivar NumPy (None = usarlo si está)
+
+        Raises:
+            ValueError: Si la región no es válida
+        """
+        end = memory.size if end is None else end
+        if start < 0 or start & 7 or end > memory.size or end <= start:
+            raise ValueError(
+                f"Región de escaneo inválida: 0x{start:08X}-0x{end:08X} "
+                "(el inicio debe estar alineado a 8)"
+            )
+        self.memory = memory
+        self.start = start
+        self.end = start + ((end - start) & ~7)
+        self.use_numpy = HAVE_NUMPY if use_numpy is None else use_numpy and HAVE_NUMPY
+        # Índices de palabra (relativos a start) y valores del último escaneo
+        self._candidates = None
+        self._values = None
+        self.scans = 0
+
+    # === Búsquedas puntuales ===
+
+    def find_bytes(self, pattern: bytes, align: int = 1) -> List[int]:
+        """
+        Direcciones donde aparece pattern dentro de la región
+
+        Args:
+            pattern: Secuencia de bytes a buscar
+            align: Solo devolver direcciones múltiplo de align
+        """
+        if not pattern:
+            raise ValueError("El patrón de búsqueda está vacío")
+        data, base = self._searchable()
+        found = []
+        pos = data.find(pattern, base, base + self.end - self.start)
+        limit = base + self.end - self.start
+        while pos != -1:
+            addr = self.start + pos - base
+            if addr % align == 0:
+                found.append(addr)
+            pos = data.find(pattern, pos + 1, limit)
+        return found
+
+    def find_value(self, value: int) -> List[int]:
+        """Direcciones alineadas a 8 que contienen el valor de 64 bits"""
+        value &= MASK64
+        if self.use_numpy:
+            idx = np.flatnonzero(self._words() == np.uint64(value))
+            return (idx * 8 + self.start).tolist()
+        return self.find_bytes(value.to_bytes(8, "little"), align=8)
+
+    def find_values(self, values: Sequence[int]) -> List[int]:
+        """Direcciones alineadas donde empiezan las palabras consecutivas values"""
+        pattern = b"".join((v & MASK64).to_bytes(8, "little") for v in values)
+        return self.find_bytes(pattern, align=8)
+
+    # === Escaneo incremental ===
+
+    def first_scan(self, value: Optional[int] = None) -> int:
+        """
+        Inicia un escaneo: con value, candidatos = palabras iguales a value;
+        sin value (valor desconocido), todas las palabras de la región
+
+        Returns:
+            Cantidad de candidatos
+        """
+        words = self._words()
+        if self.use_numpy:
+            if value is None:
+                self._candidates = np.arange(len(words), dtype=np.int64)
+                self._values = words.copy()
+            else:
+                self._candidates = np.flatnonzero(words == np.uint64(value & MASK64))
+                self._values = words[self._candidates]
+        else:
+            if value is None:
+                self._candidates = range(len(words))
+                self._values = words
+            else:
+                addrs = self.find_value(value)
+                self._candidates = [(addr - self.start) >> 3 for addr in addrs]
+                self._values = array("Q", [value & MASK64]) * len(addrs)
+        self.scans = 1
+        return len(self._candidates)
+
+    def next_scan(self, mode: str, value: Optional[int] = None) -> int:
+        """
+        Acota los candidatos comparando con el escaneo anterior
+
+        Args:
+            mode: "exact" (igual a value), "changed", "unchanged",
+                "increased" o "decreased" (comparación sin signo)
+            value: Valor para el modo "exact"
+
+        Returns:
+            Cantidad de candidatos restantes
+
+        Raises:
+            ValueError: Si el modo no existe o falta el valor
+            RuntimeError: Si no se hizo first_scan antes
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Modo de escaneo desconocido: {mode}")
+        if mode == "exact" and value is None:
+            raise ValueError("El modo 'exact' requiere un valor")
+        if self._candidates is None:
+            raise RuntimeError("No hay escaneo previo: use first_scan primero")
+
+        words = self._words()
+        if self.use_numpy:
+            current = words[self._candidates]
+            previous = self._values
+            if mode == "exact":
+                mask = current == np.uint64(value & MASK64)
+            elif mode == "changed":
+                mask = current != previous
+            elif mode == "unchanged":
+                mask = current == previous
+            elif mode == "increased":
+                mask = current > previous
+            else:
+                mask = current < previous
+            self._candidates = self._candidates[mask]
+            self._values = current[mask]
+        else:
+            keep = _PY_FILTERS[mode]
+            target = None if value is None else value & MASK64
+            candidates = []
+            values = array("Q")
+            for i, old in zip(self._candidates, self._values):
+                new = words[i]
+                if keep(new, old, target):
+                    candidates.append(i)
+                    values.append(new)
+            self._candidates = candidates
+            self._values = values
+        self.scans += 1
+        return len(self._candidates)
+
+    def reset(self):
+        """Descarta los candidatos"""
+        self._candidates = None
+        self._values = None
+        self.scans = 0
+
+    @property
+    def count(self) -> int:
+        """Cantidad de candidatos actuales (0 si no hay escaneo)"""
+        return 0 if self._candidates is None else len(self._candidates)
+
+    def candidates(self, limit: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Lista (dirección, valor en el último escaneo) de los candidatos"""
+        if self._candidates is None:
+            return []
+        indices = self._candidates[:limit]
+        values = self._values[:limit]
+        if self.use_numpy:
+            indices = indices.tolist()
+            values = values.tolist()
+        return [(self.start + i * 8, v) for i, v in zip(indices, values)]
+
+    # === Internos ===
+
+    def _searchable(self):
+        """Objeto con find() y el offset de la región dentro de él"""
+        data = self.memory.data
+        if isinstance(data, (bytearray, mmap.mmap)):
+            return data, self.start
+        return self.memory.read_bytes(self.start, self.end - self.start), 0
+
+    def _words(self):
+        """Palabras de la región (vista NumPy sin copia, o array('Q'))"""
+        data = self.memory.data
+        if isinstance(data, (bytearray, mmap.mmap)):
+            buffer = memoryview(data)[self.start : self.end]
+        else:
+            buffer = self.memory.read_bytes(self.start, self.end - self.start)
+        if self.use_numpy:
+            return np.frombuffer(buffer, dtype="<u8")
+        words = array("Q")
+        words.frombytes(buffer)
+        if sys.byteorder == "big":
+            words.byteswap()
+        return words
+
+
+_PY_FILTERS = {
+    "exact": lambda new, old, value: new == value,
+    "changed": lambda new, old, value: new != old,
+    "unchanged": lambda new, old, value: new == old,
+    "increased": lambda new, old, value: new > old,
+    "decreased": lambda new, old, value: new < old,
+}
@@ -0,0 +1,322 @@
+"""
+Memoria dispersa por páginas
+
+Cubre todo el espacio de 32 bits (4 GiB) reservando páginas de PAGE_SIZE
+bytes solo cuando se escriben por primera vez; las páginas nunca escritas se
+leen como cero. La memoria residente es proporcional a las páginas tocadas.
+
+Mantiene la API de Memory (read_word/write_word/read_byte/...) y la última
+página usada queda en caché para que los accesos consecutivos a la misma
+página eviten el diccionario.
+"""
+
+import struct
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import src.user_interface.logging.logger as logger
+from src.memory.memory import Memory
+
+logger_handler = logger.configurar_logger()
+
+_WORD = struct.Struct("<Q")
+MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+class _SparseData:
+    """
+    Vista tipo bytearray sobre una SparseMemory
+
+    Permite que el código que usa mem.data[i] o mem.data[a:b] siga
+    funcionando. Igual que con el bytearray de Memory, escribir aquí no
+    avisa a los observadores: quien escribe debe llamar a notify_write.
+    """
+
+    def __init__(self, memory: "SparseMemory"):
+        self._memory = memory
+
+    def __len__(self) -> int:
+        return self._memory.size
+
+    def _range(self, key: slice) -> Tuple[int, int]:
+        start, stop, step = key.indices(self._memory.size)
+        if step != 1:
+            raise ValueError("SparseMemory.data no soporta slices con paso")
+        return start, max(start, stop)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop = self._range(key)
+            return self._memory._read_raw(start, stop - start)
+        if key < 0:
+            key += self._memory.size
+        self._memory._check_addr(key)
+        return self._memory._read_raw(key, 1)[0]
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            start, stop = self._range(key)
+            data = bytes(value)
+            if len(data) != stop - start:
+                raise ValueError("SparseMemory.data no puede cambiar de tamaño")
+            self._memory._write_raw(start, data)
+            return
+        if key < 0:
+            key += self._memory.size
+        self._memory._check_addr(key)
+        self._memory._write_raw(key, bytes((value,)))
+
+
+class SparseMemory(Memory):
+    """Memoria de hasta 4 GiB con páginas reservadas bajo demanda"""
+
+    def __init__(self, size_bytes: int = 1 << 32):
+        """
+        Args:
+            size_bytes: Tamaño del espacio direccionable (default 4 GiB)
+        """
+        self.size = size_bytes
+        logger_handler.info(
+            f"Inicialización de memoria dispersa con tamaño {self.size} "
+            f"(páginas de {self.PAGE_SIZE} bytes)"
+        )
+        self._pages: Dict[int, bytearray] = {}
+        # Última página accedida (número y contenido)
+        self._cached_no: Optional[int] = None
+        self._cached: Optional[bytearray] = None
+        self.data = _SparseData(self)
+        # Sin vista de palabras: read_words usa read_bytes
+        self._words = None
+        self._last_aligned = -1
+        self._write_hooks = []
+        self._dirty = None
+
+    # ---------------------------
+    #  PÁGINAS
+    # ---------------------------
+    @property
+    def resident_pages(self) -> int:
+        """Cantidad de páginas reservadas"""
+        return len(self._pages)
+
+    @property
+    def resident_bytes(self) -> int:
+        """Bytes reservados por las páginas"""
+        return len(self._pages) * self.PAGE_SIZE
+
+    def mapped_pages(self) -> List[int]:
+        """Números de página reservados, en orden"""
+        return sorted(self._pages)
+
+    def _page_for_write(self, page_no: int) -> bytearray:
+        page = self._pages.get(page_no)
+        if page is None:
+            page = self._pages[page_no] = bytearray(self.PAGE_SIZE)
+        self._cached_no = page_no
+        self._cached = page
+        return page
+
+    def _iter_chunks(self, addr: int, size: int) -> Iterator[Tuple[int, int, int]]:
+        """Divide [addr, addr + size) en (página, offset, largo)"""
+        page_size = self.PAGE_SIZE
+        while size > 0:
+            page_no = addr >> self.PAGE_SHIFT
+            offset = addr & (page_size - 1)
+            length = min(size, page_size - offset)
+            yield page_no, offset, length
+            addr += length
+            size -= length
+
+    def _read_raw(self, addr: int, size: int) -> bytes:
+        out = bytearray(size)
+        pos = 0
+        for page_no, offset, length in self._iter_chunks(addr, size):
+            page = self._pages.get(page_no)
+            if page is not None:
+                out[pos : pos + length] = page[offset : offset + length]
+            pos += length
+        return bytes(out)
+
+    def _write_raw(self, addr: int, data: bytes):
+        view = memoryview(data)
+        pos = 0
+        for page_no, offset, length in self._iter_chunks(addr, len(data)):
+            chunk = view[pos : pos + length]
+            pos += length
+            if page_no not in self._pages and not any(chunk):
+                continue  # Escribir ceros en una página sin reservar no cambia nada
+            page = self._page_for_write(page_no)
+            page[offset : offset + length] = chunk
+
+    # ---------------------------
+    #  ACCESO POR BYTE
+    # ---------------------------
+    def read_byte(self, addr: int) -> int:
+        if addr >> self.PAGE_SHIFT == self._cached_no:
+            return self._cached[addr & (self.PAGE_SIZE - 1)]
+        self._check_addr(addr)
+        page = self._pages.get(addr >> self.PAGE_SHIFT)
+        return 0 if page is None else page[addr & (self.PAGE_SIZE - 1)]
+
+    def write_byte(self, addr: int, value: int):
+        page_no = addr >> self.PAGE_SHIFT
+        if page_no == self._cached_no:
+            page = self._cached
+        else:
+            self._check_addr(addr)
+            page = self._page_for_write(page_no)
+        page[addr & (self.PAGE_SIZE - 1)] = value & 0xFF
+        if self._write_hooks:
+            self.notify_write(addr, 1)
+
+    # ---------------------------
+    #  ACCESO POR PALABRA (64 bits)
+    # ---------------------------
+    def read_word(self, addr: int) -> int:
+        offset = addr & (self.PAGE_SIZE - 1)
+        if addr >> self.PAGE_SHIFT == self._cached_no and offset <= self.PAGE_SIZE - 8:
+            return _WORD.unpack_from(self._cached, offset)[0]
+
+        self._check_addr(addr, 8)
+        if offset > self.PAGE_SIZE - 8:
+            return int.from_bytes(self._read_raw(addr, 8), "little")
+        page_no = addr >> self.PAGE_SHIFT
+        page = self._pages.get(page_no)
+        if page is None:
+            return 0
+        self._cached_no = page_no
+        self._cached = page
+        return _WORD.unpack_from(page, offset)[0]
+
+    def write_word(self, addr: int, value: int):
+        offset = addr & (self.PAGE_SIZE - 1)
+        page_no = addr >> self.PAGE_SHIFT
+        if page_no == self._cached_no and offset <= self.PAGE_SIZE - 8:
+            page = self._cached
+        else:
+            self._check_addr(addr, 8)
+            if offset > self.PAGE_SIZE - 8:
+                # La palabra cruza el límite de página
+                self.write_bytes(addr, (value & MASK64).to_bytes(8, "little"))
+                return
+            page = self._page_for_write(page_no)
+        _WORD.pack_into(page, offset, value & MASK64)
+        if self._write_hooks:
+            self.notify_write(addr, 8)
+
+    # ---------------------------
+    #  ACCESO POR BLOQUES
+    # ---------------------------
+    def read_bytes(self, addr: int, size: int) -> bytes:
+        self._check_addr(addr, size)
+        return self._read_raw(addr, size)
+
+    def write_bytes(self, addr: int, data: bytes):
+        self._check_addr(addr, len(data))
+        self._write_raw(addr, data)
+        if self._write_hooks:
+            self.notify_write(addr, len(data))
+
+    def nonzero_pages(
+        self, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[Tuple[int, bytes]]:
+        """Como Memory.nonzero_pages, pero solo visita las páginas reservadas"""
+        end = self.size if end is None else end
+        self._check_addr(start, max(0, end - start))
+        for page_no in self.mapped_pages():
+            page_start = page_no << self.PAGE_SHIFT
+            lo = max(page_start, start)
+            hi = min(page_start + self.PAGE_SIZE, end)
+            if lo >= hi:
+                continue
+            page = self._pages[page_no]
+            chunk = bytes(page[lo - page_start : hi - page_start])
+            if any(chunk):
+                yield lo, chunk
+
+    def get_content_list(self):
+        raise RuntimeError(
+            "get_content_list no está disponible en memoria dispersa; "
+            "use read_bytes o mapped_pages"
+        )
+
+    # ---------------------------
+    #  CARGA Y VOLCADO A ARCHIVO
+    # ---------------------------
+    def load_from_file(self, filename: str):
+        with open(filename, "rb") as f:
+            content = f.read(self.size)
+        self._write_raw(0, content)
+        self.notify_write(0, len(content))
+
+    def dump_to_file(self, filename: str):
+        """Vuelca la memoria; las páginas sin reservar quedan como huecos"""
+        with open(filename, "wb") as f:
+            for page_no in self.mapped_pages():
+                f.seek(page_no << self.PAGE_SHIFT)
+                f.write(self._pages[page_no])
+            f.truncate(self.size)
+
+    def clear(self):
+        """Libera todas las páginas"""
+        if self._dirty is not None:
+            # Las páginas liberadas cambian (vuelven a leerse como cero)
+            self._dirty.update(self._pages)
+        self._pages.clear()
+        self._cached_no = None
+        self._cached = None
+        self.notify_write(0, self.size)
+
+    # ---------------------------
+    #  PÁGINAS MODIFICADAS
+    # ---------------------------
+    # Un conjunto de páginas en lugar del bytearray de Memory, que ocuparía
+    # 1 MiB para 4 GiB antes de tocar una sola página
+
+    def start_dirty_tracking(self):
+        if self._dirty is None:
+            self._dirty = set()
+            self.add_write_hook(self._mark_dirty)
+
+    def dirty_pages(self) -> List[int]:
+        return sorted(self._dirty) if self._dirty is not None else []
+
+    def clear_dirty(self):
+        if self._dirty is not None:
+            self._dirty.clear()
+
+    def _mark_dirty(self, addr: int, size: int):
+        if size <= 0:
+            return
+        first = addr >> self.PAGE_SHIFT
+        last = (addr + size - 1) >> self.PAGE_SHIFT
+        if last - first < max(len(self._pages), 64):
+            self._dirty.update(range(first, last + 1))
+        else:
+            # Rango enorme (restauración o carga completa): solo pudieron
+            # cambiar las páginas reservadas
+            self._dirty.update(p for p in self._pages if first <= p <= last)
+
+    # ---------------------------
+    #  INSTANTÁNEAS
+    # ---------------------------
+    def capture(self):
+        """Copia de las páginas reservadas: {número de página: bytes}"""
+        return {page_no: bytes(page) for page_no, page in self._pages.items()}
+
+    def restore_capture(self, state, pages: Optional[List[int]] = None):
+        if pages is None:
+            self._pages = {page_no: bytearray(page) for page_no, page in state.items()}
+            self._cached_no = None
+            self._cached = None
+            self.notify_write(0, self.size)
+            return
+        for page_no in pages:
+            saved = state.get(page_no)
+            if saved is None:
+                self._pages.pop(page_no, None)
+                if page_no == self._cached_no:
+                    self._cached_no = None
+                    self._cached = None
+            else:
+                self._page_for_write(page_no)[:] = saved
+            self.notify_write(page_no << self.PAGE_SHIFT, self.PAGE_SIZE)
@@ -0,0 +1,286 @@
+"""
+Puntos de observación (watchpoints) de lectura, escritura y ejecución
+
+Cada watchpoint vigila un rango de bytes. La comprobación es por páginas de
+PAGE_SIZE bytes: la tabla mantiene un conjunto de páginas vigiladas por tipo
+de acceso y solo los accesos que comienzan en una de ellas se comparan contra
+los rangos. El resto de las páginas sigue la ruta rápida.
+
+- Lectura/escritura: WatchBus envuelve a la memoria en MemoryOperations y
+  StackOperations (solo mientras haya watchpoints de datos). El acceso se
+  completa y la CPU se detiene al terminar la instrucción. Solo se vigilan
+  los accesos de palabra y de byte de LD/ST y de la pila: las copias por
+  bloques (write_bytes/write_words, DMA, INS), IN/OUT a memoria y los
+  comandos fill/paste de la CLI no pasan por los watchpoints.
+- Ejecución: la CPU no guarda en la caché de decodificación las instrucciones
+  de las páginas vigiladas, así que al buscarlas pasa siempre por la
+  validación del PC, que detiene la ejecución antes de ejecutarlas.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+
+from src.memory.memory import Bus
+
+WATCH_READ = 0x1
+WATCH_WRITE = 0x2
+WATCH_EXEC = 0x4
+
+KIND_LETTERS = {"r": WATCH_READ, "w": WATCH_WRITE, "x": WATCH_EXEC}
+KIND_NAMES = {WATCH_READ: "lectura", WATCH_WRITE: "escritura", WATCH_EXEC: "ejecución"}
+
+
+def parse_kind(text: str) -> int:
+    """
+    Convierte "r", "w", "x" o combinaciones ("rw", "rwx") en bits WATCH_*
+
+    Raises:
+        ValueError: Si el texto está vacío o tiene letras desconocidas
+    """
+    kinds = 0
+    for letter in text.strip().lower():
+        if letter not in KIND_LETTERS:
+            raise ValueError(f"Tipo de watchpoint desconocido: {letter!r} (use r/w/x)")
+        kinds |= KIND_LETTERS[letter]
+    if not kinds:
+        raise ValueError("El tipo de watchpoint está vacío (use r/w/x)")
+    return kinds
+
+
+def format_kind(kinds: int) -> str:
+    """Inverso de parse_kind ("rw", "x", ...)"""
+    return "".join(letter for letter, bit in KIND_LETTERS.items() if kinds & bit)
+
+
+@dataclass(frozen=True)
+class Watchpoint:
+    """Rango vigilado [start, end] (inclusive)"""
+
+    id: int
+    start: int
+    end: int
+    kinds: int  # Combinación de WATCH_READ / WATCH_WRITE / WATCH_EXEC
+
+    def overlaps(self, addr: int, size: int) -> bool:
+        return addr <= self.end and addr + size - 1 >= self.start
+
+    def __str__(self) -> str:
+        return (
+            f"#{self.id} 0x{self.start:08X}-0x{self.end:08X} "
+            f"[{format_kind(self.kinds)}]"
+        )
+
+
+@dataclass
+class WatchHit:
+    """Acceso que disparó un watchpoint"""
+
+    watchpoint: Watchpoint
+    kind: int  # WATCH_READ, WATCH_WRITE o WATCH_EXEC
+    address: int  # Dirección del acceso
+    size: int  # Bytes accedidos
+    value: Optional[int] = None  # Valor leído o escrito
+    old_value: Optional[int] = None  # Valor previo (escrituras)
+    pc: Optional[int] = None  # Instrucción que accedió (la completa la CPU)
+
+    def __str__(self) -> str:
+        text = (
+            f"Watchpoint {self.watchpoint} ({KIND_NAMES[self.kind]}) "
+            f"en 0x{self.address:08X}"
+        )
+        if self.pc is not None:
+            text += f" por PC=0x{self.pc:08X}"
+        if self.kind == WATCH_WRITE:
+            text += f": 0x{self.old_value:X} -> 0x{self.value:X}"
+        elif self.kind == WATCH_READ:
+            text += f": 0x{self.value:X}"
+        return text
+
+
+class WatchpointStop(Exception):
+    """La CPU la lanza al buscar una instrucción vigilada, antes de ejecutarla"""
+
+    def __init__(self, hit: WatchHit):
+        super().__init__(str(hit))
+        self.hit = hit
+
+
+class WatchpointTable:
+    """Watchpoints activos y páginas vigiladas por tipo de acceso"""
+
+    PAGE_SHIFT = 8
+    PAGE_SIZE = 1 << PAGE_SHIFT
+    # Accesos más largos que la CPU hace de una vez (palabra de 64 bits)
+    MAX_ACCESS = 8
+
+    def __init__(self):
+        self._watchpoints: Dict[int, Watchpoint] = {}
+        self._next_id = 1
+        # Páginas donde puede comenzar un acceso que toque un watchpoint. Los
+        # conjuntos se modifican en su lugar porque WatchBus los retiene
+        self.read_pages: set[int] = set()
+        self.write_pages: set[int] = set()
+        self.exec_pages: set[int] = set()
+        # Último acceso de datos que disparó un watchpoint (lo consume la CPU)
+        self.pending: Optional[WatchHit] = None
+        self._change_hooks: List[Callable[[], None]] = []
+
+    # === Observadores ===
+
+    def add_change_hook(self, hook: Callable[[], None]):
+        """Registra una función que se llama al agregar o quitar watchpoints"""
+        if hook not in self._change_hooks:
+            self._change_hooks.append(hook)
+
+    def remove_change_hook(self, hook: Callable[[], None]):
+        """Elimina un observador registrado con add_change_hook"""
+        if hook in self._change_hooks:
+            self._change_hooks.remove(hook)
+
+    # === Gestión ===
+
+    def add(self, start: int, size: int = 8, kinds: int = WATCH_WRITE) -> Watchpoint:
+        """
+        Vigila los bytes [start, start + size)
+
+        Raises:
+            ValueError: Si el rango o el tipo no son válidos
+        """
+        if start < 0 or size <= 0:
+            raise ValueError(
+                f"Rango de watchpoint inválido: 0x{max(start, 0):08X} (+{size} bytes)"
+            )
+        if not kinds or kinds & ~(WATCH_READ | WATCH_WRITE | WATCH_EXEC):
+            raise ValueError(f"Tipo de watchpoint inválido: {kinds}")
+        watchpoint = Watchpoint(self._next_id, start, start + size - 1, kinds)
+        self._watchpoints[watchpoint.id] = watchpoint
+        self._next_id += 1
+        self._rebuild()
+        return watchpoint
+
+    def remove(self, watch_id: int):
+        """
+        Quita el watchpoint con ese id
+
+        Raises:
+            KeyError: Si no existe
+        """
+        del self._watchpoints[watch_id]
+        self._rebuild()
+
+    def clear(self):
+        """Quita todos los watchpoints"""
+        if not self._watchpoints:
+            return
+        self._watchpoints.clear()
+        self.pending = None
+        self._rebuild()
+
+    def __len__(self) -> int:
+        return len(self._watchpoints)
+
+    def __iter__(self) -> Iterator[Watchpoint]:
+        return iter(sorted(self._watchpoints.values(), key=lambda wp: wp.id))
+
+    @property
+    def watches_data(self) -> bool:
+        """True si algún watchpoint vigila lecturas o escrituras"""
+        return bool(self.read_pages or self.write_pages)
+
+    # === Comprobación ===
+
+    def match(self, addr: int, size: int, kind: int) -> Optional[Watchpoint]:
+        """Primer watchpoint de tipo kind que se solapa con [addr, addr + size)"""
+        for watchpoint in self._watchpoints.values():
+            if watchpoint.kinds & kind and watchpoint.overlaps(addr, size):
+                return watchpoint
+        return None
+
+    def check(
+        self,
+        addr: int,
+        size: int,
+        kind: int,
+        value: int,
+        old_value: Optional[int] = None,
+    ) -> Optional[WatchHit]:
+        """
+        Ruta lenta: compara el acceso con los rangos y, si alguno coincide,
+        lo deja en pending (se conserva el primero hasta que la CPU lo consuma)
+        """
+        watchpoint = self.match(addr, size, kind)
+        if watchpoint is None:
+            return None
+        hit = WatchHit(watchpoint, kind, addr, size, value, old_value)
+        if self.pending is None:
+            self.pending = hit
+        return hit
+
+    # === Internos ===
+
+    def _rebuild(self):
+        pages = {WATCH_READ: set(), WATCH_WRITE: set(), WATCH_EXEC: set()}
+        for watchpoint in self._watchpoints.values():
+            # Un acceso de hasta MAX_ACCESS bytes toca el rango si comienza
+            # en [start - MAX_ACCESS + 1, end]
+            first = max(watchpoint.start - self.MAX_ACCESS + 1, 0) >> self.PAGE_SHIFT
+            last = watchpoint.end >> self.PAGE_SHIFT
+            for kind, kind_pages in pages.items():
+                if watchpoint.kinds & kind:
+                    kind_pages.update(range(first, last + 1))
+        for current, new in (
+            (self.read_pages, pages[WATCH_READ]),
+            (self.write_pages, pages[WATCH_WRITE]),
+            (self.exec_pages, pages[WATCH_EXEC]),
+        ):
+            current.clear()
+            current.update(new)
+        for hook in self._change_hooks:
+            hook()
+
+
+class WatchBus(Bus):
+    """
+    Bus que compara con los watchpoints los accesos a páginas vigiladas
+
+    Como CachedBus, ofrece la API de Memory y delega lo que no intercepta:
+    las operaciones por bloques llegan a la memoria sin comprobarse.
+    """
+
+    def __init__(self, memory, table: WatchpointTable):
+        super().__init__(memory)
+        self.table = table
+        self._shift = table.PAGE_SHIFT
+        self._read_pages = table.read_pages
+        self._write_pages = table.write_pages
+
+    def read_word(self, addr: int) -> int:
+        value = self.memory.read_word(addr)
+        if addr >> self._shift in self._read_pages:
+            self.table.check(addr, 8, WATCH_READ, value)
+        return value
+
+    def write_word(self, addr: int, value: int):
+        if addr >> self._shift in self._write_pages:
+            old_value = self.memory.read_word(addr)
+            self.memory.write_word(addr, value)
+            self.table.check(addr, 8, WATCH_WRITE, value, old_value)
+            return
+        self.memory.write_word(addr, value)
+
+    def read_byte(self, addr: int) -> int:
+        value = self.memory.read_byte(addr)
+        if addr >> self._shift in self._read_pages:
+            self.table.check(addr, 1, WATCH_READ, value)
+        return value
+
+    def write_byte(self, addr: int, value: int):
+        if addr >> self._shift in self._write_pages:
+            old_value = self.memory.read_byte(addr)
+            self.memory.write_byte(addr, value)
+            self.table.check(addr, 1, WATCH_WRITE, value & 0xFF, old_value)
+            return
+        self.memory.write_byte(addr, value)
+
+    def __getattr__(self, name: str):
+        return getattr(self.memory, name)
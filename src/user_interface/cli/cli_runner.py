@@ -7,6 +7,7 @@ Linker/Loader, and run them with optional auto-start via the .exec map.
 """
 
 import argparse
+import itertools
 import math
 import os
 from typing import Optional
@@ -14,7 +15,14 @@ from typing import Optional
 import src.user_interface.logging.logger as logger
 from src.assembler.assembler import Assembler
 from src.cpu.cpu import CPU
+from src.cpu.io_ports import FileInputProvider, StdinInputProvider, StdoutSink
+from src.cpu.profiler import SourceMap
+from src.memory.cache import parse_cache_spec
+from src.memory.file_window import parse_window_spec
 from src.memory.Linker_Loader import Linker, Loader
+from src.memory.memory import Memory, export_memory, import_memory, iter_raw
+from src.memory.regions import extents_from_addresses
+from src.memory.scanner import HAVE_NUMPY, MemoryScanner
 from src.user_interface.cli import color, help_module, messages
 from src.user_interface.cli.table_formater import Table
 
@@ -139,6 +147,17 @@ def _peek_img_word_addrs(path: str) -> set[int]:
 # -----------------------------
 
 
+def _report_watch_hit(cpu) -> bool:
+    """Muestra el watchpoint que detuvo la CPU; retorna False si no hubo"""
+    hit = getattr(cpu, "watch_hit", None)
+    if hit is None:
+        return False
+    print(color.Color.YELLOW)
+    print(f"Detenido: {hit}")
+    print(color.Color.RESET_COLOR)
+    return True
+
+
 def _prompt_int(message: str, allow_cancel: bool = True) -> Optional[int]:
     """Solicita un entero en decimal o hex (0x..). Retorna None si se cancela."""
     while True:
@@ -172,31 +191,43 @@ def assemble(input_path: str, output_path: str):
     print(f"OK -> {output_path}")
 
 
-def load_img(cpu: CPU, path: str):
+def load_img(cpu: CPU, path: str, replace: bool = False):
     """Validate and load a .img image into CPU memory using the Loader.
 
     Returns (min_addr, max_addr) of written addresses and sets cpu.exec_map if
-    a .exec sidecar file exists.
+    a .exec sidecar file exists. The image's extents are registered in
+    cpu.regions before writing: an overlap raises ValueError without touching
+    memory, unless replace is True, in which case the overlapped regions are
+    dropped and reported.
     """
     logger_handler.info(
         "validando y cargando la umagen a a memoria por medio del cargador"
     )
     Linker.revisar_img(path)
-    min_addr, max_addr = Loader.leer_img(cpu.mem, path)
-    # Registrar palabras ocupadas por este img
-    try:
-        # Reparse to get exact word addresses written (avoids changing loader)
-        for addr in _peek_img_word_addrs(path):
-            cpu.occupied_words.add(addr)
-    except Exception:
-        pass
-    # Registrar segmento cargado para detectar colisiones y hacer core dumps útiles
+    # Registrar los tramos en el registro de regiones (colisiones, piso de la
+    # pila y core dumps) antes de escribir, como Loader.cargar_programa
+    extents = extents_from_addresses(_peek_img_word_addrs(path))
+    replaced = set()
+    if replace:
+        replaced = {
+            region
+            for start, end in extents
+            for region in cpu.regions.overlapping(start, end)
+        }
+    regions = cpu.regions.add_extents(
+        extents, os.path.basename(path), evict=replace
+    )
+    for region in sorted(replaced, key=lambda r: r.start):
+        print(color.Color.YELLOW)
+        print(f"Región reemplazada por la imagen: {region}")
+        print(color.Color.RESET_COLOR)
     try:
-        prog_name = os.path.basename(path)
-        cpu.segments.append((min_addr or 0, (max_addr or 0) + 7, prog_name))
-        cpu.current_program = path
+        min_addr, max_addr = Loader.leer_img(cpu.mem, path)
     except Exception:
-        pass
+        for region in regions:
+            cpu.regions.remove(region)
+        raise
+    cpu.current_program = path
     exec_path = path + ".exec"
     if os.path.exists(exec_path):
         exec_addrs = set()
@@ -218,29 +249,72 @@ def load_img(cpu: CPU, path: str):
     return min_addr, max_addr
 
 
-def run_image(img_path: str, start_addr: int | None = None, step: bool = False):
-    """Create a CPU, load the image, and run. Auto-start using .exec if present."""
+def run_image(
+    img_path: str,
+    start_addr: int | None = None,
+    step: bool = False,
+    trace_path: str | None = None,
+    profile: str | None = None,
+    source_path: str | None = None,
+    mem_file: str | None = None,
+    cache_spec: str | None = None,
+    input_path: str | None = None,
+    map_files: list[str] | None = None,
+):
+    """Create a CPU, load the image, and run. Auto-start using .exec if present.
+
+    If trace_path is given, a binary execution trace is recorded there. If
+    profile is "exact" or "sampling", a profile report is printed and saved as
+    <img>.profile.json; source_path (default: sibling .asm) maps PCs to lines.
+    If mem_file is given, guest RAM is mmap'ed onto that file and left there
+    after the run (an existing file keeps its size, a new one gets 64 KiB).
+    If cache_spec is given ("" for defaults), the cache simulator is attached
+    and its hit/miss report is printed at the end.
+    IN reads lines from input_path if given (scripted run), else from stdin.
+    Each map_files entry ("path[@base][,ro]") maps a host file above RAM so
+    LD/ST reach it directly; files are flushed and unmapped at the end.
+    """
     logger_handler.info("Ejecución de una imagen")
-    cpu = CPU(memory_size=65536)
+    memory = None
+    if mem_file:
+        size = None if os.path.isfile(mem_file) else 65536
+        memory = Memory(size_bytes=size, backing_file=mem_file)
+    cpu = CPU(memory_size=65536, memory=memory)
+    cpu.io_ports.set_output_sink(StdoutSink())
+    cpu.io_ports.set_input_provider(
+        FileInputProvider(input_path) if input_path else StdinInputProvider()
+    )
     min_addr, _ = load_img(cpu, img_path)
+    for spec in map_files or ():
+        path, base, read_only = parse_window_spec(spec)
+        print(f"Ventana: {Loader.mapear_archivo(cpu, path, base, read_only)}")
     if start_addr is None:
-        if getattr(cpu, "exec_map", None):
-            cpu.pc = min(cpu.exec_map)
+        if cpu.exec_map:
+            cpu.pc = cpu.exec_map.next_executable(0)
         else:
             cpu.pc = min_addr or 0
     else:
         start = start_addr
-        if getattr(cpu, "exec_map", None) and start not in cpu.exec_map:
-            try:
-                start = min(a for a in cpu.exec_map if a >= start)
-            except ValueError:
-                start = min(cpu.exec_map)
+        if cpu.exec_map and start not in cpu.exec_map:
+            next_exec = cpu.exec_map.next_executable(start)
+            if next_exec is None:
+                next_exec = cpu.exec_map.next_executable(0)
+            start = next_exec
         cpu.pc = start
+    if trace_path:
+        cpu.start_trace(trace_path)
+    if profile:
+        cpu.start_profiler(profile)
+    if cache_spec is not None:
+        cpu.enable_cache(**parse_cache_spec(cache_spec))
     try:
         if step and hasattr(cpu, "run"):
             cpu.run_cycles()
-        elif hasattr(cpu, "run"):
-            cpu.run()
+        else:
+            result = cpu.run_fast()
+            print(result.summary())
+            if result.fault is not None:
+                raise RuntimeError(str(result.fault))
     except RuntimeError as e:
         # Segmentation fault / core dump
         print(color.Color.ROJO)
@@ -252,9 +326,42 @@ def run_image(img_path: str, start_addr: int | None = None, step: bool = False):
             print(f"Core dump: {binp} | {txtp}")
         except Exception:
             pass
+    finally:
+        cpu.io_ports.flush_output()
+        cpu.io_ports.set_input_provider(None)
+        if cpu.tracer is not None:
+            print(f"Traza: {cpu.tracer.path}")
+            cpu.stop_trace()
+        if cpu.profiler is not None:
+            _report_profile(cpu.stop_profiler(), img_path, source_path)
+        if cpu.cache_sim is not None:
+            print(cpu.disable_cache().report_text())
+        for window in list(cpu.file_windows):
+            cpu.unmap_file(window)
+        if memory is not None:
+            memory.close()
+            print(f"Memoria: {mem_file}")
     print("Fin de ejecución")
 
 
+def _report_profile(profiler, img_path: str, source_path: str | None = None):
+    """Print the profile report and save it as JSON next to the image."""
+    if source_path is None:
+        candidate = os.path.splitext(img_path)[0] + ".asm"
+        source_path = candidate if os.path.exists(candidate) else None
+    source_map = None
+    if source_path:
+        try:
+            source_map = SourceMap.from_asm_file(source_path)
+        except Exception as e:
+            print(f"No se pudo asociar el fuente {source_path}: {e}")
+    print(profiler.report_text(source_map))
+    json_path = img_path + ".profile.json"
+    with open(json_path, "w", encoding="utf-8") as f:
+        f.write(profiler.report_json(source_map))
+    print(f"Perfil JSON: {json_path}")
+
+
 # -----------------------------
 # UI helpers
 # -----------------------------
@@ -346,6 +453,13 @@ def _prompt_yes_no(
 
 def parse_cli_args():
     parser = argparse.ArgumentParser(prog="main.py", description="Assembler/Runner CLI")
+    parser.add_argument(
+        "--log-level",
+        type=str.upper,
+        choices=logger.NIVELES,
+        default=None,
+        help="Verbosidad del archivo de log (DEBUG registra cada operación de la ALU)",
+    )
     sub = parser.add_subparsers(dest="cmd", required=False)
 
     p_asm = sub.add_parser("asm", help="Ensambla .asm a .img")
@@ -357,11 +471,49 @@ def parse_cli_args():
     p_run.add_argument(
         "--start", default="auto", help="PC inicial (ej. 0x4E20 o 'auto')"
     )
+    p_run.add_argument(
+        "--trace", default=None, help="Graba una traza binaria (.trace)"
+    )
+    p_run.add_argument(
+        "--profile",
+        choices=["exact", "sampling"],
+        default=None,
+        help="Perfila la ejecución por PC/opcode",
+    )
+    p_run.add_argument("--asm", default=None, help="Fuente .asm para el perfil")
+    p_run.add_argument(
+        "--mem-file", default=None, help="Mapea la RAM sobre este archivo (mmap)"
+    )
+    p_run.add_argument(
+        "--cache",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="SPEC",
+        help="Simula cachés (ej. 'l1d=4K/2/64,l2=32K/8/64,policy=plru')",
+    )
+    p_run.add_argument(
+        "--input-file",
+        default=None,
+        help="Archivo de texto que responde a las lecturas IN (sin interacción)",
+    )
+    p_run.add_argument(
+        "--map-file",
+        action="append",
+        default=None,
+        metavar="RUTA[@BASE][,ro]",
+        help="Mapea un archivo por encima de la RAM para leerlo con LD/ST",
+    )
 
     p_both = sub.add_parser("asmrun", help="Ensambla y ejecuta")
     p_both.add_argument("-i", "--input", required=False)
     p_both.add_argument("-o", "--output", required=False)
     p_both.add_argument("--start", default="auto")
+    p_both.add_argument("--profile", choices=["exact", "sampling"], default=None)
+    p_both.add_argument("--mem-file", default=None)
+    p_both.add_argument("--cache", nargs="?", const="", default=None)
+    p_both.add_argument("--input-file", default=None)
+    p_both.add_argument("--map-file", action="append", default=None)
 
     # Editor de memoria interactivo
     sub.add_parser(
@@ -407,7 +559,17 @@ def handle_subcommands(args) -> bool:
                 start = int(start_arg, 0)
             except Exception:
                 start = None
-        run_image(img_in, start)
+        run_image(
+            img_in,
+            start,
+            trace_path=args.trace,
+            profile=args.profile,
+            source_path=args.asm,
+            mem_file=args.mem_file,
+            cache_spec=args.cache,
+            input_path=args.input_file,
+            map_files=args.map_file,
+        )
         return True
     if args.cmd == "asmrun":
         in_raw = args.input or _prompt_existing_file(
@@ -427,7 +589,16 @@ def handle_subcommands(args) -> bool:
         out_path = _normalize_output_img(out_raw)
         assemble(in_path, out_path)
         start = None if str(args.start).lower() == "auto" else int(args.start, 0)
-        run_image(out_path, start)
+        run_image(
+            out_path,
+            start,
+            profile=args.profile,
+            source_path=in_path,
+            mem_file=args.mem_file,
+            cache_spec=args.cache,
+            input_path=args.input_file,
+            map_files=args.map_file,
+        )
         return True
     if args.cmd == "mem":
         run_memory_editor()
@@ -438,6 +609,8 @@ def handle_subcommands(args) -> bool:
 def run_cli():
     """Entry point for the application: subcommands or interactive loop."""
     args = parse_cli_args()
+    if args.log_level:
+        logger.establecer_nivel(args.log_level)
     if handle_subcommands(args):
         return
     menu = messages.Messages()
@@ -624,6 +797,8 @@ def run_memory_editor():
             ["4", "Exec map"],
             ["5", "CPU (PC/Ejecutar)"],
             ["6", "Exportar/Importar"],
+            ["7", "Buscar / escanear valores"],
+            ["8", "Watchpoints"],
             ["9", "Volver"],
         ]
     )
@@ -640,19 +815,36 @@ def run_memory_editor():
                 ["2", "Leer palabra 64-bit"],
                 ["3", "Leer bit"],
                 ["4", "Hexdump (rango)"],
-                ["5", "Hexdump (memoria completa)"],
+                ["5", "Hexdump (memoria completa, sin páginas en cero)"],
                 ["9", "Volver"],
             ]
         )
 
-        def _hexdump(start: int, length: int, cols: int = 16):
-            end = min(start + length, cpu.mem.size)
-            data = cpu.mem.data[start:end]
+        def _hexdump_lines(base: int, data: bytes, cols: int = 16):
             for off in range(0, len(data), cols):
                 chunk = data[off : off + cols]
                 hexs = " ".join(f"{b:02X}" for b in chunk)
                 ascii_part = "".join(chr(b) if 32 <= b < 127 else "." for b in chunk)
-                print(f"{start + off:08X}: {hexs:<{cols * 3}}  |{ascii_part}|")
+                print(f"{base + off:08X}: {hexs:<{cols * 3}}  |{ascii_part}|")
+
+        def _hexdump(start: int, length: int, cols: int = 16):
+            # Por páginas: no copia el rango completo de una vez
+            addr = start
+            end = min(start + length, cpu.mem.size)
+            for chunk in iter_raw(cpu.mem, start, end):
+                _hexdump_lines(addr, chunk, cols)
+                addr += len(chunk)
+
+        def _hexdump_full(cols: int = 16):
+            # Solo páginas con datos; '*' marca tramos en cero omitidos
+            expected = 0
+            for addr, page in cpu.mem.nonzero_pages():
+                if addr != expected:
+                    print("*")
+                _hexdump_lines(addr, page, cols)
+                expected = addr + len(page)
+            if expected != cpu.mem.size:
+                print("*")
 
         while True:
             print(color.Color.CYAN)
@@ -720,7 +912,7 @@ def run_memory_editor():
                     or "n"
                 ).lower()
                 if resp.startswith("s"):
-                    _hexdump(0, cpu.mem.size)
+                    _hexdump_full()
             else:
                 print("Opción inválida")
 
@@ -811,8 +1003,7 @@ def run_memory_editor():
                     continue
                 try:
                     data = bytes.fromhex(norm)
-                    cpu.mem._check_addr(base, len(data))
-                    cpu.mem.data[base : base + len(data)] = data
+                    cpu.mem.write_bytes(base, data)
                     print(f"OK: {len(data)} bytes escritos en 0x{base:X}")
                 except Exception as e:
                     print(color.Color.ROJO)
@@ -830,8 +1021,7 @@ def run_memory_editor():
                     continue
                 try:
                     val_b = bytes([val & 0xFF])
-                    cpu.mem._check_addr(start, max(0, length))
-                    cpu.mem.data[start : start + length] = val_b * length
+                    cpu.mem.write_bytes(start, val_b * max(0, length))
                     print("OK: rango rellenado")
                 except Exception as e:
                     print(color.Color.ROJO)
@@ -848,10 +1038,7 @@ def run_memory_editor():
                 if word_val is None:
                     continue
                 try:
-                    nbytes = max(0, count) * 8
-                    cpu.mem._check_addr(start, nbytes)
-                    pattern = (word_val & 0xFFFFFFFFFFFFFFFF).to_bytes(8, "little")
-                    cpu.mem.data[start : start + nbytes] = pattern * max(0, count)
+                    cpu.mem.write_words(start, [word_val] * max(0, count))
                     print("OK: rango rellenado con palabras")
                 except Exception as e:
                     print(color.Color.ROJO)
@@ -870,8 +1057,7 @@ def run_memory_editor():
                 try:
                     with open(path, "rb") as f:
                         data = f.read()
-                    cpu.mem._check_addr(base, len(data))
-                    cpu.mem.data[base : base + len(data)] = data
+                    cpu.mem.write_bytes(base, data)
                     print(f"OK: {len(data)} bytes escritos en 0x{base:X}")
                 except Exception as e:
                     print(color.Color.ROJO)
@@ -905,7 +1091,11 @@ def run_memory_editor():
                 addr = _prompt_int("Dirección ejecutable: ")
                 if addr is None:
                     continue
-                cpu.exec_map.add(addr)
+                try:
+                    cpu.exec_map.add(addr)
+                except ValueError as e:
+                    print(f"Error: {e}")
+                    continue
                 print("OK: dirección añadida a exec_map")
             elif sub == "2":
                 start = _prompt_int("Inicio del rango: ")
@@ -917,14 +1107,17 @@ def run_memory_editor():
                 if fin < start:
                     print("Rango inválido")
                 else:
-                    for a in range(start, fin + 1, 8):
-                        cpu.exec_map.add(a)
+                    try:
+                        cpu.exec_map.add_range(start, fin)
+                    except ValueError as e:
+                        print(f"Error: {e}")
+                        continue
                     print("OK: rango añadido a exec_map (paso 8)")
             elif sub == "3":
                 cpu.exec_map.clear()
                 print("OK: exec_map limpiado")
             elif sub == "4":
-                preview = sorted(list(cpu.exec_map))[:50]
+                preview = list(itertools.islice(cpu.exec_map, 50))
                 print(f"Exec count: {len(cpu.exec_map)}  |  Preview: {preview}")
             else:
                 print("Opción inválida")
@@ -963,7 +1156,8 @@ def run_memory_editor():
                             cpu.step()
                             if getattr(cpu, "halted", False):
                                 break
-                    print("Fin de ejecución")
+                    if not _report_watch_hit(cpu):
+                        print("Fin de ejecución")
                 except Exception as e:
                     print(color.Color.ROJO)
                     print(f"Error en ejecución: {e}")
@@ -978,9 +1172,10 @@ def run_memory_editor():
                     else:
                         for _ in range(max(0, n)):
                             cpu.step()
-                            if getattr(cpu, "halted", False):
+                            if getattr(cpu, "halted", False) or cpu.watch_hit:
                                 break
-                    print("Step completado")
+                    if not _report_watch_hit(cpu):
+                        print("Step completado")
                 except Exception as e:
                     print(color.Color.ROJO)
                     print(f"Error en step: {e}")
@@ -988,6 +1183,185 @@ def run_memory_editor():
             else:
                 print("Opción inválida")
 
+    def submenu_watch():
+        watch_menu = Table(
+            messages.Messages().columns, messages.Messages().rows, "Watchpoints"
+        )
+        watch_menu.add_encabezado(["Opción", "Acción"])
+        watch_menu.add_filas(
+            [
+                ["1", "Agregar watchpoint (lectura/escritura/ejecución)"],
+                ["2", "Quitar watchpoint"],
+                ["3", "Listar watchpoints"],
+                ["4", "Quitar todos"],
+                ["5", "Continuar hasta el próximo watchpoint"],
+                ["9", "Volver"],
+            ]
+        )
+        while True:
+            print(color.Color.CYAN)
+            watch_menu.print_table()
+            print(color.Color.RESET_COLOR)
+            sub = input("watch>> ").strip()
+            if sub in ("9", "back", "menu"):
+                break
+            try:
+                if sub == "1":
+                    start = _prompt_int("Dirección inicial: ")
+                    if start is None:
+                        continue
+                    size = _prompt_int("Tamaño en bytes (8 = una palabra): ")
+                    if size is None:
+                        continue
+                    kinds = _prompt_until_non_empty(
+                        "Tipo [r]lectura/[w]escritura/[x]ejecución (ej. rw): ",
+                        allow_cancel=True,
+                    )
+                    if kinds is None:
+                        continue
+                    watchpoint = cpu.add_watchpoint(start, size, kinds)
+                    print(f"OK: watchpoint {watchpoint}")
+                elif sub == "2":
+                    watch_id = _prompt_int("Id del watchpoint: ")
+                    if watch_id is None:
+                        continue
+                    cpu.remove_watchpoint(watch_id)
+                    print(f"OK: watchpoint #{watch_id} quitado")
+                elif sub == "3":
+                    if not len(cpu.watchpoints):
+                        print("No hay watchpoints")
+                    for watchpoint in cpu.watchpoints:
+                        print(f"  {watchpoint}")
+                elif sub == "4":
+                    cpu.clear_watchpoints()
+                    print("OK: watchpoints eliminados")
+                elif sub == "5":
+                    result = cpu.run_fast()
+                    if result.fault is not None:
+                        print(color.Color.ROJO)
+                        print(f"Error en ejecución: {result.fault}")
+                        print(color.Color.RESET_COLOR)
+                    elif not _report_watch_hit(cpu):
+                        print(f"Sin watchpoints alcanzados: {result.summary()}")
+                else:
+                    print("Opción inválida")
+            except Exception as e:
+                print(color.Color.ROJO)
+                print(f"Error: {e}")
+                print(color.Color.RESET_COLOR)
+
+    # El escáner se conserva entre visitas al submenú para poder ejecutar
+    # la CPU entre un escaneo y el siguiente
+    scan_state = {"scanner": None}
+
+    def submenu_scan():
+        scan_menu = Table(
+            messages.Messages().columns, messages.Messages().rows, "Buscar / escanear"
+        )
+        scan_menu.add_encabezado(["Opción", "Acción"])
+        scan_menu.add_filas(
+            [
+                ["1", "Buscar bytes (hex)"],
+                ["2", "Buscar valor 64-bit"],
+                ["3", "Buscar secuencia de valores 64-bit"],
+                ["4", "Nuevo escaneo (valor exacto o desconocido)"],
+                ["5", "Siguiente escaneo (cambió/igual/aumentó/disminuyó/=valor)"],
+                ["6", "Ver candidatos"],
+                ["9", "Volver"],
+            ]
+        )
+
+        def _print_addrs(addrs):
+            print(f"{len(addrs)} coincidencias")
+            for a in addrs[:20]:
+                print(f"  0x{a:08X}")
+            if len(addrs) > 20:
+                print("  ...")
+
+        while True:
+            print(color.Color.CYAN)
+            scan_menu.print_table()
+            motor = "NumPy" if HAVE_NUMPY else "Python"
+            print(f"Motor: {motor}")
+            print(color.Color.RESET_COLOR)
+            sub = input("scan>> ").strip()
+            if sub in ("9", "back", "menu"):
+                break
+            try:
+                if sub == "1":
+                    hx = _prompt_until_non_empty("Bytes (hex): ", allow_cancel=True)
+                    if hx is None:
+                        continue
+                    pattern = bytes.fromhex(hx.replace("0x", "").replace(" ", ""))
+                    _print_addrs(MemoryScanner(cpu.mem).find_bytes(pattern))
+                elif sub == "2":
+                    value = _prompt_int("Valor [dec/hex]: ")
+                    if value is None:
+                        continue
+                    _print_addrs(MemoryScanner(cpu.mem).find_value(value))
+                elif sub == "3":
+                    raw = _prompt_until_non_empty(
+                        "Valores separados por coma: ", allow_cancel=True
+                    )
+                    if raw is None:
+                        continue
+                    values = [int(v.strip(), 0) for v in raw.split(",") if v.strip()]
+                    _print_addrs(MemoryScanner(cpu.mem).find_values(values))
+                elif sub == "4":
+                    raw = _prompt_until_non_empty(
+                        "Valor exacto (vacío o '?' = desconocido): ",
+                        allow_cancel=True,
+                    )
+                    if raw is None:
+                        continue
+                    scanner = MemoryScanner(cpu.mem)
+                    value = None if raw.strip() in ("", "?") else int(raw, 0)
+                    n = scanner.first_scan(value)
+                    scan_state["scanner"] = scanner
+                    print(f"OK: {n} candidatos")
+                elif sub == "5":
+                    scanner = scan_state["scanner"]
+                    if scanner is None:
+                        print("Primero haga un nuevo escaneo (opción 4)")
+                        continue
+                    raw = _prompt_until_non_empty(
+                        "Modo [c]ambió/[i]gual/[a]umentó/[d]isminuyó/=valor: ",
+                        allow_cancel=True,
+                    )
+                    if raw is None:
+                        continue
+                    raw = raw.strip().lower()
+                    if raw.startswith("="):
+                        n = scanner.next_scan("exact", int(raw[1:], 0))
+                    else:
+                        modes = {
+                            "c": "changed",
+                            "i": "unchanged",
+                            "a": "increased",
+                            "d": "decreased",
+                        }
+                        if raw[:1] not in modes:
+                            print("Modo inválido")
+                            continue
+                        n = scanner.next_scan(modes[raw[:1]])
+                    print(f"OK: {n} candidatos")
+                elif sub == "6":
+                    scanner = scan_state["scanner"]
+                    if scanner is None:
+                        print("No hay escaneo activo")
+                        continue
+                    print(f"{scanner.count} candidatos")
+                    for addr, value in scanner.candidates(limit=20):
+                        print(f"  0x{addr:08X} = {value} (0x{value:016X})")
+                    if scanner.count > 20:
+                        print("  ...")
+                else:
+                    print("Opción inválida")
+            except Exception as e:
+                print(color.Color.ROJO)
+                print(f"Error: {e}")
+                print(color.Color.RESET_COLOR)
+
     def submenu_export():
         exp_menu = Table(
             messages.Messages().columns, messages.Messages().rows, "Exportar/Importar"
@@ -995,11 +1369,12 @@ def run_memory_editor():
         exp_menu.add_encabezado(["Opción", "Acción"])
         exp_menu.add_filas(
             [
-                ["1", "Volcar rango (.bin)"],
-                ["2", "Volcar memoria completa (.bin)"],
+                ["1", "Volcar rango (.bin/.hex/.srec/.sparse)"],
+                ["2", "Volcar memoria completa (.bin/.hex/.srec/.sparse)"],
                 ["3", "Guardar exec_map (.exec)"],
                 ["4", "Cargar exec_map (.exec)"],
                 ["5", "Cargar exec asociado al .img"],
+                ["6", "Importar volcado (.bin/.hex/.srec/.sparse)"],
                 ["9", "Volver"],
             ]
         )
@@ -1018,29 +1393,29 @@ def run_memory_editor():
                 if length is None:
                     continue
                 out_path = _prompt_until_non_empty(
-                    "Ruta de salida (.bin): ", allow_cancel=True
+                    "Ruta de salida (.bin/.hex/.srec/.sparse): ", allow_cancel=True
                 )
                 if out_path is None:
                     continue
                 try:
                     cpu.mem._check_addr(start, max(0, length))
-                    with open(out_path, "wb") as f:
-                        f.write(cpu.mem.data[start : start + length])
-                    print("OK: rango volcado")
+                    n = export_memory(
+                        cpu.mem, out_path, start=start, end=start + length
+                    )
+                    print(f"OK: rango volcado ({n} bytes en el archivo)")
                 except Exception as e:
                     print(color.Color.ROJO)
                     print(f"Error: {e}")
                     print(color.Color.RESET_COLOR)
             elif sub == "2":
                 out_path = _prompt_until_non_empty(
-                    "Ruta de salida (.bin): ", allow_cancel=True
+                    "Ruta de salida (.bin/.hex/.srec/.sparse): ", allow_cancel=True
                 )
                 if out_path is None:
                     continue
                 try:
-                    with open(out_path, "wb") as f:
-                        f.write(cpu.mem.data)
-                    print("OK: memoria completa volcada")
+                    n = export_memory(cpu.mem, out_path)
+                    print(f"OK: memoria completa volcada ({n} bytes en el archivo)")
                 except Exception as e:
                     print(color.Color.ROJO)
                     print(f"Error: {e}")
@@ -1104,6 +1479,25 @@ def run_memory_editor():
                     print(color.Color.ROJO)
                     print(f"Error: {e}")
                     print(color.Color.RESET_COLOR)
+            elif sub == "6":
+                in_path = _prompt_until_non_empty(
+                    "Ruta del volcado (.bin/.hex/.srec/.sparse): ", allow_cancel=True
+                )
+                if in_path is None or not os.path.exists(in_path):
+                    print("Ruta inválida")
+                    continue
+                base = 0
+                if in_path.lower().endswith((".bin", ".raw")):
+                    base = _prompt_int("Dirección base (byte): ")
+                    if base is None:
+                        continue
+                try:
+                    n = import_memory(cpu.mem, in_path, base=base)
+                    print(f"OK: {n} bytes cargados")
+                except Exception as e:
+                    print(color.Color.ROJO)
+                    print(f"Error: {e}")
+                    print(color.Color.RESET_COLOR)
             else:
                 print("Opción inválida")
 
@@ -1129,25 +1523,20 @@ def run_memory_editor():
             try:
                 # Validar imagen y calcular rango SIN escribir memoria
                 Linker.revisar_img(img)
-                # Precise occupied word addresses for the new image
-                new_words = _peek_img_word_addrs(img)
-                # Check precise collision with previously occupied words
-                conflict_words = new_words.intersection(
-                    getattr(cpu, "occupied_words", set())
-                )
-                has_collision = len(conflict_words) > 0
+                # Tramos que ocuparía la imagen, comparados con las regiones
+                # ya registradas (O(log n) por tramo)
+                extents = extents_from_addresses(_peek_img_word_addrs(img))
+                conflicts = {
+                    region
+                    for start, end in extents
+                    for region in cpu.regions.overlapping(start, end)
+                }
+                has_collision = len(conflicts) > 0
                 if has_collision:
-                    # Show a compact preview of collisions
-                    preview = sorted(list(conflict_words))[:5]
                     print(color.Color.ROJO)
-                    if cpu.segments:
-                        # Report against first overlapping segment for context
-                        print(
-                            "Colisión de segmentos detectada (direcciones de palabra ya ocupadas)"
-                        )
-                    print(
-                        f"Ejemplos de colisión en: {[f'0x{a:08X}' for a in preview]} (total {len(conflict_words)})"
-                    )
+                    print("Colisión con regiones ya ocupadas:")
+                    for region in sorted(conflicts, key=lambda r: r.start)[:5]:
+                        print(f"  {region}")
                     print(
                         "Sugerencia: cargue en una dirección diferente o cambie el .img"
                     )
@@ -1160,8 +1549,9 @@ def run_memory_editor():
                     )
                     if resp is not True:
                         continue
-                # Cargar (destructivo) y registrar segmento
-                min_a, max_a = load_img(cpu, img)
+                # Cargar (destructivo) y registrar segmento; con la colisión
+                # confirmada la imagen reemplaza a las regiones solapadas
+                min_a, max_a = load_img(cpu, img, replace=has_collision)
                 if not exec_present:
                     # Si no hay .exec asociado, limpiar para evitar residuos
                     cpu.exec_map = set()
@@ -1174,7 +1564,7 @@ def run_memory_editor():
                         allow_cancel=True,
                     )
                     if resp is True:
-                        cpu.pc = min(cpu.exec_map)
+                        cpu.pc = cpu.exec_map.next_executable(0)
                         print(f"PC = 0x{cpu.pc:X}")
                 else:
                     print(
@@ -1194,5 +1584,9 @@ def run_memory_editor():
             submenu_cpu()
         elif cmd == "6":
             submenu_export()
+        elif cmd == "7":
+            submenu_scan()
+        elif cmd == "8":
+            submenu_watch()
         else:
             print("Opción inválida")
@@ -1,4 +1,5 @@
 import customtkinter as ctk
+from customtkinter import filedialog
 from PIL import Image
 
 from ..func import cpu_control
@@ -11,6 +12,8 @@ class BotonesAcciones(ctk.CTkFrame):
         self.columnconfigure(0, weight=1)
         self.rowconfigure(0, weight=1)
         self.rowconfigure(1, weight=1)
+        self.rowconfigure(2, weight=1)
+        self.rowconfigure(3, weight=1)
         self.imagen_siguiente = kwargs.get("imagen_siguiente", "")
         self.imagen_reiniciar = kwargs.get("reiniciar_imagen", "")
         self.cpu = kwargs.get("cpu", None)
@@ -22,6 +25,8 @@ class BotonesAcciones(ctk.CTkFrame):
 
         self.__boton_siguiente_instruccion()
         self.__boton_reiniciar()
+        self.__boton_perfil()
+        self.__boton_watchpoints()
 
     def __boton_siguiente_instruccion(self):
         siguiente_image = ctk.CTkImage(
@@ -61,6 +66,138 @@ class BotonesAcciones(ctk.CTkFrame):
         )
         boton_reiniciar.grid(column=0, row=1, sticky="nsew")
 
+    def __boton_perfil(self):
+        self.boton_perfil = ctk.CTkButton(
+            self,
+            text="Iniciar perfil",
+            fg_color="#4C44AC",
+            text_color="white",
+            corner_radius=50,
+            font=("Comic Sans MS", 16, "bold"),
+            command=self.__toggle_profiler,
+        )
+        self.boton_perfil.grid(column=0, row=2, sticky="nsew")
+
+    def __boton_watchpoints(self):
+        boton_watchpoints = ctk.CTkButton(
+            self,
+            text="Watchpoints",
+            fg_color="#4C44AC",
+            text_color="white",
+            corner_radius=50,
+            font=("Comic Sans MS", 16, "bold"),
+            command=self.__show_watchpoints,
+        )
+        boton_watchpoints.grid(column=0, row=3, sticky="nsew")
+
+    def __show_watchpoints(self):
+        """Ventana para agregar, quitar y continuar hasta un watchpoint"""
+        if not self.cpu:
+            return
+
+        ventana = ctk.CTkToplevel(self)
+        ventana.title("Watchpoints")
+        ventana.geometry("640x420")
+        ventana.columnconfigure((0, 1, 2, 3), weight=1)
+        ventana.rowconfigure(2, weight=1)
+
+        entrada_inicio = ctk.CTkEntry(ventana, placeholder_text="Dirección (0x300)")
+        entrada_tamano = ctk.CTkEntry(ventana, placeholder_text="Bytes (8)")
+        tipo = ctk.CTkSegmentedButton(ventana, values=["w", "r", "rw", "x"])
+        tipo.set("w")
+        entrada_inicio.grid(row=0, column=0, sticky="ew", padx=5, pady=10)
+        entrada_tamano.grid(row=0, column=1, sticky="ew", padx=5, pady=10)
+        tipo.grid(row=0, column=2, sticky="ew", padx=5, pady=10)
+
+        lista = ctk.CTkTextbox(ventana, font=("Courier New", 12), wrap="none")
+        lista.grid(row=2, column=0, columnspan=4, sticky="nsew", padx=10, pady=10)
+
+        def refrescar(mensaje=""):
+            lista.configure(state="normal")
+            lista.delete("1.0", "end")
+            lineas = [str(wp) for wp in self.cpu.watchpoints]
+            if mensaje:
+                lineas += ["", mensaje]
+            lista.insert("1.0", "\n".join(lineas) or "No hay watchpoints")
+            lista.configure(state="disabled")
+
+        def agregar():
+            try:
+                cpu_control.add_watchpoint(
+                    self.cpu, entrada_inicio.get(), entrada_tamano.get(), tipo.get()
+                )
+                refrescar()
+            except ValueError as e:
+                refrescar(f"Error: {e}")
+
+        def quitar():
+            try:
+                self.cpu.remove_watchpoint(int(entrada_inicio.get().lstrip("#"), 0))
+                refrescar()
+            except ValueError as e:
+                refrescar(f"Error: {e} (escriba el id en el primer campo)")
+
+        def continuar():
+            if self.console_frame and self.console_frame.waiting_for_input:
+                return
+            hit = cpu_control.continue_until_watchpoint(
+                self.cpu, self.update_callback
+            )
+            refrescar(f"Detenido: {hit}" if hit else "Sin watchpoints alcanzados")
+
+        ctk.CTkButton(ventana, text="Agregar", command=agregar).grid(
+            row=0, column=3, padx=5, pady=10
+        )
+        ctk.CTkButton(ventana, text="Quitar (id)", command=quitar).grid(
+            row=1, column=0, padx=5
+        )
+        ctk.CTkButton(
+            ventana,
+            text="Quitar todos",
+            command=lambda: (self.cpu.clear_watchpoints(), refrescar()),
+        ).grid(row=1, column=1, padx=5)
+        ctk.CTkButton(ventana, text="Continuar", command=continuar).grid(
+            row=1, column=3, padx=5
+        )
+        refrescar()
+
+    def __toggle_profiler(self):
+        """Inicia el perfilador o muestra su informe"""
+        if not self.cpu:
+            return
+
+        reports = cpu_control.toggle_profiler(self.cpu)
+        if reports is None:
+            self.boton_perfil.configure(text="Ver perfil")
+            return
+
+        self.boton_perfil.configure(text="Iniciar perfil")
+        self.__show_profile(*reports)
+
+    def __show_profile(self, text_report, json_report):
+        ventana = ctk.CTkToplevel(self)
+        ventana.title("Perfil de ejecución")
+        ventana.geometry("900x600")
+        ventana.columnconfigure(0, weight=1)
+        ventana.rowconfigure(0, weight=1)
+
+        texto = ctk.CTkTextbox(ventana, font=("Courier New", 12), wrap="none")
+        texto.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+        texto.insert("1.0", text_report)
+        texto.configure(state="disabled")
+
+        def guardar_json():
+            ruta = filedialog.asksaveasfilename(
+                defaultextension=".json", filetypes=(("JSON", "*.json"),)
+            )
+            if ruta:
+                with open(ruta, "w", encoding="utf-8") as f:
+                    f.write(json_report)
+
+        ctk.CTkButton(ventana, text="Guardar JSON", command=guardar_json).grid(
+            row=1, column=0, pady=(0, 10)
+        )
+
     def __execute_step(self):
         """Ejecuta un paso de instrucción"""
         if self.cpu and self.console_frame:
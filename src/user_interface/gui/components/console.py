@@ -93,6 +93,11 @@ class ConsoleFrame(ctk.CTkFrame):
         self.console_textbox.insert("end", char)
         self.console_textbox.see("end")
 
+    def append_text(self, text: str):
+        """Agrega un bloque de texto con una sola inserción (OutputSink)"""
+        self.console_textbox.insert("end", text)
+        self.console_textbox.see("end")
+
     def append_int(self, value: int):
         """Agrega un entero a la consola con newline"""
         self.console_textbox.insert("end", f"{value}\n")
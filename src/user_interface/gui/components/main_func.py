@@ -9,6 +9,7 @@ Versión: 1.0
 
 import customtkinter as ctk
 
+from src.cpu.io_ports import CallbackSink
 from src.user_interface.gui.components import (
     assembly,
     buttons_actions,
@@ -167,14 +168,29 @@ class MainFunctionalityMenu(ctk.CTkFrame):
     def __setup_io_callbacks(self):
         """Configura los callbacks de entrada/salida del CPU"""
         if self.cpu:
-            # Callbacks de salida
-            self.cpu.io_ports.set_output_char_callback(self.console_frame.append_char)
-            self.cpu.io_ports.set_output_int_callback(self.console_frame.append_int)
+            # Salida por lotes: una inserción en la consola por línea o bloque
+            # en lugar de una por carácter
+            self.cpu.io_ports.set_output_sink(
+                CallbackSink(self.console_frame.append_text)
+            )
+            self.__flush_output_periodically()
 
             # Callbacks de entrada
             self.cpu.io_ports.set_input_char_callback(self.console_frame.request_char)
             self.cpu.io_ports.set_input_int_callback(self.console_frame.request_int)
 
+    def __flush_output_periodically(self):
+        """
+        Entrega el texto que quedó en el sink sin salto de línea (p. ej. un
+        prompt al ejecutar paso a paso); el sink solo revisa su plazo al
+        recibir otra escritura
+        """
+        sink = self.cpu.io_ports.output_sink
+        if sink is not None:
+            sink.flush()
+            interval = sink.flush_interval or 0.1
+            self.after(int(interval * 1000), self.__flush_output_periodically)
+
     def __update_cpu_state(self, state):
         """
         Actualiza todos los componentes de la GUI con el estado del CPU
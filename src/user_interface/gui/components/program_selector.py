@@ -65,14 +65,14 @@ class ProgramSelectorFrame(ctk.CTkFrame):
         program = self._label_to_program.get(selected_label)
         if program and self.memory:
             # Limpiar memoria del programa
-            for addr in range(program.min_addr, program.max_addr + 1, 8):
-                self.memory.write_word(addr, 0)
+            words = (program.max_addr - program.min_addr) // 8 + 1
+            self.memory.write_words(program.min_addr, [0] * words)
             print(
                 f"Memoria limpiada: {program.min_addr // 8} - {program.max_addr // 8}"
             )
 
         # Eliminar solo esta instancia
-        CompilationRegistry.unload_program_instance(program)
+        CompilationRegistry.unload_program_instance(self.cpu, program)
         print(f"Programa '{selected_label}' descargado")
 
         # Actualizar visualización de RAM con programas restantes
@@ -43,12 +43,9 @@ class DinamicRandomAccessMemory(ctk.CTkFrame):
         start_word = min_addr // 8
         end_word = max_addr // 8
 
-        word_pos = start_word
-        while word_pos <= end_word:
-            addr = word_pos * 8
-            value = memory.read_word(addr)
+        values = memory.read_words(start_word * 8, end_word - start_word + 1)
+        for word_pos, value in enumerate(values, start_word):
             lines.append(f"{word_pos:<12} 0x{value:016X}\n")
-            word_pos += 1
 
         self.memory_textbox.insert("1.0", "".join(lines))
 
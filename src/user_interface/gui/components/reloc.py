@@ -126,7 +126,7 @@ class RelocCodeFrame(ctk.CTkFrame):
             program_name = None
 
         func.link_load(
-            self.text_entry, self.memory, self.ram_display, base_address, program_name
+            self.text_entry, self.cpu, self.ram_display, base_address, program_name
         )
         if self.program_selector:
             self.program_selector.update_program_list()
@@ -10,6 +10,8 @@ Versión: 1.0
 import customtkinter as ctk
 from PIL import Image
 
+import src.user_interface.logging.logger as logger
+
 
 class TopMenuTitleOptions(ctk.CTkFrame):
     def __init__(self, parent, height, width, **kwargs):
@@ -24,6 +26,8 @@ class TopMenuTitleOptions(ctk.CTkFrame):
         self.help = kwargs.get("help")
         self.info = kwargs.get("info")
         self.iconos_menu = [self.home, self.help, self.info]
+        self.on_log_level = kwargs.get("on_log_level")
+        self.log_level = kwargs.get("log_level", "INFO")
         self.logo_width = kwargs.get("image_width", 40)
         self.logo_height = kwargs.get("image_height", 40)
 
@@ -92,4 +96,15 @@ class TopMenuTitleOptions(ctk.CTkFrame):
             except:
                 pass
 
+        if self.on_log_level is not None:
+            contenedor_opciones.columnconfigure(len(self.iconos_menu), weight=1)
+            log_menu = ctk.CTkOptionMenu(
+                contenedor_opciones,
+                values=logger.NIVELES,
+                command=self.on_log_level,
+                width=110,
+            )
+            log_menu.set(self.log_level)
+            log_menu.grid(row=0, column=len(self.iconos_menu), padx=(0, 45))
+
         contenedor_opciones.grid(row=0, column=1, sticky="e", padx=(0, 35))
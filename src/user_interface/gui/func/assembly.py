@@ -2,6 +2,7 @@ from customtkinter import filedialog
 
 from src.assembler import assembler as assembler
 from src.assembler.preprocessor import convert_org_word_positions_to_bytes
+from src.cpu.profiler import SourceMap
 
 from .compilation_registry import CompilationRegistry
 
@@ -59,6 +60,9 @@ def assemble(textbox_origen, textbox_destino, source_file_path=None):
     if source_file_path:
         source_filename = os.path.basename(source_file_path)
 
-    CompilationRegistry.register(binary_output, bin_path, map_path, source_filename)
+    source_map = SourceMap.from_assembler(asm, contenido)
+    CompilationRegistry.register(
+        binary_output, bin_path, map_path, source_filename, source_map
+    )
 
     textbox_destino(binary_output)
@@ -20,17 +20,28 @@ class CompilationRegistry:
     _registry = {}
     _loaded_programs = []
     _source_files = {}  # Mapea hash de código -> nombre de archivo original
+    _last_source_map = None  # SourceMap del último programa ensamblado
 
     @classmethod
-    def register(cls, source_code, bin_path, map_path, source_filename=None):
+    def register(
+        cls, source_code, bin_path, map_path, source_filename=None, source_map=None
+    ):
         code_hash = hashlib.md5(source_code.encode()).hexdigest()
         cls._registry[code_hash] = {
             "bin_path": bin_path,
             "map_path": map_path,
             "source": source_code,
+            "source_map": source_map,
         }
         if source_filename:
             cls._source_files[code_hash] = source_filename
+        if source_map is not None:
+            cls._last_source_map = source_map
+
+    @classmethod
+    def get_last_source_map(cls):
+        """SourceMap del último programa ensamblado (para el perfilador)"""
+        return cls._last_source_map
 
     @classmethod
     def find_by_content(cls, source_code):
@@ -50,12 +61,29 @@ class CompilationRegistry:
 
     @classmethod
     def register_loaded_program(
-        cls, name, min_addr, max_addr, entry_point, bin_path, map_path
+        cls, cpu, name, extents, entry_point, bin_path, map_path
     ):
-        """Registra un programa que fue cargado en memoria"""
+        """
+        Registra un programa en cpu.regions (nombre de región = uid) y en la
+        lista de cargados; se llama antes de escribirlo en memoria
+
+        Args:
+            cpu: Instancia del CPU
+            name: Nombre del programa
+            extents: Tramos [inicio, fin] que ocupa (Loader.tramos)
+            entry_point: Dirección de entrada
+            bin_path: Ruta al archivo .bin
+            map_path: Ruta al archivo .map
+
+        Raises:
+            ValueError: Si colisiona con un programa ya cargado, la pila o MMIO
+        """
+        if not extents:
+            raise ValueError(f"El programa '{name}' no tiene palabras para cargar")
         program = LoadedProgram(
-            name, min_addr, max_addr, entry_point, bin_path, map_path
+            name, extents[0][0], extents[-1][1] - 7, entry_point, bin_path, map_path
         )
+        cpu.regions.add_extents(extents, program.uid)
         cls._loaded_programs.append(program)
         return program
 
@@ -66,29 +94,21 @@ class CompilationRegistry:
 
     @classmethod
     def clear_loaded_programs(cls):
-        """Limpia la lista de programas cargados"""
+        """Limpia la lista de programas cargados (CPU.reset ya quita sus regiones)"""
         cls._loaded_programs = []
 
     @classmethod
-    def unload_program(cls, program_name):
-        """Elimina un programa específico de la lista de cargados"""
+    def unload_program(cls, cpu, program_name):
+        """Elimina un programa específico de la lista de cargados y de cpu.regions"""
+        for program in cls._loaded_programs:
+            if program.name == program_name:
+                cpu.regions.remove_named(program.uid)
         cls._loaded_programs = [
             p for p in cls._loaded_programs if p.name != program_name
         ]
 
     @classmethod
-    def unload_program_instance(cls, program):
+    def unload_program_instance(cls, cpu, program):
         """Elimina una instancia específica de programa (por identidad/UID)."""
+        cpu.regions.remove_named(program.uid)
         cls._loaded_programs = [p for p in cls._loaded_programs if p.uid != program.uid]
-
-    @classmethod
-    def check_collision(cls, min_addr, max_addr):
-        """
-        Verifica si hay colisión con programas ya cargados
-        Retorna (colisiona, programa_colision) donde programa_colision es el nombre del programa con el que colisiona
-        """
-        for program in cls._loaded_programs:
-            # Verificar si los rangos se solapan
-            if not (max_addr < program.min_addr or min_addr > program.max_addr):
-                return True, program.name
-        return False, None
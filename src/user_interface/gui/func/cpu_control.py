@@ -16,11 +16,14 @@ def execute_step(cpu, update_callback=None):
 
     try:
         should_continue = cpu.step()
+        cpu.io_ports.flush_output()
 
         if update_callback:
             update_callback(cpu.get_state())
 
-        if not should_continue:
+        if cpu.watch_hit is not None:
+            print(f"Detenido: {cpu.watch_hit}")
+        elif not should_continue:
             cpu.running = False
             print("Programa terminado")
 
@@ -32,6 +35,83 @@ def execute_step(cpu, update_callback=None):
         return False
 
 
+def add_watchpoint(cpu, start_text: str, size_text: str, kinds: str):
+    """
+    Agrega un watchpoint a partir de los campos de la ventana
+
+    Args:
+        cpu: Instancia del CPU
+        start_text: Dirección inicial (decimal o hex 0x..)
+        size_text: Tamaño en bytes (vacío = 8)
+        kinds: Tipo de acceso ("r", "w", "x" o combinaciones)
+
+    Returns:
+        El watchpoint creado
+
+    Raises:
+        ValueError: Si algún campo no es válido
+    """
+    start = int(start_text.strip(), 0)
+    size = int(size_text.strip(), 0) if size_text.strip() else 8
+    return cpu.add_watchpoint(start, size, kinds)
+
+
+def continue_until_watchpoint(cpu, update_callback=None, max_steps=1_000_000):
+    """
+    Ejecuta instrucciones hasta que un watchpoint detenga la CPU, el programa
+    termine o se alcance max_steps
+
+    Args:
+        cpu: Instancia del CPU
+        update_callback: Función para actualizar la GUI con el estado del CPU
+        max_steps: Límite de instrucciones (evita congelar la interfaz)
+
+    Returns:
+        El WatchHit que detuvo la ejecución, o None
+    """
+    cpu.running = True
+    try:
+        for _ in range(max_steps):
+            should_continue = cpu.step()
+            if cpu.watch_hit is not None:
+                print(f"Detenido: {cpu.watch_hit}")
+                break
+            if not should_continue:
+                cpu.running = False
+                print("Programa terminado")
+                break
+        else:
+            print(f"Sin watchpoints en {max_steps} instrucciones")
+    except Exception as e:
+        cpu.running = False
+        print(f"Error en ejecución: {e}")
+
+    cpu.io_ports.flush_output()
+    if update_callback:
+        update_callback(cpu.get_state())
+    return cpu.watch_hit
+
+
+def toggle_profiler(cpu):
+    """
+    Activa el perfilador o, si ya estaba activo, lo detiene y retorna su informe
+
+    Args:
+        cpu: Instancia del CPU
+
+    Returns:
+        None al activarlo; (informe de texto, informe JSON) al detenerlo
+    """
+    if cpu.profiler is None:
+        cpu.start_profiler("exact")
+        print("Perfilador activado")
+        return None
+
+    profiler = cpu.stop_profiler()
+    source_map = CompilationRegistry.get_last_source_map()
+    return profiler.report_text(source_map), profiler.report_json(source_map)
+
+
 def reset_cpu(
     cpu,
     update_callback=None,
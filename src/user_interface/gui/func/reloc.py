@@ -34,26 +34,29 @@ def load(memory, bin_path, map_path, base_address=None):
     # Si se especifica base_address, se suma a todas las direcciones
     offset = base_address if base_address is not None else 0
 
-    # Obtener punto de entrada (primera dirección ejecutable)
+    return min_addr, max_addr, entry_point_of(map_entries, offset)
+
+
+def entry_point_of(map_entries, offset=0):
+    """Punto de entrada: primera dirección ejecutable (None si no hay)"""
     entry_point = None
     for entry in map_entries:
         if entry.flag == 1:
             adjusted_addr = entry.address + offset
             if entry_point is None or adjusted_addr < entry_point:
                 entry_point = adjusted_addr
-
-    return min_addr, max_addr, entry_point
+    return entry_point
 
 
 def link_load(
-    textbox, memory, ram_display=None, base_address=None, program_name_override=None
+    textbox, cpu, ram_display=None, base_address=None, program_name_override=None
 ):
     """
     Enlaza y carga un programa en memoria
 
     Args:
         textbox: CTkTextbox con el contenido del código relocalizable
-        memory: Objeto Memory
+        cpu: Instancia del CPU (su memoria y su registro de regiones)
         ram_display: Componente para actualizar visualización de RAM
         base_address: Dirección base opcional para reubicación (en bytes)
     """
@@ -70,20 +73,6 @@ def link_load(
 
     if link(bin_path, map_path):
         print("Enlazado correctamente")
-        min_addr, max_addr, entry_point = load(memory, bin_path, map_path, base_address)
-
-        # Verificar colisión con programas ya cargados
-        collision, collision_program = CompilationRegistry.check_collision(
-            min_addr, max_addr
-        )
-        if collision:
-            print(
-                f"\033[31m Error: El programa colisiona con '{collision_program}' ya cargado en memoria \033[0m"
-            )
-            # Deshacer la carga escribiendo ceros
-            for addr in range(min_addr, max_addr + 1, 8):
-                memory.write_word(addr, 0)
-            return
 
         # Determinar nombre del programa (permitir override del usuario)
         if program_name_override:
@@ -97,10 +86,31 @@ def link_load(
                 # Usar nombre del binario como fallback
                 program_name = os.path.splitext(os.path.basename(bin_path))[0]
 
-        # Registrar programa cargado
-        CompilationRegistry.register_loaded_program(
-            program_name, min_addr, max_addr, entry_point, bin_path, map_path
-        )
+        # Registrar sus tramos en cpu.regions antes de escribir, como
+        # Loader.cargar_programa: si colisiona con otro programa, la pila o
+        # MMIO, la carga se rechaza sin pisar la memoria
+        _, map_entries = linker.Linker.analizar_programa(bin_path, map_path)
+        offset = base_address if base_address is not None else 0
+        try:
+            program = CompilationRegistry.register_loaded_program(
+                cpu,
+                program_name,
+                loader.Loader.tramos(map_entries, offset),
+                entry_point_of(map_entries, offset),
+                bin_path,
+                map_path,
+            )
+        except ValueError as e:
+            print(f"\033[31m Error: {e} \033[0m")
+            return
+
+        try:
+            min_addr, max_addr, entry_point = load(
+                cpu.mem, bin_path, map_path, base_address
+            )
+        except Exception:
+            CompilationRegistry.unload_program_instance(cpu, program)
+            raise
 
         # Convertir direcciones de bytes a posiciones de palabra para mostrar
         min_word = min_addr // 8
@@ -111,6 +121,6 @@ def link_load(
         print(f"Punto de entrada: {entry_word}")
 
         if ram_display:
-            ram_display.update_memory(memory, min_addr, max_addr)
+            ram_display.update_memory(cpu.mem, min_addr, max_addr)
     else:
         print("\033[33m No se pudo enlazar \033[0m")
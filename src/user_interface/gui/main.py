@@ -3,6 +3,7 @@
 
 import customtkinter as ctk
 
+import src.user_interface.logging.logger as logger
 from src.cpu.cpu import CPU
 from src.memory.memory import Memory
 from src.user_interface.gui.components import main_func, top_menu
@@ -49,6 +50,8 @@ class MainFrame(ctk.CTk):
             info=Routes.INFO_PATH,
             image_width=self.__return_percentage_relation(self.height, 10),
             image_height=self.__return_percentage_relation(self.height, 10),
+            on_log_level=self.__change_log_level,
+            log_level=logger.nivel_actual(),
         )
         title_section.grid(row=0, column=0, sticky="nsew")
 
@@ -68,6 +71,10 @@ class MainFrame(ctk.CTk):
         )
         main_functionality_frame.grid(row=1, column=0, sticky="nsew")
 
+    def __change_log_level(self, nivel):
+        logger.establecer_nivel(nivel)
+        self.cpu.refresh_logging()
+
     def __return_percentage_relation(self, dimension, percentage):
         return (dimension * percentage) / 100
 
@@ -1,29 +1,177 @@
+import atexit
 import logging
 import logging.handlers
 import os
-import sys
+import queue
+import threading
+import time
 
-def configurar_logger(nombre_app="euclid_64_logs", log_dir="logs", nivel=logging.DEBUG):
-    os.makedirs(log_dir, exist_ok=True)
+# Nivel usado cuando no se indica otro (se puede cambiar con EUCLID_LOG_LEVEL)
+NIVEL_POR_DEFECTO = os.environ.get("EUCLID_LOG_LEVEL", "INFO")
 
-    formato = logging.Formatter(
-        "%(asctime)s [%(levelname)s] %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
+# Niveles que se ofrecen en la CLI y la GUI; OFF desactiva todo el registro
+NIVELES = ["DEBUG", "INFO", "WARNING", "ERROR", "OFF"]
+NIVEL_APAGADO = logging.CRITICAL + 1
 
+NOMBRE_APP = "euclid_64_logs"
+# Logger hijo para eventos por instrucción (ALU, memoria); usa DEBUG
+NOMBRE_ALTA_FRECUENCIA = NOMBRE_APP + ".alta_frecuencia"
+
+_listeners = []
+
+
+def _convertir_nivel(nivel) -> int:
+    """Acepta un nivel numérico o su nombre ('debug', 'INFO', 'OFF', ...)"""
+    if isinstance(nivel, int):
+        return nivel
+    nombre = str(nivel).strip().upper()
+    if nombre == "OFF":
+        return NIVEL_APAGADO
+    valor = logging.getLevelName(nombre)
+    if not isinstance(valor, int):
+        raise ValueError(f"Nivel de log no válido: {nivel}")
+    return valor
+
+
+class FiltroDeFrecuencia(logging.Filter):
+    """
+    Limita los eventos de alta frecuencia
+
+    Deja pasar uno de cada `muestreo` registros y como máximo
+    `max_por_segundo` por segundo. Al abrirse una nueva ventana, el primer
+    registro que pasa indica cuántos se omitieron.
+    """
+
+    def __init__(self, max_por_segundo: int = 200, muestreo: int = 1):
+        super().__init__()
+        self.max_por_segundo = max_por_segundo
+        self.muestreo = max(1, muestreo)
+        self._contador = 0
+        self._ventana = 0
+        self._en_ventana = 0
+        self._omitidos = 0
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        with self._lock:
+            self._contador += 1
+            if self._contador % self.muestreo:
+                self._omitidos += 1
+                return False
+
+            ventana = int(time.monotonic())
+            if ventana != self._ventana:
+                self._ventana = ventana
+                self._en_ventana = 0
+            if self._en_ventana >= self.max_por_segundo:
+                self._omitidos += 1
+                return False
+            self._en_ventana += 1
+
+            if self._omitidos:
+                record.msg = f"{record.msg} ({self._omitidos} mensajes omitidos)"
+                self._omitidos = 0
+            return True
+
+
+def configurar_logger(nombre_app=NOMBRE_APP, log_dir="logs", nivel=None):
+    """
+    Retorna el logger de la aplicación
+
+    El archivo se escribe desde un hilo en segundo plano: el logger solo
+    encola registros (QueueHandler) y un QueueListener los vuelca al
+    TimedRotatingFileHandler.
+    """
     logger = logging.getLogger(nombre_app)
-    logger.setLevel(nivel)
 
     if not logger.handlers:
+        os.makedirs(log_dir, exist_ok=True)
+
+        formato = logging.Formatter(
+            "%(asctime)s [%(levelname)s] %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S"
+        )
 
         archivo = logging.handlers.TimedRotatingFileHandler(
             os.path.join(log_dir, f"{nombre_app}.log"),
             when="midnight",
             backupCount=7,
-            encoding="utf-8"
+            encoding="utf-8",
+            delay=True,
         )
         archivo.setLevel(logging.DEBUG)
         archivo.setFormatter(formato)
-        logger.addHandler(archivo)
 
-    return logger
\ No newline at end of file
+        cola = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(
+            cola, archivo, respect_handler_level=True
+        )
+        listener.start()
+        _listeners.append(listener)
+
+        logger.addHandler(logging.handlers.QueueHandler(cola))
+        logger.propagate = False
+        logger.setLevel(_convertir_nivel(NIVEL_POR_DEFECTO))
+
+    if nivel is not None:
+        logger.setLevel(_convertir_nivel(nivel))
+
+    return logger
+
+
+def configurar_logger_alta_frecuencia(max_por_segundo=200, muestreo=1):
+    """
+    Logger para eventos por instrucción (operaciones de la ALU, accesos)
+
+    Comparte los handlers del logger principal y aplica FiltroDeFrecuencia.
+    Los componentes deben consultar hot_path_habilitado() al construirse y
+    no llamar a este logger si está deshabilitado.
+    """
+    configurar_logger()
+    logger = logging.getLogger(NOMBRE_ALTA_FRECUENCIA)
+    if not logger.filters:
+        logger.addFilter(FiltroDeFrecuencia(max_por_segundo, muestreo))
+    return logger
+
+
+def hot_path_habilitado() -> bool:
+    """True si los eventos de alta frecuencia (DEBUG) se registrarían"""
+    return logging.getLogger(NOMBRE_ALTA_FRECUENCIA).isEnabledFor(logging.DEBUG)
+
+
+def establecer_nivel(nivel) -> int:
+    """
+    Cambia la verbosidad del logger de la aplicación
+
+    Los componentes ya construidos (ALU) resuelven su guarda al crearse; la
+    CPU expone refresh_logging() para volver a resolverla.
+
+    Args:
+        nivel: Nombre ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'OFF') o número
+
+    Returns:
+        Nivel numérico aplicado
+
+    Raises:
+        ValueError: Si el nombre de nivel no existe
+    """
+    valor = _convertir_nivel(nivel)
+    configurar_logger().setLevel(valor)
+    return valor
+
+
+def nivel_actual() -> str:
+    """Nombre del nivel vigente del logger de la aplicación"""
+    valor = configurar_logger().level
+    if valor >= NIVEL_APAGADO:
+        return "OFF"
+    return logging.getLevelName(valor)
+
+
+def detener_logging():
+    """Vacía la cola y detiene los hilos de escritura"""
+    while _listeners:
+        _listeners.pop().stop()
+
+
+atexit.register(detener_logging)
@@ -0,0 +1,440 @@
+"""
+Micro-benchmarks del emulador
+Uso: python benchmark.py <nombre> [--n N]
+
+Benchmarks disponibles:
+    blocks    sort_bubble.asm: intérprete (antes) contra el motor de bloques
+    bulk      Array de N palabras: write_word/read_word contra write_words/read_words
+    dispatch  Costo por instrucción: cadena de conjuntos (antes) contra tabla
+    dma       Archivo de N bytes a memoria: INS (byte a byte) contra DMA
+    input     Lecturas IN de enteros: callback por valor contra proveedor guionado
+    window    Suma de N palabras con LD: desde la RAM y desde un archivo mapeado
+    trace     Registros por segundo del grabador de trazas y costo en run_fast
+    memory    LD/ST de palabra por segundo: ruta con struct (antes) contra la vista
+              de palabras, alineadas y no, y en un bucle con run_fast
+"""
+
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.cpu.cpu import CPU
+from src.cpu.dma import DMA_CTRL, DMA_DST, DMA_LEN, DMA_SRC, DMA_TO_MEMORY
+from src.cpu.io_ports import CallbackSink, StringInputProvider
+from src.cpu.trace import TraceReader, TraceRecorder
+from src.isa.isa import Opcodes
+from src.memory.loader import Loader
+from src.memory.memory import Memory
+
+
+# Repeticiones de las comparaciones antes/ahora (se informa la mejor)
+REPEATS = 3
+
+
+def _encode(opcode, rd=0, rs1=0, rs2=0, func=0, imm32=0):
+    """Codifica una instrucción de 64 bits"""
+    return (
+        (opcode << 56)
+        | (rd << 52)
+        | (rs1 << 48)
+        | (rs2 << 44)
+        | (func << 32)
+        | (imm32 & 0xFFFFFFFF)
+    )
+
+
+def _timed_run(cpu, cycles):
+    """Ejecuta cycles instrucciones y retorna instrucciones por segundo"""
+    start = time.perf_counter()
+    cpu.run(max_cycles=cycles)
+    elapsed = time.perf_counter() - start
+    return cycles / elapsed
+
+
+def _print_before_after(label, unit, before, after):
+    """Una línea con la línea base, el valor actual y la mejora"""
+    print(
+        f"{label:<16} antes {before:>12,.0f}  ahora {after:>12,.0f} {unit}"
+        f"  (x{after / before:.1f})"
+    )
+
+
+def _set_chain_execute(cpu):
+    """
+    execute() previo a la tabla de despacho (línea base): arma los conjuntos de
+    opcodes de cada ejecutor en cada instrucción y los recorre en orden
+    """
+    table = cpu.dispatch_table
+
+    def execute(decoded):
+        opcode = decoded["opcode"]
+        groups = (
+            {
+                Opcodes.ADD, Opcodes.SUB, Opcodes.MUL, Opcodes.DIV,
+                Opcodes.AND, Opcodes.OR, Opcodes.XOR, Opcodes.NOT,
+                Opcodes.SHL, Opcodes.SHR, Opcodes.CMP,
+                Opcodes.FADD, Opcodes.FSUB, Opcodes.FMUL, Opcodes.FDIV,
+            },
+            {
+                Opcodes.MOVI, Opcodes.LD, Opcodes.ST, Opcodes.OUT, Opcodes.IN,
+                Opcodes.ADDI, Opcodes.CP, Opcodes.INS, Opcodes.OUTS,
+            },
+            {Opcodes.PUSH, Opcodes.POP},
+            {
+                Opcodes.JMP, Opcodes.JZ, Opcodes.JNZ, Opcodes.JC,
+                Opcodes.JNC, Opcodes.JS, Opcodes.CALL, Opcodes.RET,
+            },
+        )  # fmt: skip
+        for group in groups:
+            if opcode in group:
+                return table[opcode](decoded, cpu)
+        if opcode == Opcodes.HALT:
+            return False
+        if opcode == Opcodes.NOP:
+            return True
+        raise RuntimeError(f"Opcode no reconocido: {opcode}")
+
+    return execute
+
+
+def bench_dispatch(n):
+    """
+    Bucles sin trabajo de ALU (CP/MOVI/NOP/JMP) y con ADD, para separar el
+    costo del despacho del costo de la operación; cada uno con la cadena de
+    conjuntos previa (antes) y con la tabla de despacho (ahora)
+    """
+    programs = {
+        "transfer": [
+            _encode(Opcodes.CP, rd=1, rs1=2),
+            _encode(Opcodes.MOVI, rd=3, imm32=7),
+            _encode(Opcodes.NOP),
+            _encode(Opcodes.JMP, imm32=0),
+        ],
+        "alu": [
+            _encode(Opcodes.ADD, rd=1, rs1=1, rs2=2),
+            _encode(Opcodes.SUB, rd=3, rs1=1, rs2=2),
+            _encode(Opcodes.AND, rd=4, rs1=1, rs2=3),
+            _encode(Opcodes.JMP, imm32=0),
+        ],
+    }
+
+    for name, words in programs.items():
+        rates = [0.0, 0.0]
+        for _ in range(REPEATS):
+            for i, baseline in enumerate((True, False)):
+                cpu = CPU(memory_size=4096)
+                for j, word in enumerate(words):
+                    cpu.mem.write_word(j * 8, word)
+                cpu.registers[2] = 3
+                if baseline:
+                    cpu.execute = _set_chain_execute(cpu)
+                rates[i] = max(rates[i], _timed_run(cpu, n))
+        _print_before_after(name, "instr/s", *rates)
+
+
+def bench_trace(n):
+    """Grabador aislado (por compresión) y run_fast con y sin traza"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.trace")
+        for compression in ("none", "zlib", "lzma"):
+            start = time.perf_counter()
+            with TraceRecorder(path, compression=compression) as recorder:
+                record = recorder.record
+                for i in range(n):
+                    record(i, (i & 0xFF) * 8, 0x1000000000000000, i, 0x300, 9)
+            elapsed = time.perf_counter() - start
+            size = os.path.getsize(path)
+            print(
+                f"{compression:<10} {n / elapsed:>12,.0f} registros/s "
+                f"{size / n:>6.2f} bytes/registro"
+            )
+
+        start = time.perf_counter()
+        count = sum(1 for _ in TraceReader(path))
+        elapsed = time.perf_counter() - start
+        print(f"{'lectura':<10} {count / elapsed:>12,.0f} registros/s (lzma)")
+
+        loop = [
+            _encode(Opcodes.ADD, rd=1, rs1=1, rs2=2),
+            _encode(Opcodes.ST, rd=1, imm32=0x300),
+            _encode(Opcodes.JMP, imm32=0),
+        ]
+        for traced in (False, True):
+            cpu = CPU(memory_size=4096)
+            for i, word in enumerate(loop):
+                cpu.mem.write_word(i * 8, word)
+            if traced:
+                cpu.start_trace(path)
+            result = cpu.run_fast(max_cycles=n)
+            cpu.stop_trace()
+            label = "run+traza" if traced else "run"
+            print(f"{label:<10} {result.ips:>12,.0f} instr/s")
+
+
+def _struct_word_ops(memory_ops):
+    """
+    read_word/write_word de MemoryOperations previos a la vista de palabras
+    (línea base): rango en MemoryOperations y otra vez en Memory, con struct
+    """
+    mem = memory_ops.mem
+    size = mem.size
+
+    def mem_read_word(addr):
+        mem._check_addr(addr, 8)
+        return struct.unpack_from("<Q", mem.data, addr)[0]
+
+    def mem_write_word(addr, value):
+        mem._check_addr(addr, 8)
+        struct.pack_into("<Q", mem.data, addr, value & 0xFFFFFFFFFFFFFFFF)
+        if mem._write_hooks:
+            mem.notify_write(addr, 8)
+
+    def read_word(address):
+        if address < 0 or address > size - 8:
+            raise ValueError(f"Dirección de lectura fuera de rango: 0x{address:08X}")
+        return mem_read_word(address)
+
+    def write_word(address, value):
+        if address < 0 or address > size - 8:
+            raise ValueError(f"Dirección de escritura fuera de rango: 0x{address:08X}")
+        mem_write_word(address, value & 0xFFFFFFFFFFFFFFFF)
+
+    return read_word, write_word
+
+
+def bench_memory(n):
+    """
+    LD/ST de palabra por MemoryOperations (alineados y no) y un bucle LD/ST
+    ejecutado con run_fast; cada uno por la ruta con struct (antes) y por la
+    vista de palabras (ahora)
+    """
+    cpu = CPU(memory_size=65536)
+    memory_ops = cpu.memory_ops
+    routes = (
+        _struct_word_ops(memory_ops),
+        (memory_ops.read_word, memory_ops.write_word),
+    )
+    addrs = [(i * 8) & 0xFFF8 for i in range(1024)]
+    unaligned = [addr + 3 for addr in addrs[:-1]]
+
+    for label, targets in (("alineada", addrs), ("no alineada", unaligned)):
+        rounds = max(1, n // len(targets))
+        loads, stores = [0.0, 0.0], [0.0, 0.0]
+        # Rondas alternadas entre rutas y el mejor valor de cada una
+        for _ in range(REPEATS):
+            for i, (read_word, write_word) in enumerate(routes):
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    for addr in targets:
+                        read_word(addr)
+                rate = rounds * len(targets) / (time.perf_counter() - start)
+                loads[i] = max(loads[i], rate)
+
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    for addr in targets:
+                        write_word(addr, addr)
+                rate = rounds * len(targets) / (time.perf_counter() - start)
+                stores[i] = max(stores[i], rate)
+        _print_before_after("LD " + label, "op/s", *loads)
+        _print_before_after("ST " + label, "op/s", *stores)
+
+    loop = [
+        _encode(Opcodes.LD, rd=1, imm32=0x800),
+        _encode(Opcodes.ADD, rd=1, rs1=1, rs2=2),
+        _encode(Opcodes.ST, rd=1, imm32=0x800),
+        _encode(Opcodes.LD, rd=3, rs1=4, func=1, imm32=8),
+        _encode(Opcodes.ST, rd=3, rs1=4, func=1, imm32=16),
+        _encode(Opcodes.JMP, imm32=0),
+    ]
+    rates = [0.0, 0.0]
+    for _ in range(REPEATS):
+        for i, baseline in enumerate((True, False)):
+            cpu = CPU(memory_size=4096)
+            for j, word in enumerate(loop):
+                cpu.mem.write_word(j * 8, word)
+            cpu.registers[2] = 1
+            cpu.registers[4] = 0x900
+            if baseline:
+                read_word, write_word = _struct_word_ops(cpu.memory_ops)
+                cpu.memory_ops.read_word = read_word
+                cpu.memory_ops.write_word = write_word
+            rates[i] = max(rates[i], cpu.run_fast(max_cycles=n).ips)
+    _print_before_after("run LD/ST", "instr/s", *rates)
+
+
+def bench_bulk(n):
+    """Escritura y lectura de un array de n palabras: una a una y en bloque"""
+    mem = Memory(size_bytes=n * 8)
+    mem.add_write_hook(lambda addr, size: None)  # Como la caché de la CPU
+    values = list(range(n))
+
+    start = time.perf_counter()
+    for i, value in enumerate(values):
+        mem.write_word(i * 8, value)
+    per_word = time.perf_counter() - start
+    start = time.perf_counter()
+    mem.write_words(0, values)
+    bulk = time.perf_counter() - start
+    print(f"{'ST x palabra':<16} {n / per_word:>12,.0f} palabras/s")
+    print(f"{'write_words':<16} {n / bulk:>12,.0f} palabras/s")
+
+    start = time.perf_counter()
+    for i in range(n):
+        mem.read_word(i * 8)
+    per_word = time.perf_counter() - start
+    start = time.perf_counter()
+    assert mem.read_words(0, n) == values
+    bulk = time.perf_counter() - start
+    print(f"{'LD x palabra':<16} {n / per_word:>12,.0f} palabras/s")
+    print(f"{'read_words':<16} {n / bulk:>12,.0f} palabras/s")
+
+
+def bench_input(n):
+    """Programa que suma n enteros leídos con IN desde distintas entradas"""
+    words = [
+        _encode(Opcodes.IN, rd=1, func=1, imm32=2),  # IN R1, puerto 2 (entero)
+        _encode(Opcodes.ADD, rd=2, rs1=2, rs2=1),
+        _encode(Opcodes.JMP, imm32=0),
+    ]
+    expected = sum(range(n))
+
+    for name in ("callback", "provider"):
+        cpu = CPU(memory_size=4096)
+        for i, word in enumerate(words):
+            cpu.mem.write_word(i * 8, word)
+        if name == "callback":
+            # Como la consola: un texto por lectura que hay que convertir
+            lines = iter([str(i) for i in range(n)])
+            cpu.io_ports.set_input_int_callback(lambda: int(next(lines)))
+        else:
+            text = "\n".join(str(i) for i in range(n)) + "\n"
+            cpu.io_ports.set_input_provider(StringInputProvider(text))
+        result = cpu.run_fast(max_cycles=n * len(words))
+        assert cpu.registers[2] == expected
+        print(f"{name:<10} {n / result.elapsed:>12,.0f} lecturas/s")
+
+
+def bench_dma(n):
+    """Carga un archivo de texto de n bytes en memoria con INS y con DMA"""
+    port = 0xFFFF0020
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "datos.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(("x" * 999 + "\n") * (n // 1000))
+        size = os.path.getsize(path)
+        cpu = CPU(memory_size=size + 4096)
+        io = cpu.io_ports
+
+        io.open_file(port, path, "r")
+        start = time.perf_counter()
+        addr = 0
+        while True:
+            text = io.read_string(port, max_length=1000)  # Como INS
+            if not text:
+                break
+            io.write_string_to_memory(addr, text, max_length=1000)
+            addr += len(text)
+        ins = time.perf_counter() - start
+        io.close_file(port)
+
+        io.open_file(port, path, "rb")
+        start = time.perf_counter()
+        for address, value in (
+            (DMA_SRC, port),
+            (DMA_DST, 0),
+            (DMA_LEN, size),
+            (DMA_CTRL, DMA_TO_MEMORY),
+        ):
+            io.write_output(value, address, 0)
+        dma = time.perf_counter() - start
+        io.close_file(port)
+        assert io.dma.count == size
+
+    print(f"{'INS':<10} {size / ins / 1e6:>12,.1f} MB/s")
+    print(f"{'DMA':<10} {size / dma / 1e6:>12,.1f} MB/s")
+
+
+def bench_window(n):
+    """Programa que suma n palabras con LD en la RAM y en un archivo mapeado"""
+    words = [
+        _encode(Opcodes.LD, rd=3, rs1=1, func=1),  # LD R3, [R1 + 0]
+        _encode(Opcodes.ADD, rd=2, rs1=2, rs2=3),
+        _encode(Opcodes.ADDI, rd=1, rs1=1, imm32=8),
+        _encode(Opcodes.JMP, imm32=0),
+    ]
+    payload = b"".join(i.to_bytes(8, "little") for i in range(n))
+    expected = sum(range(n))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "datos.bin")
+        with open(path, "wb") as f:
+            f.write(payload)
+        for name in ("ram", "window"):
+            cpu = CPU(memory_size=len(payload) + 4096)
+            cpu.mem.write_words(0, words)
+            if name == "ram":
+                cpu.mem.write_bytes(4096, payload)
+                cpu.registers[1] = 4096
+            else:
+                window = cpu.map_file(path, read_only=True)
+                cpu.registers[1] = window.base
+            result = cpu.run_fast(max_cycles=n * len(words))
+            assert cpu.registers[2] == expected
+            print(f"{name:<10} {n / result.elapsed:>12,.0f} palabras/s")
+            for window in list(cpu.file_windows):
+                cpu.unmap_file(window)
+
+
+def bench_blocks(n):
+    """
+    sort_bubble.asm con 100 números (el máximo que lee) ejecutado con el
+    intérprete y con el motor de bloques; n no se usa
+    """
+    bin_path = str(ROOT_DIR / "build" / "sort_bubble.bin")
+    map_path = str(ROOT_DIR / "build" / "sort_bubble.map")
+    numbers = " ".join(str((i * 7919) % 1000) for i in range(100))
+
+    rates = [0.0, 0.0]
+    for _ in range(REPEATS):
+        for i, engine in enumerate(("interpreter", "blocks")):
+            cpu = CPU(memory_size=65536)
+            Loader.cargar_programa(cpu, bin_path, map_path)
+            cpu.io_ports.set_input_provider(StringInputProvider(f"100\n{numbers}\n"))
+            cpu.io_ports.set_output_sink(CallbackSink(lambda text: None))
+            start = time.perf_counter()
+            cpu.run(engine=engine)
+            elapsed = time.perf_counter() - start
+            rates[i] = max(rates[i], cpu.cycle_count / elapsed)
+    _print_before_after("sort_bubble", "instr/s", *rates)
+
+
+BENCHMARKS = {
+    "blocks": bench_blocks,
+    "bulk": bench_bulk,
+    "memory": bench_memory,
+    "dispatch": bench_dispatch,
+    "dma": bench_dma,
+    "input": bench_input,
+    "trace": bench_trace,
+    "window": bench_window,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks del emulador")
+    parser.add_argument("name", choices=sorted(BENCHMARKS))
+    parser.add_argument("--n", type=int, default=200_000)
+    args = parser.parse_args()
+    BENCHMARKS[args.name](args.n)
+
+
+if __name__ == "__main__":
+    main()
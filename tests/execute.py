@@ -1,6 +1,6 @@
 """
 Ejecutor de programas compilados
-Uso: python execute.py <archivo.bin> <archivo.map>
+Uso: python execute.py <archivo.bin> <archivo.map> [entrada.txt]
 """
 
 import sys
@@ -10,10 +10,11 @@ ROOT_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT_DIR))
 
 from src.cpu.cpu import CPU
+from src.cpu.io_ports import FileInputProvider, StdinInputProvider
 from src.memory.loader import Loader
 
 
-def execute_program(bin_path, map_path, max_cycles=100000):
+def execute_program(bin_path, map_path, max_cycles=100000, input_path=None):
     """
     Ejecuta un programa compilado usando el CPU y el loader
 
@@ -21,6 +22,7 @@ def execute_program(bin_path, map_path, max_cycles=100000):
         bin_path: Ruta al archivo .bin
         map_path: Ruta al archivo .map
         max_cycles: Numero maximo de ciclos de ejecucion
+        input_path: Archivo con las respuestas a IN (None = stdin)
     """
     bin_file = Path(bin_path)
     map_file = Path(map_path)
@@ -36,41 +38,33 @@ def execute_program(bin_path, map_path, max_cycles=100000):
 
     cpu.io_ports.set_output_char_callback(lambda ch: print(chr(ch), end="", flush=True))
     cpu.io_ports.set_output_int_callback(lambda val: print(val, end="", flush=True))
-    cpu.io_ports.set_input_int_callback(lambda: int(input()))
-
-    class InputBuffer:
-        def __init__(self):
-            self.buffer = []
-
-        def read_char(self):
-            if not self.buffer:
-                line = input()
-                self.buffer.extend(list(line + "\n"))
-            return ord(self.buffer.pop(0)) if self.buffer else 10
-
-    input_buf = InputBuffer()
-    cpu.io_ports.set_input_char_callback(input_buf.read_char)
+    cpu.io_ports.set_input_provider(
+        FileInputProvider(input_path) if input_path else StdinInputProvider()
+    )
 
     try:
-        for _ in range(max_cycles):
-            if not cpu.step():
-                break
+        result = cpu.run_fast(max_cycles=max_cycles)
     except KeyboardInterrupt:
         print("\nEjecucion interrumpida")
+        return cpu.cycle_count
 
-    return cpu.cycle_count
+    if result.fault is not None:
+        raise RuntimeError(str(result.fault))
+    print(f"\n{result.summary()}")
+    return result.cycles
 
 
 def main():
     if len(sys.argv) < 3:
-        print("Uso: python execute.py <archivo.bin> <archivo.map>")
+        print("Uso: python execute.py <archivo.bin> <archivo.map> [entrada.txt]")
         sys.exit(1)
 
     bin_path = sys.argv[1]
     map_path = sys.argv[2]
+    input_path = sys.argv[3] if len(sys.argv) > 3 else None
 
     try:
-        cycles = execute_program(bin_path, map_path)
+        cycles = execute_program(bin_path, map_path, input_path=input_path)
         print(f"\nEjecucion completada en {cycles} ciclos")
     except Exception as e:
         print(f"Error: {e}")
@@ -3,7 +3,9 @@ Suite completa de tests para el emulador
 Prueba todas las funcionalidades implementadas
 """
 
+import json
 import sys
+from array import array
 from pathlib import Path
 
 import pytest
@@ -12,9 +14,83 @@ ROOT_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT_DIR))
 
 from src.assembler.assembler import Assembler
+from src.cpu.core import ALU, ALUOperation, Flags, FloatALU
 from src.cpu.cpu import CPU
+from src.cpu.devices import Device, DeviceBus
+from src.cpu.dma import (
+    DMA_COUNT,
+    DMA_CTRL,
+    DMA_DONE,
+    DMA_DST,
+    DMA_EOF,
+    DMA_ERROR,
+    DMA_LEN,
+    DMA_SRC,
+    DMA_STATUS,
+    DMA_TO_FILE,
+)
+from src.cpu.io_ports import (
+    CallbackSink,
+    FileInputProvider,
+    FilePortDevice,
+    FileSink,
+    InputProvider,
+    IOPorts,
+    OutputSink,
+    StringInputProvider,
+)
+from src.cpu.profiler import Profiler, SourceMap
+from src.cpu.registers import RegisterFile
+from src.cpu.trace import NO_ADDRESS, TraceReader
 from src.isa.isa import Opcodes
+from src.memory.cache import CacheConfig, CacheLevel, parse_cache_spec
+from src.memory.file_window import parse_window_spec
 from src.memory.loader import Loader
+from src.memory.memory import (
+    MASK64,
+    Memory,
+    export_memory,
+    import_memory,
+    iter_intel_hex,
+    parse_intel_hex,
+)
+from src.memory.permissions import PermissionTable
+from src.memory.regions import RegionRegistry, extents_from_addresses
+from src.memory.scanner import HAVE_NUMPY, MemoryScanner
+from src.memory.sparse_memory import SparseMemory
+from src.memory.watchpoints import WATCH_WRITE, WatchBus
+from src.user_interface.gui.func import reloc as gui_reloc
+from src.user_interface.gui.func.compilation_registry import CompilationRegistry
+from src.user_interface.logging import logger
+
+# Suma 0..49 en un bucle: la guarda en 0x300 y la escribe en el puerto 0xFFFF0008
+LOOP_PROGRAM = """
+ORG 0x0
+    MOVI R1, 0
+    MOVI R2, 50
+    MOVI R3, 0
+loop:
+    ADD R3, R3, R1
+    ADDI R1, R1, 1
+    CMP R0, R1, R2
+    JNZ loop
+    ST R3, 0x300
+    OUT R3, 0xFFFF0008
+    HALT
+"""
+
+
+def load_program(tmp_path, code=LOOP_PROGRAM, memory_size=2048):
+    """Ensambla code en tmp_path y lo carga en una CPU nueva"""
+    asm_file = tmp_path / "block.asm"
+    asm_file.write_text(code)
+    bin_file = tmp_path / "block.bin"
+    map_file = tmp_path / "block.map"
+    Assembler().assemble_file(str(asm_file), str(bin_file), str(map_file))
+
+    cpu = CPU(memory_size=memory_size)
+    Loader.cargar_programa(cpu, str(bin_file), str(map_file))
+    return cpu
 
 
 class TestAssembler:
@@ -433,5 +509,1567 @@ class TestIntegration:
         assert result == -5
 
 
+class TestDecodeCache:
+    """Tests de la caché de instrucciones decodificadas"""
+
+    def test_cache_reused_across_steps(self):
+        """Una instrucción ya ejecutada se sirve desde la caché"""
+        cpu = CPU(memory_size=1024)
+        cpu.mem.write_word(0, (Opcodes.MOVI << 56) | (1 << 52) | 7)
+
+        cpu.step()
+        cpu.pc = 0
+        cpu.step()
+
+        assert len(cpu.decode_cache) == 1
+        assert cpu.registers[1] == 7
+
+    def test_write_word_invalidates_line(self):
+        """Reescribir una palabra cacheada invalida la línea"""
+        cpu = CPU(memory_size=1024)
+        cpu.mem.write_word(0, (Opcodes.MOVI << 56) | (1 << 52) | 1)
+        cpu.step()
+
+        cpu.mem.write_word(0, (Opcodes.MOVI << 56) | (1 << 52) | 2)
+        cpu.pc = 0
+        cpu.step()
+
+        assert cpu.registers[1] == 2
+
+    def test_self_modifying_store(self):
+        """Un ST del programa sobre su propio código se respeta"""
+        cpu = CPU(memory_size=1024)
+        patched = (Opcodes.MOVI << 56) | (3 << 52) | 99
+
+        # 0x00: LD R2, #0x100 / 0x08: ST R2, #0x18 / 0x10: JMP 0x18 / 0x18: MOVI R3, 1
+        cpu.mem.write_word(0x00, (Opcodes.LD << 56) | (2 << 52) | 0x100)
+        cpu.mem.write_word(0x08, (Opcodes.ST << 56) | (2 << 52) | 0x18)
+        cpu.mem.write_word(0x10, (Opcodes.JMP << 56) | 0x18)
+        cpu.mem.write_word(0x18, (Opcodes.MOVI << 56) | (3 << 52) | 1)
+        cpu.mem.write_word(0x20, Opcodes.HALT << 56)
+        cpu.mem.write_word(0x100, patched)
+
+        # Ejecutar primero la instrucción original para que quede en caché
+        cpu.pc = 0x18
+        cpu.step()
+        assert cpu.registers[3] == 1
+
+        cpu.pc = 0
+        cpu.run(max_cycles=100)
+
+        assert cpu.registers[3] == 99
+
+    def test_unaligned_overlap_invalidates(self):
+        """Una escritura de byte dentro de una palabra no alineada invalida la línea"""
+        cpu = CPU(memory_size=1024)
+        cpu.mem.write_word(0x104, (Opcodes.MOVI << 56) | (1 << 52) | 5)
+        cpu.pc = 0x104
+        cpu.step()
+
+        cpu.mem.write_byte(0x104, 6)
+        cpu.pc = 0x104
+        cpu.step()
+
+        assert cpu.registers[1] == 6
+
+
+class TestBlockEngine:
+    """Tests del motor de bloques básicos"""
+
+    def test_blocks_match_interpreter(self, tmp_path):
+        """El motor de bloques produce el mismo estado que el intérprete"""
+        results = []
+        for engine in ("interpreter", "blocks"):
+            cpu = load_program(tmp_path)
+            output = []
+            cpu.io_ports.set_output_int_callback(output.append)
+            cpu.run(max_cycles=10000, engine=engine)
+            results.append(
+                (output, cpu.registers.get_all(), cpu.flags, cpu.pc, cpu.cycle_count)
+            )
+
+        assert results[0] == results[1]
+        assert results[1][0] == [sum(range(50))]
+
+    def test_store_into_running_block(self, tmp_path):
+        """Un ST que reescribe el bloque en curso sale del bloque y se respeta"""
+        cpu = load_program(
+            tmp_path,
+            """
+            ORG 0x0
+                LD R2, 0x100
+                ST R2, 0x10
+                MOVI R3, 1
+                HALT
+            """,
+        )
+        cpu.mem.write_word(0x100, (Opcodes.MOVI << 56) | (3 << 52) | 77)
+
+        cpu.run(max_cycles=100, engine="blocks")
+
+        assert cpu.registers[3] == 77
+
+    def test_fault_leaves_interpreter_state(self, tmp_path):
+        """Un fallo dentro de un bloque deja PC y contador como el intérprete"""
+        code = """
+        ORG 0x0
+            MOVI R1, 5
+            MOVI R2, 0
+            DIV R3, R1, R2
+            HALT
+        """
+        states = []
+        for engine in ("interpreter", "blocks"):
+            cpu = load_program(tmp_path, code)
+            with pytest.raises(RuntimeError):
+                cpu.run(max_cycles=100, engine=engine)
+            states.append((cpu.pc, cpu.ir, cpu.cycle_count, cpu.registers.get_all()))
+
+        assert states[0] == states[1]
+
+
+class TestDispatchTable:
+    """Tests de la tabla de despacho de opcodes"""
+
+    def test_table_covers_isa(self):
+        """Todos los opcodes del ISA tienen manejador"""
+        cpu = CPU(memory_size=1024)
+
+        for opcode in Opcodes:
+            assert cpu.dispatch_table[opcode] is not None
+
+    def test_register_custom_opcode(self):
+        """Una extensión puede agregar un opcode nuevo"""
+        cpu = CPU(memory_size=1024)
+
+        def swap(instruction, cpu):
+            rd, rs1 = instruction["rd"], instruction["rs1"]
+            cpu.registers[rd], cpu.registers[rs1] = (
+                cpu.registers[rs1],
+                cpu.registers[rd],
+            )
+            return True
+
+        cpu.register_opcode_handler(0x80, swap)
+        cpu.registers[1] = 1
+        cpu.registers[2] = 2
+        cpu.mem.write_word(0, (0x80 << 56) | (1 << 52) | (2 << 48))
+        cpu.step()
+
+        assert cpu.registers[1] == 2
+        assert cpu.registers[2] == 1
+
+    def test_register_existing_requires_replace(self):
+        """Reemplazar un opcode del ISA requiere replace=True"""
+        cpu = CPU(memory_size=1024)
+
+        with pytest.raises(ValueError):
+            cpu.register_opcode_handler(Opcodes.NOP, lambda i, c: True)
+
+        cpu.register_opcode_handler(Opcodes.NOP, lambda i, c: False, replace=True)
+        cpu.mem.write_word(0, Opcodes.NOP << 56)
+
+        assert cpu.step() is False
+
+    def test_unknown_opcode_raises(self):
+        """Un opcode sin manejador produce error"""
+        cpu = CPU(memory_size=1024)
+        cpu.mem.write_word(0, 0xEE << 56)
+
+        with pytest.raises(RuntimeError):
+            cpu.step()
+
+
+class TestRunFast:
+    """Tests del modo de ejecución rápida sin callbacks"""
+
+    def test_run_fast_matches_run(self, tmp_path):
+        """run_fast deja el mismo estado que run y cuenta las instrucciones"""
+        states = []
+        for fast in (False, True):
+            cpu = load_program(tmp_path)
+            output = []
+            cpu.io_ports.set_output_int_callback(output.append)
+            if fast:
+                result = cpu.run_fast(check_every=7)
+                assert result.halted and result.fault is None
+                assert result.cycles == cpu.cycle_count
+            else:
+                cpu.run()
+            states.append((output, cpu.registers.get_all(), cpu.pc, cpu.cycle_count))
+
+        assert states[0] == states[1]
+
+    def test_run_fast_max_cycles(self):
+        """max_cycles se respeta aunque no sea múltiplo de check_every"""
+        cpu = CPU(memory_size=1024)
+        cpu.mem.write_word(0, (Opcodes.JMP << 56) | 0)
+
+        result = cpu.run_fast(max_cycles=1000, check_every=64)
+
+        assert result.cycles == 1000
+        assert not result.halted
+        assert cpu.cycle_count == 1000
+
+    def test_run_fast_fault(self):
+        """Un error se devuelve como CPUFault en lugar de lanzarse"""
+        cpu = CPU(memory_size=1024)
+        cpu.mem.write_word(0, Opcodes.NOP << 56)
+        cpu.mem.write_word(8, 0xEE << 56)
+
+        result = cpu.run_fast()
+
+        assert result.fault is not None
+        assert result.fault.pc == 8
+        assert result.fault.ir == 0xEE << 56
+        assert result.fault.error_type == "RuntimeError"
+        assert result.cycles == 1
+
+
+class TestPermissionTable:
+    """Tests de la tabla de permisos de ejecución"""
+
+    def test_matches_reference_set(self):
+        """Se comporta como un conjunto de direcciones, incluso no alineadas"""
+        import random
+
+        rng = random.Random(5)
+        table = PermissionTable(4096)
+        reference = set()
+        for _ in range(500):
+            addr = rng.randrange(0, 4096 - 8)
+            if rng.random() < 0.7:
+                table.add(addr)
+                reference.add(addr)
+            else:
+                table.discard(addr)
+                reference.discard(addr)
+
+        assert list(table) == sorted(reference)
+        assert len(table) == len(reference)
+        for addr in range(0, 4096, 3):
+            assert (addr in table) == (addr in reference)
+            expected = min((a for a in reference if a >= addr), default=None)
+            assert table.next_executable(addr) == expected
+
+    def test_ranges_and_page_bits(self):
+        """Las palabras contiguas forman un tramo y marcan su página como código"""
+        table = PermissionTable(1 << 20)
+        table.update(range(0x404, 0x504, 8))
+
+        assert table.ranges() == [(0x404, 0x4FC)]
+        assert table.page_executable(0x404) and table.page_executable(0x4FC)
+        assert not table.page_executable(0x0)
+        assert table.export_state() == ((0x404, 0x4FC),)
+
+        table.clear()
+        assert len(table) == 0
+        assert not table.page_executable(0x404)
+
+    def test_add_range_merges_spans(self):
+        """add_range funde tramos sin recorrer palabras y cuenta bien las páginas"""
+        import random
+
+        rng = random.Random(11)
+        table = PermissionTable(8192)
+        reference = set()
+        for _ in range(200):
+            start = rng.randrange(0, 8192 - 8)
+            end = min(start + rng.randrange(0, 600), 8192 - 8)
+            if rng.random() < 0.5:
+                table.add_range(start, end)
+                reference.update(range(start, end + 1, 8))
+            else:
+                addrs = [rng.randrange(0, 8192 - 8) for _ in range(20)]
+                table.update(addrs)
+                reference.update(addrs)
+
+        assert list(table) == sorted(reference)
+        assert len(table) == len(reference)
+        for page in range(8192 >> PermissionTable.PAGE_SHIFT):
+            words = sum(1 for a in reference if a >> PermissionTable.PAGE_SHIFT == page)
+            assert table._exec_per_page.get(page, 0) == words
+
+        for addr in sorted(reference):
+            table.discard(addr)
+        assert len(table) == 0 and not table._exec_per_page
+        with pytest.raises(ValueError):
+            table.add_range(8000, 8192)
+
+    def test_cpu_exec_map_skips_and_invalidates(self):
+        """La CPU salta datos y revalida la caché al cambiar el exec_map"""
+        cpu = CPU(memory_size=1024)
+        cpu.mem.write_word(0, 0xEE << 56)
+        cpu.mem.write_word(8, Opcodes.NOP << 56)
+        cpu.exec_map = {8}
+
+        assert isinstance(cpu.exec_map, PermissionTable)
+        assert cpu.step() is True
+        assert cpu.pc == 16
+
+        cpu.exec_map.clear()
+        cpu.pc = 8
+        with pytest.raises(RuntimeError):
+            cpu.step()
+
+        cpu.exec_map = None
+        cpu.pc = 8
+        assert cpu.step() is True
+
+
+class TestLazyFlags:
+    """Tests de la evaluación diferida de flags"""
+
+    def test_lazy_matches_eager(self):
+        """Los flags materializados coinciden con el cálculo inmediato"""
+        alu = ALU()
+        values = [0, 1, 5, 0x7FFFFFFFFFFFFFFF, 0x8000000000000000, 2**64 - 1]
+        operations = [
+            ALUOperation.ADD,
+            ALUOperation.SUB,
+            ALUOperation.MUL,
+            ALUOperation.CMP,
+            ALUOperation.SHL,
+            ALUOperation.XOR,
+        ]
+        for operation in operations:
+            for a in values:
+                for b in values:
+                    result, flags = alu.execute(operation, a, b)
+                    lazy_result, record = alu.execute_lazy(operation, a, b)
+                    assert lazy_result == result
+                    assert alu.materialize_flags(record) == flags
+                    for flag in Flags:
+                        expected = bool(flags & (1 << flag))
+                        assert alu.test_flag(record, flag) == expected
+
+    def test_branch_reads_pending_flags(self):
+        """JZ decide a partir de los flags pendientes de CMP"""
+        cpu = CPU(memory_size=1024)
+        cpu.registers[1] = 7
+        cpu.registers[2] = 7
+        cpu.mem.write_word(0, (Opcodes.CMP << 56) | (1 << 48) | (2 << 44))
+        cpu.mem.write_word(8, (Opcodes.JZ << 56) | 0x100)
+
+        cpu.step()
+        assert cpu._pending_flags is not None
+        cpu.step()
+
+        assert cpu.pc == 0x100
+        assert cpu.get_state()["flags"] == (1 << Flags.ZERO) | (1 << Flags.POSITIVE)
+        assert cpu._pending_flags is None
+
+    def test_eager_mode(self):
+        """Con lazy_flags=False los flags se escriben en cada operación"""
+        cpu = CPU(memory_size=1024, lazy_flags=False)
+        cpu.registers[1] = 1
+        cpu.mem.write_word(0, (Opcodes.SUB << 56) | (3 << 52) | (2 << 48) | (1 << 44))
+
+        cpu.step()
+
+        assert cpu._pending_flags is None
+        assert cpu.flags == 1 << Flags.NEGATIVE
+
+        cpu.mem.write_word(8, (Opcodes.ADDI << 56) | (3 << 52) | (3 << 48) | 1)
+        cpu.step()
+
+        assert cpu._pending_flags is None
+        assert cpu.flags == 1 << Flags.ZERO | 1 << Flags.POSITIVE
+
+
+class TestLogging:
+    """Tests del subsistema de logging"""
+
+    def test_rate_limit_filter(self):
+        """El filtro deja pasar como máximo max_por_segundo registros"""
+        import logging
+
+        filtro = logger.FiltroDeFrecuencia(max_por_segundo=5, muestreo=2)
+        record = logging.LogRecord("x", logging.DEBUG, "", 0, "evento", None, None)
+
+        passed = sum(filtro.filter(record) for _ in range(100))
+
+        assert passed <= 5
+
+    def test_level_switch_resolves_alu_guard(self):
+        """Cambiar el nivel y llamar refresh_logging cambia la variante de la ALU"""
+        previous = logger.nivel_actual()
+        try:
+            logger.establecer_nivel("INFO")
+            cpu = CPU(memory_size=1024)
+            assert cpu.alu.trace is False
+            assert cpu.alu_executor.float_alu.trace is False
+
+            logger.establecer_nivel("debug")
+            cpu.refresh_logging()
+            assert cpu.alu.trace is True
+            assert cpu.alu.execute(ALUOperation.ADD, 2, 3)[0] == 5
+            float_alu = cpu.alu_executor.float_alu
+            assert float_alu.trace is True
+            one = float_alu.float_to_int(1.0)
+            result, _ = float_alu.execute("FADD", one, one)
+            assert float_alu.int_to_float(result) == 2.0
+        finally:
+            logger.establecer_nivel(previous)
+
+    def test_invalid_level(self):
+        """Un nombre de nivel desconocido produce ValueError"""
+        with pytest.raises(ValueError):
+            logger.establecer_nivel("VERBOSO")
+
+
+class TestTrace:
+    """Tests del grabador de trazas binarias"""
+
+    def test_trace_roundtrip(self, tmp_path):
+        """La traza registra cada instrucción con PC, Rd y dirección tocada"""
+        cpu = CPU(memory_size=1024)
+        cpu.mem.write_word(0, (Opcodes.MOVI << 56) | (1 << 52) | 0x40)
+        cpu.mem.write_word(8, (Opcodes.ST << 56) | (1 << 52) | 0x300)
+        cpu.mem.write_word(16, Opcodes.HALT << 56)
+
+        path = tmp_path / "run.trace"
+        cpu.start_trace(str(path), buffer_records=2)
+        cpu.run_fast()
+        cpu.stop_trace()
+
+        records = list(TraceReader(str(path)))
+        assert [r.pc for r in records] == [0, 8, 16]
+        assert [r.cycle for r in records] == [0, 1, 2]
+        assert records[0].rd_value == 0x40
+        assert records[1].address == 0x300
+        assert records[2].address == NO_ADDRESS
+
+    def test_step_and_run_fast_traces_match(self, tmp_path):
+        """step() y run_fast() producen la misma traza"""
+        traces = []
+        for fast in (False, True):
+            cpu = load_program(tmp_path)
+            path = tmp_path / f"loop{int(fast)}.trace"
+            cpu.start_trace(str(path), compression="lzma")
+            if fast:
+                cpu.run_fast()
+            else:
+                cpu.run(engine="blocks")
+            cpu.stop_trace()
+            traces.append(list(TraceReader(str(path))))
+
+        assert traces[0] == traces[1]
+        assert len(traces[0]) == traces[0][-1].cycle + 1
+
+    def test_invalid_file(self, tmp_path):
+        """Un archivo que no es traza produce ValueError"""
+        path = tmp_path / "bad.trace"
+        path.write_bytes(b"no es una traza")
+
+        with pytest.raises(ValueError):
+            TraceReader(str(path))
+
+
+class TestProfiler:
+    """Tests del perfilador por PC y por opcode"""
+
+    def test_exact_counts_and_source_lines(self, tmp_path):
+        """El modo exacto cuenta cada instrucción y la asocia a su línea"""
+        asm_file = tmp_path / "block.asm"
+        asm_file.write_text(LOOP_PROGRAM)
+        cpu = load_program(tmp_path)
+
+        profiler = cpu.start_profiler()
+        cpu.run(engine="blocks")
+
+        source_map = SourceMap.from_asm_file(str(asm_file))
+        report = profiler.to_dict(source_map)
+        assert report["estimated_instructions"] == cpu.cycle_count
+        hottest_lines = {entry["line"] for entry in report["by_pc"][:4]}
+        assert hottest_lines == {7, 8, 9, 10}
+        assert report["by_label"][0]["label"] == "loop"
+        assert report["by_label"][0]["count"] == 203
+        assert report["by_opcode"][-1]["count"] == 1
+
+    def test_sampling_mode(self):
+        """El modo de muestreo registra una de cada sample_every instrucciones"""
+        cpu = CPU(memory_size=1024)
+        cpu.mem.write_word(0, Opcodes.NOP << 56)
+        cpu.mem.write_word(8, (Opcodes.JMP << 56) | 0)
+
+        profiler = cpu.start_profiler("sampling", sample_every=5)
+        cpu.run_fast(max_cycles=1000)
+
+        assert profiler.samples == 200
+        assert profiler.estimated(profiler.samples) == 1000
+        assert dict(profiler.pc_items()) == {0: 100, 8: 100}
+
+    def test_unaligned_addresses(self):
+        """Direcciones en la misma palabra con distinta alineación no se mezclan"""
+        profiler = Profiler(4096)
+        profiler.sample(0x400, Opcodes.NOP)
+        profiler.sample(0x404, Opcodes.NOP)
+        profiler.sample(0x404, Opcodes.NOP)
+
+        assert sorted(profiler.pc_items()) == [(0x400, 1), (0x404, 2)]
+        assert json.loads(profiler.report_json())["samples"] == 3
+
+
+class TestSnapshot:
+    """Tests de instantáneas con seguimiento de páginas modificadas"""
+
+    def test_restore_roundtrip(self, tmp_path):
+        """Restaurar vuelve registros, PC, flags, SP, mapa y memoria"""
+        cpu = load_program(tmp_path)
+        exec_ranges = cpu.permissions.ranges()
+        snap = cpu.snapshot()
+
+        cpu.run()
+        assert cpu.mem.read_word(0x300) == sum(range(50))
+        cpu.stack_ops.push(7)
+        cpu.exec_map = None
+
+        cpu.restore(snap)
+        assert cpu.pc == 0
+        assert cpu.registers.get_all() == [0] * 16
+        assert cpu.flags == snap.flags
+        assert cpu.stack_ops.stack_pointer == snap.stack_pointer
+        assert cpu.mem.read_word(0x300) == 0
+        assert cpu.exec_map is not None
+        assert cpu.permissions.ranges() == exec_ranges
+        assert cpu.segments == list(snap.segments)
+
+        cpu.run()
+        assert cpu.mem.read_word(0x300) == sum(range(50))
+
+    def test_incremental_restore_copies_dirty_pages(self):
+        """Solo las páginas escritas desde la instantánea quedan marcadas"""
+        cpu = CPU(memory_size=64 * 1024)
+        cpu.mem.write_word(0x100, 11)
+        snap = cpu.snapshot()
+        assert cpu.mem.dirty_pages() == []
+
+        cpu.mem.write_word(0x2000, 5)
+        cpu.mem.write_word(0x3FFC, 6)  # Cruza el límite de página
+        assert cpu.mem.dirty_pages() == [2, 3, 4]
+
+        cpu.restore(snap)
+        assert cpu.mem.dirty_pages() == []
+        assert cpu.mem.read_word(0x2000) == 0
+        assert cpu.mem.read_word(0x3FFC) == 0
+        assert cpu.mem.read_word(0x100) == 11
+
+    def test_restore_invalidates_cached_code(self):
+        """El código modificado tras la instantánea no sobrevive al restore"""
+        cpu = CPU(memory_size=1024)
+        cpu.mem.write_word(0, (Opcodes.MOVI << 56) | (1 << 52) | 5)
+        cpu.mem.write_word(8, Opcodes.HALT << 56)
+        snap = cpu.snapshot()
+
+        cpu.run()
+        cpu.mem.write_word(0, (Opcodes.MOVI << 56) | (1 << 52) | 9)
+        cpu.restore(snap)
+        cpu.run()
+        assert cpu.registers.read(1) == 5
+
+    def test_memory_clear(self):
+        """Memory.clear pone todo en cero en el mismo búfer"""
+        cpu = CPU(memory_size=1024)
+        data = cpu.mem.data
+        cpu.mem.write_word(64, 0xFFFF)
+        cpu.reset()
+        assert cpu.mem.data is data
+        assert cpu.mem.read_word(64) == 0
+
+
+class TestSparseMemory:
+    """Tests de la memoria dispersa de 4 GiB"""
+
+    def test_lazy_pages_and_zero_reads(self):
+        """Solo se reservan páginas al escribir; lo no escrito se lee como cero"""
+        mem = SparseMemory()
+        assert mem.size == 1 << 32
+        assert mem.read_word(0xFFFFFFF0) == 0
+        assert mem.resident_pages == 0
+
+        mem.write_word(0xFFFFFFF8, 0x1122334455667788)
+        mem.write_byte(0x10, 0xAB)
+        assert mem.read_word(0xFFFFFFF8) == 0x1122334455667788
+        assert mem.read_byte(0x10) == 0xAB
+        assert mem.data[0x10] == 0xAB
+        assert mem.resident_pages == 2
+
+        with pytest.raises(ValueError):
+            mem.read_word(0xFFFFFFFC)
+
+    def test_word_across_page_boundary(self):
+        """Una palabra que cruza páginas se divide entre ambas"""
+        mem = SparseMemory()
+        mem.write_word(0x1FFC, 0x0102030405060708)
+        assert mem.read_word(0x1FFC) == 0x0102030405060708
+        assert mem.read_bytes(0x2000, 4) == bytes([0x04, 0x03, 0x02, 0x01])
+        assert mem.mapped_pages() == [1, 2]
+
+    def test_cpu_uses_high_addresses(self):
+        """La CPU puede guardar datos cerca del tope del espacio de 32 bits"""
+        cpu = CPU(memory=SparseMemory())
+        cpu.mem.write_word(0, (Opcodes.MOVI << 56) | (1 << 52) | 1234)
+        cpu.mem.write_word(8, (Opcodes.ST << 56) | (1 << 52) | 0xFFFE0000)
+        cpu.mem.write_word(16, (Opcodes.LD << 56) | (2 << 52) | 0xFFFE0000)
+        cpu.mem.write_word(24, Opcodes.HALT << 56)
+
+        snap = cpu.snapshot()
+        assert cpu.run_fast().halted
+        assert cpu.registers.read(2) == 1234
+        assert cpu.mem.resident_pages == 2
+
+        cpu.restore(snap)
+        assert cpu.mem.read_word(0xFFFE0000) == 0
+        assert cpu.mem.resident_pages == 1
+
+    def test_cpu_bookkeeping_stays_sparse(self):
+        """Páginas sucias y permisos no crecen con los 4 GiB; la pila va bajo MMIO"""
+        cpu = CPU(memory=SparseMemory())
+        assert cpu.stack_ops.stack_pointer == IOPorts.MMIO_CONSOLE_CHAR
+        assert cpu.stack_ops.stack_limit == 0
+        cpu.stack_ops.push(7)
+
+        snap = cpu.snapshot()
+        assert snap.permissions == ()
+        cpu.mem.write_word(0x5000, 1)
+        cpu.stack_ops.push(8)
+        assert cpu.mem.dirty_pages() == [5, (IOPorts.MMIO_CONSOLE_CHAR >> 12) - 1]
+        cpu.mem.clear()
+        assert cpu.mem.dirty_pages() == [5, (IOPorts.MMIO_CONSOLE_CHAR >> 12) - 1]
+
+        cpu.restore(snap)
+        assert cpu.mem.resident_pages == 1 and cpu.stack_ops.pop() == 7
+
+
+class TestWordFastPath:
+    """Tests de la vista de palabras para accesos alineados"""
+
+    def test_aligned_and_unaligned_agree(self):
+        """La vista alineada y la ruta de bytes usan el mismo formato"""
+        cpu = CPU(memory_size=1024)
+        cpu.mem.write_word(16, 0x0102030405060708)
+        assert cpu.mem.data[16:24] == bytes([8, 7, 6, 5, 4, 3, 2, 1])
+        cpu.mem.write_word(27, 0xAABBCCDDEEFF0011)
+        assert cpu.mem.read_word(27) == 0xAABBCCDDEEFF0011
+        assert cpu.mem.read_word(24) == 0xDDEEFF0011000000
+
+    def test_bounds_checked_once(self):
+        """Los accesos fuera de rango siguen fallando con el mensaje de la CPU"""
+        cpu = CPU(memory_size=1024)
+        assert cpu.memory_ops.read_word(1016) == 0
+        with pytest.raises(ValueError, match="lectura fuera de rango"):
+            cpu.memory_ops.read_word(1024)
+        with pytest.raises(ValueError, match="escritura fuera de rango"):
+            cpu.memory_ops.write_word(-8, 1)
+        with pytest.raises(ValueError):
+            cpu.mem.read_word(1020)
+
+    def test_hook_errors_are_not_masked(self):
+        """Un ValueError de un observador se propaga con su propio mensaje"""
+        cpu = CPU(memory_size=1024)
+
+        def failing_hook(addr, size):
+            raise ValueError("observador roto")
+
+        cpu.mem.add_write_hook(failing_hook)
+        with pytest.raises(ValueError, match="observador roto"):
+            cpu.memory_ops.write_word(8, 1)
+        with pytest.raises(ValueError, match="observador roto"):
+            cpu.memory_ops.write_byte(8, 1)
+        # Fuera de rango la memoria falla antes del observador
+        with pytest.raises(ValueError, match="escritura fuera de rango"):
+            cpu.memory_ops.write_word(1024, 1)
+        with pytest.raises(ValueError, match="lectura fuera de rango"):
+            cpu.memory_ops.read_word(-8)
+        with pytest.raises(ValueError, match="fuera de rango: 0x00000400"):
+            cpu.memory_ops.read_byte(1024)
+
+
+class TestMappedMemory:
+    """Tests de la memoria mapeada sobre un archivo (mmap)"""
+
+    def test_cpu_writes_reach_file(self, tmp_path):
+        """Lo que escribe el programa queda en el archivo de respaldo"""
+        ram = tmp_path / "ram.bin"
+        cpu = CPU(memory=Memory(size_bytes=4096, backing_file=str(ram)))
+        cpu.mem.write_word(0, (Opcodes.MOVI << 56) | (1 << 52) | 77)
+        cpu.mem.write_word(8, (Opcodes.ST << 56) | (1 << 52) | 0x800)
+        cpu.mem.write_word(16, Opcodes.HALT << 56)
+        assert cpu.run_fast().halted
+        cpu.mem.close()
+
+        data = ram.read_bytes()
+        assert len(data) == 4096
+        assert int.from_bytes(data[0x800:0x808], "little") == 77
+
+    def test_read_only_attach(self, tmp_path):
+        """Otra instancia puede abrir la misma imagen solo para lectura"""
+        ram = tmp_path / "ram.bin"
+        mem = Memory(size_bytes=8192, backing_file=str(ram))
+        mem.write_word(0x1000, 0xCAFE)
+        mem.flush()
+
+        viewer = Memory(backing_file=str(ram), read_only=True)
+        assert viewer.size == 8192
+        assert viewer.read_word(0x1000) == 0xCAFE
+        with pytest.raises(TypeError):
+            viewer.write_word(0, 1)
+        viewer.close()
+        mem.close()
+
+    def test_load_dump_and_clear(self, tmp_path):
+        """Cargar/volcar el propio archivo no copia; clear deja todo en cero"""
+        ram = tmp_path / "ram.bin"
+        ram.write_bytes((5).to_bytes(8, "little") + bytes(4088))
+        mem = Memory(backing_file=str(ram))
+        assert mem.read_word(0) == 5
+
+        mem.write_word(8, 6)
+        mem.dump_to_file(str(ram))
+        assert ram.read_bytes()[8] == 6
+        copy = tmp_path / "copy.bin"
+        mem.dump_to_file(str(copy))
+        assert copy.read_bytes() == ram.read_bytes()
+
+        mem.clear()
+        assert mem.read_word(0) == 0 and mem.read_word(8) == 0
+        mem.close()
+
+
+class TestMemoryExport:
+    """Tests de los exportadores e importadores de memoria"""
+
+    def _memory(self):
+        mem = Memory(size_bytes=256 * 1024)
+        mem.write_bytes(0x10, b"hola")
+        mem.write_word(0x1FFF8, 0x1122334455667788)  # Cruza el límite de 64 KiB
+        mem.write_word(0x3FFF8, 0xFF)
+        return mem
+
+    @pytest.mark.parametrize("ext", [".bin", ".hex", ".srec", ".sparse"])
+    def test_roundtrip(self, tmp_path, ext):
+        """Cada formato se vuelve a leer con su importador"""
+        mem = self._memory()
+        path = tmp_path / f"volcado{ext}"
+        export_memory(mem, str(path))
+
+        copy = Memory(size_bytes=mem.size)
+        import_memory(copy, str(path))
+        assert bytes(copy.data) == bytes(mem.data)
+
+    def test_formats_skip_zero_pages(self, tmp_path):
+        """Los formatos de texto y el disperso no crecen con la memoria vacía"""
+        mem = self._memory()
+        sizes = {}
+        for ext in (".hex", ".srec", ".sparse"):
+            path = tmp_path / f"volcado{ext}"
+            sizes[ext] = export_memory(mem, str(path))
+        assert max(sizes.values()) < 300
+        assert [addr for addr, _ in mem.nonzero_pages()] == [0x0, 0x1F000, 0x3F000]
+
+    def test_intel_hex_checksum(self):
+        """El parser de Intel HEX rechaza checksums inválidos"""
+        mem = self._memory()
+        lines = list(iter_intel_hex(mem, 0, 0x100))
+        assert lines[-1] == ":00000001FF\n"
+        assert list(parse_intel_hex(lines)) == [(0x10, b"hola" + bytes(12))]
+
+        corrupt = lines[1][:-3] + "00\n"
+        with pytest.raises(ValueError, match="checksum"):
+            list(parse_intel_hex([corrupt]))
+
+
+class TestMemoryScanner:
+    """Tests del escáner de memoria (con NumPy y en Python puro)"""
+
+    ARRAY = [5, 3, 9, 1, 7]
+
+    def _memory(self):
+        mem = Memory(size_bytes=1 << 20)
+        for i, value in enumerate(self.ARRAY):
+            mem.write_word(0x80000 + i * 8, value)
+        mem.write_bytes(0x123, b"euclid")
+        return mem
+
+    @pytest.mark.parametrize("use_numpy", [True, False])
+    def test_find_patterns_and_values(self, use_numpy):
+        """Encuentra bytes, valores y secuencias de palabras"""
+        scanner = MemoryScanner(self._memory(), use_numpy=use_numpy)
+        assert scanner.find_bytes(b"euclid") == [0x123]
+        assert scanner.find_value(9) == [0x80010]
+        assert scanner.find_values(self.ARRAY) == [0x80000]
+        assert scanner.find_values([3, 5]) == []
+
+    @pytest.mark.parametrize("use_numpy", [True, False])
+    def test_incremental_scan(self, use_numpy):
+        """Los escaneos sucesivos acotan los candidatos"""
+        mem = self._memory()
+        scanner = MemoryScanner(mem, use_numpy=use_numpy)
+        assert scanner.first_scan() == mem.size // 8
+
+        mem.write_word(0x80008, 4)
+        assert scanner.next_scan("changed") == 1
+        assert scanner.candidates() == [(0x80008, 4)]
+
+        mem.write_word(0x80008, 10)
+        assert scanner.next_scan("increased") == 1
+        assert scanner.next_scan("exact", 11) == 0
+
+    def test_scan_program_memory(self, tmp_path):
+        """Localiza la variable del programa y valida los argumentos"""
+        cpu = load_program(tmp_path)
+        scanner = MemoryScanner(cpu.mem)
+        scanner.first_scan(0)
+        cpu.run()
+        assert scanner.next_scan("exact", sum(range(50))) == 1
+        assert scanner.candidates()[0][0] == 0x300
+
+        with pytest.raises(ValueError):
+            MemoryScanner(cpu.mem, start=3)
+        with pytest.raises(RuntimeError):
+            MemoryScanner(cpu.mem).next_scan("changed")
+
+
+class TestCacheSimulator:
+    """Tests del simulador de jerarquía de caché"""
+
+    @pytest.mark.parametrize("policy", ["lru", "plru"])
+    def test_set_associative_replacement(self, policy):
+        """Dos vías retienen dos líneas en conflicto; la tercera expulsa la LRU"""
+        level = CacheLevel("L1D", CacheConfig(256, 2, 64, policy))
+        stride = 128  # Misma dirección de conjunto
+        assert not level.access(0)
+        assert not level.access(stride)
+        assert level.access(0) and level.access(stride + 8)
+        level.access(0)
+        assert not level.access(2 * stride)  # Expulsa a stride
+        assert level.access(0)
+        assert not level.access(stride)
+        assert (level.hits, level.misses) == (4, 4)
+
+    def test_cpu_integration(self, tmp_path):
+        """Cada instrucción se busca en L1I y los ST se atribuyen a su PC"""
+        cpu = load_program(tmp_path)
+        hierarchy = cpu.enable_cache()
+        cpu.run_fast()
+        assert cpu.mem.read_word(0x300) == sum(range(50))
+        assert hierarchy.l1i.accesses == cpu.cycle_count
+        assert hierarchy.writes == 1 and hierarchy.l1d.misses == 1
+        assert len(hierarchy.data_by_pc) == 1
+        assert "L1I" in hierarchy.report_text()
+
+        assert cpu.disable_cache() is hierarchy
+        assert cpu.memory_ops.mem is cpu.mem and cpu.cache_sim is None
+
+    def test_parse_cache_spec(self):
+        """La especificación de texto se valida"""
+        config = parse_cache_spec("l1d=8K/4/32,l2=off,policy=plru")
+        assert config["l1d"] == CacheConfig(8192, 4, 32, "plru")
+        assert config["use_l2"] is False
+        for spec in ("l1d=3K/2/64", "l1i=4K/2", "policy=fifo", "l3=1M/8/64"):
+            with pytest.raises(ValueError):
+                parse_cache_spec(spec)
+
+
+class TestWatchpoints:
+    """Tests de los watchpoints de lectura, escritura y ejecución"""
+
+    @pytest.mark.parametrize("runner", ["run", "run_fast"])
+    def test_write_watchpoint_pauses_after_store(self, tmp_path, runner):
+        """La escritura se completa y la CPU se detiene con el PC del ST"""
+        cpu = load_program(tmp_path)
+        cpu.add_watchpoint(0x300, 8, "w")
+        getattr(cpu, runner)()
+        hit = cpu.watch_hit
+        assert hit is not None and hit.kind == WATCH_WRITE
+        assert (hit.pc, hit.address) == (0x38, 0x300)
+        assert (hit.old_value, hit.value) == (0, sum(range(50)))
+        assert cpu.pc == 0x40 and not cpu.running
+
+        getattr(cpu, runner)()
+        assert cpu.watch_hit is None
+        assert cpu.mem.read_word(0x300) == sum(range(50))
+
+    def test_exec_watchpoint_stops_before_instruction(self, tmp_path):
+        """Se detiene antes de ejecutar la instrucción vigilada, cada vez"""
+        cpu = load_program(tmp_path)
+        cpu.add_watchpoint(0x18, 8, "x")
+        hits = 0
+        while True:
+            result = cpu.run_fast()
+            if cpu.watch_hit is None:
+                break
+            hits += 1
+            assert cpu.pc == cpu.watch_hit.pc == 0x18
+        assert hits == 50 and result.halted
+        assert cpu.mem.read_word(0x300) == sum(range(50))
+
+    def test_page_granular_arming(self, tmp_path):
+        """Solo hay bus de comprobación con watchpoints de datos"""
+        cpu = load_program(tmp_path)
+        assert cpu.memory_ops.mem is cpu.mem
+        watchpoint = cpu.add_watchpoint(0x700, 4, "rw")
+        assert isinstance(cpu.memory_ops.mem, WatchBus)
+        # Un acceso de 8 bytes que comienza antes del rango también lo toca
+        assert cpu.watchpoints.match(0x6F9, 8, WATCH_WRITE) is watchpoint
+        assert cpu.watchpoints.match(0x6F8, 8, WATCH_WRITE) is None
+        cpu.run()
+        assert cpu.watch_hit is None
+
+        cpu.remove_watchpoint(watchpoint.id)
+        assert cpu.memory_ops.mem is cpu.mem
+        for args in ((-1, 8, "w"), (0x10, 8, "q"), (0x10, 0, "w")):
+            with pytest.raises(ValueError):
+                cpu.add_watchpoint(*args)
+        with pytest.raises(ValueError):
+            cpu.remove_watchpoint(99)
+
+
+class TestBulkWords:
+    """Tests de read_words / write_words"""
+
+    @pytest.mark.parametrize("factory", [lambda: Memory(size_bytes=8192), SparseMemory])
+    def test_roundtrip_and_inputs(self, factory):
+        """Acepta listas, array('Q'), NumPy y bytes; alineado o no"""
+        mem = factory()
+        assert mem.write_words(0x100, [1, -1, 1 << 64 | 7]) == 3
+        assert mem.read_words(0x100, 3) == [1, MASK64, 7]
+        assert mem.read_words(0x101, 1) == [0xFF << 56]
+
+        mem.write_words(0xFFB, array("Q", [0x1122334455667788]))
+        assert mem.read_word(0xFFB) == 0x1122334455667788
+        mem.write_words(0x200, (0x0102).to_bytes(8, "little") * 2)
+        assert mem.read_words(0x200, 2) == [0x0102, 0x0102]
+        if HAVE_NUMPY:
+            import numpy as np
+
+            mem.write_words(0x300, np.arange(4, dtype=">u8"))
+            assert mem.read_words(0x300, 4) == [0, 1, 2, 3]
+        assert mem.read_words(0x100, 0) == []
+
+        with pytest.raises(ValueError):
+            mem.write_words(0x100, b"\x00" * 5)
+        with pytest.raises(ValueError):
+            mem.read_words(mem.size - 8, 2)
+
+    def test_single_notification(self):
+        """Una validación y un aviso de escritura por llamada"""
+        mem = Memory(size_bytes=4096)
+        writes = []
+        mem.add_write_hook(lambda addr, size: writes.append((addr, size)))
+        mem.write_words(0x40, range(100))
+        assert writes == [(0x40, 800)]
+        with pytest.raises(ValueError):
+            mem.write_words(4000, range(100))
+        assert len(writes) == 1 and mem.read_word(4000) == 0
+
+    def test_loader_and_io_use_bulk_paths(self, tmp_path):
+        """El loader escribe un tramo por bloque contiguo y OUT de arrays lee todo"""
+        code = """
+    ORG 0x0
+        MOVI R1, 0x200
+        MOVI R2, 3
+        HALT
+    ORG 0x200
+    DW 3, -4, 5
+"""
+        asm_file = tmp_path / "bulk.asm"
+        asm_file.write_text(code)
+        bin_file, map_file = tmp_path / "bulk.bin", tmp_path / "bulk.map"
+        Assembler().assemble_file(str(asm_file), str(bin_file), str(map_file))
+
+        cpu = CPU(memory_size=2048)
+        writes = []
+        cpu.mem.add_write_hook(lambda addr, size: writes.append((addr, size)))
+        Loader.cargar_programa(cpu, str(bin_file), str(map_file))
+        assert writes == [(0x0, 24), (0x200, 24)]
+        assert cpu.mem.read_words(0x200, 3) == [3, MASK64 - 3, 5]
+
+        # OUT con subop 1 (array con separador ','), cortado al final de memoria
+        cpu.io_ports.write_output(0x200, 3, (1 << 1) | (ord(",") << 4))
+        cpu.io_ports.write_output(2048 - 8, 5, 1 << 1)
+        assert cpu.io_ports.output_buffer == "3,-4,50"
+
+        cpu.stack_ops.push(1)
+        cpu.stack_ops.push(2)
+        assert cpu.stack_ops.contents() == [2, 1]
+
+
+class TestRegionRegistry:
+    """Tests del registro de regiones y su uso en loader y pila"""
+
+    def test_queries_and_collisions(self):
+        """find / overlapping por bisect; colisión atómica o desalojo"""
+        regions = RegionRegistry()
+        regions.add(0x100, 0x1FF, "a")
+        regions.add_extents(extents_from_addresses([0x300, 0x308, 0x400]), "b")
+        assert [(r.start, r.end) for r in regions.named("b")] == [
+            (0x300, 0x30F),
+            (0x400, 0x407),
+        ]
+        assert regions.find(0x1FF).name == "a" and regions.find(0x200) is None
+        assert [r.name for r in regions.overlapping(0x1F0, 0x300)] == ["a", "b"]
+        assert regions.overlapping(0x200, 0x2FF) == []
+
+        with pytest.raises(ValueError, match="colisiona con 'a'"):
+            regions.add_extents([(0x000, 0x0FF), (0x180, 0x187)], "c")
+        assert regions.find(0x000) is None and len(regions) == 3
+
+        regions.add(0x180, 0x30F, "c", evict=True)
+        assert [r.name for r in regions] == ["c", "b"]
+        assert regions.remove_named("b") == 1 and len(regions) == 1
+
+    def test_allocator_strategies(self):
+        """first-fit toma el primer hueco; best-fit el más ajustado"""
+        regions = RegionRegistry()
+        regions.add(0x000, 0x0FF, "a")
+        regions.add(0x200, 0x2FF, "b")  # hueco 0x100-0x1FF (256 bytes)
+        regions.add(0x340, 0x3FF, "c")  # hueco 0x300-0x33F (64 bytes)
+        assert regions.free_ranges(0, 0x500) == [
+            (0x100, 0x1FF),
+            (0x300, 0x33F),
+            (0x400, 0x4FF),
+        ]
+        assert regions.allocate(48, 0, 0x500, strategy="first") == 0x100
+        assert regions.allocate(48, 0, 0x500, strategy="best") == 0x300
+        assert regions.allocate(0x180, 0, 0x600) == 0x400
+        with pytest.raises(ValueError):
+            regions.allocate(0x180, 0, 0x500)
+        assert regions.stack_floor(0x500) == 0x400
+
+    def test_loader_placement_and_stack_floor(self, tmp_path):
+        """La carga que colisiona no escribe; placement reubica; la pila se
+        detiene al llegar al programa más alto"""
+        asm_file = tmp_path / "p.asm"
+        asm_file.write_text("    ORG 0x0\n        MOVI R1, 1\n        HALT\n")
+        bin_file, map_file = str(tmp_path / "p.bin"), str(tmp_path / "p.map")
+        Assembler().assemble_file(str(asm_file), bin_file, map_file)
+
+        cpu = CPU(memory_size=2048)
+        Loader.cargar_programa(cpu, bin_file, map_file)
+        writes = []
+        cpu.mem.add_write_hook(lambda addr, size: writes.append(addr))
+        with pytest.raises(ValueError, match="colisiona"):
+            Loader.cargar_programa(cpu, bin_file, map_file, base_address=8)
+        assert writes == [] and len(cpu.segments) == 1
+
+        Loader.cargar_programa(cpu, bin_file, map_file, placement="first")
+        Loader.cargar_programa(cpu, bin_file, map_file, base_address=1024)
+        assert cpu.segments == [
+            (0, 15, "p.bin"),
+            (16, 31, "p.bin"),
+            (1024, 1039, "p.bin"),
+        ]
+        assert cpu.stack_ops.stack_limit == 1040
+        for i in range((2048 - 1040) // 8):
+            cpu.stack_ops.push(i)
+        with pytest.raises(RuntimeError, match="invadiría"):
+            cpu.stack_ops.push(0)
+
+        cpu.reset()
+        assert cpu.segments == [] and cpu.stack_ops.stack_limit == 0
+        assert {r.kind for r in cpu.regions} == {"mmio"}
+
+    def test_gui_loads_use_cpu_regions(self, tmp_path):
+        """Los programas cargados desde la GUI quedan en cpu.regions y una
+        colisión rechaza la carga sin desalojar al otro"""
+        source = "ORG 0x0\n        MOVI R1, 1\n        HALT"
+        asm_file = tmp_path / "p.asm"
+        asm_file.write_text(source)
+        bin_file, map_file = str(tmp_path / "p.bin"), str(tmp_path / "p.map")
+        Assembler().assemble_file(str(asm_file), bin_file, map_file)
+        CompilationRegistry.register(source, bin_file, map_file)
+
+        class Textbox:
+            def get(self, start, end):
+                return source
+
+        cpu = CPU(memory_size=2048)
+        try:
+            gui_reloc.link_load(Textbox(), cpu, program_name_override="a")
+            assert cpu.segments == [(0, 15, "a:0:0-8")]
+            assert cpu.stack_ops.stack_limit == 16
+
+            gui_reloc.link_load(Textbox(), cpu, base_address=8)
+            assert [p.name for p in CompilationRegistry.get_loaded_programs()] == ["a"]
+            assert cpu.segments == [(0, 15, "a:0:0-8")]
+        finally:
+            CompilationRegistry.clear_loaded_programs()
+
+
+class TestRegisterFastPath:
+    """Tests del acceso sin validar a registros y del FloatALU con memoryview"""
+
+    def test_values_is_stable_and_public_api_checks(self):
+        """values sobrevive a reset/restore; read/write siguen validando"""
+        registers = RegisterFile()
+        values = registers.values
+        registers[3] = -1
+        assert values[3] == MASK64
+        registers.reset()
+        assert registers.values is values and values == [0] * 16
+        with pytest.raises(ValueError):
+            registers[16]
+        with pytest.raises(ValueError):
+            registers.write(-1, 0)
+
+        cpu = CPU(memory_size=1024)
+        values = cpu.registers.values
+        snap = cpu.snapshot()
+        cpu.registers[5] = 42
+        cpu.restore(snap)
+        assert cpu.alu_executor.regs is values and values[5] == 0
+
+    @pytest.mark.parametrize(
+        "a, b",
+        [(3.5, 2.5), (-1e308, 1e308), (0.1, 3.0), (1.0, 0.0), (float("nan"), 1.0)],
+    )
+    def test_float_alu_matches_struct(self, a, b):
+        """La reinterpretación por memoryview da los mismos bits que struct"""
+        import struct
+
+        def to_bits(value):
+            return struct.unpack("Q", struct.pack("d", value))[0]
+
+        float_alu = FloatALU()
+        for name, op in (
+            ("FADD", lambda x, y: x + y),
+            ("FSUB", lambda x, y: x - y),
+            ("FMUL", lambda x, y: x * y),
+        ):
+            result, _ = float_alu.execute(name, to_bits(a), to_bits(b))
+            assert result == to_bits(op(a, b))
+        assert float_alu.int_to_float(to_bits(a)) == a or a != a
+        assert float_alu.float_to_int(b) == to_bits(b)
+
+
+class TestOutputSink:
+    """Tests de la salida de consola por lotes"""
+
+    def test_flush_rules(self, tmp_path):
+        """Entrega por salto de línea, buffer lleno, bloque grande y close"""
+        batches = []
+        sink = CallbackSink(batches.append, capacity=16, flush_interval=None)
+        sink.write("ab")
+        sink.write("c")
+        assert batches == [] and sink.pending == 3
+        sink.write("\n")
+        sink.write("x" * 40)
+        assert batches == ["abc\n", "x" * 40] and sink.pending == 0
+
+        sink.line_buffered = False
+        for ch in "0123456789abcdefgh":
+            sink.write(ch)
+        assert batches[-1] == "0123456789abcdef" and sink.pending == 2
+
+        path = tmp_path / "salida.txt"
+        file_sink = FileSink(str(path))
+        file_sink.write("hola\n")
+        assert path.read_text() == ""
+        file_sink.close()
+        assert path.read_text() == "hola\n"
+
+    def test_large_array_is_one_update(self):
+        """OUT de un arreglo de 100k elementos llega en una sola entrega"""
+        cpu = CPU(memory_size=1 << 20)
+        count = 100_000
+        cpu.mem.write_words(0, [i - 3 for i in range(count)])
+        func = (1 << 1) | (ord(",") << 4)
+
+        cpu.io_ports.write_output(0, count, func)
+        expected = cpu.io_ports.get_output_buffer()
+        assert expected.startswith("-3,-2,-1,0,1,") and expected.count(",") == count - 1
+
+        batches = []
+        cpu.io_ports.set_output_sink(CallbackSink(batches.append))
+        cpu.io_ports.write_output(0, count, func)
+        assert batches == [expected]
+
+    def test_base_is_abstract(self):
+        """OutputSink exige write_through"""
+        with pytest.raises(TypeError):
+            OutputSink()
+
+    def test_unknown_port_reaches_sink(self):
+        """OUT a un puerto numérico desconocido también llega al sink"""
+        cpu = CPU(memory_size=4096)
+        batches = []
+        cpu.io_ports.set_output_sink(CallbackSink(batches.append))
+        cpu.io_ports.write_output(42, 7, 1)
+        assert batches == ["42\n"]
+
+    def test_flush_on_input_and_halt(self, tmp_path):
+        """El texto pendiente se entrega antes de un IN y al ejecutar HALT"""
+        cpu = load_program(tmp_path)
+        batches = []
+        sink = CallbackSink(batches.append, line_buffered=False, flush_interval=None)
+        cpu.io_ports.set_output_sink(sink)
+
+        pending_at_read = []
+        cpu.io_ports.set_input_int_callback(
+            lambda: pending_at_read.append(sink.pending) or 7
+        )
+        cpu.io_ports.write_output(ord(">"), 1, 1)
+        assert batches == []
+        assert cpu.io_ports.read_input(2, 1) == 7 and pending_at_read == [0]
+        assert batches == [">"]
+
+        cpu.run_fast()
+        assert batches == [">", f"{sum(range(50))}\n"]
+
+
+class TestInputProvider:
+    """Tests de la entrada guionada por buffer"""
+
+    def test_base_is_abstract(self):
+        """InputProvider exige read_block"""
+        with pytest.raises(TypeError):
+            InputProvider()
+
+    def test_mixed_reads(self):
+        """Enteros, flotantes, caracteres y líneas salen del mismo buffer"""
+        provider = StringInputProvider("12\n\n0x1F\n3.5\nhola mundo\nab")
+        assert provider.read_int() == 12
+        assert provider.read_int() == 31  # Salta la línea vacía
+        assert provider.read_float() == 3.5
+        assert provider.read_char() == ord("h")
+        assert provider.read_line() == "ola mundo"
+        assert provider.read_line(1) == "a"
+        assert provider.read_char() == ord("b")
+        assert provider.read_char() == 10
+        assert provider.read_line() is None and provider.read_char() == 0
+        assert provider.read_int() == 0
+
+        with pytest.raises(ValueError):
+            StringInputProvider("siete\n").read_int()
+
+    def test_file_blocks(self, tmp_path):
+        """Las líneas que cruzan bloques (y los \\r\\n) se reconstruyen"""
+        path = tmp_path / "entrada.txt"
+        path.write_bytes(b"123\r\n-45\r\nlinea larga\r\n")
+        provider = FileInputProvider(str(path), block_size=4)
+        assert provider.read_int() == 123
+        assert provider.read_int() == -45
+        assert provider.read_line() == "linea larga"
+        assert provider.read_line() is None
+
+    def test_cpu_reads_from_provider(self):
+        """IN entero, IN de arreglo (subop 1) e INS leen del proveedor"""
+        cpu = CPU(memory_size=4096)
+        cpu.io_ports.set_input_provider(StringInputProvider("-2\n5,6,x,8\nhola\n"))
+        assert cpu.io_ports.read_input(2, 1) == MASK64 - 1
+
+        func = (1 << 1) | (ord(",") << 4)
+        instruction = (Opcodes.IN << 56) | (3 << 52) | (4 << 48) | (func << 32) | 4
+        cpu.registers[4] = 0x200
+        cpu.mem.write_word(0, instruction)
+        cpu.step()
+        assert cpu.registers[3] == 4
+        assert cpu.mem.read_words(0x200, 4) == [5, 6, 0, 8]
+
+        assert cpu.io_ports.read_string(IOPorts.MMIO_CONSOLE_IN_INT) == "hola"
+
+
+class TestDMA:
+    """Tests del controlador DMA entre archivos y memoria"""
+
+    PORT = 0xFFFF0020
+
+    def _program(self, cpu, src, dst, length, direction):
+        """Programa los registros con OUT a MMIO y lee STATUS/COUNT con IN"""
+        for address, value in (
+            (DMA_SRC, src),
+            (DMA_DST, dst),
+            (DMA_LEN, length),
+            (DMA_CTRL, direction),
+        ):
+            cpu.io_ports.write_output(value, address, 0)
+        return cpu.io_ports.read_input(DMA_STATUS, 0), cpu.io_ports.read_input(
+            DMA_COUNT, 0
+        )
+
+    @pytest.mark.parametrize("factory", [None, SparseMemory])
+    def test_file_roundtrip(self, tmp_path, factory):
+        """Archivo -> memoria con un solo aviso de escritura y de vuelta"""
+        payload = bytes(range(256)) * 4096  # 1 MiB
+        src = tmp_path / "entrada.bin"
+        src.write_bytes(payload)
+        memory = factory(size_bytes=2 << 20) if factory else None
+        cpu = CPU(memory_size=2 << 20, memory=memory)
+        writes = []
+        cpu.mem.add_write_hook(lambda addr, size: writes.append((addr, size)))
+
+        cpu.io_ports.open_file(self.PORT, str(src), "rb")
+        status, count = self._program(cpu, self.PORT, 0x1000, len(payload), 0)
+        assert (status, count) == (DMA_DONE, len(payload))
+        assert cpu.mem.read_bytes(0x1000, len(payload)) == payload
+        if factory is None:
+            assert writes == [(0x1000, len(payload))]
+        cpu.io_ports.close_file(self.PORT)
+
+        out = tmp_path / "salida.bin"
+        cpu.io_ports.open_file(self.PORT, str(out), "wb")
+        status, count = self._program(cpu, 0x1000, self.PORT, 4096, DMA_TO_FILE)
+        cpu.io_ports.close_file(self.PORT)
+        assert (status, count) == (DMA_DONE, 4096)
+        assert out.read_bytes() == payload[:4096]
+
+    def test_short_read_and_errors(self, tmp_path):
+        """EOF antes de LEN, puerto sin archivo y rango fuera de la memoria"""
+        src = tmp_path / "corto.txt"
+        src.write_text("hola")
+        cpu = CPU(memory_size=4096)
+        cpu.io_ports.open_file(self.PORT, str(src), "r")
+        status, count = self._program(cpu, self.PORT, 0x100, 64, 0)
+        assert (status, count) == (DMA_DONE | DMA_EOF, 4)
+        assert cpu.io_ports.read_string_from_memory(0x100) == "hola"
+
+        status, _ = self._program(cpu, 0x30, 0x100, 8, 0)
+        assert status == DMA_DONE | DMA_ERROR and "0x30" in cpu.io_ports.dma.last_error
+        status, count = self._program(cpu, self.PORT, 4090, 64, 0)
+        assert (status, count) == (DMA_DONE | DMA_ERROR, 0)
+        cpu.io_ports.close_all_files()
+
+    def test_mixed_with_ins(self, tmp_path):
+        """DMA después de INS sigue donde quedó el texto, y INS después del DMA"""
+        src = tmp_path / "mixto.txt"
+        src.write_text("cabecera\n0123456789ABCDEF\ncola\n")
+        cpu = CPU(memory_size=4096)
+        cpu.io_ports.open_file(self.PORT, str(src), "r")
+        assert cpu.io_ports.read_string(self.PORT) == "cabecera"
+
+        status, count = self._program(cpu, self.PORT, 0x100, 16, 0)
+        assert (status, count) == (DMA_DONE, 16)
+        assert cpu.mem.read_bytes(0x100, 16) == b"0123456789ABCDEF"
+        assert cpu.io_ports.read_string(self.PORT) == ""  # Resto de la línea
+        assert cpu.io_ports.read_string(self.PORT) == "cola"
+        cpu.io_ports.close_all_files()
+
+    def test_guest_program(self, tmp_path):
+        """Un programa invitado programa el DMA con OUT/IN y ejecuta lo leído"""
+        src = tmp_path / "codigo.bin"
+        src.write_bytes((Opcodes.HALT << 56).to_bytes(8, "little"))
+        cpu = CPU(memory_size=4096)
+        cpu.io_ports.open_file(self.PORT, str(src), "rb")
+
+        def encode(opcode, rd=0, imm32=0):
+            return (opcode << 56) | (rd << 52) | (imm32 & 0xFFFFFFFF)
+
+        program = [
+            encode(Opcodes.OUT, 1, DMA_SRC),
+            encode(Opcodes.OUT, 2, DMA_DST),
+            encode(Opcodes.OUT, 3, DMA_LEN),
+            encode(Opcodes.OUT, 4, DMA_CTRL),
+            encode(Opcodes.IN, 5, DMA_COUNT),
+            encode(Opcodes.NOP),  # Lo reemplaza el HALT que trae el DMA
+        ]
+        cpu.mem.write_words(0, program)
+        cpu.pc = 0x28
+        cpu.step()  # El NOP queda en la caché de decodificación
+        cpu.pc = 0
+        for reg, value in ((1, self.PORT), (2, 0x28), (3, 8), (4, 0)):
+            cpu.registers[reg] = value
+        result = cpu.run_fast(max_cycles=100)
+        assert result.halted and cpu.registers[5] == 8 and cpu.pc == 0x30
+        cpu.io_ports.close_all_files()
+
+
+class TestFileWindow:
+    """Tests de los archivos del host mapeados en el espacio del invitado"""
+
+    @staticmethod
+    def _encode(opcode, rd=0, rs1=0, rs2=0, func=0, imm32=0):
+        return (
+            (opcode << 56)
+            | (rd << 52)
+            | (rs1 << 48)
+            | (rs2 << 44)
+            | (func << 32)
+            | (imm32 & 0xFFFFFFFF)
+        )
+
+    @pytest.mark.parametrize("engine", ["interpreter", "blocks", "fast"])
+    def test_guest_reads_and_writes_file(self, tmp_path, engine):
+        """LD/ST sobre la ventana leen y modifican el archivo"""
+        data = tmp_path / "datos.bin"
+        data.write_bytes(b"".join(n.to_bytes(8, "little") for n in (20, 22, 0)))
+        cpu = CPU(memory_size=4096)
+        window = cpu.map_file(str(data))
+        assert window.base == 4096 and window.size == 24
+        assert cpu.regions.find(window.base).name == "datos.bin"
+
+        encode = self._encode
+        cpu.mem.write_words(
+            0,
+            [
+                encode(Opcodes.LD, 3, 1, func=1, imm32=0),
+                encode(Opcodes.LD, 4, 1, func=1, imm32=8),
+                encode(Opcodes.ADD, 5, 3, 4),
+                encode(Opcodes.ST, 5, 1, func=1, imm32=16),
+                encode(Opcodes.HALT),
+            ],
+        )
+        cpu.registers[1] = window.base
+        if engine == "fast":
+            assert cpu.run_fast(max_cycles=100).halted
+        else:
+            cpu.run(max_cycles=100, engine=engine)
+        assert cpu.registers[5] == 42
+        cpu.unmap_file(window)
+        assert data.read_bytes()[16:] == (42).to_bytes(8, "little")
+        assert cpu.regions.find(4096) is None and not cpu.file_windows
+
+    def test_placement_and_collisions(self, tmp_path):
+        """La base elegida evita otras ventanas y no se acepta dentro de la RAM"""
+        cpu = CPU(memory_size=5000)
+        first = cpu.map_file(str(tmp_path / "a.bin"), size=4096)
+        second = cpu.map_file(str(tmp_path / "b.bin"), size=100)
+        assert (first.base, second.base) == (8192, 12288)
+        with pytest.raises(ValueError, match="RAM"):
+            cpu.map_file(str(tmp_path / "c.bin"), base=0x100, size=8)
+        with pytest.raises(ValueError, match="colisiona"):
+            cpu.map_file(str(tmp_path / "c.bin"), base=8200, size=8)
+        cpu.reset()
+        assert cpu.memory_ops.read_byte(12288 + 99) == 0
+        assert len(cpu.regions.of_kind("mmio")) == 4
+        for window in list(cpu.file_windows):
+            cpu.unmap_file(window)
+        assert cpu.memory_ops.mem is cpu.mem
+
+    def test_read_only_and_spec(self, tmp_path):
+        """Las escrituras en una ventana de solo lectura detienen la CPU"""
+        data = tmp_path / "tabla.bin"
+        data.write_bytes(bytes(range(16)))
+        assert parse_window_spec(f"{data}@0x20000,ro") == (str(data), 0x20000, True)
+        assert parse_window_spec("x.bin") == ("x.bin", None, False)
+        with pytest.raises(ValueError):
+            parse_window_spec("x.bin@base")
+
+        cpu = CPU(memory_size=4096)
+        window = Loader.mapear_archivo(cpu, str(data), 0x20000, read_only=True)
+        assert cpu.memory_ops.read_word(0x20008) == int.from_bytes(
+            bytes(range(8, 16)), "little"
+        )
+        cpu.mem.write_words(0, [self._encode(Opcodes.ST, 1, imm32=0x20000)])
+        result = cpu.run_fast(max_cycles=10)
+        assert "solo lectura" in str(result.fault)
+        cpu.unmap_file(window)
+        assert data.read_bytes() == bytes(range(16))
+
+
+class TestDeviceBus:
+    """Tests del bus de dispositivos MMIO"""
+
+    class Counter(Device):
+        """Dispositivo de prueba: +0 lee y avanza el contador, +8 lo fija"""
+
+        def __init__(self, start=0x10000):
+            super().__init__("contador", start, 16)
+            self.value = 0
+
+        def read(self, address):
+            if address == self.start:
+                self.value += 1
+                return self.value
+            return 0
+
+        def write(self, address, value):
+            if address == self.start + 8:
+                self.value = value
+
+    def test_page_decoding(self):
+        """La tabla de páginas ubica cada dirección y rechaza solapamientos"""
+        bus = DeviceBus()
+        small = bus.attach(Device("a", 0x1F8, 16))  # Cruza dos páginas
+        big = bus.attach(Device("b", 0x208, 3 * DeviceBus.PAGE_SIZE))
+        assert bus.find(0x1F8) is small and bus.find(0x207) is small
+        assert bus.find(0x208) is big and bus.find(big.end - 1) is big
+        assert bus.find(0x1F7) is None and bus.find(big.end) is None
+        with pytest.raises(ValueError, match="colisiona con 'b'"):
+            bus.attach(Device("c", 0x300, 8))
+        bus.detach(small)
+        assert bus.find(0x200) is None and list(bus) == [big]
+        with pytest.raises(ValueError):
+            bus.detach(small)
+
+    @pytest.mark.parametrize("engine", ["interpreter", "blocks", "fast"])
+    def test_plugged_device(self, engine):
+        """Un dispositivo nuevo responde a IN/OUT y a LD/ST fuera de la RAM"""
+        cpu = CPU(memory_size=4096)
+        counter = cpu.attach_device(self.Counter())
+        assert cpu.regions.find(0x10008).name == "contador"
+        cpu.io_ports.write_output(40, 0x10008, 0)
+        assert cpu.io_ports.read_input(0x10000, 0) == 41
+
+        encode = TestFileWindow._encode
+        cpu.mem.write_words(
+            0,
+            [
+                encode(Opcodes.LD, 1, imm32=0x10000),
+                encode(Opcodes.ST, 1, imm32=0x800),
+                encode(Opcodes.HALT),
+            ],
+        )
+        if engine == "fast":
+            assert cpu.run_fast(max_cycles=10).halted
+        else:
+            cpu.run(max_cycles=10, engine=engine)
+        assert cpu.mem.read_word(0x800) == 42 == counter.value
+
+        cpu.detach_device(counter)
+        assert cpu.regions.find(0x10000) is None
+        with pytest.raises(ValueError, match="lectura fuera de rango"):
+            cpu.memory_ops.read_word(0x10000)
+        with pytest.raises(ValueError, match="RAM"):
+            cpu.attach_device(self.Counter(start=0x100))
+        with pytest.raises(ValueError, match="consola"):
+            cpu.attach_device(self.Counter(start=IOPorts.MMIO_CONSOLE_INT))
+
+    def test_devices_shadow_sparse_memory(self, tmp_path):
+        """Con SparseMemory los LD/ST a un dispositivo no llegan a la RAM"""
+        cpu = CPU(memory=SparseMemory())
+        cpu.memory_ops.write_word(DMA_LEN, 1234)
+        assert cpu.io_ports.dma.length == 1234
+        assert cpu.mem.read_word(DMA_LEN) == 0
+        cpu.memory_ops.write_byte(IOPorts.MMIO_CONSOLE_CHAR, ord("A"))
+        assert cpu.io_ports.output_buffer == "A"
+
+        counter = cpu.attach_device(self.Counter(start=0xFFFF8000))
+        cpu.mem.write_words(
+            0,
+            [
+                TestFileWindow._encode(Opcodes.LD, 1, imm32=0xFFFF8000),
+                TestFileWindow._encode(Opcodes.HALT),
+            ],
+        )
+        assert cpu.run_fast(max_cycles=10).halted
+        assert cpu.registers[1] == 1 == counter.value
+
+        # Los puertos de archivo solo atienden INS/OUTS: ST sigue en memoria
+        src = tmp_path / "vacio.txt"
+        src.write_text("")
+        cpu.io_ports.open_file(0xFFFF0020, str(src), "r")
+        cpu.memory_ops.write_word(0xFFFF0020, 9)
+        assert cpu.mem.read_word(0xFFFF0020) == 9
+        cpu.io_ports.close_all_files()
+
+    def test_file_ports(self, tmp_path):
+        """Cada archivo abierto es un dispositivo de un puerto"""
+        src = tmp_path / "lineas.txt"
+        src.write_text("uno\ndos\n")
+        io = CPU(memory_size=4096).io_ports
+        io.open_file(0xFFFF0020, str(src), "r")
+        assert isinstance(io.devices.find(0xFFFF0020), FilePortDevice)
+        assert io.read_string(0xFFFF0020) == "uno"
+        io.open_file(0xFFFF0020, str(src), "r")  # Reabrir reemplaza el archivo
+        assert io.read_string(0xFFFF0020) == "uno"
+        io.close_file(0xFFFF0020)
+        assert io.devices.find(0xFFFF0020) is None
+        assert io.read_string(0xFFFF0020) == ""
+        with pytest.raises(RuntimeError, match="consola"):
+            io.open_file(IOPorts.MMIO_CONSOLE_INT, str(src), "r")
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])